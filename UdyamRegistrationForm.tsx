@@ -4,6 +4,15 @@
 import React, { useState, useEffect } from 'react';
 import { toast } from 'react-toastify';
 import 'react-toastify/dist/ReactToastify.css';
+import { ValidationCache, versionOf } from './utils/validationCache';
+import { isAadhaarNumber, isEntrepreneurName, isGstin, isOtp, isPanNumber } from './utils/generatedValidators';
+import { validateAadhaarChecksum, validateGSTINChecksum } from './utils/validation';
+
+// Field validation results memoised across keystrokes and re-renders
+const fieldValidationCache = new ValidationCache({ max: 500 });
+
+// Aadhaar Verhoeff and GSTIN check-digit tests, as in the API (NEXT_PUBLIC_VALIDATE_CHECKSUMS=false turns them off)
+const CHECKSUMS_ENABLED = String((process as any)?.env?.NEXT_PUBLIC_VALIDATE_CHECKSUMS || 'true').toLowerCase() !== 'false';
 
 // Types
 interface FormField {
@@ -69,29 +78,23 @@ const UdyamRegistrationForm: React.FC = () => {
 
   const API_BASE = (process?.env?.NEXT_PUBLIC_API_URL as string) || '';
 
-  // Validation patterns
-  const validationPatterns = {
-    aadhaar: /^[2-9][0-9]{11}$/,
-    pan: /^[A-Z]{5}[0-9]{4}[A-Z]{1}$/,
-    otp: /^[0-9]{6}$/,
-    gstin: /^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$/,
-    name: /^[a-zA-Z\s.]+$/
-  };
-
   // Form validation
-  const validateField = (fieldName: string, value: string): string => {
+  const computeFieldError = (fieldName: string, value: string): string => {
     if (!value.trim() && ['aadhaar_number', 'entrepreneur_name', 'organization_type', 'pan_number', 'filed_itr'].includes(fieldName)) {
       return 'This field is required';
     }
 
     switch (fieldName) {
       case 'aadhaar_number':
-        if (!validationPatterns.aadhaar.test(value)) {
+        if (!isAadhaarNumber(value)) {
           return 'Please enter valid 12-digit Aadhaar number starting with 2-9';
         }
+        if (CHECKSUMS_ENABLED && !validateAadhaarChecksum(value)) {
+          return 'Please check the Aadhaar number; its last digit does not match';
+        }
         break;
       case 'entrepreneur_name':
-        if (!validationPatterns.name.test(value)) {
+        if (!isEntrepreneurName(value)) {
           return 'Name should contain only letters, spaces and dots';
         }
         if (value.length < 2) {
@@ -103,25 +106,38 @@ const UdyamRegistrationForm: React.FC = () => {
         if (otpSent) {
           const otpMockEnabled = String((process as any)?.env?.NEXT_PUBLIC_OTPMOCK || '').toLowerCase() === 'true';
           const isMockOtp = otpMockEnabled && value === '1234';
-          if (!isMockOtp && !validationPatterns.otp.test(value)) {
+          if (!isMockOtp && !isOtp(value)) {
             return 'Please enter valid 6-digit OTP';
           }
         }
         break;
       case 'pan_number':
-        if (!validationPatterns.pan.test(value)) {
+        if (!isPanNumber(value)) {
           return 'PAN format: AAAAA9999A (5 letters, 4 numbers, 1 letter)';
         }
         break;
       case 'gstin':
-        if (value && !validationPatterns.gstin.test(value)) {
+        if (value && !isGstin(value)) {
           return 'Please enter valid 15-character GSTIN';
         }
+        if (value && CHECKSUMS_ENABLED && !validateGSTINChecksum(value)) {
+          return 'Please check the GSTIN; its last character does not match';
+        }
         break;
     }
     return '';
   };
 
+  // OTP rules depend on whether an OTP was sent, so that state is part of the key
+  const validateField = (fieldName: string, value: string): string => {
+    const rule = fieldName === 'otp' ? `otp:${otpSent}` : fieldName;
+    return fieldValidationCache.check(rule, value, (text: string) => computeFieldError(fieldName, text));
+  };
+
+  useEffect(() => {
+    if (schema) fieldValidationCache.setVersion(versionOf(schema));
+  }, [schema]);
+
   useEffect(() => {
     const loadSchema = async () => {
       try {
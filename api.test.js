@@ -4,8 +4,11 @@ const request = require('supertest');
 jest.mock('pg', () => {
   const mPool = {
     query: jest.fn(),
-    end: jest.fn()
+    end: jest.fn(),
+    on: jest.fn()
   };
+  // Queries run on a checked-out client (utils/db.js); it shares mPool.query
+  mPool.connect = jest.fn(() => Promise.resolve({ query: mPool.query, release: jest.fn() }));
   return { Pool: jest.fn(() => mPool) };
 });
 
@@ -13,10 +16,13 @@ const { Pool } = require('pg');
 const mockPool = new Pool();
 
 const app = require('./server');
+const externalServices = require('./utils/externalServices');
+const { statusCache } = app;
 
 describe('Udyam Registration API Tests', () => {
   beforeEach(() => {
     jest.clearAllMocks();
+    statusCache.clear();
   });
 
   describe('POST /api/generate-otp', () => {
@@ -28,7 +34,7 @@ describe('Udyam Registration API Tests', () => {
       const response = await request(app)
         .post('/api/generate-otp')
         .send({
-          aadhaar_number: '234567890123',
+          aadhaar_number: '234567890124',
           entrepreneur_name: 'John Doe'
         });
 
@@ -38,6 +44,38 @@ describe('Udyam Registration API Tests', () => {
       expect(mockPool.query).toHaveBeenCalledTimes(2);
     });
 
+    test('should accept an Aadhaar number sent as a JSON number', async () => {
+      mockPool.query
+        .mockResolvedValueOnce({ rows: [] }) // No existing registration
+        .mockResolvedValueOnce({ rows: [{ id: 1 }] }); // Insert OTP
+
+      const response = await request(app)
+        .post('/api/generate-otp')
+        .send({
+          aadhaar_number: 234567890124,
+          entrepreneur_name: 'John Doe'
+        });
+
+      expect(response.status).toBe(200);
+    });
+
+    test('should not store an OTP when the UIDAI lookup fails', async () => {
+      const lookup = jest.spyOn(externalServices, 'lookupAadhaarMobile')
+        .mockRejectedValueOnce(new Error('UIDAI timeout'));
+      mockPool.query.mockResolvedValueOnce({ rows: [] }); // No existing registration
+
+      const response = await request(app)
+        .post('/api/generate-otp')
+        .send({
+          aadhaar_number: '234567890124',
+          entrepreneur_name: 'John Doe'
+        });
+
+      expect(response.status).toBe(503);
+      expect(mockPool.query).toHaveBeenCalledTimes(1);
+      lookup.mockRestore();
+    });
+
     test('should reject invalid Aadhaar number', async () => {
       const response = await request(app)
         .post('/api/generate-otp')
@@ -50,11 +88,24 @@ describe('Udyam Registration API Tests', () => {
       expect(response.body.error).toBe('Validation failed');
     });
 
+    test('should reject an Aadhaar number with a wrong check digit', async () => {
+      const response = await request(app)
+        .post('/api/generate-otp')
+        .send({
+          aadhaar_number: '234567890123', // Verhoeff check digit should be 4
+          entrepreneur_name: 'John Doe'
+        });
+
+      expect(response.status).toBe(400);
+      expect(response.body.error).toBe('Validation failed');
+      expect(mockPool.query).not.toHaveBeenCalled();
+    });
+
     test('should reject invalid name format', async () => {
       const response = await request(app)
         .post('/api/generate-otp')
         .send({
-          aadhaar_number: '234567890123',
+          aadhaar_number: '234567890124',
           entrepreneur_name: 'John123' // Invalid - contains numbers
         });
 
@@ -70,7 +121,7 @@ describe('Udyam Registration API Tests', () => {
       const response = await request(app)
         .post('/api/generate-otp')
         .send({
-          aadhaar_number: '234567890123',
+          aadhaar_number: '234567890124',
           entrepreneur_name: 'John Doe'
         });
 
@@ -82,27 +133,19 @@ describe('Udyam Registration API Tests', () => {
   describe('POST /api/validate-otp', () => {
     test('should validate correct OTP', async () => {
       mockPool.query
-        .mockResolvedValueOnce({ 
-          rows: [{ 
-            id: 1, 
-            aadhaar_number: '234567890123',
-            otp: '123456',
-            expires_at: new Date(Date.now() + 300000) // 5 minutes from now
-          }] 
-        }) // Find OTP
-        .mockResolvedValueOnce({ rows: [] }) // Mark as used
-        .mockResolvedValueOnce({ rows: [{ id: 1 }] }); // Create/update registration
+        .mockResolvedValueOnce({ rows: [{ id: 1 }] }); // Consume OTP and upsert draft registration
 
       const response = await request(app)
         .post('/api/validate-otp')
         .send({
-          aadhaar_number: '234567890123',
+          aadhaar_number: '234567890124',
           otp: '123456'
         });
 
       expect(response.status).toBe(200);
       expect(response.body.success).toBe(true);
       expect(response.body.token).toBeDefined();
+      expect(mockPool.query).toHaveBeenCalledTimes(1);
     });
 
     test('should reject invalid OTP', async () => {
@@ -111,7 +154,7 @@ describe('Udyam Registration API Tests', () => {
       const response = await request(app)
         .post('/api/validate-otp')
         .send({
-          aadhaar_number: '234567890123',
+          aadhaar_number: '234567890124',
           otp: '654321'
         });
 
@@ -123,7 +166,7 @@ describe('Udyam Registration API Tests', () => {
       const response = await request(app)
         .post('/api/validate-otp')
         .send({
-          aadhaar_number: '234567890123',
+          aadhaar_number: '234567890124',
           otp: '12345' // Too short
         });
 
@@ -190,6 +233,21 @@ describe('Udyam Registration API Tests', () => {
       expect(response.body.already_registered).toBe(true);
     });
 
+    test('should reject a GSTIN with a wrong check character', async () => {
+      const response = await request(app)
+        .post('/api/validate-pan')
+        .send({
+          organization_type: 'proprietorship',
+          pan_number: 'ABCPD1234E',
+          gstin: '27ABCPD1234E1ZA', // Check character should be E
+          filed_itr: 'yes'
+        })
+        .set('Authorization', 'Bearer valid-jwt-token');
+
+      expect(response.status).toBe(400);
+      expect(response.body.error).toBe('Validation failed');
+    });
+
     test('should reject invalid PAN format', async () => {
       const response = await request(app)
         .post('/api/validate-pan')
@@ -219,7 +277,7 @@ describe('Udyam Registration API Tests', () => {
       });
 
       const response = await request(app)
-        .get('/api/registration-status/234567890123');
+        .get('/api/registration-status/234567890124');
 
       expect(response.status).toBe(200);
       expect(response.body.status).toBe('completed');
@@ -230,12 +288,43 @@ describe('Udyam Registration API Tests', () => {
       mockPool.query.mockResolvedValueOnce({ rows: [] });
 
       const response = await request(app)
-        .get('/api/registration-status/234567890123');
+        .get('/api/registration-status/234567890124');
 
       expect(response.status).toBe(200);
       expect(response.body.status).toBe('not_started');
     });
 
+    test('should serve repeated status checks from the cache', async () => {
+      mockPool.query
+        .mockResolvedValueOnce({ rows: [{ status: 'completed', step_completed: 2 }] })
+        .mockResolvedValueOnce({ rows: [] });
+      await request(app).get('/api/registration-status/234567890124');
+      await request(app).get('/api/registration-status/345678901238');
+
+      const registered = await request(app).get('/api/registration-status/234567890124');
+      const unknown = await request(app).get('/api/registration-status/345678901238');
+
+      expect(registered.body.status).toBe('completed');
+      expect(unknown.body.status).toBe('not_started');
+      expect(mockPool.query).toHaveBeenCalledTimes(2);
+    });
+
+    test('should reload the status after the OTP is validated', async () => {
+      mockPool.query
+        .mockResolvedValueOnce({ rows: [] }) // First status lookup, cached as not started
+        .mockResolvedValueOnce({ rows: [{ id: 2 }] }) // Consume OTP and upsert draft registration
+        .mockResolvedValueOnce({ rows: [{ status: 'draft', step_completed: 1 }] }); // Status lookup
+
+      await request(app).get('/api/registration-status/345678901238');
+      await request(app)
+        .post('/api/validate-otp')
+        .send({ aadhaar_number: '345678901238', otp: '123456' });
+      const response = await request(app).get('/api/registration-status/345678901238');
+
+      expect(response.body.status).toBe('draft');
+      expect(mockPool.query).toHaveBeenCalledTimes(3);
+    });
+
     test('should reject invalid Aadhaar in URL', async () => {
       const response = await request(app)
         .get('/api/registration-status/123456789'); // Too short
@@ -266,7 +355,7 @@ describe('Udyam Registration API Tests', () => {
           .post('/api/generate-otp')
           .set('X-RL-Key', 'same-user')
           .send({
-            aadhaar_number: '234567890123',
+            aadhaar_number: '234567890124',
             entrepreneur_name: 'John Doe'
           })
       );
@@ -0,0 +1,124 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { AuditLog } = require('./utils/auditLog');
+
+// Records each batch INSERT; fail(config) may throw to stand in for a database error
+function fakeDb(fail = () => {}) {
+  const inserts = [];
+  const query = jest.fn(async (config) => {
+    fail(config);
+    inserts.push({ name: config.name, rows: config.values[0].length, values: config.values });
+    return { rowCount: config.values[0].length };
+  });
+  return { query, inserts };
+}
+
+const validation = (audit, value = '234567890123') => audit.validation({
+  registration_id: 1, validation_type: 'aadhaar', field_name: 'aadhaar_number', field_value: value, is_valid: true
+});
+
+describe('Audit Log Tests', () => {
+  test('should write each table as one multi-row insert', async () => {
+    const db = fakeDb();
+    const audit = new AuditLog(db);
+
+    for (let i = 0; i < 3; i++) validation(audit);
+    audit.submission({ registration_id: 1, step_number: 1, form_data: { consent: true } });
+    expect(db.query).not.toHaveBeenCalled();
+
+    await audit.flush();
+    expect(db.inserts.map(({ name, rows }) => [name, rows])).toEqual([
+      ['audit_insert_form_submissions', 1],
+      ['audit_insert_validation_logs', 3]
+    ]);
+    // Column arrays, one per column
+    expect(db.inserts[1].values).toHaveLength(7);
+    expect(audit.stats()).toMatchObject({ depth: 0, queued: 4, written: 4, flushes: 2 });
+    expect(audit.stats().flush_latency.count).toBe(2);
+  });
+
+  test('should flush as soon as a batch is full', async () => {
+    const db = fakeDb();
+    const audit = new AuditLog(db, { batchSize: 2, flushMs: 60000 }).start();
+
+    validation(audit);
+    await new Promise(setImmediate);
+    expect(db.query).not.toHaveBeenCalled();
+
+    validation(audit);
+    await new Promise(setImmediate);
+    await audit.flushing;
+    expect(db.inserts).toHaveLength(1);
+    await audit.stop();
+  });
+
+  test('should drop records once the buffer is full', async () => {
+    const audit = new AuditLog(fakeDb(), { maxBuffer: 2 });
+
+    expect(validation(audit)).toBe(true);
+    expect(validation(audit)).toBe(true);
+    expect(validation(audit)).toBe(false);
+    expect(audit.stats()).toMatchObject({ depth: 2, dropped: 1, max_depth: 2 });
+  });
+
+  test('should reject only the row that violates a constraint', async () => {
+    const db = fakeDb(({ values }) => {
+      if (values[0].includes(404)) throw Object.assign(new Error('foreign key violation'), { code: '23503' });
+    });
+    const audit = new AuditLog(db);
+
+    validation(audit);
+    audit.validation({ registration_id: 404, validation_type: 'pan', field_name: 'pan_number', is_valid: false });
+    validation(audit);
+    await audit.flush();
+
+    expect(audit.stats()).toMatchObject({ written: 2, rejected: 1, depth: 0 });
+  });
+
+  test('should keep the batch queued while the database is down', async () => {
+    let down = true;
+    const db = fakeDb(() => {
+      if (down) throw Object.assign(new Error('connection refused'), { code: 'ECONNREFUSED' });
+    });
+    const audit = new AuditLog(db);
+
+    validation(audit, 'first');
+    validation(audit, 'second');
+    await audit.flush();
+    expect(audit.stats()).toMatchObject({ depth: 2, written: 0, errors: 1, last_error: 'connection refused' });
+
+    down = false;
+    await audit.flush();
+    expect(db.inserts[0].values[3]).toEqual(['first', 'second']);
+    expect(audit.stats().depth).toBe(0);
+  });
+
+  test('should spill overflow to disk and replay it once drained', async () => {
+    const spillDir = fs.mkdtempSync(path.join(os.tmpdir(), 'audit-spill-'));
+    const db = fakeDb();
+    const audit = new AuditLog(db, { maxBuffer: 1, overflow: 'spill', spillDir });
+
+    try {
+      validation(audit, 'queued');
+      validation(audit, 'spilled');
+      await audit.spillWrite;
+      expect(fs.readdirSync(spillDir)).toEqual([`audit-${process.pid}.ndjson`]);
+
+      await audit.flush();
+      await new Promise((resolve) => setTimeout(resolve, 20));
+      await audit.flush();
+
+      expect(db.inserts.map(({ values }) => values[3][0])).toEqual(['queued', 'spilled']);
+      expect(db.inserts[1].values[6][0]).toBeInstanceOf(Date);
+      expect(audit.stats()).toMatchObject({ spilled: 1, replayed: 1, depth: 0 });
+      expect(fs.readdirSync(spillDir)).toEqual([]);
+    } finally {
+      fs.rmSync(spillDir, { recursive: true, force: true });
+    }
+  });
+
+  test('should reject an unknown overflow policy', () => {
+    expect(() => new AuditLog(fakeDb(), { overflow: 'block' })).toThrow('Unknown AUDIT_OVERFLOW');
+  });
+});
@@ -0,0 +1,44 @@
+
+/**
+ * Cluster supervisor for the Udyam Registration API
+ * Runs one server.js worker per core behind a shared port
+ */
+
+const os = require('os');
+const path = require('path');
+const cluster = require('cluster');
+require('dotenv').config();
+const { Supervisor } = require('./utils/cluster');
+const { serveClusterRateLimits } = require('./utils/rateLimitStore');
+
+const cores = typeof os.availableParallelism === 'function' ? os.availableParallelism() : os.cpus().length;
+const workers = parseInt(process.env.CLUSTER_WORKERS || String(cores), 10);
+
+if (!cluster.isPrimary) {
+  throw new Error('cluster.js must be started directly; workers run server.js');
+}
+
+// Rate-limit counters for every worker live here (utils/rateLimitStore.js)
+serveClusterRateLimits(cluster);
+
+const supervisor = new Supervisor({
+  workers,
+  exec: path.join(__dirname, 'server.js'),
+  heartbeatMs: parseInt(process.env.CLUSTER_HEARTBEAT_MS || '5000', 10),
+  shutdownTimeoutMs: parseInt(process.env.CLUSTER_SHUTDOWN_TIMEOUT_MS || '30000', 10)
+}).start();
+
+console.log(`🚀 Supervisor ${process.pid} starting ${workers} workers on port ${process.env.PORT || 3001}`);
+console.log(`🔁 Rolling reload: kill -HUP ${process.pid}`);
+
+process.on('SIGHUP', () => {
+  supervisor.reload().catch((error) => console.error('Reload error:', error));
+});
+
+const shutdown = async () => {
+  console.log('📄 Draining workers');
+  await supervisor.stop();
+  process.exit(0);
+};
+process.on('SIGINT', shutdown);
+process.on('SIGTERM', shutdown);
@@ -0,0 +1,87 @@
+const { EventEmitter } = require('events');
+const { Supervisor, attachStandalone } = require('./utils/cluster');
+
+// cluster module stand-in: forked workers listen (or crash) when told to
+function fakeCluster({ failFrom = Infinity } = {}) {
+  const cluster = new EventEmitter();
+  cluster.workers = {};
+  let nextId = 1;
+  cluster.setupPrimary = () => {};
+  cluster.fork = () => {
+    const worker = new EventEmitter();
+    worker.id = nextId++;
+    worker.process = { pid: 1000 + worker.id, kill: () => exit(worker, 'SIGKILL') };
+    worker.isConnected = () => true;
+    worker.send = (message) => {
+      if (message.type === 'cluster-shutdown') setImmediate(() => exit(worker, null));
+    };
+    cluster.workers[worker.id] = worker;
+    setImmediate(() => (worker.id >= failFrom ? exit(worker, null, 1) : worker.emit('listening')));
+    return worker;
+  };
+  const exit = (worker, signal, code = 0) => {
+    if (!cluster.workers[worker.id]) return;
+    delete cluster.workers[worker.id];
+    worker.emit('exit', code, signal);
+    cluster.emit('exit', worker, code, signal);
+  };
+  return cluster;
+}
+
+describe('Cluster Supervisor Tests', () => {
+  test('should replace every worker during a rolling reload', async () => {
+    const cluster = fakeCluster();
+    const supervisor = new Supervisor({ workers: 3, exec: 'server.js', clusterModule: cluster, log: () => {} }).start();
+    const before = Object.keys(cluster.workers);
+
+    expect(await supervisor.reload()).toBe(true);
+    const after = Object.keys(cluster.workers);
+    expect(after).toHaveLength(3);
+    expect(after.some((id) => before.includes(id))).toBe(false);
+    expect(supervisor.restarts).toBe(0);
+    await supervisor.stop();
+  });
+
+  test('should keep the old workers when a replacement fails to start', async () => {
+    const cluster = fakeCluster({ failFrom: 3 });
+    const supervisor = new Supervisor({ workers: 2, exec: 'server.js', clusterModule: cluster, log: () => {} }).start();
+
+    expect(await supervisor.reload()).toBe(false);
+    expect(Object.keys(cluster.workers)).toEqual(['1', '2']);
+    expect(supervisor.restarts).toBe(0);
+    await supervisor.stop();
+  });
+
+  test('should report workers that stopped sending heartbeats', () => {
+    const cluster = fakeCluster();
+    const supervisor = new Supervisor({ workers: 1, exec: 'server.js', clusterModule: cluster, heartbeatMs: 1000, log: () => {} }).start();
+    cluster.emit('message', cluster.workers[1], { type: 'cluster-heartbeat', health: { pid: 1001, status: 'ok' } });
+    expect(supervisor.snapshot()[0].status).toBe('ok');
+
+    supervisor.health.get(1).seen_at -= 5000;
+    expect(supervisor.snapshot()[0].status).toBe('unresponsive');
+    clearInterval(supervisor.broadcastTimer);
+  });
+
+  test('should close a standalone server before running the shutdown hook', async () => {
+    const steps = [];
+    const server = Object.assign(new EventEmitter(), {
+      close: (done) => {
+        steps.push('close');
+        setImmediate(done);
+      }
+    });
+    const exit = jest.fn();
+    const { shutdown } = attachStandalone(server, { onShutdown: async () => steps.push('onShutdown'), exit });
+
+    try {
+      await shutdown();
+      await shutdown(); // a second signal while draining
+      expect(steps).toEqual(['close', 'onShutdown']);
+      expect(exit.mock.calls).toEqual([[0]]);
+    } finally {
+      process.removeListener('SIGTERM', shutdown);
+      process.removeListener('SIGINT', shutdown);
+    }
+  });
+});
@@ -0,0 +1,29 @@
+-- Generated by `python -m validators.codegen` from udyam_form_schema.json
+-- (schema version b7212db7c67e28f5). Do not edit by hand; rerun the generator.
+-- Re-applies the column CHECK constraints; safe to run more than once.
+-- Each constraint is swapped in NOT VALID, which needs the table lock only for a catalog
+-- change; VALIDATE then scans the existing rows without blocking reads or writes.
+
+BEGIN;
+ALTER TABLE registrations DROP CONSTRAINT IF EXISTS valid_aadhaar;
+ALTER TABLE registrations ADD CONSTRAINT valid_aadhaar CHECK (aadhaar_number ~ '^[2-9][0-9]{11}$') NOT VALID;
+COMMIT;
+ALTER TABLE registrations VALIDATE CONSTRAINT valid_aadhaar;
+
+BEGIN;
+ALTER TABLE otp_verifications DROP CONSTRAINT IF EXISTS valid_otp;
+ALTER TABLE otp_verifications ADD CONSTRAINT valid_otp CHECK (otp ~ '^[0-9]{6}$') NOT VALID;
+COMMIT;
+ALTER TABLE otp_verifications VALIDATE CONSTRAINT valid_otp;
+
+BEGIN;
+ALTER TABLE registrations DROP CONSTRAINT IF EXISTS valid_pan;
+ALTER TABLE registrations ADD CONSTRAINT valid_pan CHECK (pan_number IS NULL OR pan_number ~ '^[A-Z]{5}[0-9]{4}[A-Z]{1}$') NOT VALID;
+COMMIT;
+ALTER TABLE registrations VALIDATE CONSTRAINT valid_pan;
+
+BEGIN;
+ALTER TABLE registrations DROP CONSTRAINT IF EXISTS valid_gstin;
+ALTER TABLE registrations ADD CONSTRAINT valid_gstin CHECK (gstin IS NULL OR gstin ~ '^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$') NOT VALID;
+COMMIT;
+ALTER TABLE registrations VALIDATE CONSTRAINT valid_gstin;
@@ -53,34 +53,38 @@ CREATE TABLE IF NOT EXISTS otp_verifications (
 );
 
 -- Table: form_submissions
--- Audit trail for all form submissions
+-- Audit trail for all form submissions, range-partitioned by month on submitted_at.
+-- Monthly partitions (form_submissions_YYYY_MM) are created ahead and detached once past
+-- retention by python -m validators.partitions; the primary key includes the partition key.
 CREATE TABLE IF NOT EXISTS form_submissions (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     registration_id INTEGER REFERENCES registrations(id) ON DELETE CASCADE,
     step_number INTEGER NOT NULL,
     form_data JSONB NOT NULL,
     ip_address INET,
     user_agent TEXT,
-    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    submitted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, submitted_at),
 
     -- Constraints
     CONSTRAINT valid_step CHECK (step_number BETWEEN 1 AND 10)
-);
+) PARTITION BY RANGE (submitted_at);
 
 -- Table: validation_logs
--- Log validation attempts and results
+-- Log validation attempts and results, range-partitioned by month on validated_at
 CREATE TABLE IF NOT EXISTS validation_logs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     registration_id INTEGER REFERENCES registrations(id) ON DELETE SET NULL,
     validation_type VARCHAR(50) NOT NULL,
     field_name VARCHAR(50) NOT NULL,
     field_value VARCHAR(255),
     is_valid BOOLEAN NOT NULL,
     error_message TEXT,
-    validated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    validated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, validated_at)
 
     -- Note: Index declared later (CREATE INDEX) because inline INDEX is not valid in PostgreSQL
-);
+) PARTITION BY RANGE (validated_at);
 
 -- Table: enterprise_details (for future use in step 3)
 -- Extended enterprise information
@@ -108,17 +112,58 @@ CREATE TABLE IF NOT EXISTS enterprise_details (
     CONSTRAINT valid_turnover CHECK (previous_year_turnover >= 0)
 );
 
+-- Table: otp_dispatch_jobs
+-- Queue of OTP SMS deliveries, drained by the dispatcher in utils/otpQueue.js.
+-- Delivered jobs are deleted; jobs that exhaust their retries stay as status 'dead', without
+-- their OTP, until cleanup_expired_otps() purges them.
+CREATE TABLE IF NOT EXISTS otp_dispatch_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    aadhaar_number VARCHAR(12) NOT NULL,
+    mobile VARCHAR(15) NOT NULL,
+    -- NULL once the job is dead-lettered
+    otp VARCHAR(6),
+    status VARCHAR(10) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    -- Next time the job may be claimed; claiming pushes it out by the visibility timeout
+    run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    failed_at TIMESTAMP
+);
+
+-- Table: udyam_sequences
+-- Next unissued Udyam number per state and district. API processes lease blocks of numbers
+-- from here (utils/udyamAllocator.js); next_value only ever grows.
+CREATE TABLE IF NOT EXISTS udyam_sequences (
+    state_code CHAR(2) NOT NULL,
+    district_code CHAR(2) NOT NULL,
+    next_value BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (state_code, district_code),
+
+    CONSTRAINT valid_codes CHECK (state_code ~ '^[0-9]{2}$' AND district_code ~ '^[0-9]{2}$'),
+    CONSTRAINT valid_next_value CHECK (next_value >= 1)
+);
+
 -- Create indexes for performance optimization
 CREATE INDEX IF NOT EXISTS idx_registrations_aadhaar ON registrations(aadhaar_number);
 CREATE INDEX IF NOT EXISTS idx_registrations_pan ON registrations(pan_number);
+-- One completed registration per PAN; the API's existence filter can miss a PAN completed
+-- elsewhere moments earlier, so this is the guarantee
+CREATE UNIQUE INDEX IF NOT EXISTS idx_registrations_completed_pan ON registrations(pan_number) WHERE status = 'completed';
 CREATE INDEX IF NOT EXISTS idx_registrations_status ON registrations(status);
 CREATE INDEX IF NOT EXISTS idx_registrations_created_at ON registrations(created_at);
+-- Delta scans of the existence filters (utils/existenceFilter.js)
+CREATE INDEX IF NOT EXISTS idx_registrations_updated_at ON registrations(updated_at);
 CREATE INDEX IF NOT EXISTS idx_otp_aadhaar_type ON otp_verifications(aadhaar_number, type);
 CREATE INDEX IF NOT EXISTS idx_otp_expires_at ON otp_verifications(expires_at);
 CREATE INDEX IF NOT EXISTS idx_form_submissions_reg_id ON form_submissions(registration_id);
 CREATE INDEX IF NOT EXISTS idx_form_submissions_step ON form_submissions(step_number);
+CREATE INDEX IF NOT EXISTS idx_otp_dispatch_jobs_due ON otp_dispatch_jobs(run_at) WHERE status = 'queued';
 
--- Index for validation_logs performance
+-- Index for validation_logs performance; on the partitioned tables every index is per partition,
+-- so each stays the size of one month
 CREATE INDEX IF NOT EXISTS idx_validation_logs_type_time ON validation_logs(validation_type, validated_at);
 
 -- Create function to update updated_at timestamp
@@ -139,12 +184,66 @@ CREATE TRIGGER update_enterprise_details_updated_at
     BEFORE UPDATE ON enterprise_details 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
--- Create function to clean up expired OTPs
-CREATE OR REPLACE FUNCTION cleanup_expired_otps()
+-- Create function to add the monthly partition of a range-partitioned audit table.
+-- Rows for that month already caught by <parent>_default are moved into the new partition.
+-- Used below and by python -m validators.partitions; returns the partition name.
+CREATE OR REPLACE FUNCTION create_monthly_partition(parent TEXT, month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month)::date;
+    upper_bound DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    partition_name TEXT := parent || '_' || to_char(date_trunc('month', month), 'YYYY_MM');
+    key_column TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    SELECT a.attname INTO key_column
+    FROM pg_partitioned_table p
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = parent::regclass;
+
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, parent);
+    IF to_regclass(parent || '_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+            parent || '_default', key_column, lower_bound, key_column, upper_bound, partition_name
+        );
+    END IF;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   parent, partition_name, lower_bound, upper_bound);
+    RETURN partition_name;
+END;
+$$ language 'plpgsql';
+
+-- Create the default partitions and this month's and the next three months' partitions.
+-- Tables created before partitioning are skipped; python -m validators.partitions convert
+-- moves their rows into partitioned tables.
+DO $$
+DECLARE
+    parent TEXT;
+    ahead INTEGER;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['form_submissions', 'validation_logs'] LOOP
+        CONTINUE WHEN NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = parent::regclass);
+        EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT', parent || '_default', parent);
+        FOR ahead IN 0..3 LOOP
+            PERFORM create_monthly_partition(parent, (date_trunc('month', CURRENT_DATE) + make_interval(months => ahead))::date);
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+-- Create function to clean up expired OTPs and old dead-lettered OTP deliveries
+DROP FUNCTION IF EXISTS cleanup_expired_otps();
+CREATE OR REPLACE FUNCTION cleanup_expired_otps(dead_job_retention INTERVAL DEFAULT INTERVAL '7 days')
 RETURNS void AS $$
 BEGIN
     DELETE FROM otp_verifications 
     WHERE expires_at < CURRENT_TIMESTAMP - INTERVAL '1 day';
+    DELETE FROM otp_dispatch_jobs
+    WHERE status = 'dead' AND failed_at < CURRENT_TIMESTAMP - dead_job_retention;
 END;
 $$ language 'plpgsql';
 
@@ -196,6 +295,7 @@ COMMENT ON TABLE otp_verifications IS 'Temporary storage for OTP verification';
 COMMENT ON TABLE form_submissions IS 'Audit trail for all form submissions';
 COMMENT ON TABLE validation_logs IS 'Logs of field validation attempts';
 COMMENT ON TABLE enterprise_details IS 'Extended enterprise information for completed registrations';
+COMMENT ON TABLE otp_dispatch_jobs IS 'Pending OTP SMS deliveries and their dead-letter list';
 
 COMMENT ON COLUMN registrations.step_completed IS '1: Aadhaar verified, 2: PAN verified, 3: Registration completed';
 COMMENT ON COLUMN registrations.udyam_number IS 'Generated Udyam registration number (format: UDYAM-XX-XX-XXXXXXX)';
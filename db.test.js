@@ -0,0 +1,81 @@
+const { Database, LatencyHistogram, STATEMENTS, poolConfig } = require('./utils/db');
+
+// Pool stand-in whose clients answer with the given query function
+function fakePool(query) {
+  const released = [];
+  const pool = {
+    waitingCount: 0,
+    totalCount: 1,
+    idleCount: 0,
+    options: { max: 4 },
+    released,
+    connect: jest.fn(() => Promise.resolve({ query, release: (error) => released.push(error) }))
+  };
+  return pool;
+}
+
+describe('Database Access Tests', () => {
+  test('should run statements by name as prepared queries', async () => {
+    const query = jest.fn(() => Promise.resolve({ rows: [{ id: 1 }] }));
+    const db = new Database(fakePool(query));
+
+    const result = await db.execute('registration_by_id', [1]);
+    expect(result.rows).toEqual([{ id: 1 }]);
+    expect(query.mock.calls[0][0]).toEqual({ name: 'registration_by_id', text: STATEMENTS.registration_by_id, values: [1] });
+    expect(() => db.execute('no_such_statement')).toThrow('Unknown statement');
+  });
+
+  test('should time checkout and each statement separately', async () => {
+    let clock = 0;
+    const query = jest.fn(() => {
+      clock += 5;
+      return Promise.resolve({ rows: [] });
+    });
+    const pool = fakePool(query);
+    pool.connect = jest.fn(() => {
+      clock += 2;
+      return Promise.resolve({ query, release: () => {} });
+    });
+    const db = new Database(pool, { now: () => clock });
+
+    await db.execute('registration_status_by_aadhaar', ['234567890123']);
+    await db.query('SELECT 1');
+
+    const stats = db.stats();
+    expect(stats.checkout.count).toBe(2);
+    expect(stats.checkout.max_ms).toBe(2);
+    expect(stats.statements.registration_status_by_aadhaar).toMatchObject({ count: 1, max_ms: 5, errors: 0 });
+    expect(stats.statements.unnamed.count).toBe(1);
+    expect(stats.pool).toMatchObject({ max: 4, total: 1, idle: 0, waiting: 0 });
+  });
+
+  test('should discard a client after a connection error but not after an SQL error', async () => {
+    const sqlError = Object.assign(new Error('duplicate key'), { code: '23505' });
+    const dropped = new Error('Connection terminated unexpectedly');
+    const query = jest.fn();
+    query.mockRejectedValueOnce(sqlError).mockRejectedValueOnce(dropped);
+    const pool = fakePool(query);
+    const db = new Database(pool);
+
+    await expect(db.execute('registration_by_id', [1])).rejects.toThrow('duplicate key');
+    await expect(db.execute('registration_by_id', [1])).rejects.toThrow('Connection terminated');
+    expect(pool.released).toEqual([undefined, dropped]);
+    expect(db.stats().statements.registration_by_id.errors).toBe(2);
+  });
+
+  test('should report percentiles within the bucket resolution', () => {
+    const histogram = new LatencyHistogram();
+    for (let ms = 1; ms <= 1000; ms++) histogram.record(ms);
+    expect(histogram.percentile(50)).toBeGreaterThanOrEqual(500);
+    expect(histogram.percentile(50)).toBeLessThan(550);
+    expect(histogram.percentile(99)).toBeGreaterThanOrEqual(990);
+    expect(histogram.percentile(100)).toBe(1000);
+  });
+
+  test('should read pool settings from the environment', () => {
+    const config = poolConfig({ DB_POOL_MAX: '25', DB_POOL_IDLE_TIMEOUT_MS: '5000', DB_STATEMENT_TIMEOUT_MS: '2000' });
+    expect(config).toMatchObject({ max: 25, idleTimeoutMillis: 5000, statement_timeout: 2000, connectionTimeoutMillis: 0 });
+    expect(poolConfig({}).max).toBe(10);
+    expect(poolConfig({}).query_timeout).toBeUndefined();
+  });
+});
@@ -0,0 +1,172 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { BloomFilter, ExistenceFilters, hashPair } = require('./utils/existenceFilter');
+
+const aadhaar = (i) => String(200000000000 + i);
+const pan = (i) => `ABCPE${String(i).padStart(4, '0')}F`;
+
+// Database stand-in answering the filter's named scans from an array of registrations
+function fakeDb(rows, { startedMs = 1000 } = {}) {
+  const query = jest.fn(({ name, values }) => {
+    if (name === 'existence_scan_bounds') {
+      return Promise.resolve({
+        rows: [{
+          aadhaar: rows.filter((r) => r.status !== 'draft').length,
+          pan: rows.filter((r) => r.status === 'completed' && r.pan_number).length,
+          started_ms: startedMs
+        }]
+      });
+    }
+    if (name === 'existence_scan_batch') {
+      const [lastId, limit] = values;
+      return Promise.resolve({ rows: rows.filter((r) => r.id > lastId && r.status !== 'draft').slice(0, limit) });
+    }
+    if (name === 'existence_scan_changed') {
+      const [since, lastId, limit] = values;
+      const changed = rows.filter((r) => r.updated_ms > since && r.id > lastId && r.status !== 'draft');
+      return Promise.resolve({ rows: changed.slice(0, limit) });
+    }
+    return Promise.reject(new Error(`unexpected query ${name}`));
+  });
+  return { query };
+}
+
+const registration = (i, status, updatedMs = 0) => ({
+  id: i + 1,
+  aadhaar_number: aadhaar(i),
+  pan_number: status === 'draft' ? null : pan(i),
+  status,
+  updated_ms: updatedMs
+});
+
+const quiet = () => {};
+
+describe('Existence Filter Tests', () => {
+  test('should hash the same way as validators/existence.py', () => {
+    expect(hashPair('234567890123')).toEqual([4199578415, 2568107065]);
+    expect(hashPair('ABCPE1234F')).toEqual([842293411, 843553193]);
+  });
+
+  test('should have no false negatives and stay near the target false-positive rate', () => {
+    const filter = BloomFilter.forCapacity(10000, 0.01);
+    for (let i = 0; i < 10000; i++) filter.add(aadhaar(i));
+
+    for (let i = 0; i < 10000; i++) expect(filter.mightContain(aadhaar(i))).toBe(true);
+    let falsePositives = 0;
+    for (let i = 10000; i < 30000; i++) {
+      if (filter.mightContain(aadhaar(i))) falsePositives++;
+    }
+    expect(falsePositives / 20000).toBeLessThan(0.02);
+    expect(filter.stats().estimated_fpr).toBeLessThan(0.02);
+  });
+
+  test('should round-trip snapshots and reject corrupt ones', () => {
+    const filter = BloomFilter.forCapacity(100);
+    filter.add('234567890123');
+    const buffer = filter.serialize('aadhaar', 1234.5);
+
+    const loaded = BloomFilter.deserialize(buffer);
+    expect(loaded.name).toBe('aadhaar');
+    expect(loaded.watermark).toBe(1234.5);
+    expect(loaded.filter.mightContain('234567890123')).toBe(true);
+    expect(loaded.filter.count).toBe(1);
+
+    buffer[buffer.length - 1] ^= 0xff;
+    expect(() => BloomFilter.deserialize(buffer)).toThrow('checksum');
+    expect(() => BloomFilter.deserialize(Buffer.from('nope'))).toThrow('Not an existence filter');
+  });
+
+  test('should confirm every check in the database until the filters are built', async () => {
+    const filters = new ExistenceFilters(fakeDb([]), { log: quiet });
+    const confirm = jest.fn(() => Promise.resolve(false));
+
+    expect(await filters.exists('aadhaar', aadhaar(1), confirm)).toBe(false);
+    expect(confirm).toHaveBeenCalledTimes(1);
+    expect(filters.stats()).toMatchObject({ ready: false, unchecked: 1 });
+  });
+
+  test('should skip the database for definite negatives after a keyset scan', async () => {
+    const rows = [
+      registration(0, 'completed'),
+      registration(1, 'in_progress'),
+      registration(2, 'draft'),
+      registration(3, 'completed')
+    ];
+    const db = fakeDb(rows);
+    const filters = new ExistenceFilters(db, { batchRows: 2, minCapacity: 1000, log: quiet });
+    await filters.build();
+
+    // Three non-draft rows: one full batch, then a short one ends the scan
+    expect(db.query.mock.calls.filter(([q]) => q.name === 'existence_scan_batch')).toHaveLength(2);
+    const confirm = jest.fn(() => Promise.resolve(true));
+    expect(await filters.exists('aadhaar', aadhaar(1), confirm)).toBe(true);
+    expect(await filters.exists('pan', pan(3), confirm)).toBe(true);
+    expect(confirm).toHaveBeenCalledTimes(2);
+
+    // Drafts and unfinished PANs are not in the filters
+    const never = jest.fn(() => Promise.resolve(true));
+    expect(await filters.exists('aadhaar', aadhaar(2), never)).toBe(false);
+    expect(await filters.exists('pan', pan(1), never)).toBe(false);
+    expect(never).not.toHaveBeenCalled();
+    expect(filters.stats()).toMatchObject({ ready: true, source: 'scan', skipped: 2, confirmed: 2 });
+  });
+
+  test('should pick up completions from this process and from the delta scan', async () => {
+    const rows = [registration(0, 'completed', 500)];
+    const filters = new ExistenceFilters(fakeDb(rows, { startedMs: 1000 }), { overlapMs: 100, minCapacity: 1000, log: quiet });
+    await filters.build();
+
+    filters.add({ aadhaar_number: aadhaar(5), pan_number: pan(5), status: 'completed' });
+    expect(filters.pan.mightContain(pan(5))).toBe(true);
+
+    rows.push(registration(6, 'completed', 2000));
+    await filters.sync();
+    expect(filters.aadhaar.mightContain(aadhaar(6))).toBe(true);
+    expect(filters.pan.mightContain(pan(6))).toBe(true);
+    expect(filters.watermark).toBe(2000);
+  });
+
+  test('should warm start from a snapshot and catch up', async () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'existence-'));
+    try {
+      const rows = [registration(0, 'completed', 500)];
+      const first = new ExistenceFilters(fakeDb(rows), { snapshotDir: dir, minCapacity: 1000, log: quiet });
+      await first.start();
+      await first.stop();
+      expect(fs.existsSync(path.join(dir, 'aadhaar.bloom'))).toBe(true);
+
+      rows.push(registration(1, 'completed', 3000));
+      const db = fakeDb(rows);
+      const second = new ExistenceFilters(db, { snapshotDir: dir, log: quiet });
+      await second.start();
+      await second.stop();
+
+      expect(second.stats().source).toBe('snapshot');
+      expect(db.query.mock.calls.some(([q]) => q.name === 'existence_scan_batch')).toBe(false);
+      expect(second.aadhaar.mightContain(aadhaar(0))).toBe(true);
+      expect(second.aadhaar.mightContain(aadhaar(1))).toBe(true);
+    } finally {
+      fs.rmSync(dir, { recursive: true, force: true });
+    }
+  });
+
+  test('should scan once when several processes start without a snapshot', async () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'existence-'));
+    try {
+      const rows = [registration(0, 'completed', 500), registration(1, 'draft', 500)];
+      const dbs = [fakeDb(rows), fakeDb(rows), fakeDb(rows)];
+      const workers = dbs.map((db) => new ExistenceFilters(db, { snapshotDir: dir, minCapacity: 1000, log: quiet }));
+      await Promise.all(workers.map((filters) => filters.start()));
+      await Promise.all(workers.map((filters) => filters.stop()));
+
+      const scans = dbs.map((db) => db.query.mock.calls.filter(([q]) => q.name === 'existence_scan_bounds').length);
+      expect(scans.sort()).toEqual([0, 0, 1]);
+      expect(workers.map((filters) => filters.stats().source).sort()).toEqual(['scan', 'snapshot', 'snapshot']);
+      workers.forEach((filters) => expect(filters.pan.mightContain(pan(0))).toBe(true));
+      expect(fs.existsSync(path.join(dir, 'build.lock'))).toBe(false);
+    } finally {
+      fs.rmSync(dir, { recursive: true, force: true });
+    }
+  });
+});
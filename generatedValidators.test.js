@@ -0,0 +1,35 @@
+const corpus = require('./validation_corpus.json');
+const schema = require('./udyam_form_schema.json');
+const { patternChecks, PATTERNS, SCHEMA_VERSION } = require('./utils/generatedValidators');
+
+describe('Generated Validator Tests', () => {
+  test('should be generated from the current schema', () => {
+    expect(corpus.schema_version).toBe(SCHEMA_VERSION);
+
+    const schemaPatterns = {};
+    Object.values(schema.steps).forEach(step => {
+      step.fields.forEach(field => {
+        if (field.validation && field.validation.pattern) {
+          schemaPatterns[field.name] = field.validation.pattern;
+        }
+      });
+    });
+    expect(PATTERNS).toEqual(schemaPatterns);
+  });
+
+  Object.entries(corpus.fields).forEach(([field, entry]) => {
+    test(`should agree with the conformance corpus for ${field}`, () => {
+      const check = patternChecks[field];
+      const mismatches = entry.cases.filter(([value, expected]) => check(value) !== expected);
+      expect(mismatches).toEqual([]);
+    });
+  });
+
+  test('should reject non-string input', () => {
+    Object.values(patternChecks).forEach(check => {
+      expect(check(null)).toBe(false);
+      expect(check(undefined)).toBe(false);
+      expect(check(123456)).toBe(false);
+    });
+  });
+});
@@ -0,0 +1,134 @@
+const { Idempotency, MemoryIdempotencyStore, RedisIdempotencyStore, createIdempotency } = require('./middleware/idempotency');
+const { MemoryRedis } = require('./utils/memoryRedis');
+
+const request = (key, body = { pan_number: 'ABCPE1234F' }, subject = 'registration:1') => ({
+  method: 'POST',
+  originalUrl: '/api/validate-pan',
+  headers: key === undefined ? {} : { 'idempotency-key': key },
+  body,
+  subject
+});
+
+function response() {
+  const res = {
+    statusCode: 200,
+    headers: {},
+    status(code) { res.statusCode = code; return res; },
+    set(name, value) { res.headers[name] = value; return res; },
+    json(body) { res.body = body; return res; }
+  };
+  return res;
+}
+
+// Runs the middleware and, when it passes the request on, the handler
+async function call(middleware, req, handler) {
+  const res = response();
+  let ran = false;
+  await middleware(req, res, () => { ran = true; });
+  if (ran) await handler(req, res);
+  return { res, ran };
+}
+
+const subject = (req) => req.subject;
+
+describe('Idempotency Key Tests', () => {
+  test('should replay the stored response without running the handler again', async () => {
+    const idempotency = new Idempotency(new MemoryIdempotencyStore(), { subject });
+    const middleware = idempotency.middleware('validate-pan');
+    const handler = jest.fn(async (req, res) => res.json({ success: true, udyam_number: 'UDYAM-27-01-0000001' }));
+
+    const first = await call(middleware, request('retry-1'), handler);
+    await new Promise(setImmediate);
+    const second = await call(middleware, request('retry-1'), handler);
+
+    expect(handler).toHaveBeenCalledTimes(1);
+    expect(second.ran).toBe(false);
+    expect(second.res.body).toEqual(first.res.body);
+    expect(second.res.headers['Idempotent-Replayed']).toBe('true');
+    expect(idempotency.stats()).toMatchObject({ replays: 1, stored: 1 });
+  });
+
+  test('should pass requests without a key straight through', async () => {
+    const idempotency = new Idempotency(new MemoryIdempotencyStore(), { subject });
+    const handler = jest.fn(async (req, res) => res.json({ success: true }));
+
+    await call(idempotency.middleware('validate-pan'), request(undefined), handler);
+    await call(idempotency.middleware('validate-pan'), request(undefined), handler);
+    expect(handler).toHaveBeenCalledTimes(2);
+    expect(idempotency.stats().requests).toBe(0);
+  });
+
+  test('should keep keys apart per subject and reject a reused key with another body', async () => {
+    const idempotency = new Idempotency(new MemoryIdempotencyStore(), { subject });
+    const middleware = idempotency.middleware('validate-pan');
+    const handler = jest.fn(async (req, res) => res.json({ success: true }));
+
+    await call(middleware, request('k'), handler);
+    await call(middleware, request('k', undefined, 'registration:2'), handler);
+    expect(handler).toHaveBeenCalledTimes(2);
+
+    await new Promise(setImmediate);
+    const changed = await call(middleware, request('k', { pan_number: 'ZZZPE1234F' }), handler);
+    expect(changed.res.statusCode).toBe(422);
+    expect(handler).toHaveBeenCalledTimes(2);
+  });
+
+  test('should answer 409 while the first request is still running', async () => {
+    const idempotency = new Idempotency(new MemoryIdempotencyStore(), { subject });
+    const middleware = idempotency.middleware('submit-registration');
+    let finish;
+    const slow = (req, res) => new Promise((resolve) => { finish = () => resolve(res.json({ success: true })); });
+
+    const first = call(middleware, request('k'), slow);
+    await new Promise(setImmediate);
+    const second = await call(middleware, request('k'), slow);
+    expect(second.res.statusCode).toBe(409);
+    finish();
+    expect((await first).res.body).toEqual({ success: true });
+  });
+
+  test('should let a retry run again after a server error', async () => {
+    const idempotency = new Idempotency(new MemoryIdempotencyStore(), { subject });
+    const middleware = idempotency.middleware('submit-registration');
+    const handler = jest.fn()
+      .mockImplementationOnce(async (req, res) => res.status(500).json({ error: 'Internal server error' }))
+      .mockImplementationOnce(async (req, res) => res.json({ success: true }));
+
+    await call(middleware, request('k'), handler);
+    await new Promise(setImmediate);
+    const retry = await call(middleware, request('k'), handler);
+    expect(handler).toHaveBeenCalledTimes(2);
+    expect(retry.res.body).toEqual({ success: true });
+  });
+
+  test('should expire stored responses after the TTL', async () => {
+    let now = 0;
+    const idempotency = new Idempotency(new MemoryIdempotencyStore({ now: () => now }), { subject, ttlMs: 1000 });
+    const handler = jest.fn(async (req, res) => res.json({ success: true }));
+
+    await call(idempotency.middleware('validate-pan'), request('k'), handler);
+    await new Promise(setImmediate);
+    now = 1000;
+    await call(idempotency.middleware('validate-pan'), request('k'), handler);
+    expect(handler).toHaveBeenCalledTimes(2);
+  });
+
+  test('should share keys through Redis', async () => {
+    const redis = new MemoryRedis();
+    const workers = [1, 2].map(() => new Idempotency(new RedisIdempotencyStore(redis), { subject }));
+    const handler = jest.fn(async (req, res) => res.status(201).json({ success: true }));
+
+    await call(workers[0].middleware('submit-registration'), request('k'), handler);
+    await new Promise(setImmediate);
+    const replay = await call(workers[1].middleware('submit-registration'), request('k'), handler);
+    expect(handler).toHaveBeenCalledTimes(1);
+    expect(replay.res.statusCode).toBe(201);
+  });
+
+  test('should refuse per-process keys under the cluster supervisor', () => {
+    expect(createIdempotency({ subject, env: {}, isWorker: false }).store).toBeInstanceOf(MemoryIdempotencyStore);
+    expect(() => createIdempotency({ subject, env: { IDEMPOTENCY_STORE: 'memory' }, isWorker: true }))
+      .toThrow('IDEMPOTENCY_STORE=memory keeps keys per worker');
+    expect(() => createIdempotency({ subject, env: { IDEMPOTENCY_STORE: 'kafka' } })).toThrow('Unknown IDEMPOTENCY_STORE');
+  });
+});
@@ -0,0 +1,219 @@
+// Idempotency keys for the write endpoints. A client that retries after a timeout sends the
+// same Idempotency-Key header; the first request runs and its response is stored under
+// (route, token subject, key), and every retry within the TTL gets that response back
+// without reaching the route handler or the registration tables.
+//
+// While the first request is still running, a retry gets 409 rather than running it twice.
+// 5xx responses are not stored, so a request that failed on our side can be retried.
+// Reusing a key with a different request body is rejected with 422.
+
+const cluster = require('cluster');
+const crypto = require('crypto');
+
+const HEADER = 'idempotency-key';
+const MAX_KEY_LENGTH = 255;
+const DEFAULT_TTL_MS = 24 * 60 * 60 * 1000;
+// How long a request may hold its key before a retry may run it again
+const DEFAULT_LOCK_MS = 60 * 1000;
+const DEFAULT_MAX_ENTRIES = 100000;
+const PENDING = 'pending';
+
+// Keys in this process only; enough for a single server
+class MemoryIdempotencyStore {
+  constructor({ max = DEFAULT_MAX_ENTRIES, now = Date.now } = {}) {
+    this.max = max;
+    this.now = now;
+    this.entries = new Map();
+  }
+
+  read(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return null;
+    if (entry.expiresAt <= this.now()) {
+      this.entries.delete(key);
+      return null;
+    }
+    return entry.record;
+  }
+
+  // Null when the key was free and is now held; otherwise the record already there
+  async reserve(key, lockMs) {
+    const existing = this.read(key);
+    if (existing) return existing;
+    this.write(key, { state: PENDING }, lockMs);
+    return null;
+  }
+
+  async complete(key, record, ttlMs) {
+    this.write(key, record, ttlMs);
+  }
+
+  async release(key) {
+    this.entries.delete(key);
+  }
+
+  write(key, record, ttlMs) {
+    this.entries.delete(key);
+    this.entries.set(key, { record, expiresAt: this.now() + ttlMs });
+    if (this.entries.size > this.max) this.entries.delete(this.entries.keys().next().value);
+  }
+
+  stats() {
+    return { backend: 'memory', size: this.entries.size };
+  }
+}
+
+// Keys shared by every process and host; SET NX makes the reservation atomic
+class RedisIdempotencyStore {
+  constructor(client, { prefix = 'idem:' } = {}) {
+    this.client = client;
+    this.prefix = prefix;
+  }
+
+  async reserve(key, lockMs) {
+    const reserved = await this.client.set(this.prefix + key, JSON.stringify({ state: PENDING }), { PX: lockMs, NX: true });
+    if (reserved !== null) return null;
+    const text = await this.client.get(this.prefix + key);
+    // Expired between the two calls: report it as in progress and let the client retry
+    return text === null ? { state: PENDING } : JSON.parse(text);
+  }
+
+  async complete(key, record, ttlMs) {
+    await this.client.set(this.prefix + key, JSON.stringify(record), { PX: ttlMs });
+  }
+
+  async release(key) {
+    await this.client.del(this.prefix + key);
+  }
+
+  stats() {
+    return { backend: 'redis' };
+  }
+}
+
+// Same body, same request: anything else under the same key is a client bug
+const fingerprint = (req) => crypto
+  .createHash('sha256')
+  .update(`${req.method} ${req.originalUrl || req.url}\n${JSON.stringify(req.body || {})}`)
+  .digest('base64');
+
+class Idempotency {
+  // subject(req) names who the key belongs to, normally the session token's registration
+  constructor(store, { subject, ttlMs = DEFAULT_TTL_MS, lockMs = DEFAULT_LOCK_MS } = {}) {
+    this.store = store;
+    this.subject = subject;
+    this.ttlMs = ttlMs;
+    this.lockMs = lockMs;
+    this.counters = {
+      requests: 0,
+      replays: 0,
+      in_progress: 0,
+      mismatches: 0,
+      stored: 0,
+      store_errors: 0
+    };
+  }
+
+  // Express middleware for one route; requests without the header pass straight through
+  middleware(route) {
+    return async (req, res, next) => {
+      const key = req.headers[HEADER];
+      if (key === undefined) return next();
+      if (!key || key.length > MAX_KEY_LENGTH) {
+        return res.status(400).json({
+          error: 'Invalid Idempotency-Key',
+          message: `Idempotency-Key must be 1 to ${MAX_KEY_LENGTH} characters`
+        });
+      }
+      this.counters.requests++;
+
+      const storeKey = `${route}:${this.subject(req)}:${key}`;
+      const requestHash = fingerprint(req);
+      let existing;
+      try {
+        existing = await this.store.reserve(storeKey, this.lockMs);
+      } catch (error) {
+        // Without the store the request still runs, just without retry protection
+        this.counters.store_errors++;
+        return next();
+      }
+
+      if (existing) {
+        if (existing.state === PENDING) {
+          this.counters.in_progress++;
+          return res.status(409).json({
+            error: 'Request in progress',
+            message: 'A request with this Idempotency-Key is still being processed'
+          });
+        }
+        if (existing.fingerprint !== requestHash) {
+          this.counters.mismatches++;
+          return res.status(422).json({
+            error: 'Idempotency-Key reused',
+            message: 'This Idempotency-Key was used for a different request'
+          });
+        }
+        this.counters.replays++;
+        res.set('Idempotent-Replayed', 'true');
+        return res.status(existing.status).json(existing.body);
+      }
+
+      // Record whatever the handler answers with
+      const json = res.json.bind(res);
+      res.json = (body) => {
+        res.json = json;
+        const status = res.statusCode;
+        const saved = status >= 500
+          ? this.store.release(storeKey)
+          : this.store.complete(storeKey, { state: 'done', status, body, fingerprint: requestHash }, this.ttlMs)
+            .then(() => { this.counters.stored++; });
+        saved.catch(() => { this.counters.store_errors++; });
+        return json(body);
+      };
+      next();
+    };
+  }
+
+  stats() {
+    return { ...this.store.stats(), ...this.counters };
+  }
+}
+
+// IDEMPOTENCY_STORE=redis|memory. Redis shares keys across processes and is the default when
+// REDIS_URL is set or under the cluster supervisor, where memory keys would be per worker.
+function createIdempotency({
+  subject,
+  env = process.env,
+  isWorker = cluster.isWorker,
+  backend = env.IDEMPOTENCY_STORE || (env.REDIS_URL || isWorker ? 'redis' : 'memory'),
+  redisUrl = env.REDIS_URL
+} = {}) {
+  let store;
+  if (backend === 'memory' && isWorker) {
+    throw new Error('IDEMPOTENCY_STORE=memory keeps keys per worker; use redis under cluster.js');
+  }
+  if (backend === 'redis') {
+    // Loaded only when selected, like the Redis OTP store
+    const { createClient } = require('redis');
+    // Fail fast while disconnected; requests then run without retry protection
+    const client = createClient({ url: redisUrl || 'redis://localhost:6379', disableOfflineQueue: true });
+    client.on('error', (error) => console.error('Redis idempotency store error:', error.message));
+    client.connect().catch((error) => console.error('Redis idempotency store connection failed:', error.message));
+    store = new RedisIdempotencyStore(client);
+  } else if (backend === 'memory') {
+    store = new MemoryIdempotencyStore({ max: env.IDEMPOTENCY_MAX_KEYS ? parseInt(env.IDEMPOTENCY_MAX_KEYS, 10) : DEFAULT_MAX_ENTRIES });
+  } else {
+    throw new Error(`Unknown IDEMPOTENCY_STORE: ${backend}`);
+  }
+  return new Idempotency(store, {
+    subject,
+    ttlMs: env.IDEMPOTENCY_TTL_MS ? parseInt(env.IDEMPOTENCY_TTL_MS, 10) : DEFAULT_TTL_MS
+  });
+}
+
+module.exports = {
+  Idempotency,
+  MemoryIdempotencyStore,
+  RedisIdempotencyStore,
+  createIdempotency,
+};
@@ -0,0 +1,102 @@
+// express-validator chains for the registration API.
+// Kept out of server.js so benchmarks and tests can drive them without a database.
+
+const { body } = require('express-validator');
+const { ValidationCache, versionOf } = require('../utils/validationCache');
+const { patternChecks, SCHEMA_VERSION } = require('../utils/generatedValidators');
+const { validateAadhaarChecksum, validateGSTINChecksum } = require('../utils/validation');
+
+const OTP_MOCK_ENABLED = String(process.env.OTPMOCK || process.env.OTP_MOCK || '').toLowerCase() === 'true';
+// Aadhaar Verhoeff and GSTIN check digits; VALIDATE_CHECKSUMS=false accepts any well-formed number
+const CHECKSUMS_ENABLED = String(process.env.VALIDATE_CHECKSUMS || 'true').toLowerCase() !== 'false';
+
+// Validation patterns
+const validationPatterns = {
+  aadhaar: /^[2-9][0-9]{11}$/,
+  pan: /^[A-Z]{5}[0-9]{4}[A-Z]{1}$/,
+  otp: /^[0-9]{6}$/,
+  gstin: /^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$/,
+  name: /^[a-zA-Z\s.]+$/,
+  email: /^[^\s@]+@[^\s@]+\.[^\s@]+$/
+};
+
+// Schema fields use the generated positional checkers; the regexes above remain
+// the fallback for rules the schema doesn't cover (email)
+const patternCheckers = {
+  aadhaar: patternChecks.aadhaar_number,
+  pan: patternChecks.pan_number,
+  otp: patternChecks.otp,
+  gstin: patternChecks.gstin,
+  name: patternChecks.entrepreneur_name
+};
+
+// Memoised pattern checks; retries and resubmits mostly repeat values already seen.
+// The version tag changes whenever the patterns do, which drops stale results.
+const validationCache = new ValidationCache({
+  max: parseInt(process.env.VALIDATION_CACHE_MAX || '10000', 10),
+  version: versionOf([SCHEMA_VERSION, ...Object.values(validationPatterns).map(String)])
+});
+const matchesPattern = (rule) => {
+  const check = patternCheckers[rule] || ((text) => validationPatterns[rule].test(text));
+  return (value) => validationCache.check(rule, value, check);
+};
+// Run after the pattern check, so only well-formed values get here
+const checksumRules = {
+  aadhaar_checksum: validateAadhaarChecksum,
+  gstin_checksum: validateGSTINChecksum
+};
+// .custom() gets the raw body value, which may be a JSON number
+const passesChecksum = (rule) => (value) => !CHECKSUMS_ENABLED || validationCache.check(rule, String(value), checksumRules[rule]);
+
+const validateAadhaarData = [
+  body('aadhaar_number')
+    .custom(matchesPattern('aadhaar'))
+    .withMessage('Invalid Aadhaar number format')
+    .bail()
+    .custom(passesChecksum('aadhaar_checksum'))
+    .withMessage('Invalid Aadhaar number check digit'),
+  body('entrepreneur_name')
+    .isLength({ min: 2, max: 100 })
+    .custom(matchesPattern('name'))
+    .withMessage('Invalid name format'),
+];
+
+const validatePANData = [
+  body('organization_type')
+    .isIn(['proprietorship', 'partnership', 'llp', 'pvt_company', 'public_company', 'huf', 'cooperative', 'trust', 'society'])
+    .withMessage('Invalid organization type'),
+  body('pan_number')
+    .custom(matchesPattern('pan'))
+    .withMessage('Invalid PAN format'),
+  body('gstin')
+    .optional({ checkFalsy: true, nullable: true })
+    .custom(matchesPattern('gstin'))
+    .withMessage('Invalid GSTIN format')
+    .bail()
+    .custom(passesChecksum('gstin_checksum'))
+    .withMessage('Invalid GSTIN check digit'),
+  body('filed_itr')
+    .isIn(['yes', 'no'])
+    .withMessage('ITR filing status must be yes or no')
+];
+
+const validateOTPData = [
+  body('aadhaar_number')
+    .custom(matchesPattern('aadhaar'))
+    .bail()
+    .custom(passesChecksum('aadhaar_checksum'))
+    .withMessage('Invalid Aadhaar number check digit'),
+  body('otp').custom((value) => {
+    if (OTP_MOCK_ENABLED && value === '1234') return true;
+    return matchesPattern('otp')(value);
+  })
+];
+
+module.exports = {
+  validationPatterns,
+  validationCache,
+  matchesPattern,
+  validateAadhaarData,
+  validatePANData,
+  validateOTPData,
+};
@@ -0,0 +1,74 @@
+const request = require('supertest');
+const { createMockServices, parseLatency, TokenBucket, configFromEnv } = require('./utils/mockServices');
+
+const noDelay = () => Promise.resolve();
+
+describe('Mock Downstream Services Tests', () => {
+  test('should sample lognormal latency around the configured median and p99', () => {
+    const sample = parseLatency('lognormal:100:1000');
+    const values = Array.from({ length: 20000 }, sample).sort((a, b) => a - b);
+    expect(values[10000]).toBeGreaterThan(85);
+    expect(values[10000]).toBeLessThan(115);
+    expect(values[19800]).toBeGreaterThan(700);
+    expect(values[19800]).toBeLessThan(1400);
+  });
+
+  test('should reject unknown latency specs', () => {
+    expect(() => parseLatency('bogus:1')).toThrow('Invalid latency spec');
+    expect(() => parseLatency('fixed:-5')).toThrow('Invalid latency spec');
+    expect(parseLatency('fixed:250')()).toBe(250);
+  });
+
+  test('should refill the token bucket over time', () => {
+    let now = 0;
+    const bucket = new TokenBucket(2, () => now);
+    expect([bucket.take(), bucket.take(), bucket.take()]).toEqual([true, true, false]);
+    now = 500;
+    expect(bucket.take()).toBe(true);
+    expect(bucket.take()).toBe(false);
+  });
+
+  test('should read per-service settings from the environment', () => {
+    const config = configFromEnv({ MOCK_SMS_LATENCY: 'fixed:5', MOCK_SMS_RATE_LIMIT: '10', MOCK_PAN_FAILURE_RATE: '0.5' });
+    expect(config.sms).toMatchObject({ latency: 'fixed:5', rateLimit: 10 });
+    expect(config.pan.failureRate).toBe(0.5);
+  });
+
+  test('should answer UIDAI, SMS and PAN calls', async () => {
+    const app = createMockServices({ sleep: noDelay, config: { uidai: { failureRate: 0 }, sms: { failureRate: 0 }, pan: { failureRate: 0 } } });
+
+    const uidai = await request(app).post('/uidai/otp').send({ aadhaar_number: '234567890123' });
+    expect(uidai.status).toBe(200);
+    expect(uidai.body.mobile).toMatch(/^9[0-9]{9}$/);
+
+    const batch = await request(app).post('/sms/send-batch').send({ messages: [{ to: uidai.body.mobile, message: 'OTP' }, {}] });
+    expect(batch.body.results.map((r) => r.success)).toEqual([true, false]);
+
+    const pan = await request(app).post('/pan/verify').send({ pan_number: 'ABCPK1234E' });
+    expect(pan.body.valid).toBe(true);
+  });
+
+  test('should inject failures and throttle beyond the rate limit', async () => {
+    const app = createMockServices({ sleep: noDelay, config: { sms: { failureRate: 1 }, pan: { failureRate: 0, rateLimit: 1 } } });
+
+    const sms = await request(app).post('/sms/send').send({ to: '9876543210', message: 'OTP' });
+    expect(sms.status).toBe(503);
+
+    await request(app).post('/pan/verify').send({ pan_number: 'ABCPK1234E' });
+    const throttled = await request(app).post('/pan/verify').send({ pan_number: 'ABCPK1234E' });
+    expect(throttled.status).toBe(429);
+
+    const stats = await request(app).get('/stats');
+    expect(stats.body.sms.failed).toBe(1);
+    expect(stats.body.pan.throttled).toBe(1);
+  });
+
+  test('should change a service at runtime', async () => {
+    const app = createMockServices({ sleep: noDelay });
+    const updated = await request(app).put('/config/sms').send({ failureRate: 0, latency: 'fixed:10' });
+    expect(updated.body).toMatchObject({ failureRate: 0, latency: 'fixed:10' });
+
+    const invalid = await request(app).put('/config/sms').send({ latency: 'nope' });
+    expect(invalid.status).toBe(400);
+  });
+});
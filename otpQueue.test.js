@@ -0,0 +1,109 @@
+const { EventEmitter } = require('events');
+const { MemoryQueue, OtpDispatcher, createOtpQueue, PostgresQueue } = require('./utils/otpQueue');
+
+const job = (mobile, expiresAt) => ({ aadhaar_number: '234567890123', mobile, otp: '123456', expires_at: expiresAt });
+
+describe('OTP Dispatch Queue Tests', () => {
+  test('should deliver queued OTPs in one batch', async () => {
+    const queue = new MemoryQueue();
+    const send = jest.fn(async (messages) => messages.map(() => ({ success: true })));
+    const dispatcher = new OtpDispatcher(queue, send, { batchSize: 10 });
+
+    await queue.enqueue(job('9876543210', Date.now() + 600000));
+    await queue.enqueue(job('9876543211', Date.now() + 600000));
+    expect(await dispatcher.runOnce()).toBe(2);
+
+    expect(send).toHaveBeenCalledTimes(1);
+    expect(send.mock.calls[0][0][0]).toEqual({ to: '9876543210', message: expect.stringContaining('123456') });
+    expect(await queue.depth()).toEqual({ pending: 0, dead: 0 });
+    expect(dispatcher.stats().sent).toBe(2);
+  });
+
+  test('should retry with backoff and dead-letter after the last attempt', async () => {
+    let now = 1000;
+    const queue = new MemoryQueue({ now: () => now });
+    const send = jest.fn(async (messages) => messages.map(() => ({ success: false, message: 'gateway down' })));
+    const dispatcher = new OtpDispatcher(queue, send, { maxAttempts: 2, backoffMs: 100, now: () => now, random: () => 1 });
+
+    await queue.enqueue(job('9876543210', now + 600000));
+    await dispatcher.runOnce();
+    expect(await dispatcher.runOnce()).toBe(0); // still backing off
+
+    now += 100;
+    await dispatcher.runOnce();
+    const dead = await queue.deadLetters();
+    expect(dead).toHaveLength(1);
+    expect(dead[0]).toMatchObject({ attempts: 2, last_error: 'gateway down', otp: null });
+    expect(dispatcher.stats()).toMatchObject({ retried: 1, dead_lettered: 1 });
+  });
+
+  test('should not send OTPs that expired while queued', async () => {
+    const queue = new MemoryQueue();
+    const send = jest.fn();
+    const dispatcher = new OtpDispatcher(queue, send);
+
+    await queue.enqueue(job('9876543210', Date.now() - 1));
+    await dispatcher.runOnce();
+
+    expect(send).not.toHaveBeenCalled();
+    expect((await queue.deadLetters())[0].last_error).toBe('expired before delivery');
+  });
+
+  test('should make claimed jobs visible again after the visibility timeout', async () => {
+    let now = 0;
+    const queue = new MemoryQueue({ now: () => now });
+    await queue.enqueue(job('9876543210', 600000));
+
+    expect(await queue.claim(10, 5000)).toHaveLength(1);
+    expect(await queue.claim(10, 5000)).toHaveLength(0);
+    now = 5000;
+    expect(await queue.claim(10, 5000)).toHaveLength(1);
+  });
+
+  test('should drain the queue with running workers', async () => {
+    const queue = new MemoryQueue();
+    const dispatcher = new OtpDispatcher(queue, async (messages) => messages.map(() => ({ success: true })), { workers: 2 }).start();
+
+    await queue.enqueue(job('9876543210', Date.now() + 600000));
+    await new Promise((resolve) => setTimeout(resolve, 20));
+    await dispatcher.stop();
+
+    expect(await queue.depth()).toEqual({ pending: 0, dead: 0 });
+  });
+
+  test('should clear the OTP of a dead-lettered Postgres job', async () => {
+    const pool = { query: jest.fn(async () => ({ rows: [] })) };
+    await new PostgresQueue(pool).deadLetter(7, 'gateway down');
+
+    expect(pool.query.mock.calls[0][0]).toContain('otp = NULL');
+    expect(pool.query.mock.calls[0][1]).toEqual([7, 'gateway down']);
+  });
+
+  test('should wake one idle Postgres worker per poll or notification', async () => {
+    const listener = Object.assign(new EventEmitter(), { query: jest.fn(async () => ({})), release: jest.fn() });
+    const queue = new PostgresQueue({ connect: async () => listener }, { pollMs: 20 });
+    await queue.listen();
+    expect(listener.query).toHaveBeenCalledWith('LISTEN otp_dispatch');
+
+    const woken = [];
+    [0, 1, 2].forEach((i) => queue.waitForWork(1000).then(() => woken.push(i)));
+    listener.emit('notification', { channel: 'otp_dispatch' });
+    await new Promise(setImmediate);
+    expect(woken).toEqual([0]);
+
+    await new Promise((resolve) => setTimeout(resolve, 30));
+    expect(woken).toEqual([0, 1]);
+
+    queue.wake();
+    await queue.unlisten();
+    await new Promise(setImmediate);
+    expect(woken).toEqual([0, 1, 2]);
+    expect(listener.release).toHaveBeenCalled();
+  });
+
+  test('should pick the backend from OTP_QUEUE_BACKEND', () => {
+    expect(createOtpQueue({}, 'memory')).toBeInstanceOf(MemoryQueue);
+    expect(createOtpQueue({}, 'postgres')).toBeInstanceOf(PostgresQueue);
+    expect(() => createOtpQueue({}, 'kafka')).toThrow('Unknown OTP_QUEUE_BACKEND');
+  });
+});
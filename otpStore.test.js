@@ -0,0 +1,98 @@
+const { RedisOtpStore, PostgresOtpStore, COMPARE_AND_DELETE, VERIFY_AND_REGISTER, createOtpStore } = require('./utils/otpStore');
+
+// Minimal in-memory stand-in for the node-redis calls the store makes
+class FakeRedis {
+  constructor(now) {
+    this.now = now;
+    this.data = new Map();
+  }
+
+  async set(key, value, { PX }) {
+    this.data.set(key, { value, expiresAt: this.now() + PX });
+  }
+
+  get(key) {
+    const entry = this.data.get(key);
+    if (!entry || entry.expiresAt <= this.now()) return null;
+    return entry.value;
+  }
+
+  async eval(script, { keys, arguments: args }) {
+    expect(script).toBe(COMPARE_AND_DELETE);
+    if (this.get(keys[0]) === args[0]) {
+      this.data.delete(keys[0]);
+      return 1;
+    }
+    return 0;
+  }
+}
+
+describe('OTP Store Tests', () => {
+  test('should accept an OTP from Redis once', async () => {
+    const now = () => 1000;
+    const store = new RedisOtpStore(new FakeRedis(now), { now });
+    await store.save('234567890123', 'aadhaar_verification', '123456', new Date(601000));
+
+    expect(await store.verify('234567890123', 'aadhaar_verification', '654321')).toBe(false);
+    expect(await store.verify('234567890123', 'aadhaar_verification', '123456')).toBe(true);
+    expect(await store.verify('234567890123', 'aadhaar_verification', '123456')).toBe(false);
+  });
+
+  test('should let Redis expire OTPs with the key TTL', async () => {
+    let now = 1000;
+    const redis = new FakeRedis(() => now);
+    const store = new RedisOtpStore(redis, { now: () => now });
+    await store.save('234567890123', 'aadhaar_verification', '123456', new Date(now + 600000));
+
+    expect(redis.data.get('otp:aadhaar_verification:234567890123').expiresAt).toBe(601000);
+    now += 600000;
+    expect(await store.verify('234567890123', 'aadhaar_verification', '123456')).toBe(false);
+  });
+
+  test('should consume the OTP in one conditional update in the Postgres store', async () => {
+    const pool = { query: jest.fn() };
+    pool.query
+      .mockResolvedValueOnce({ rows: [{ '?column?': 1 }] }) // Consumed
+      .mockResolvedValueOnce({ rows: [] }); // Already used by a concurrent attempt
+    const store = new PostgresOtpStore(pool);
+
+    expect(await store.verify('234567890123', 'aadhaar_verification', '123456')).toBe(true);
+    expect(await store.verify('234567890123', 'aadhaar_verification', '123456')).toBe(false);
+    expect(pool.query).toHaveBeenCalledTimes(2);
+    expect(pool.query.mock.calls[0][0].text).toContain('used_at IS NULL RETURNING 1');
+  });
+
+  test('should verify and upsert the draft registration in one Postgres call', async () => {
+    const pool = { query: jest.fn() };
+    pool.query
+      .mockResolvedValueOnce({ rows: [{ id: 42 }] })
+      .mockResolvedValueOnce({ rows: [] }); // OTP already used or wrong
+    const store = new PostgresOtpStore(pool);
+
+    expect(await store.verifyAndRegister('234567890123', 'aadhaar_verification', '123456')).toBe(42);
+    expect(await store.verifyAndRegister('234567890123', 'aadhaar_verification', '123456')).toBeNull();
+    expect(pool.query).toHaveBeenCalledTimes(2);
+    expect(pool.query.mock.calls[0][0]).toEqual({
+      name: 'otp_verify_and_register',
+      text: VERIFY_AND_REGISTER,
+      values: ['234567890123', 'aadhaar_verification', '123456', 1]
+    });
+  });
+
+  test('should only register after Redis consumed the OTP', async () => {
+    const now = () => 1000;
+    const pool = { query: jest.fn() };
+    pool.query.mockResolvedValueOnce({ rows: [{ id: 7 }] });
+    const store = new RedisOtpStore(new FakeRedis(now), { pool, now });
+    await store.save('234567890123', 'aadhaar_verification', '123456', new Date(601000));
+
+    expect(await store.verifyAndRegister('234567890123', 'aadhaar_verification', '000000')).toBeNull();
+    expect(await store.verifyAndRegister('234567890123', 'aadhaar_verification', '123456')).toBe(7);
+    expect(pool.query).toHaveBeenCalledTimes(1);
+  });
+
+  test('should default to the Postgres store', () => {
+    expect(createOtpStore({}, { backend: undefined })).toBeInstanceOf(PostgresOtpStore);
+    expect(() => createOtpStore({}, { backend: 'memcached' })).toThrow('Unknown OTP_STORE');
+  });
+});
@@ -0,0 +1,110 @@
+const { EventEmitter } = require('events');
+const { WindowCounter, ClusterStore, RedisWindowStore, serveClusterRateLimits } = require('./utils/rateLimitStore');
+const { MemoryRedis } = require('./utils/memoryRedis');
+
+// Wires a worker-side channel straight to a fake cluster primary
+function fakeCluster() {
+  const primary = new EventEmitter();
+  const channel = new EventEmitter();
+  const worker = {
+    isConnected: () => true,
+    send: (message) => setImmediate(() => channel.emit('message', message))
+  };
+  channel.send = (message) => setImmediate(() => primary.emit('message', worker, message));
+  return { primary, channel };
+}
+
+describe('Rate Limit Store Tests', () => {
+  test('should count hits in fixed windows', () => {
+    let now = 0;
+    const counter = new WindowCounter({ now: () => now });
+    expect(counter.increment('ip', 1000).totalHits).toBe(1);
+    expect(counter.increment('ip', 1000)).toEqual({ totalHits: 2, resetTime: 1000 });
+    counter.decrement('ip');
+    expect(counter.get('ip').totalHits).toBe(1);
+    now = 1000;
+    expect(counter.get('ip')).toBeUndefined();
+    expect(counter.increment('ip', 1000)).toEqual({ totalHits: 1, resetTime: 2000 });
+  });
+
+  test('should share counters between workers through the primary', async () => {
+    const { primary, channel } = fakeCluster();
+    const counter = serveClusterRateLimits(primary, new WindowCounter());
+    counter.stopSweep();
+    const first = new ClusterStore({ prefix: 'otp:', channel });
+    const second = new ClusterStore({ prefix: 'otp:', channel });
+    first.init({ windowMs: 60000 });
+    second.init({ windowMs: 60000 });
+
+    await first.increment('1.2.3.4');
+    await second.increment('1.2.3.4');
+    const third = await first.increment('1.2.3.4');
+    expect(third.totalHits).toBe(3);
+    expect(third.resetTime).toBeInstanceOf(Date);
+
+    await second.resetKey('1.2.3.4');
+    expect(await first.get('1.2.3.4')).toBeUndefined();
+  });
+
+  test('should count locally when the primary does not answer', async () => {
+    const channel = new EventEmitter();
+    channel.send = () => {};
+    const store = new ClusterStore({ channel, ipcTimeoutMs: 5 });
+    store.init({ windowMs: 60000 });
+
+    await store.increment('ip');
+    expect((await store.increment('ip')).totalHits).toBe(2);
+  });
+
+  test('should share sliding windows between stores through Redis', async () => {
+    let now = 60000;
+    const redis = new MemoryRedis({ now: () => now });
+    const [a, b] = [0, 1].map(() => new RedisWindowStore(redis, { flushMs: 0, now: () => now }));
+    a.init({ windowMs: 60000, limit: 100 });
+    b.init({ windowMs: 60000, limit: 100 });
+
+    await a.increment('ip');
+    await b.increment('ip');
+    expect((await a.increment('ip')).totalHits).toBe(3);
+
+    // Half-way through the next window, half of the previous window still counts
+    now = 150000;
+    expect((await b.increment('ip')).totalHits).toBe(2);
+    await a.decrement('ip');
+    await new Promise((resolve) => setTimeout(resolve, 5));
+    expect((await a.get('ip')).totalHits).toBe(1);
+  });
+
+  test('should pre-aggregate concurrent hits into one round trip', async () => {
+    const redis = new MemoryRedis({ now: () => 0 });
+    const store = new RedisWindowStore(redis, { flushMs: 5, now: () => 0 });
+    store.init({ windowMs: 60000, limit: 100 });
+
+    const results = await Promise.all(Array.from({ length: 20 }, () => store.increment('ip')));
+    expect(results.map((r) => r.totalHits)).toEqual(Array.from({ length: 20 }, (_, i) => i + 1));
+    expect(redis.commands).toBe(1);
+  });
+
+  test('should answer keys over the limit locally', async () => {
+    const redis = new MemoryRedis({ now: () => 0 });
+    const store = new RedisWindowStore(redis, { flushMs: 0, now: () => 0 });
+    store.init({ windowMs: 60000, limit: 3 });
+
+    for (let i = 0; i < 3; i++) await store.increment('ip');
+    const commands = redis.commands;
+    expect((await store.increment('ip')).totalHits).toBe(4);
+    expect((await store.increment('ip')).totalHits).toBe(5);
+    expect(redis.commands).toBe(commands);
+    expect(store.stats().blocked_locally).toBe(2);
+  });
+
+  test('should fall back to local counting when Redis fails', async () => {
+    const broken = { eval: () => Promise.reject(new Error('ECONNREFUSED')) };
+    const store = new RedisWindowStore(broken, { flushMs: 0 });
+    store.init({ windowMs: 60000, limit: 3 });
+
+    await store.increment('ip');
+    expect((await store.increment('ip')).totalHits).toBe(2);
+    expect(store.stats().redis_errors).toBe(2);
+  });
+});
@@ -0,0 +1,20 @@
+#!/usr/bin/env node
+// Runs the UIDAI, SMS gateway and PAN stand-ins from utils/mockServices.js on one port.
+// Point the backend at it with UIDAI_API_URL, SMS_GATEWAY_URL and PAN_API_URL.
+//
+//   MOCK_SMS_LATENCY=lognormal:400:2500 MOCK_SMS_RATE_LIMIT=200 node scripts/mock-services.js
+
+require('dotenv').config();
+const { createMockServices, configFromEnv } = require('../utils/mockServices');
+
+const PORT = process.env.MOCK_SERVICES_PORT || 4010;
+const config = configFromEnv();
+const app = createMockServices({ config });
+
+app.listen(PORT, () => {
+  console.log(`🧪 Mock downstream services on port ${PORT}`);
+  Object.entries(config).forEach(([name, settings]) => {
+    const limit = settings.rateLimit ? `${settings.rateLimit}/s` : 'unlimited';
+    console.log(`   ${name}: latency ${settings.latency}, failure rate ${settings.failureRate}, rate limit ${limit}`);
+  });
+});
@@ -0,0 +1,152 @@
+#!/usr/bin/env node
+// Benchmark of OTP verification against a real PostgreSQL database: the original three
+// queries (SELECT, UPDATE used_at, upsert registration) versus the single-statement
+// PostgresOtpStore.verifyAndRegister(). Reports round trips, latency percentiles and
+// whether a used OTP is accepted a second time.
+//
+//   node scripts/otp-verify-bench.js --count 5000 --concurrency 32 --rtt-ms 1
+//
+// --rtt-ms adds that much delay to every query to stand in for the network distance
+// between the API and the database. Uses the DB_* variables; rows it creates use
+// Aadhaar numbers 990000000000 and up and are deleted afterwards.
+
+require('dotenv').config();
+const { Pool } = require('pg');
+const { PostgresOtpStore, UPSERT_DRAFT_REGISTRATION } = require('../utils/otpStore');
+const { poolConfig } = require('../utils/db');
+
+const TYPE = 'aadhaar_verification';
+const OTP = '246810';
+const FIRST_AADHAAR = 990000000000;
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(name);
+  return index > 0 ? process.argv[index + 1] : fallback;
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// pool.query wrapper that counts calls and adds the simulated network delay
+function countingPool(pool, rttMs) {
+  const counted = {
+    calls: 0,
+    async query(...args) {
+      counted.calls++;
+      if (rttMs) await sleep(rttMs);
+      return pool.query(...args);
+    }
+  };
+  return counted;
+}
+
+// The validate-otp queries as they were before verifyAndRegister()
+async function legacyVerify(db, aadhaar, otp) {
+  const otpRecord = await db.query(
+    'SELECT * FROM otp_verifications WHERE aadhaar_number = $1 AND type = $2 AND otp = $3 AND expires_at > CURRENT_TIMESTAMP',
+    [aadhaar, TYPE, otp]
+  );
+  if (otpRecord.rows.length === 0) return null;
+  await db.query(
+    'UPDATE otp_verifications SET used_at = CURRENT_TIMESTAMP WHERE aadhaar_number = $1 AND type = $2',
+    [aadhaar, TYPE]
+  );
+  const draft = await db.query(UPSERT_DRAFT_REGISTRATION, [aadhaar, 'draft', 1]);
+  return draft.rows[0].id;
+}
+
+async function clear(pool, count) {
+  const range = [String(FIRST_AADHAAR), String(FIRST_AADHAAR + count - 1)];
+  await pool.query('DELETE FROM registrations WHERE aadhaar_number BETWEEN $1 AND $2', range);
+  await pool.query('DELETE FROM otp_verifications WHERE aadhaar_number BETWEEN $1 AND $2', range);
+}
+
+async function seed(pool, count) {
+  await clear(pool, count);
+  await pool.query(
+    `INSERT INTO otp_verifications (aadhaar_number, otp, type, expires_at)
+     SELECT ($1::bigint + i)::text, $2, $3, CURRENT_TIMESTAMP + INTERVAL '10 minutes'
+     FROM generate_series(0, $4 - 1) AS i`,
+    [FIRST_AADHAAR, OTP, TYPE, count]
+  );
+}
+
+function percentile(sorted, q) {
+  if (!sorted.length) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil((q / 100) * sorted.length) - 1)];
+}
+
+async function runPhase(name, pool, verify, { count, concurrency, rttMs }) {
+  await seed(pool, count);
+  const db = countingPool(pool, rttMs);
+  const latencies = [];
+  let next = 0;
+  let failures = 0;
+
+  const started = process.hrtime.bigint();
+  await Promise.all(Array.from({ length: concurrency }, async () => {
+    while (next < count) {
+      const aadhaar = String(FIRST_AADHAAR + next++);
+      const t0 = process.hrtime.bigint();
+      const id = await verify(db, aadhaar, OTP);
+      latencies.push(Number(process.hrtime.bigint() - t0) / 1e6);
+      if (id === null) failures++;
+    }
+  }));
+  const elapsed = Number(process.hrtime.bigint() - started) / 1e9;
+  const roundTrips = db.calls / count;
+
+  // Submit the first OTPs again: they were used, so they should be rejected
+  let reused = 0;
+  const replays = Math.min(count, 100);
+  for (let i = 0; i < replays; i++) {
+    if ((await verify(db, String(FIRST_AADHAAR + i), OTP)) !== null) reused++;
+  }
+
+  latencies.sort((a, b) => a - b);
+  return {
+    implementation: name,
+    verifications: count,
+    failures,
+    round_trips: roundTrips,
+    per_sec: count / elapsed,
+    p50_ms: percentile(latencies, 50),
+    p99_ms: percentile(latencies, 99),
+    max_ms: latencies[latencies.length - 1],
+    reused_accepted: `${reused}/${replays}`
+  };
+}
+
+async function main() {
+  const settings = {
+    count: parseInt(option('--count', '2000'), 10),
+    concurrency: parseInt(option('--concurrency', '32'), 10),
+    rttMs: parseFloat(option('--rtt-ms', '0'))
+  };
+  const pool = new Pool({ ...poolConfig(), max: settings.concurrency });
+
+  try {
+    const results = [
+      await runPhase('3 queries', pool, legacyVerify, settings),
+      await runPhase('verifyAndRegister', pool, (db, aadhaar, otp) => new PostgresOtpStore(db).verifyAndRegister(aadhaar, TYPE, otp), settings)
+    ];
+    console.log(`📊 ${settings.count} verifications, concurrency ${settings.concurrency}, +${settings.rttMs} ms per query`);
+    console.table(results.map((r) => ({
+      ...r,
+      per_sec: Math.round(r.per_sec),
+      p50_ms: r.p50_ms.toFixed(2),
+      p99_ms: r.p99_ms.toFixed(2),
+      max_ms: r.max_ms.toFixed(2)
+    })));
+    if (process.argv.includes('--json')) {
+      process.stdout.write(JSON.stringify(results));
+    }
+  } finally {
+    await clear(pool, settings.count).catch(() => {});
+    await pool.end();
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
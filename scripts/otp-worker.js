@@ -0,0 +1,48 @@
+#!/usr/bin/env node
+// Standalone OTP dispatcher draining the otp_dispatch_jobs table, for running delivery
+// separately from the API (set OTP_DISPATCH_WORKERS=0 on the API processes).
+//
+//   node scripts/otp-worker.js            # drain continuously
+//   node scripts/otp-worker.js --dead     # list dead-lettered jobs and exit
+
+require('dotenv').config();
+const { Pool } = require('pg');
+const externalServices = require('../utils/externalServices');
+const { OtpDispatcher, PostgresQueue } = require('../utils/otpQueue');
+const { poolConfig } = require('../utils/db');
+
+const pool = new Pool(poolConfig());
+const queue = new PostgresQueue(pool);
+
+async function main() {
+  if (process.argv.includes('--dead')) {
+    const rows = await queue.deadLetters(parseInt(process.env.LIMIT || '100', 10));
+    rows.forEach((row) => console.log(JSON.stringify(row)));
+    await pool.end();
+    return;
+  }
+
+  const sendBatch = process.env.SMS_GATEWAY_BATCH === 'true'
+    ? externalServices.sendSmsBatch
+    : (messages) => Promise.all(messages.map((m) => externalServices.sendSms(m.to, m.message)));
+  const dispatcher = new OtpDispatcher(queue, sendBatch, {
+    workers: Math.max(1, parseInt(process.env.OTP_DISPATCH_WORKERS || '4', 10)),
+    batchSize: parseInt(process.env.OTP_DISPATCH_BATCH_SIZE || '50', 10),
+    maxAttempts: parseInt(process.env.OTP_DISPATCH_MAX_ATTEMPTS || '5', 10)
+  }).start();
+  console.log(`📨 OTP dispatcher running with ${dispatcher.options.workers} workers`);
+
+  const shutdown = async () => {
+    await dispatcher.stop();
+    console.log('📊', JSON.stringify(dispatcher.stats()));
+    await pool.end();
+    process.exit(0);
+  };
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,168 @@
+#!/usr/bin/env node
+// Benchmark of Udyam number allocation against a real PostgreSQL database under concurrent
+// submissions: the original random 7-digit suffix, one sequence update per number (block
+// size 1, every allocation locks the sequence row) and leased blocks (utils/udyamAllocator.js).
+// Each number is stored in a scratch table with a UNIQUE constraint, like registrations.
+//
+//   node scripts/udyam-alloc-bench.js --count 20000 --concurrency 64 --workers 4 --block 100
+//
+// --workers is the number of allocators sharing the sequence, standing in for API processes.
+// Uses the DB_* variables and state/district 99-99; the scratch table and the 99-99
+// sequence are removed afterwards.
+
+require('dotenv').config();
+const { Pool } = require('pg');
+const { UdyamAllocator } = require('../utils/udyamAllocator');
+const { poolConfig } = require('../utils/db');
+
+const STATE = '99';
+const DISTRICT = '99';
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(name);
+  return index > 0 ? process.argv[index + 1] : fallback;
+}
+
+async function reset(pool) {
+  await pool.query('DROP TABLE IF EXISTS udyam_bench_numbers');
+  await pool.query('CREATE UNLOGGED TABLE udyam_bench_numbers (udyam_number VARCHAR(50) UNIQUE)');
+  await pool.query('DELETE FROM udyam_sequences WHERE state_code = $1 AND district_code = $2', [STATE, DISTRICT]);
+}
+
+async function clear(pool) {
+  await pool.query('DROP TABLE IF EXISTS udyam_bench_numbers');
+  await pool.query('DELETE FROM udyam_sequences WHERE state_code = $1 AND district_code = $2', [STATE, DISTRICT]);
+}
+
+// The number as registration_complete stores it; unique violations carry the column name
+function store(pool, number) {
+  return pool.query('INSERT INTO udyam_bench_numbers (udyam_number) VALUES ($1)', [number]);
+}
+
+function percentile(sorted, q) {
+  if (!sorted.length) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil((q / 100) * sorted.length) - 1)];
+}
+
+// The submit-registration code before the allocator: nothing stops two requests drawing
+// the same suffix, so a repeat fails on the unique constraint
+function randomStrategy(pool) {
+  const counters = { leases: 0, collisions: 0 };
+  return {
+    counters,
+    async assign() {
+      const sequenceNumber = String(Math.floor(Math.random() * 10000000)).padStart(7, '0');
+      const number = `UDYAM-${STATE}-${DISTRICT}-${sequenceNumber}`;
+      try {
+        await store(pool, number);
+        return number;
+      } catch (error) {
+        if (error.code !== '23505') throw error;
+        counters.collisions++;
+        return null;
+      }
+    }
+  };
+}
+
+function allocatorStrategy(pool, workers, options) {
+  // Lease queries are counted through this wrapper; each allocator is one process
+  const counters = { leases: 0, collisions: 0 };
+  const db = {
+    query(config) {
+      counters.leases++;
+      return pool.query(config);
+    }
+  };
+  const allocators = Array.from({ length: workers }, () => new UdyamAllocator(db, options));
+  let turn = 0;
+  return {
+    counters,
+    async assign() {
+      const allocator = allocators[turn++ % allocators.length];
+      const number = await allocator.withNumber(STATE, DISTRICT, (n) => store(pool, n));
+      counters.collisions = allocators.reduce((sum, a) => sum + a.counters.collisions, 0);
+      return number;
+    }
+  };
+}
+
+async function runPhase(name, pool, strategy, { count, concurrency }) {
+  await reset(pool);
+  const latencies = [];
+  const issued = new Set();
+  let duplicates = 0;
+  let failed = 0;
+  let next = 0;
+
+  const started = process.hrtime.bigint();
+  await Promise.all(Array.from({ length: concurrency }, async () => {
+    while (next < count) {
+      next++;
+      const t0 = process.hrtime.bigint();
+      const number = await strategy.assign();
+      latencies.push(Number(process.hrtime.bigint() - t0) / 1e6);
+      if (number === null) {
+        failed++;
+      } else if (issued.has(number)) {
+        duplicates++;
+      } else {
+        issued.add(number);
+      }
+    }
+  }));
+  const elapsed = Number(process.hrtime.bigint() - started) / 1e9;
+
+  latencies.sort((a, b) => a - b);
+  return {
+    strategy: name,
+    allocations: count,
+    per_sec: count / elapsed,
+    sequence_queries: strategy.counters.leases,
+    p50_ms: percentile(latencies, 50),
+    p99_ms: percentile(latencies, 99),
+    unique_violations: strategy.counters.collisions,
+    failed_submissions: failed,
+    duplicates
+  };
+}
+
+async function main() {
+  const settings = {
+    count: parseInt(option('--count', '20000'), 10),
+    concurrency: parseInt(option('--concurrency', '64'), 10),
+    workers: parseInt(option('--workers', '4'), 10),
+    block: parseInt(option('--block', '100'), 10)
+  };
+  const pool = new Pool({ ...poolConfig(), max: settings.concurrency });
+
+  try {
+    const results = [
+      await runPhase('random suffix', pool, randomStrategy(pool), settings),
+      await runPhase('row per number', pool, allocatorStrategy(pool, settings.workers, {
+        blockSize: 1, maxBlockSize: 1, prefetchRatio: 0
+      }), settings),
+      await runPhase(`leased blocks (${settings.block}+)`, pool, allocatorStrategy(pool, settings.workers, {
+        blockSize: settings.block
+      }), settings)
+    ];
+    console.log(`📊 ${settings.count} allocations, concurrency ${settings.concurrency}, ${settings.workers} allocators`);
+    console.table(results.map((r) => ({
+      ...r,
+      per_sec: Math.round(r.per_sec),
+      p50_ms: r.p50_ms.toFixed(2),
+      p99_ms: r.p99_ms.toFixed(2)
+    })));
+    if (process.argv.includes('--json')) {
+      process.stdout.write(JSON.stringify(results));
+    }
+  } finally {
+    await clear(pool).catch(() => {});
+    await pool.end();
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,168 @@
+#!/usr/bin/env node
+// JS half of the validator benchmark; run through `python -m validators.bench`.
+// Reads a corpus JSON file and prints one result object per (implementation, field) as JSON.
+//
+//   node --expose-gc scripts/validator-bench.js corpus.json [--min-time 0.2]
+
+const fs = require('fs');
+const validation = require('../utils/validation');
+const { patternChecks } = require('../utils/generatedValidators');
+
+const MAX_EXAMPLES = 5;
+
+// A record that passes every chain, so only the field under test can fail
+const BASE_RECORD = {
+  aadhaar_number: '234567890124',
+  entrepreneur_name: 'Test Entrepreneur',
+  otp: '123456',
+  organization_type: 'proprietorship',
+  pan_number: 'ABCPP1234E',
+  gstin: '',
+  filed_itr: 'no'
+};
+
+function option(name, fallback) {
+  const index = process.argv.indexOf(name);
+  return index > 0 ? process.argv[index + 1] : fallback;
+}
+
+function heapUsed() {
+  if (global.gc) global.gc();
+  return process.memoryUsage().heapUsed;
+}
+
+function result(implementation, field, cases, answers, opsPerSec, bytesPerOp, baseline = false) {
+  const wrong = [];
+  cases.forEach(([value, expected], i) => {
+    if (Boolean(answers[i]) !== expected) wrong.push(value);
+  });
+  return {
+    language: 'node',
+    implementation,
+    field,
+    cases: cases.length,
+    ops_per_sec: opsPerSec,
+    mismatches: wrong.length,
+    examples: wrong.slice(0, MAX_EXAMPLES),
+    alloc: bytesPerOp,
+    alloc_unit: 'heap B/op',
+    baseline
+  };
+}
+
+function benchSync(fn, values, minTime) {
+  const answers = values.map(fn);
+  let passes = 0;
+  const started = process.hrtime.bigint();
+  let elapsed = 0;
+  do {
+    for (let i = 0; i < values.length; i++) fn(values[i]);
+    passes++;
+    elapsed = Number(process.hrtime.bigint() - started) / 1e9;
+  } while (elapsed < minTime);
+
+  const before = heapUsed();
+  for (let i = 0; i < values.length; i++) fn(values[i]);
+  const bytes = Math.max(process.memoryUsage().heapUsed - before, 0);
+  return { answers, opsPerSec: (passes * values.length) / elapsed, bytesPerOp: bytes / values.length };
+}
+
+async function benchAsync(fn, values, minTime, beforePass) {
+  const answers = [];
+  beforePass();
+  for (const value of values) answers.push(await fn(value));
+  let passes = 0;
+  const started = process.hrtime.bigint();
+  let elapsed = 0;
+  do {
+    beforePass();
+    for (const value of values) await fn(value);
+    passes++;
+    elapsed = Number(process.hrtime.bigint() - started) / 1e9;
+  } while (elapsed < minTime);
+
+  beforePass();
+  const before = heapUsed();
+  for (const value of values) await fn(value);
+  const bytes = Math.max(process.memoryUsage().heapUsed - before, 0);
+  return { answers, opsPerSec: (passes * values.length) / elapsed, bytesPerOp: bytes / values.length };
+}
+
+// express-validator chains from middleware/validation.js, one request per value
+function loadApiChains() {
+  try {
+    const { validationResult } = require('express-validator');
+    const chains = require('../middleware/validation');
+    const byField = {
+      aadhaar_number: chains.validateAadhaarData,
+      entrepreneur_name: chains.validateAadhaarData,
+      pan_number: chains.validatePANData,
+      gstin: chains.validatePANData,
+      otp: chains.validateOTPData
+    };
+    const checkers = {};
+    Object.entries(byField).forEach(([field, fieldChains]) => {
+      checkers[field] = async (value) => {
+        const req = { body: { ...BASE_RECORD, [field]: value } };
+        for (const chain of fieldChains) await chain.run(req);
+        return !validationResult(req).array().some((error) => (error.path || error.param) === field);
+      };
+    });
+    return { checkers, clearCache: () => chains.validationCache.clear() };
+  } catch (error) {
+    return { error: error.message.split('\n')[0] };
+  }
+}
+
+async function main() {
+  const corpusPath = process.argv[2];
+  if (!corpusPath) {
+    console.error('usage: validator-bench.js corpus.json [--min-time seconds]');
+    process.exit(2);
+  }
+  const minTime = parseFloat(option('--min-time', '0.2'));
+  const corpus = JSON.parse(fs.readFileSync(corpusPath, 'utf8'));
+
+  const syncImplementations = {
+    'validation.js': {
+      aadhaar_number: validation.validateAadhaar,
+      pan_number: validation.validatePAN,
+      otp: validation.validateOTP,
+      gstin: validation.validateGSTIN
+    },
+    generated: patternChecks,
+    // The hand-written regexes the API used before codegen; JS \s also matches Unicode spaces
+    RegExp: Object.fromEntries(
+      Object.entries(corpus.fields).map(([field, entry]) => {
+        const regex = new RegExp(entry.pattern);
+        return [field, (value) => regex.test(value)];
+      })
+    )
+  };
+  const api = loadApiChains();
+
+  const results = [];
+  for (const [field, entry] of Object.entries(corpus.fields)) {
+    const cases = entry.cases;
+    const values = cases.map(([value]) => value);
+
+    for (const [name, fns] of Object.entries(syncImplementations)) {
+      if (!fns[field]) continue;
+      const stats = benchSync(fns[field], values, minTime);
+      results.push(result(name, field, cases, stats.answers, stats.opsPerSec, stats.bytesPerOp, name === 'RegExp'));
+    }
+
+    if (api.error) {
+      results.push({ language: 'node', implementation: 'express-validator', field, skipped: api.error });
+    } else if (api.checkers[field]) {
+      const stats = await benchAsync(api.checkers[field], values, minTime, api.clearCache);
+      results.push(result('express-validator', field, cases, stats.answers, stats.opsPerSec, stats.bytesPerOp));
+    }
+  }
+  process.stdout.write(JSON.stringify(results));
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -8,25 +8,38 @@ const express = require('express');
 const cors = require('cors');
 const helmet = require('helmet');
 const rateLimit = require('express-rate-limit');
-const { body, validationResult } = require('express-validator');
+const { validationResult } = require('express-validator');
 const bcrypt = require('bcrypt');
 const jwt = require('jsonwebtoken');
 const { Pool } = require('pg');
 require('dotenv').config();
+const {
+  validationCache,
+  matchesPattern,
+  validateAadhaarData,
+  validatePANData,
+  validateOTPData
+} = require('./middleware/validation');
+const { createIdempotency } = require('./middleware/idempotency');
+const externalServices = require('./utils/externalServices');
+const { OtpDispatcher, createOtpQueue } = require('./utils/otpQueue');
+const { createOtpStore } = require('./utils/otpStore');
+const { Database, poolConfig } = require('./utils/db');
+const { attachStandalone, attachWorker, clusterHealth } = require('./utils/cluster');
+const { createRateLimitStore } = require('./utils/rateLimitStore');
+const { createStatusCache } = require('./utils/statusCache');
+const { createExistenceFilters } = require('./utils/existenceFilter');
+const { createUdyamAllocator } = require('./utils/udyamAllocator');
+const { createAuditLog } = require('./utils/auditLog');
 
 const app = express();
 const PORT = process.env.PORT || 3001;
 const OTP_MOCK_ENABLED = String(process.env.OTPMOCK || process.env.OTP_MOCK || '').toLowerCase() === 'true';
 
-// Database connection
-const pool = new Pool({
-  host: process.env.DB_HOST || 'localhost',
-  port: process.env.DB_PORT || 5432,
-  database: process.env.DB_NAME || 'udyam_db',
-  user: process.env.DB_USER || 'postgres',
-  password: process.env.DB_PASSWORD || 'password',
-  ssl: process.env.NODE_ENV === 'production' ? { rejectUnauthorized: false } : false
-});
+// Database connection (pool size and timeouts from DB_POOL_*; see utils/db.js)
+const pool = new Pool(poolConfig());
+pool.on('error', (error) => console.error('Idle database client error:', error.message));
+const db = new Database(pool);
 
 // Middleware
 app.use(helmet());
@@ -41,6 +54,7 @@ app.use(express.urlencoded({ extended: true, limit: '10mb' }));
 const limiter = rateLimit({
   windowMs: 15 * 60 * 1000, // 15 minutes
   max: 100,
+  store: createRateLimitStore('api'),
   skip: () => OTP_MOCK_ENABLED || process.env.NODE_ENV !== 'production'
 });
 if (process.env.NODE_ENV !== 'test') {
@@ -51,6 +65,8 @@ if (process.env.NODE_ENV !== 'test') {
 const otpLimiter = rateLimit({
   windowMs: process.env.NODE_ENV === 'test' ? 200 : 5 * 60 * 1000,
   max: 3,
+  // Shared across cluster workers so the limit holds per host, not per process
+  store: createRateLimitStore('otp'),
   skipFailedRequests: true,
   // In dev or when OTP mock is enabled, skip rate limiting to ease testing
   skip: () => OTP_MOCK_ENABLED || process.env.NODE_ENV !== 'production',
@@ -65,16 +81,6 @@ const otpLimiter = rateLimit({
   }
 });
 
-// Validation patterns
-const validationPatterns = {
-  aadhaar: /^[2-9][0-9]{11}$/,
-  pan: /^[A-Z]{5}[0-9]{4}[A-Z]{1}$/,
-  otp: /^[0-9]{6}$/,
-  gstin: /^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$/,
-  name: /^[a-zA-Z\s.]+$/,
-  email: /^[^\s@]+@[^\s@]+\.[^\s@]+$/
-};
-
 // Utility functions
 const generateOTP = () => {
   return Math.floor(100000 + Math.random() * 900000).toString();
@@ -87,18 +93,88 @@ const validateInput = (field, value, pattern) => {
   return true;
 };
 
-const sendOTP = async (mobile, otp) => {
-  // In real implementation, integrate with SMS service like Twilio, MSG91, etc.
-  console.log(`Sending OTP ${otp} to mobile number: ${mobile}`);
+// OTP storage: Redis with key TTLs when OTP_STORE=redis, otp_verifications otherwise
+const otpStore = createOtpStore(db);
+
+// OTP delivery runs off the request path: generate-otp enqueues, the dispatcher sends.
+// SMS_GATEWAY_BATCH=true sends each claimed batch in one provider call.
+const otpQueue = createOtpQueue(db);
+const sendOtpBatch = process.env.SMS_GATEWAY_BATCH === 'true'
+  ? externalServices.sendSmsBatch
+  : (messages) => Promise.all(messages.map((m) => externalServices.sendSms(m.to, m.message)));
+const otpDispatcher = new OtpDispatcher(otpQueue, sendOtpBatch, {
+  workers: parseInt(process.env.OTP_DISPATCH_WORKERS || '4', 10),
+  batchSize: parseInt(process.env.OTP_DISPATCH_BATCH_SIZE || '50', 10),
+  maxAttempts: parseInt(process.env.OTP_DISPATCH_MAX_ATTEMPTS || '5', 10)
+});
+
+// Registration status lookups: in-process LRU, optional Redis tier, then the database.
+// Every write to a registration row invalidates its Aadhaar.
+const statusCache = createStatusCache(async (aadhaar) => {
+  const registration = await db.execute('registration_status_by_aadhaar', [aadhaar]);
+  return registration.rows[0] || null;
+});
+
+// Bloom filters of registered Aadhaar and completed PAN numbers: a definite miss skips the
+// duplicate-check query, a possible hit is confirmed in SQL. Built when the server starts.
+const existenceFilters = createExistenceFilters(db);
+
+// Udyam numbers come from per state/district sequences, leased in blocks (UDYAM_BLOCK_SIZE)
+const udyamAllocator = createUdyamAllocator(db);
+const DEFAULT_STATE_CODE = process.env.UDYAM_DEFAULT_STATE_CODE || '27'; // Maharashtra
+const DEFAULT_DISTRICT_CODE = process.env.UDYAM_DEFAULT_DISTRICT_CODE || '01';
+
+// Registration id from a valid session token, or null; routes answer a bad token themselves
+const sessionRegistrationId = (req) => {
+  const token = (req.headers.authorization || '').split(' ')[1];
+  if (!token) return null;
+  try {
+    return jwt.verify(token, process.env.JWT_SECRET || 'udyam-secret-key').registration_id || null;
+  } catch (error) {
+    return null;
+  }
+};
+
+// Idempotency-Key support for client retries, keyed by the session's registration
+// (or the client IP without a valid token)
+const idempotency = createIdempotency({
+  subject: (req) => {
+    const registrationId = sessionRegistrationId(req);
+    return registrationId ? `registration:${registrationId}` : `ip:${req.ip}`;
+  }
+});
 
-  // Simulate SMS sending
-  return new Promise((resolve) => {
-    setTimeout(() => {
-      resolve({ success: true, message: 'OTP sent successfully' });
-    }, 1000);
+// Audit trail (form_submissions, validation_logs): queued here, written in batches
+const auditLog = createAuditLog(db);
+
+const auditStep = (req, stepNumber, registrationId, fields) => {
+  const body = req.body || {};
+  auditLog.submission({
+    registration_id: registrationId,
+    step_number: stepNumber,
+    form_data: Object.fromEntries(fields.filter((field) => body[field] !== undefined).map((field) => [field, body[field]])),
+    ip_address: req.ip || null,
+    user_agent: req.headers['user-agent'] || null
   });
 };
 
+// One validation_logs row per submitted field; [type, field, redact] keeps OTPs out of the log
+const auditValidation = (req, registrationId, fields) => {
+  const body = req.body || {};
+  const failed = new Map(validationResult(req).array().map((error) => [error.path || error.param, error.msg]));
+  for (const [validationType, fieldName, redact] of fields) {
+    if (body[fieldName] === undefined || body[fieldName] === '') continue;
+    auditLog.validation({
+      registration_id: registrationId,
+      validation_type: validationType,
+      field_name: fieldName,
+      field_value: redact ? null : body[fieldName],
+      is_valid: !failed.has(fieldName),
+      error_message: failed.get(fieldName) || null
+    });
+  }
+};
+
 // Middleware for error handling
 const errorHandler = (err, req, res, next) => {
   console.error('Error:', err.stack);
@@ -108,43 +184,30 @@ const errorHandler = (err, req, res, next) => {
   });
 };
 
-// Validation middleware
-const validateAadhaarData = [
-  body('aadhaar_number')
-    .matches(validationPatterns.aadhaar)
-    .withMessage('Invalid Aadhaar number format'),
-  body('entrepreneur_name')
-    .isLength({ min: 2, max: 100 })
-    .matches(validationPatterns.name)
-    .withMessage('Invalid name format'),
-];
-
-const validatePANData = [
-  body('organization_type')
-    .isIn(['proprietorship', 'partnership', 'llp', 'pvt_company', 'public_company', 'huf', 'cooperative', 'trust', 'society'])
-    .withMessage('Invalid organization type'),
-  body('pan_number')
-    .matches(validationPatterns.pan)
-    .withMessage('Invalid PAN format'),
-  body('gstin')
-    .optional({ checkFalsy: true, nullable: true })
-    .matches(validationPatterns.gstin)
-    .withMessage('Invalid GSTIN format'),
-  body('filed_itr')
-    .isIn(['yes', 'no'])
-    .withMessage('ITR filing status must be yes or no')
-];
-
 // Routes
 
 // Health check
 app.get('/health', (req, res) => {
-  res.json({ status: 'OK', timestamp: new Date().toISOString() });
+  res.json({
+    status: 'OK',
+    timestamp: new Date().toISOString(),
+    validation_cache: validationCache.stats(),
+    otp_dispatch: otpDispatcher.stats(),
+    database: db.stats(),
+    status_cache: statusCache.stats(),
+    existence_filters: existenceFilters.stats(),
+    udyam_allocator: udyamAllocator.stats(),
+    idempotency: idempotency.stats(),
+    audit_log: auditLog.stats(),
+    cluster: clusterHealth()
+  });
 });
 
 // Generate OTP
 app.post('/api/generate-otp', otpLimiter, validateAadhaarData, async (req, res) => {
   try {
+    auditStep(req, 1, null, ['aadhaar_number', 'entrepreneur_name', 'consent']);
+    auditValidation(req, null, [['aadhaar', 'aadhaar_number'], ['name', 'entrepreneur_name']]);
     const errors = validationResult(req);
     if (!errors.isEmpty()) {
       return res.status(400).json({ 
@@ -167,47 +230,47 @@ app.post('/api/generate-otp', otpLimiter, validateAadhaarData, async (req, res)
     }
 
     // Check if Aadhaar already exists in registration
-    const existingAadhaar = await pool.query(
-      'SELECT id FROM registrations WHERE aadhaar_number = $1 AND status != \'draft\'',
-      [aadhaar_number]
-    );
+    const aadhaarRegistered = await existenceFilters.exists('aadhaar', aadhaar_number, async () => {
+      const existingAadhaar = await db.execute('registration_active_by_aadhaar', [aadhaar_number]);
+      return existingAadhaar.rows.length > 0;
+    });
 
-    if (existingAadhaar.rows.length > 0) {
+    if (aadhaarRegistered) {
       return res.status(400).json({
         error: 'Aadhaar already registered',
         message: 'This Aadhaar number is already used for Udyam registration'
       });
     }
 
+    // Mobile number registered with UIDAI (UIDAI_API_URL; simulated when unset). Looked up
+    // before the save, so a failed lookup leaves any earlier OTP in place and stores none.
+    let mobileNumber;
+    try {
+      mobileNumber = await externalServices.lookupAadhaarMobile(aadhaar_number);
+    } catch (error) {
+      console.error('UIDAI lookup error:', error.message);
+      return res.status(503).json({
+        error: 'Aadhaar service unavailable',
+        message: 'Please try again later'
+      });
+    }
+    const maskedMobile = `*******${mobileNumber.slice(-4)}`;
+
     // Generate and store OTP
     const otp = generateOTP();
     const expiresAt = new Date(Date.now() + 10 * 60 * 1000); // 10 minutes
 
-    await pool.query(
-      'INSERT INTO otp_verifications (aadhaar_number, otp, expires_at, type) VALUES ($1, $2, $3, $4) ON CONFLICT (aadhaar_number, type) DO UPDATE SET otp = $2, expires_at = $3, created_at = CURRENT_TIMESTAMP',
-      [aadhaar_number, otp, expiresAt, 'aadhaar_verification']
-    );
-
-    // In real implementation, get mobile number from UIDAI API
-    const mockMobileNumber = '9876543210'; // This should come from UIDAI verification
-    const maskedMobile = `*******${mockMobileNumber.slice(-4)}`;
+    await otpStore.save(aadhaar_number, 'aadhaar_verification', otp, expiresAt);
 
-    // Send OTP
-    const smsResult = await sendOTP(mockMobileNumber, otp);
+    // Queue the SMS; delivery and retries happen in the dispatcher
+    await otpQueue.enqueue({ aadhaar_number, mobile: mobileNumber, otp, expires_at: expiresAt });
 
-    if (smsResult.success) {
-      res.json({
-        success: true,
-        message: 'OTP sent to registered mobile number',
-        expires_in: 600, // seconds
-        sent_to: maskedMobile
-      });
-    } else {
-      res.status(500).json({
-        error: 'Failed to send OTP',
-        message: 'Please try again later'
-      });
-    }
+    res.json({
+      success: true,
+      message: 'OTP sent to registered mobile number',
+      expires_in: 600, // seconds
+      sent_to: maskedMobile
+    });
 
   } catch (error) {
     console.error('Generate OTP error:', error);
@@ -219,14 +282,9 @@ app.post('/api/generate-otp', otpLimiter, validateAadhaarData, async (req, res)
 });
 
 // Validate OTP
-app.post('/api/validate-otp', [
-  body('aadhaar_number').matches(validationPatterns.aadhaar),
-  body('otp').custom((value) => {
-    if (OTP_MOCK_ENABLED && value === '1234') return true;
-    return validationPatterns.otp.test(String(value));
-  })
-], async (req, res) => {
+app.post('/api/validate-otp', validateOTPData, async (req, res) => {
   try {
+    auditValidation(req, null, [['aadhaar', 'aadhaar_number'], ['otp', 'otp', true]]);
     const errors = validationResult(req);
     if (!errors.isEmpty()) {
       return res.status(400).json({ 
@@ -254,36 +312,29 @@ app.post('/api/validate-otp', [
       return res.json({ success: true, message: 'Aadhaar verified successfully', token });
     }
 
-    // Verify OTP against DB
-    const otpRecord = await pool.query(
-      'SELECT * FROM otp_verifications WHERE aadhaar_number = $1 AND type = $2 AND otp = $3 AND expires_at > CURRENT_TIMESTAMP',
-      [aadhaar_number, 'aadhaar_verification', otp]
-    );
+    // Consume the OTP (once only) and upsert the draft registration in one atomic call
+    const registrationId = await otpStore.verifyAndRegister(aadhaar_number, 'aadhaar_verification', otp, 1);
+    auditLog.validation({
+      registration_id: registrationId,
+      validation_type: 'otp_verification',
+      field_name: 'otp',
+      is_valid: registrationId !== null,
+      error_message: registrationId === null ? 'OTP is incorrect or has expired' : null
+    });
 
-    if (otpRecord.rows.length === 0) {
+    if (registrationId === null) {
       return res.status(400).json({
         error: 'Invalid OTP',
         message: 'OTP is incorrect or has expired'
       });
     }
-
-    // Mark OTP as used
-    await pool.query(
-      'UPDATE otp_verifications SET used_at = CURRENT_TIMESTAMP WHERE aadhaar_number = $1 AND type = $2',
-      [aadhaar_number, 'aadhaar_verification']
-    );
-
-    // Create or update draft registration
-    const draftRecord = await pool.query(
-      'INSERT INTO registrations (aadhaar_number, status, step_completed) VALUES ($1, $2, $3) ON CONFLICT (aadhaar_number) DO UPDATE SET step_completed = GREATEST(registrations.step_completed, $3), updated_at = CURRENT_TIMESTAMP RETURNING id',
-      [aadhaar_number, 'draft', 1]
-    );
+    await statusCache.invalidate(aadhaar_number);
 
     // Generate session token
     const token = jwt.sign(
       { 
         aadhaar_number: aadhaar_number,
-        registration_id: draftRecord.rows[0].id,
+        registration_id: registrationId,
         step: 1
       },
       process.env.JWT_SECRET || 'udyam-secret-key',
@@ -306,8 +357,11 @@ app.post('/api/validate-otp', [
 });
 
 // Validate PAN
-app.post('/api/validate-pan', validatePANData, async (req, res) => {
+app.post('/api/validate-pan', idempotency.middleware('validate-pan'), validatePANData, async (req, res) => {
   try {
+    const sessionId = sessionRegistrationId(req);
+    auditStep(req, 2, sessionId, ['organization_type', 'pan_number', 'gstin', 'filed_itr']);
+    auditValidation(req, sessionId, [['pan', 'pan_number'], ['gstin', 'gstin']]);
     const errors = validationResult(req);
     if (!errors.isEmpty()) {
       return res.status(400).json({ 
@@ -319,12 +373,12 @@ app.post('/api/validate-pan', validatePANData, async (req, res) => {
     const { organization_type, pan_number, gstin, filed_itr } = req.body;
 
     // Check if PAN already exists in completed registrations
-    const existingPAN = await pool.query(
-      'SELECT id, status FROM registrations WHERE pan_number = $1 AND status = \'completed\'',
-      [pan_number]
-    );
+    const panRegistered = await existenceFilters.exists('pan', pan_number, async () => {
+      const existingPAN = await db.execute('registration_completed_by_pan', [pan_number]);
+      return existingPAN.rows.length > 0;
+    });
 
-    if (existingPAN.rows.length > 0) {
+    if (panRegistered) {
       return res.status(400).json({
         error: 'PAN already registered',
         message: 'Udyam Registration has already been done through this PAN',
@@ -332,9 +386,6 @@ app.post('/api/validate-pan', validatePANData, async (req, res) => {
       });
     }
 
-    // In real implementation, validate PAN with Income Tax Department API
-    // For now, we'll simulate PAN validation
-
     // Validate PAN format and organization type consistency
     const fourthChar = pan_number.charAt(3);
     const orgTypePANMap = {
@@ -356,6 +407,24 @@ app.post('/api/validate-pan', validatePANData, async (req, res) => {
       });
     }
 
+    // Income Tax Department check (PAN_API_URL; skipped when unset)
+    let panCheck;
+    try {
+      panCheck = await externalServices.verifyPan(pan_number);
+    } catch (error) {
+      console.error('PAN verification error:', error.message);
+      return res.status(503).json({
+        error: 'PAN verification unavailable',
+        message: 'Please try again later'
+      });
+    }
+    if (!panCheck.valid) {
+      return res.status(400).json({
+        error: 'PAN verification failed',
+        message: 'PAN could not be verified with the Income Tax Department'
+      });
+    }
+
     // Get authorization token from request
     const authHeader = req.headers.authorization;
     let registrationId = null;
@@ -374,10 +443,13 @@ app.post('/api/validate-pan', validatePANData, async (req, res) => {
 
     // Update registration record
     if (registrationId) {
-      await pool.query(
-        'UPDATE registrations SET organization_type = $1, pan_number = $2, gstin = $3, filed_itr = $4, step_completed = GREATEST(step_completed, 2), updated_at = CURRENT_TIMESTAMP WHERE id = $5',
+      const updated = await db.execute(
+        'registration_update_pan',
         [organization_type, pan_number, gstin || null, filed_itr, registrationId]
       );
+      if (updated.rows.length) {
+        await statusCache.invalidate(updated.rows[0].aadhaar_number);
+      }
     }
 
     res.json({
@@ -400,7 +472,7 @@ app.post('/api/validate-pan', validatePANData, async (req, res) => {
 });
 
 // Submit complete registration
-app.post('/api/submit-registration', async (req, res) => {
+app.post('/api/submit-registration', idempotency.middleware('submit-registration'), async (req, res) => {
   try {
     const authHeader = req.headers.authorization;
     if (!authHeader) {
@@ -410,38 +482,58 @@ app.post('/api/submit-registration', async (req, res) => {
     const token = authHeader.split(' ')[1];
     const decoded = jwt.verify(token, process.env.JWT_SECRET || 'udyam-secret-key');
     const registrationId = decoded.registration_id;
+    auditStep(req, 3, registrationId, ['declaration']);
 
     // Get registration details
-    const registration = await pool.query(
-      'SELECT * FROM registrations WHERE id = $1',
-      [registrationId]
-    );
+    const registration = await db.execute('registration_by_id', [registrationId]);
 
     if (registration.rows.length === 0) {
       return res.status(404).json({ error: 'Registration not found' });
     }
 
-    // Generate Udyam Registration Number
-    const currentYear = new Date().getFullYear();
-    const stateCode = '27'; // Example: Maharashtra
-    const districtCode = '01';
-    const sequenceNumber = String(Math.floor(Math.random() * 10000000)).padStart(7, '0');
-    const udyamNumber = `UDYAM-${stateCode}-${districtCode}-${sequenceNumber}`;
-
-    // Update registration status
-    await pool.query(
-      'UPDATE registrations SET status = $1, udyam_number = $2, completed_at = CURRENT_TIMESTAMP WHERE id = $3',
-      ['completed', udyamNumber, registrationId]
-    );
-
-    res.json({
+    const completed = (udyamNumber) => res.json({
       success: true,
       message: 'Registration completed successfully',
       udyam_number: udyamNumber,
       reference_number: `REF${Date.now()}`
     });
 
+    // Already completed (a retry without an Idempotency-Key): keep the number it was given
+    if (registration.rows[0].status === 'completed' && registration.rows[0].udyam_number) {
+      return completed(registration.rows[0].udyam_number);
+    }
+
+    // Generate Udyam Registration Number. A GSTIN starts with the GST state code;
+    // district codes are not collected yet.
+    const { gstin } = registration.rows[0];
+    const stateCode = gstin ? gstin.slice(0, 2) : DEFAULT_STATE_CODE;
+    const districtCode = DEFAULT_DISTRICT_CODE;
+
+    // Update registration status, unless an overlapping submit completed it since the read
+    let stored = false;
+    const udyamNumber = await udyamAllocator.withNumber(stateCode, districtCode, async (number) => {
+      const updated = await db.execute('registration_complete', ['completed', number, registrationId]);
+      stored = updated.rows.length > 0;
+    });
+    if (!stored) {
+      // The allocated number is skipped; the client gets the one the winning submit stored
+      const current = await db.execute('registration_by_id', [registrationId]);
+      return completed(current.rows[0].udyam_number);
+    }
+    await statusCache.invalidate(registration.rows[0].aadhaar_number);
+    existenceFilters.add({ ...registration.rows[0], status: 'completed' });
+
+    completed(udyamNumber);
+
   } catch (error) {
+    // idx_registrations_completed_pan: another registration completed with this PAN first
+    if (error.code === '23505' && error.constraint === 'idx_registrations_completed_pan') {
+      return res.status(400).json({
+        error: 'PAN already registered',
+        message: 'Udyam Registration has already been done through this PAN',
+        already_registered: true
+      });
+    }
     console.error('Submit registration error:', error);
     res.status(500).json({
       error: 'Internal server error',
@@ -455,25 +547,22 @@ app.get('/api/registration-status/:aadhaar', async (req, res) => {
   try {
     const { aadhaar } = req.params;
 
-    if (!validationPatterns.aadhaar.test(aadhaar)) {
+    if (!matchesPattern('aadhaar')(aadhaar)) {
       return res.status(400).json({ error: 'Invalid Aadhaar number' });
     }
 
-    const registration = await pool.query(
-      'SELECT status, step_completed, udyam_number, created_at, completed_at FROM registrations WHERE aadhaar_number = $1',
-      [aadhaar]
-    );
+    const registration = await statusCache.get(aadhaar);
 
-    if (registration.rows.length === 0) {
+    if (registration === null) {
       return res.json({ status: 'not_started' });
     }
 
     res.json({
-      status: registration.rows[0].status,
-      step_completed: registration.rows[0].step_completed,
-      udyam_number: registration.rows[0].udyam_number,
-      created_at: registration.rows[0].created_at,
-      completed_at: registration.rows[0].completed_at
+      status: registration.status,
+      step_completed: registration.step_completed,
+      udyam_number: registration.udyam_number,
+      created_at: registration.created_at,
+      completed_at: registration.completed_at
     });
 
   } catch (error) {
@@ -495,11 +584,41 @@ app.use('*', (req, res) => {
 
 // Start server unless running under test
 if (process.env.NODE_ENV !== 'test') {
-  app.listen(PORT, () => {
-    console.log(`🚀 Udyam Registration API Server running on port ${PORT}`);
+  const server = app.listen(PORT, () => {
+    console.log(`🚀 Udyam Registration API Server running on port ${PORT} (pid ${process.pid})`);
     console.log(`📄 Environment: ${process.env.NODE_ENV || 'development'}`);
     console.log(`🔗 Health check: http://localhost:${PORT}/health`);
   });
+  // Runs once the server has stopped accepting and in-flight requests finished
+  const onShutdown = async () => {
+    await otpDispatcher.stop();
+    otpStore.stopCleanup();
+    await existenceFilters.stop();
+    await auditLog.stop();
+    await db.end();
+  };
+  // Under cluster.js: heartbeat to the supervisor and drain on rolling reload.
+  // Started directly: drain on SIGTERM/SIGINT, so the audit log is flushed before exit.
+  attachWorker(server, {
+    stats: () => ({ db_waiting: db.stats().pool.waiting }),
+    onShutdown
+  });
+  attachStandalone(server, { onShutdown });
+  // OTP_DISPATCH_WORKERS=0 leaves delivery to scripts/otp-worker.js (Postgres queue only)
+  if (otpDispatcher.options.workers > 0) {
+    otpDispatcher.start();
+  }
+  otpStore.startCleanup(
+    parseInt(process.env.OTP_CLEANUP_INTERVAL_MS || '3600000', 10),
+    parseInt(process.env.OTP_DEAD_LETTER_RETENTION_DAYS || '7', 10)
+  );
+  auditLog.start();
+  // Until the build finishes, duplicate checks go to the database as before
+  if (process.env.EXISTENCE_FILTER_ENABLED !== 'false') {
+    existenceFilters.start().catch((error) => console.error('Existence filter build failed:', error.message));
+  }
 }
 
 module.exports = app;
+// For tests that need each status lookup to reach the database
+module.exports.statusCache = statusCache;
@@ -0,0 +1,90 @@
+const { StatusCache } = require('./utils/statusCache');
+const { MemoryRedis } = require('./utils/memoryRedis');
+
+const row = (status) => ({ status, step_completed: 1, udyam_number: null });
+
+describe('Status Cache Tests', () => {
+  test('should serve repeated lookups from memory until the TTL passes', async () => {
+    let now = 0;
+    const loader = jest.fn(() => Promise.resolve(row('draft')));
+    const cache = new StatusCache(loader, { ttlMs: 1000, now: () => now });
+
+    expect((await cache.get('234567890123')).status).toBe('draft');
+    expect((await cache.get('234567890123')).status).toBe('draft');
+    expect(loader).toHaveBeenCalledTimes(1);
+
+    now = 1000;
+    await cache.get('234567890123');
+    expect(loader).toHaveBeenCalledTimes(2);
+    expect(cache.stats()).toMatchObject({ hits: 1, misses: 2 });
+  });
+
+  test('should cache unknown Aadhaar numbers for the negative TTL', async () => {
+    let now = 0;
+    const loader = jest.fn(() => Promise.resolve(undefined));
+    const cache = new StatusCache(loader, { ttlMs: 5000, negativeTtlMs: 100, now: () => now });
+
+    expect(await cache.get('234567890123')).toBeNull();
+    expect(await cache.get('234567890123')).toBeNull();
+    now = 100;
+    await cache.get('234567890123');
+    expect(loader).toHaveBeenCalledTimes(2);
+    expect(cache.stats().negative_hits).toBe(1);
+  });
+
+  test('should load once for concurrent misses', async () => {
+    const loader = jest.fn(() => new Promise((resolve) => setTimeout(() => resolve(row('draft')), 5)));
+    const cache = new StatusCache(loader);
+
+    await Promise.all(Array.from({ length: 10 }, () => cache.get('234567890123')));
+    expect(loader).toHaveBeenCalledTimes(1);
+    expect(cache.stats().coalesced).toBe(9);
+  });
+
+  test('should not cache a load that an invalidation overtook', async () => {
+    let status = 'draft';
+    const loader = jest.fn(() => new Promise((resolve) => {
+      const seen = status;
+      setTimeout(() => resolve(row(seen)), 5);
+    }));
+    const cache = new StatusCache(loader);
+
+    const stale = cache.get('234567890123');
+    await new Promise((resolve) => setImmediate(resolve)); // the load has read 'draft'
+    status = 'completed';
+    await cache.invalidate('234567890123');
+    expect((await stale).status).toBe('draft');
+    expect((await cache.get('234567890123')).status).toBe('completed');
+  });
+
+  test('should load again after the cache is cleared', async () => {
+    const loader = jest.fn(() => Promise.resolve(row('draft')));
+    const cache = new StatusCache(loader);
+
+    await cache.get('234567890123');
+    cache.clear();
+    await cache.get('234567890123');
+    expect(loader).toHaveBeenCalledTimes(2);
+    expect(cache.stats().size).toBe(1);
+  });
+
+  test('should share entries and invalidations through Redis', async () => {
+    const redis = new MemoryRedis();
+    let status = 'draft';
+    const loader = jest.fn(() => Promise.resolve(row(status)));
+    const first = new StatusCache(loader, { redis });
+    const second = new StatusCache(loader, { redis });
+
+    await first.get('234567890123');
+    expect((await second.get('234567890123')).status).toBe('draft');
+    expect(loader).toHaveBeenCalledTimes(1);
+    expect(second.stats().redis_hits).toBe(1);
+
+    // A tombstone replaces the Redis entry, so a third process goes to the database
+    status = 'completed';
+    await first.invalidate('234567890123');
+    const third = new StatusCache(loader, { redis });
+    expect((await third.get('234567890123')).status).toBe('completed');
+    expect(loader).toHaveBeenCalledTimes(2);
+  });
+});
@@ -6,7 +6,7 @@ const { Pool } = require('pg');
 jest.mock('jsonwebtoken', () => ({
   sign: jest.fn(() => 'mocked-jwt-token'),
   verify: jest.fn(() => ({
-    aadhaar_number: '234567890123',
+    aadhaar_number: '234567890124',
     registration_id: 1,
     step: 1
   }))
@@ -31,7 +31,7 @@ afterAll(() => {
 // Helper functions for tests
 global.createMockRegistration = () => ({
   id: 1,
-  aadhaar_number: '234567890123',
+  aadhaar_number: '234567890124',
   entrepreneur_name: 'Test User',
   status: 'draft',
   step_completed: 1,
@@ -41,7 +41,7 @@ global.createMockRegistration = () => ({
 
 global.createMockOTP = () => ({
   id: 1,
-  aadhaar_number: '234567890123',
+  aadhaar_number: '234567890124',
   otp: '123456',
   type: 'aadhaar_verification',
   expires_at: new Date(Date.now() + 600000), // 10 minutes from now
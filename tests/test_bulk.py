@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from validators.bulk import validate_file
+
+VALID = {
+    "aadhaar_number": "234567890124", "entrepreneur_name": "Ramesh Kumar", "otp": "123456",
+    "organization_type": "proprietorship", "pan_number": "ABCPE1234F", "filed_itr": "yes",
+}
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    return str(path)
+
+
+def test_ndjson_checks_fields_missing_from_the_first_record(tmp_path):
+    source = write_lines(tmp_path / "in.ndjson", [
+        json.dumps(VALID),
+        json.dumps(dict(VALID, pan_number="bad", gstin="junk")),
+        json.dumps({"aadhaar_number": "234567890124"}),
+    ])
+    accepted, rejects = tmp_path / "ok.ndjson", tmp_path / "bad.ndjson"
+
+    stats = validate_file(source, str(accepted), str(rejects), workers=1)
+
+    assert (stats["accepted"], stats["rejected"]) == (1, 2)
+    rejected = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [(e["field"], e["code"]) for e in rejected[0]["errors"]] == [
+        ("pan_number", "pattern"), ("gstin", "pattern")]
+    # A field the file's first record has is required on every record, like a CSV column
+    assert [(e["field"], e["code"]) for e in rejected[1]["errors"]] == [
+        ("entrepreneur_name", "required"), ("otp", "required"), ("organization_type", "required"),
+        ("pan_number", "required"), ("filed_itr", "required")]
+    assert [json.loads(line) for line in accepted.read_text().splitlines()] == [VALID]
+
+
+def test_csv_writes_header_and_error_column(tmp_path):
+    source = write_lines(tmp_path / "in.csv", [
+        "aadhaar_number,entrepreneur_name,pan_number",
+        "234567890124,Ramesh Kumar,ABCPE1234F",
+        '234567890123,"Ramesh Kumar",ABCPE1234F',
+        "234567890124,,abc",
+    ])
+    accepted, rejects = tmp_path / "ok.csv", tmp_path / "bad.csv"
+
+    stats = validate_file(source, str(accepted), str(rejects), workers=1, chunk_size=2,
+                          fields=["aadhaar_number", "entrepreneur_name", "pan_number"])
+
+    assert (stats["rows"], stats["accepted"], stats["rejected"]) == (3, 1, 2)
+    assert accepted.read_text().splitlines() == [
+        "aadhaar_number,entrepreneur_name,pan_number", "234567890124,Ramesh Kumar,ABCPE1234F"]
+    assert rejects.read_text().splitlines() == [
+        "aadhaar_number,entrepreneur_name,pan_number,errors",
+        '234567890123,"Ramesh Kumar",ABCPE1234F,"aadhaar_number:checksum"',
+        '234567890124,,abc,"entrepreneur_name:required;pan_number:pattern"',
+    ]
+    assert stats["errors"]["aadhaar_number:checksum"] == 1
+
+
+def test_workers_keep_input_order(tmp_path):
+    rows = [dict(VALID, pan_number="ABCPE1234F" if i % 3 else "bad") for i in range(50)]
+    source = write_lines(tmp_path / "in.ndjson", [json.dumps(row) for row in rows])
+    rejects = tmp_path / "bad.ndjson"
+
+    stats = validate_file(source, None, str(rejects), workers=2, chunk_size=7)
+
+    assert stats["rejected"] == 17
+    assert len(rejects.read_text().splitlines()) == 17
+
+
+@pytest.mark.parametrize("name,lines", [
+    ("in.csv", ["aadhaar_number,entrepreneur_name,pan_number", "234567890124,Ramesh Kumar,ABCPE1234F"]),
+    ("in.ndjson", [json.dumps({"aadhaar_number": "234567890124", "pan_number": "ABCPE1234F"})]),
+])
+def test_missing_required_columns_are_refused_without_fields(tmp_path, name, lines):
+    source = write_lines(tmp_path / name, lines)
+
+    with pytest.raises(ValueError, match="missing required fields .*otp.*filed_itr"):
+        validate_file(source, None, None, workers=1)
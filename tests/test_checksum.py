@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from validators.checksum import (gstin_check_char, gstin_checksum_valid, gstin_checksum_valid_batch,
+                                 verhoeff_digit, verhoeff_valid, verhoeff_valid_batch)
+
+
+def test_verhoeff_reference_vector():
+    assert verhoeff_digit("236") == "3"
+    assert verhoeff_valid("2363")
+    assert not verhoeff_valid("2364")
+
+
+@pytest.mark.parametrize("number, valid", [
+    ("234567890124", True),
+    ("345678901238", True),
+    ("234567890123", False),
+    ("345678901234", False),
+    ("", False),
+    ("23456789012a", False),
+    ("２３６３", False),
+])
+def test_verhoeff_aadhaar_numbers(number, valid):
+    assert verhoeff_valid(number) is valid
+
+
+def test_verhoeff_catches_adjacent_transpositions():
+    number = "234567890124"
+    for i in range(len(number) - 1):
+        swapped = number[:i] + number[i + 1] + number[i] + number[i + 2:]
+        if swapped != number:
+            assert not verhoeff_valid(swapped), swapped
+
+
+def test_gstin_reference_vector():
+    assert gstin_check_char("27AAPFU0939F1Z") == "V"
+    assert gstin_checksum_valid("27AAPFU0939F1ZV")
+    assert not gstin_checksum_valid("27AAPFU0939F1ZW")
+
+
+@pytest.mark.parametrize("gstin", ["", "27AAPFU0939F1Z", "27aapfu0939f1zv", "27AAPFU0939F1Z-"])
+def test_gstin_malformed_values_are_invalid(gstin):
+    assert not gstin_checksum_valid(gstin)
+
+
+def test_batch_checksums_agree_with_scalar():
+    numbers = ["2363", "2364", "2345", "9999", "2000", "5050"]
+    matrix = np.array(numbers, dtype="S4").view(np.uint8).reshape(len(numbers), 4)
+    assert verhoeff_valid_batch(matrix).tolist() == [verhoeff_valid(n) for n in numbers]
+
+    gstins = ["27AAPFU0939F1ZV", "27AAPFU0939F1ZW", "27ABCPD1234E1ZE", "29ABCPD1234E1ZE"]
+    matrix = np.array(gstins, dtype="S15").view(np.uint8).reshape(len(gstins), 15)
+    assert gstin_checksum_valid_batch(matrix).tolist() == [gstin_checksum_valid(g) for g in gstins]
@@ -0,0 +1,44 @@
+import json
+import os
+import re
+
+import pytest
+
+from validators import compile_pattern
+from validators.compiler import UnsupportedPattern, parse_pattern
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(ROOT, "validation_corpus.json"), encoding="utf-8") as f:
+    CORPUS = json.load(f)["fields"]
+
+
+@pytest.mark.parametrize("field", sorted(CORPUS))
+def test_compiled_pattern_agrees_with_re_on_the_corpus(field):
+    pattern = CORPUS[field]["pattern"]
+    # The reference the corpus was built with: ASCII classes, like the form
+    check, regex = compile_pattern(pattern), re.compile(pattern, re.ASCII)
+
+    mismatches = [(value, expected) for value, expected in CORPUS[field]["cases"]
+                  if check(value) != expected or bool(regex.fullmatch(value)) != expected]
+    assert mismatches == []
+
+
+def test_compiled_pattern_is_ascii_only_like_the_form():
+    check = compile_pattern(r"^[0-9]{4}$")
+
+    assert check("2024")
+    # str.isdigit() and re's \d would both accept these
+    assert not check("２０２４")
+    assert not check("2024\n")
+
+
+@pytest.mark.parametrize("pattern", [r"[0-9]+", r"^(a|b)$", r"^[^0-9]$"])
+def test_patterns_outside_the_positional_subset_fall_back_to_re(pattern):
+    with pytest.raises(UnsupportedPattern):
+        parse_pattern(pattern)
+
+    regex = re.compile(pattern)
+    check = compile_pattern(pattern)
+    for value in ["a", "b", "7", "ab", ""]:
+        assert bool(check(value)) == bool(regex.fullmatch(value))
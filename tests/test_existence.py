@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from validators.existence import BloomFilter, hash_pair, read_snapshot, snapshot_path, write_snapshot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEMBERS = [str(234567890000 + i) for i in range(0, 2000, 7)]
+OTHERS = [str(345678900000 + i) for i in range(500)]
+
+# Reads a snapshot with utils/existenceFilter.js and reports what it holds
+READ_WITH_JS = """
+const fs = require('fs');
+const { BloomFilter, hashPair } = require('./utils/existenceFilter');
+const [file, values] = [process.argv[1], JSON.parse(process.argv[2])];
+const { name, watermark, filter } = BloomFilter.deserialize(fs.readFileSync(file));
+console.log(JSON.stringify({
+  name, watermark, m: filter.m, k: filter.k, count: filter.count,
+  hits: values.map((value) => filter.mightContain(value)),
+  hashes: hashPair('234567890123')
+}));
+"""
+
+
+def filled(values, capacity=1000):
+    bloom = BloomFilter.for_capacity(capacity)
+    for value in values:
+        bloom.add(value)
+    return bloom
+
+
+def test_hash_pair_matches_the_api():
+    # hashPair('234567890123') in existenceFilter.test.js
+    assert hash_pair("234567890123") == (4199578415, 2568107065)
+
+
+def test_snapshot_round_trip(tmp_path):
+    bloom = filled(MEMBERS)
+    write_snapshot(str(tmp_path), "aadhaar", bloom, 1700000000000.0)
+
+    watermark, loaded = read_snapshot(str(tmp_path), "aadhaar")
+
+    assert watermark == 1700000000000.0
+    assert (loaded.m, loaded.k, loaded.count) == (bloom.m, bloom.k, len(MEMBERS))
+    assert all(value in loaded for value in MEMBERS)
+
+
+def test_corrupt_or_misnamed_snapshots_are_rejected(tmp_path):
+    path = write_snapshot(str(tmp_path), "pan", filled(MEMBERS), 0.0)
+    os.replace(path, snapshot_path(str(tmp_path), "aadhaar"))
+    with pytest.raises(ValueError, match="holds the pan filter"):
+        read_snapshot(str(tmp_path), "aadhaar")
+
+    data = bytearray(filled(MEMBERS).to_bytes("pan"))
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        BloomFilter.from_bytes(bytes(data))
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_python_snapshot_loads_in_the_api(tmp_path):
+    bloom = filled(MEMBERS)
+    path = write_snapshot(str(tmp_path), "aadhaar", bloom, 1700000000000.0)
+    values = MEMBERS + OTHERS
+
+    output = subprocess.run(["node", "-e", READ_WITH_JS, path, json.dumps(values)],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    loaded = json.loads(output)
+
+    assert (loaded["name"], loaded["watermark"]) == ("aadhaar", 1700000000000.0)
+    assert (loaded["m"], loaded["k"], loaded["count"]) == (bloom.m, bloom.k, bloom.count)
+    assert loaded["hits"] == [value in bloom for value in values]
+    assert not all(loaded["hits"][len(MEMBERS):])
+    assert loaded["hashes"] == list(hash_pair("234567890123"))
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from validators.partitions import MONTHLY_PARTITION, Partition, add_months, partition_name  # noqa: E402
+
+
+@pytest.mark.parametrize("month, months, expected", [
+    (date(2024, 1, 1), 0, date(2024, 1, 1)),
+    (date(2024, 1, 1), 1, date(2024, 2, 1)),
+    (date(2024, 11, 1), 2, date(2025, 1, 1)),
+    (date(2024, 12, 1), 1, date(2025, 1, 1)),
+    (date(2024, 1, 1), -1, date(2023, 12, 1)),
+    (date(2024, 3, 1), -14, date(2023, 1, 1)),
+    (date(2024, 1, 31), 1, date(2024, 2, 1)),
+])
+def test_add_months(month, months, expected):
+    assert add_months(month, months) == expected
+
+
+def test_partition_names_match_create_monthly_partition():
+    # to_char(month, 'YYYY_MM') in database_schema.sql
+    assert partition_name("validation_logs", date(2024, 3, 1)) == "validation_logs_2024_03"
+    assert partition_name("form_submissions", date(2025, 12, 1)) == "form_submissions_2025_12"
+
+    match = MONTHLY_PARTITION.match(partition_name("form_submissions", date(2024, 7, 1)))
+    assert match.groups() == ("form_submissions", "2024", "07")
+    assert MONTHLY_PARTITION.match("form_submissions_default") is None
+    assert MONTHLY_PARTITION.match("registrations_2024_07") is None
+
+
+def test_partition_bounds_come_from_the_catalog_expression():
+    month = Partition("validation_logs_2024_03",
+                      "FOR VALUES FROM ('2024-03-01 00:00:00') TO ('2024-04-01 00:00:00')", -1, 8192, 0)
+    default = Partition("validation_logs_default", "DEFAULT", 10, 8192, 0)
+
+    assert (month.lower, month.upper) == (date(2024, 3, 1), date(2024, 4, 1))
+    assert add_months(month.lower, 1) == month.upper
+    # reltuples is -1 until the table is first analyzed
+    assert month.rows == 0
+    assert (default.lower, default.upper) == (None, None)
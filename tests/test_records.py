@@ -0,0 +1,78 @@
+import pytest
+
+from validators import FieldError, ValidationCache, load_schema, validate_many, validate_record
+
+VALID = {
+    "aadhaar_number": "234567890124",
+    "entrepreneur_name": "Ramesh Kumar",
+    "otp": "123456",
+    "organization_type": "proprietorship",
+    "pan_number": "ABCPE1234F",
+    "gstin": "27ABCPD1234E1ZE",
+    "filed_itr": "yes",
+}
+
+
+def test_valid_record_has_no_errors():
+    assert validate_record(VALID) == []
+
+
+def test_errors_name_the_field_and_the_failed_check():
+    record = dict(VALID, aadhaar_number="234567890123", pan_number="abcpe1234f",
+                  organization_type="sole_trader", entrepreneur_name="")
+
+    errors = validate_record(record)
+
+    assert all(isinstance(error, FieldError) for error in errors)
+    # In schema order
+    assert [(e.field, e.code) for e in errors] == [
+        ("aadhaar_number", "checksum"),
+        ("entrepreneur_name", "required"),
+        ("organization_type", "choice"),
+        ("pan_number", "pattern"),
+    ]
+    assert errors[3].message == load_schema().rules["pan_number"].message
+
+
+def test_optional_fields_may_be_missing():
+    record = dict(VALID)
+    del record["gstin"]
+
+    assert validate_record(record) == []
+
+
+def test_checksums_can_be_skipped():
+    record = dict(VALID, aadhaar_number="234567890123", gstin="27ABCPD1234E1ZV")
+
+    assert [e.code for e in validate_record(record)] == ["checksum", "checksum"]
+    assert validate_record(record, checksums=False) == []
+
+
+def test_fields_and_steps_restrict_the_rules():
+    record = {"aadhaar_number": "123"}
+
+    assert [e.field for e in validate_record(record, fields=["aadhaar_number"])] == ["aadhaar_number"]
+    assert [e.field for e in validate_record(record, steps=["step2"])] == [
+        "organization_type", "pan_number", "filed_itr"]
+    with pytest.raises(KeyError, match="Unknown fields: pan"):
+        validate_record(record, fields=["pan"])
+
+
+def test_validate_many_yields_row_index_and_errors():
+    records = [VALID, dict(VALID, otp="12345"), VALID, {}]
+
+    results = list(validate_many(records, steps=["step1"]))
+    invalid = list(validate_many(records, steps=["step1"], only_invalid=True))
+
+    assert [index for index, _ in results] == [0, 1, 2, 3]
+    assert invalid == [results[1], results[3]]
+    assert results[1][1] == [FieldError("otp", "pattern", results[1][1][0].message)]
+    assert [e.code for e in results[3][1]] == ["required"] * 3
+
+
+def test_cached_results_match_uncached():
+    records = [dict(VALID, pan_number=pan) for pan in ["ABCPE1234F", "ABCPE1234", "ABCPE1234F", "abcpe1234f"] * 3]
+    cache = ValidationCache(maxsize=16)
+
+    assert list(validate_many(records, cache=cache)) == list(validate_many(records))
+    assert cache.hits > 0
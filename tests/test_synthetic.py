@@ -0,0 +1,26 @@
+import random
+
+from validators import load_schema
+from validators.synthetic import _mutate, generate_rows
+
+RULES = load_schema().rules
+
+
+def test_logged_field_values_match_their_validity_flag():
+    checked = 0
+    for table, row in generate_rows(0, 500, seed=3):
+        if table != "validation_logs":
+            continue
+        _, _, field_name, value, is_valid = row[:5]
+        assert (RULES[field_name].validate(value) is None) is is_valid, row
+        checked += 1
+    assert checked > 0
+
+
+def test_mutations_are_always_rejected():
+    rng = random.Random(1)
+    # Digits in PAN positions 6-9 and letters in a name survive a same-class typo
+    for field_name, value in [("pan_number", "ABCPE1234F"), ("entrepreneur_name", "Ramesh Kumar"),
+                              ("aadhaar_number", "234567890124"), ("gstin", "27ABCPD1234E1ZE")]:
+        for _ in range(200):
+            assert RULES[field_name].validate(_mutate(rng, value, RULES[field_name])) is not None
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pytest
+
+from validators import load_schema
+from validators.vectorized import (BAD_CHAR, BAD_CHECKSUM, BAD_LENGTH, FIXED_WIDTH_FIELDS, MISSING,
+                                   NON_ASCII, VALID, validate_column, validate_columns)
+
+SAMPLES = {
+    "aadhaar_number": ["234567890124", "345678901238", "234567890123", "134567890124"],
+    "pan_number": ["ABCPE1234F", "ABCPE12345", "abcpe1234f"],
+    "otp": ["123456", "12345", "12345a"],
+    "gstin": ["27AAPFU0939F1ZV", "27AAPFU0939F1ZW", "27ABCPD1234E1ZE", "27ABCPD1234E0ZE"],
+}
+
+
+def column(field, size=500, seed=7):
+    """Known samples plus random one-character typos, blanks and padding"""
+    rng = random.Random(f"{seed}:{field}")
+    values = list(SAMPLES[field]) + ["", None, " ", "२३४५६७८९०१२४"]
+    while len(values) < size:
+        value = rng.choice(SAMPLES[field])
+        pos = rng.randrange(len(value))
+        value = value[:pos] + rng.choice("0123456789AZaz -") + value[pos + 1:]
+        values.append(rng.choice([value, value + "1", value[1:]]))
+    return values
+
+
+@pytest.mark.parametrize("field", FIXED_WIDTH_FIELDS)
+@pytest.mark.parametrize("checksum", [True, False])
+def test_vectorized_agrees_with_scalar(field, checksum):
+    rule = load_schema().rules[field]
+    values = column(field)
+
+    result = validate_column(values, field, chunk_size=64, checksum=checksum)
+
+    assert result.mask.tolist() == [rule.validate(v, checksum) is None for v in values]
+
+
+@pytest.mark.parametrize("field", ["aadhaar_number", "gstin"])
+def test_bytes_columns_give_the_same_result(field):
+    values = [v for v in column(field) if v is not None and v.isascii()]
+
+    as_text = validate_column(values, field)
+    as_bytes = validate_column(np.array([v.encode() for v in values], dtype="S16"), field)
+
+    assert as_bytes.mask.tolist() == as_text.mask.tolist()
+    assert as_bytes.reason.tolist() == as_text.reason.tolist()
+
+
+def test_reason_codes_and_failing_position():
+    values = ["234567890124", "234567890123", "2345678901", "23456789012a", "", "२३४५६७८९०१२४"]
+
+    result = validate_column(values, "aadhaar_number")
+
+    assert result.reason.tolist() == [VALID, BAD_CHECKSUM, BAD_LENGTH, BAD_CHAR, MISSING, NON_ASCII]
+    assert result.position[3] == 11
+    assert result.counts()["bad_checksum"] == 1
+
+
+def test_optional_column_accepts_blanks():
+    results = validate_columns({"gstin": ["", "27AAPFU0939F1ZV"], "otp": ["", "123456"]})
+
+    assert results["gstin"].mask.tolist() == [True, True]
+    assert results["otp"].mask.tolist() == [False, True]
@@ -0,0 +1,86 @@
+const { UdyamAllocator, formatUdyamNumber } = require('./utils/udyamAllocator');
+
+// udyam_sequences stand-in: the lease upsert applied to an in-memory table, after a delay
+function fakeDb({ delayMs = 0, start = 1 } = {}) {
+  const next = new Map();
+  const query = jest.fn(async ({ name, values: [state, district, size] }) => {
+    if (name !== 'udyam_sequence_lease') throw new Error(`unexpected query ${name}`);
+    if (delayMs) await new Promise((resolve) => setTimeout(resolve, delayMs));
+    const key = `${state}-${district}`;
+    const first = next.has(key) ? next.get(key) : start;
+    next.set(key, first + size);
+    return { rows: [{ first_value: String(first) }] };
+  });
+  return { query, next };
+}
+
+describe('Udyam Allocator Tests', () => {
+  test('should hand out a leased block in order with one query', async () => {
+    const db = fakeDb();
+    const allocator = new UdyamAllocator(db, { blockSize: 10, prefetchRatio: 0 });
+
+    expect(await allocator.allocate('27', '01')).toBe('UDYAM-27-01-0000001');
+    expect(await allocator.allocate('27', '01')).toBe('UDYAM-27-01-0000002');
+    expect(await allocator.allocate('09', '03')).toBe('UDYAM-09-03-0000001');
+    expect(db.query).toHaveBeenCalledTimes(2);
+    expect(db.query.mock.calls[0][0].values).toEqual(['27', '01', 10]);
+  });
+
+  test('should never repeat a number across concurrent processes', async () => {
+    const db = fakeDb({ delayMs: 1 });
+    const workers = Array.from({ length: 4 }, () => new UdyamAllocator(db, { blockSize: 16 }));
+
+    const numbers = await Promise.all(
+      Array.from({ length: 2000 }, (_, i) => workers[i % 4].allocate('27', '01'))
+    );
+    expect(new Set(numbers).size).toBe(2000);
+    // Blocks, not numbers, cost a round trip
+    expect(db.query.mock.calls.length).toBeLessThan(200);
+  });
+
+  test('should share one lease between callers waiting on the same sequence', async () => {
+    const db = fakeDb({ delayMs: 5 });
+    const allocator = new UdyamAllocator(db, { blockSize: 100 });
+
+    await Promise.all(Array.from({ length: 50 }, () => allocator.allocate('27', '01')));
+    expect(db.query).toHaveBeenCalledTimes(1);
+    expect(allocator.stats().waits).toBe(50);
+  });
+
+  test('should grow the block size while blocks run out quickly', async () => {
+    let now = 0;
+    const db = fakeDb();
+    const allocator = new UdyamAllocator(db, { blockSize: 4, maxBlockSize: 16, prefetchRatio: 0, now: () => now });
+
+    for (let i = 0; i < 4 + 8 + 16 + 1; i++) await allocator.allocate('27', '01');
+    expect(db.query.mock.calls.map(([q]) => q.values[2])).toEqual([4, 8, 16, 16]);
+
+    // A block that lasts ten times the target shrinks the next one
+    now = 100000;
+    for (let i = 0; i < 16; i++) await allocator.allocate('27', '01');
+    expect(db.query.mock.calls[4][0].values[2]).toBe(8);
+  });
+
+  test('should skip numbers already taken by another registration', async () => {
+    const allocator = new UdyamAllocator(fakeDb(), { blockSize: 10 });
+    const taken = new Set([formatUdyamNumber('27', '01', 1), formatUdyamNumber('27', '01', 2)]);
+    const store = jest.fn(async (number) => {
+      if (taken.has(number)) {
+        throw Object.assign(new Error('duplicate key'), { code: '23505', constraint: 'registrations_udyam_number_key' });
+      }
+    });
+
+    expect(await allocator.withNumber('27', '01', store)).toBe('UDYAM-27-01-0000003');
+    expect(allocator.stats().collisions).toBe(2);
+
+    const failing = () => Promise.reject(Object.assign(new Error('connection lost'), { code: '08006' }));
+    await expect(allocator.withNumber('27', '01', failing)).rejects.toThrow('connection lost');
+  });
+
+  test('should reject bad codes and an exhausted sequence', async () => {
+    const allocator = new UdyamAllocator(fakeDb({ start: 10000000 }));
+
+    await expect(allocator.allocate('2A', '01')).rejects.toThrow('Invalid state/district code');
+    await expect(allocator.allocate('27', '01')).rejects.toThrow('exhausted');
+  });
+});
@@ -0,0 +1,287 @@
+// Asynchronous audit trail for form_submissions and validation_logs. Routes queue records and
+// return; a background flush writes each table's queue as one multi-row INSERT every
+// flushMs, or sooner once batchSize records are waiting. An audit write never adds a round
+// trip to a request.
+//
+// The queue is bounded. When it is full, or the database is unreachable for long enough to
+// fill it, records are dropped (overflow 'drop') or appended to an NDJSON spill file
+// (overflow 'spill') that is replayed once the queue has drained, including after a restart.
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const { LatencyHistogram } = require('./db');
+
+const DEFAULT_MAX_BUFFER = 10000;
+const DEFAULT_BATCH_SIZE = 500;
+const DEFAULT_FLUSH_MS = 200;
+const OVERFLOW_POLICIES = ['drop', 'spill'];
+// Class 23 (integrity constraint violation): retrying the batch can't succeed
+const INTEGRITY_ERROR = /^23/;
+
+// One statement per table whatever the batch size, so each is prepared once per connection
+const TABLES = {
+  form_submissions: {
+    columns: ['registration_id', 'step_number', 'form_data', 'ip_address', 'user_agent', 'submitted_at'],
+    types: ['integer', 'integer', 'jsonb', 'inet', 'text', 'timestamp']
+  },
+  validation_logs: {
+    columns: ['registration_id', 'validation_type', 'field_name', 'field_value', 'is_valid', 'error_message', 'validated_at'],
+    types: ['integer', 'text', 'text', 'text', 'boolean', 'text', 'timestamp']
+  }
+};
+
+for (const [table, spec] of Object.entries(TABLES)) {
+  const arrays = spec.types.map((type, i) => `$${i + 1}::${type}[]`).join(', ');
+  spec.statement = {
+    name: `audit_insert_${table}`,
+    text: `INSERT INTO ${table} (${spec.columns.join(', ')}) SELECT * FROM unnest(${arrays})`
+  };
+}
+
+class AuditLog {
+  constructor(db, {
+    maxBuffer = DEFAULT_MAX_BUFFER,
+    batchSize = DEFAULT_BATCH_SIZE,
+    flushMs = DEFAULT_FLUSH_MS,
+    overflow = 'drop',
+    spillDir = null,
+    now = () => new Date()
+  } = {}) {
+    if (!OVERFLOW_POLICIES.includes(overflow)) throw new Error(`Unknown AUDIT_OVERFLOW: ${overflow}`);
+    if (overflow === 'spill' && !spillDir) throw new Error('AUDIT_OVERFLOW=spill needs AUDIT_SPILL_DIR');
+    this.db = db;
+    this.maxBuffer = maxBuffer;
+    this.batchSize = batchSize;
+    this.flushMs = flushMs;
+    this.overflow = overflow;
+    this.spillDir = spillDir;
+    this.spillPath = spillDir ? path.join(spillDir, `audit-${process.pid}.ndjson`) : null;
+    this.now = now;
+    this.queues = Object.fromEntries(Object.keys(TABLES).map((table) => [table, []]));
+    this.depth = 0;
+    this.timer = null;
+    this.flushing = null;
+    this.spillLines = [];
+    this.spillWrite = null;
+    this.spillPending = false;
+    this.replaying = false;
+    this.flushLatency = new LatencyHistogram();
+    this.counters = {
+      queued: 0,
+      written: 0,
+      flushes: 0,
+      max_depth: 0,
+      dropped: 0,
+      spilled: 0,
+      replayed: 0,
+      rejected: 0,
+      errors: 0
+    };
+    this.lastError = null;
+  }
+
+  // A form step as submitted; form_data should hold only the step's own fields
+  submission({ registration_id = null, step_number, form_data, ip_address = null, user_agent = null }) {
+    return this.enqueue('form_submissions', [
+      registration_id, step_number, form_data, ip_address, user_agent, this.now()
+    ]);
+  }
+
+  validation({ registration_id = null, validation_type, field_name, field_value = null, is_valid, error_message = null }) {
+    return this.enqueue('validation_logs', [
+      registration_id, validation_type, field_name,
+      field_value === null ? null : String(field_value).slice(0, 255),
+      is_valid, error_message, this.now()
+    ]);
+  }
+
+  // False when the record did not make it into the queue (dropped or spilled)
+  enqueue(table, row) {
+    if (this.depth >= this.maxBuffer) {
+      this.overflowRecord(table, row);
+      return false;
+    }
+    this.queues[table].push(row);
+    this.depth++;
+    this.counters.queued++;
+    if (this.depth > this.counters.max_depth) this.counters.max_depth = this.depth;
+    if (this.timer && this.queues[table].length >= this.batchSize && !this.flushing) {
+      setImmediate(() => this.flush());
+    }
+    return true;
+  }
+
+  overflowRecord(table, row) {
+    if (this.overflow === 'spill') {
+      this.counters.spilled++;
+      this.spillPending = true;
+      this.spillLines.push(JSON.stringify({ table, row }));
+      if (!this.spillWrite) this.spillWrite = this.writeSpill();
+    } else {
+      this.counters.dropped++;
+    }
+  }
+
+  // Appends everything spilled since the last write in one call
+  async writeSpill() {
+    try {
+      await fs.promises.mkdir(this.spillDir, { recursive: true });
+      while (this.spillLines.length) {
+        const lines = this.spillLines;
+        this.spillLines = [];
+        await fs.promises.appendFile(this.spillPath, `${lines.join('\n')}\n`);
+      }
+    } catch (error) {
+      // The spill file is the last resort; what couldn't be written is lost
+      this.counters.dropped += this.spillLines.length;
+      this.spillLines = [];
+      this.lastError = error.message;
+      console.error('Audit spill error:', error.message);
+    } finally {
+      this.spillWrite = null;
+    }
+  }
+
+  // Write up to batchSize queued records per table; one flush at a time
+  flush() {
+    if (!this.flushing) {
+      this.flushing = this.flushAll().finally(() => { this.flushing = null; });
+    }
+    return this.flushing;
+  }
+
+  async flushAll() {
+    for (const table of Object.keys(TABLES)) {
+      const queue = this.queues[table];
+      while (queue.length) {
+        const batch = queue.splice(0, this.batchSize);
+        this.depth -= batch.length;
+        if (!(await this.writeBatch(table, batch))) return;
+      }
+    }
+    // Drained: bring back anything spilled while we were behind
+    if (this.spillPending && !this.replaying) this.replaySpill().catch((error) => console.error('Audit replay error:', error.message));
+  }
+
+  // True when the batch is settled (written or rejected); false to stop and retry later
+  async writeBatch(table, batch) {
+    const spec = TABLES[table];
+    const started = process.hrtime.bigint();
+    try {
+      await this.db.query({ ...spec.statement, values: spec.columns.map((_, i) => batch.map((row) => row[i])) });
+      this.flushLatency.record(Number(process.hrtime.bigint() - started) / 1e6);
+      this.counters.flushes++;
+      this.counters.written += batch.length;
+      return true;
+    } catch (error) {
+      this.counters.errors++;
+      this.lastError = error.message;
+      if (INTEGRITY_ERROR.test(error.code || '') && batch.length > 1) {
+        // One bad row (say, a registration deleted meanwhile) mustn't sink the batch
+        for (const row of batch) await this.writeBatch(table, [row]);
+        return true;
+      }
+      if (INTEGRITY_ERROR.test(error.code || '')) {
+        this.counters.rejected++;
+        return true;
+      }
+      // Database unavailable: put the batch back in front and try on the next tick
+      const room = Math.max(0, this.maxBuffer - this.depth);
+      const kept = batch.slice(0, room);
+      for (const row of batch.slice(room)) this.overflowRecord(table, row);
+      this.queues[table].unshift(...kept);
+      this.depth += kept.length;
+      return false;
+    }
+  }
+
+  // Re-queue spill files from this and earlier processes; each file is claimed by renaming it
+  async replaySpill() {
+    this.replaying = true;
+    this.spillPending = false;
+    try {
+      await this.spillWrite;
+      let names;
+      try {
+        names = await fs.promises.readdir(this.spillDir);
+      } catch (error) {
+        if (error.code === 'ENOENT') return;
+        throw error;
+      }
+      for (const name of names.filter((n) => /^audit-\d+\.ndjson$/.test(n))) {
+        const claimed = path.join(this.spillDir, `${name}.replay-${process.pid}`);
+        try {
+          await fs.promises.rename(path.join(this.spillDir, name), claimed);
+        } catch (error) {
+          if (error.code === 'ENOENT') continue;
+          throw error;
+        }
+        const lines = readline.createInterface({ input: fs.createReadStream(claimed), crlfDelay: Infinity });
+        for await (const line of lines) {
+          if (!line) continue;
+          const { table, row } = JSON.parse(line);
+          const stamp = row.length - 1;
+          row[stamp] = new Date(row[stamp]);
+          // Keep the queue from refilling past the point where it would spill again
+          if (this.depth >= this.maxBuffer - this.batchSize) await this.flush();
+          if (this.enqueue(table, row)) this.counters.replayed++;
+        }
+        await fs.promises.unlink(claimed);
+      }
+    } finally {
+      this.replaying = false;
+    }
+  }
+
+  start() {
+    if (this.timer) return this;
+    this.timer = setInterval(() => this.flush(), this.flushMs);
+    this.timer.unref();
+    // Files left by an earlier run are replayed after the first flush
+    this.spillPending = Boolean(this.spillDir);
+    return this;
+  }
+
+  // Final flush on shutdown; what can't be written is spilled (or dropped)
+  async stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+    await this.flush();
+    for (const [table, queue] of Object.entries(this.queues)) {
+      for (const row of queue.splice(0)) this.overflowRecord(table, row);
+    }
+    this.depth = 0;
+    await this.spillWrite;
+  }
+
+  stats() {
+    return {
+      overflow: this.overflow,
+      capacity: this.maxBuffer,
+      depth: this.depth,
+      depth_by_table: Object.fromEntries(Object.entries(this.queues).map(([table, queue]) => [table, queue.length])),
+      ...this.counters,
+      flush_latency: this.flushLatency.summary(),
+      last_error: this.lastError
+    };
+  }
+}
+
+// AUDIT_* settings; AUDIT_OVERFLOW=spill writes overflow to AUDIT_SPILL_DIR
+function createAuditLog(db, { env = process.env } = {}) {
+  const number = (name, fallback) => (env[name] ? parseInt(env[name], 10) : fallback);
+  const overflow = env.AUDIT_OVERFLOW || 'drop';
+  return new AuditLog(db, {
+    maxBuffer: number('AUDIT_BUFFER_MAX', DEFAULT_MAX_BUFFER),
+    batchSize: number('AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+    flushMs: number('AUDIT_FLUSH_MS', DEFAULT_FLUSH_MS),
+    overflow,
+    spillDir: env.AUDIT_SPILL_DIR || (overflow === 'spill' ? 'logs/audit-spill' : null)
+  });
+}
+
+module.exports = {
+  AuditLog,
+  createAuditLog,
+};
@@ -0,0 +1,303 @@
+// Cluster supervision for the API. The primary (cluster.js) forks one server.js per worker;
+// workers share the listening port, report health to the primary on a heartbeat and get the
+// whole cluster's health back for /health. A rolling reload replaces workers one at a time,
+// starting each replacement and waiting for it to listen before draining the old one.
+
+const cluster = require('cluster');
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+const HEALTH_MESSAGE = 'cluster-health';
+const HEARTBEAT_MESSAGE = 'cluster-heartbeat';
+const SHUTDOWN_MESSAGE = 'cluster-shutdown';
+
+const DEFAULT_HEARTBEAT_MS = 5000;
+const DEFAULT_SHUTDOWN_TIMEOUT_MS = 30 * 1000;
+const DEFAULT_START_TIMEOUT_MS = 30 * 1000;
+const MAX_RESTART_DELAY_MS = 30 * 1000;
+
+// Worker side
+
+let clusterSnapshot = null;
+
+// Stops accepting connections; resolves once in-flight requests have finished
+function closeServer(server) {
+  return new Promise((resolve) => {
+    server.close(resolve);
+    if (server.closeIdleConnections) server.closeIdleConnections();
+  });
+}
+
+// Counts requests, reports to the primary and drains on shutdown.
+// onShutdown runs after the server stopped accepting and in-flight requests finished.
+function attachWorker(server, {
+  heartbeatMs = DEFAULT_HEARTBEAT_MS,
+  shutdownTimeoutMs = DEFAULT_SHUTDOWN_TIMEOUT_MS,
+  onShutdown = async () => {},
+  stats = () => ({})
+} = {}) {
+  if (!cluster.isWorker) return null;
+
+  const counters = { requests: 0, in_flight: 0 };
+  let draining = false;
+  server.on('request', (req, res) => {
+    counters.requests++;
+    counters.in_flight++;
+    // Keep-alive connections would otherwise hold the drain open
+    if (draining) res.setHeader('Connection', 'close');
+    res.once('close', () => { counters.in_flight--; });
+  });
+
+  const loopResolutionMs = 10;
+  const loopDelay = monitorEventLoopDelay({ resolution: loopResolutionMs });
+  loopDelay.enable();
+
+  const report = () => {
+    if (!process.connected) return;
+    const memory = process.memoryUsage();
+    process.send({
+      type: HEARTBEAT_MESSAGE,
+      health: {
+        pid: process.pid,
+        status: draining ? 'draining' : 'ok',
+        uptime_s: Math.round(process.uptime()),
+        rss_mb: Math.round(memory.rss / 1048576),
+        heap_used_mb: Math.round(memory.heapUsed / 1048576),
+        // The histogram counts the sampling interval itself as delay
+        event_loop_p99_ms: Math.round(Math.max(0, loopDelay.percentile(99) / 1e6 - loopResolutionMs) * 100) / 100,
+        ...counters,
+        ...stats()
+      }
+    });
+    loopDelay.reset();
+  };
+  server.once('listening', report);
+  const heartbeat = setInterval(report, heartbeatMs);
+  heartbeat.unref();
+
+  const shutdown = async () => {
+    if (draining) return;
+    draining = true;
+    report();
+    const forced = setTimeout(() => process.exit(1), shutdownTimeoutMs);
+    forced.unref();
+    await closeServer(server);
+    clearInterval(heartbeat);
+    try {
+      await onShutdown();
+    } catch (error) {
+      console.error('Worker shutdown error:', error.message);
+    }
+    process.exit(0);
+  };
+
+  process.on('message', (message) => {
+    if (!message) return;
+    if (message.type === HEALTH_MESSAGE) clusterSnapshot = { workers: message.workers, restarts: message.restarts };
+    if (message.type === SHUTDOWN_MESSAGE) shutdown();
+  });
+  // Ctrl-C reaches the workers too; drain instead of dying mid-request
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+  return { shutdown, counters };
+}
+
+// The same drain for a server started on its own (node server.js): on SIGTERM or SIGINT,
+// close the server, then run onShutdown. Returns null under cluster.js, where attachWorker
+// handles the signals.
+function attachStandalone(server, {
+  shutdownTimeoutMs = DEFAULT_SHUTDOWN_TIMEOUT_MS,
+  onShutdown = async () => {},
+  exit = (code) => process.exit(code)
+} = {}) {
+  if (cluster.isWorker) return null;
+
+  let draining = false;
+  server.on('request', (req, res) => {
+    if (draining) res.setHeader('Connection', 'close');
+  });
+
+  const shutdown = async () => {
+    if (draining) return;
+    draining = true;
+    const forced = setTimeout(() => exit(1), shutdownTimeoutMs);
+    forced.unref();
+    await closeServer(server);
+    try {
+      await onShutdown();
+    } catch (error) {
+      console.error('Shutdown error:', error.message);
+    }
+    clearTimeout(forced);
+    exit(0);
+  };
+
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+  return { shutdown };
+}
+
+// Health of every worker as last broadcast by the primary; null outside a cluster
+function clusterHealth() {
+  if (!cluster.isWorker) return null;
+  return { worker_id: cluster.worker.id, pid: process.pid, workers: [], restarts: 0, ...clusterSnapshot };
+}
+
+// Primary side
+
+class Supervisor {
+  constructor({
+    workers,
+    exec,
+    heartbeatMs = DEFAULT_HEARTBEAT_MS,
+    shutdownTimeoutMs = DEFAULT_SHUTDOWN_TIMEOUT_MS,
+    startTimeoutMs = DEFAULT_START_TIMEOUT_MS,
+    clusterModule = cluster,
+    log = console.log
+  }) {
+    this.size = workers;
+    this.exec = exec;
+    this.heartbeatMs = heartbeatMs;
+    this.shutdownTimeoutMs = shutdownTimeoutMs;
+    this.startTimeoutMs = startTimeoutMs;
+    this.cluster = clusterModule;
+    this.log = log;
+    this.health = new Map();
+    this.retiring = new Set();
+    this.restarts = 0;
+    this.crashStreak = 0;
+    this.reloading = false;
+    this.stopping = false;
+  }
+
+  start() {
+    this.cluster.setupPrimary({ exec: this.exec });
+    this.cluster.on('message', (worker, message) => {
+      if (message && message.type === HEARTBEAT_MESSAGE) {
+        this.health.set(worker.id, { ...message.health, worker_id: worker.id, seen_at: Date.now() });
+      }
+    });
+    this.cluster.on('exit', (worker, code, signal) => this.onExit(worker, code, signal));
+    this.broadcastTimer = setInterval(() => this.broadcast(), this.heartbeatMs);
+    for (let i = 0; i < this.size; i++) this.fork();
+    return this;
+  }
+
+  fork() {
+    const worker = this.cluster.fork();
+    worker.startedAt = Date.now();
+    return worker;
+  }
+
+  // Workers that stopped reporting for three heartbeats show as unresponsive
+  snapshot() {
+    const staleAfter = this.heartbeatMs * 3;
+    const now = Date.now();
+    return Object.values(this.cluster.workers).map((worker) => {
+      const health = this.health.get(worker.id);
+      if (!health) return { worker_id: worker.id, pid: worker.process.pid, status: 'starting' };
+      const status = now - health.seen_at > staleAfter ? 'unresponsive' : health.status;
+      return { ...health, status, seen_at: new Date(health.seen_at).toISOString() };
+    });
+  }
+
+  broadcast() {
+    const workers = this.snapshot();
+    for (const worker of Object.values(this.cluster.workers)) {
+      if (worker.isConnected()) worker.send({ type: HEALTH_MESSAGE, workers, restarts: this.restarts });
+    }
+  }
+
+  onExit(worker, code, signal) {
+    this.health.delete(worker.id);
+    if (this.retiring.delete(worker.id) || this.stopping) return;
+
+    // Unexpected exit: replace it, backing off if workers keep dying right after start
+    const lived = Date.now() - (worker.startedAt || 0);
+    this.crashStreak = lived < 5000 ? this.crashStreak + 1 : 0;
+    const delay = this.crashStreak ? Math.min(MAX_RESTART_DELAY_MS, 500 * 2 ** (this.crashStreak - 1)) : 0;
+    this.restarts++;
+    this.log(`⚠️  Worker ${worker.process.pid} exited (${signal || code}); restarting in ${delay} ms`);
+    setTimeout(() => {
+      if (!this.stopping) this.fork();
+    }, delay);
+  }
+
+  // Resolves once the worker listens; rejects if it exits or takes too long
+  waitForListening(worker) {
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        cleanup();
+        reject(new Error(`worker ${worker.process.pid} did not start listening`));
+      }, this.startTimeoutMs);
+      const onListening = () => { cleanup(); resolve(); };
+      const onExit = () => { cleanup(); reject(new Error(`worker ${worker.process.pid} exited during start`)); };
+      const cleanup = () => {
+        clearTimeout(timer);
+        worker.off('listening', onListening);
+        worker.off('exit', onExit);
+      };
+      worker.on('listening', onListening);
+      worker.on('exit', onExit);
+    });
+  }
+
+  // Ask a worker to drain and exit; kill it if it hasn't within the shutdown timeout
+  retire(worker) {
+    this.retiring.add(worker.id);
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => worker.process.kill('SIGKILL'), this.shutdownTimeoutMs + 1000);
+      worker.once('exit', () => {
+        clearTimeout(timer);
+        resolve();
+      });
+      if (worker.isConnected()) {
+        worker.send({ type: SHUTDOWN_MESSAGE });
+      } else {
+        worker.process.kill('SIGTERM');
+      }
+    });
+  }
+
+  // Replace every worker one at a time. Each replacement is listening before the worker it
+  // replaces starts draining, so serving capacity never drops below the configured size.
+  async reload() {
+    if (this.reloading || this.stopping) return false;
+    this.reloading = true;
+    const old = Object.values(this.cluster.workers).filter((worker) => !this.retiring.has(worker.id));
+    this.log(`🔁 Rolling reload of ${old.length} workers`);
+    try {
+      for (const worker of old) {
+        const replacement = this.fork();
+        // Until it listens, an exit means the new code is broken, not a crash to restart
+        this.retiring.add(replacement.id);
+        try {
+          await this.waitForListening(replacement);
+          this.retiring.delete(replacement.id);
+        } catch (error) {
+          // Keep the old workers serving and stop here
+          this.log(`❌ Reload aborted: ${error.message}`);
+          if (this.cluster.workers[replacement.id]) replacement.process.kill('SIGKILL');
+          return false;
+        }
+        await this.retire(worker);
+      }
+      this.log('✅ Reload complete');
+      return true;
+    } finally {
+      this.reloading = false;
+    }
+  }
+
+  async stop() {
+    this.stopping = true;
+    clearInterval(this.broadcastTimer);
+    await Promise.all(Object.values(this.cluster.workers).map((worker) => this.retire(worker)));
+  }
+}
+
+module.exports = {
+  Supervisor,
+  attachStandalone,
+  attachWorker,
+  clusterHealth,
+};
@@ -0,0 +1,184 @@
+// Data access for the API. The hot queries are named prepared statements: PostgreSQL parses
+// and plans each one once per connection and later executions only bind parameters.
+// Every query checks a client out of the pool explicitly, so the time spent waiting for a
+// connection and the time spent in the statement are measured separately.
+//
+// Pool sizing and timeouts come from DB_POOL_* variables; Database.stats() feeds /health.
+
+const SUB_BUCKETS = 8;
+
+// Statements used by the routes in server.js, by name. The OTP store and dispatch queue
+// name their own statements the same way (utils/otpStore.js, utils/otpQueue.js).
+const STATEMENTS = {
+  registration_active_by_aadhaar: 'SELECT id FROM registrations WHERE aadhaar_number = $1 AND status != \'draft\'',
+  registration_completed_by_pan: 'SELECT id, status FROM registrations WHERE pan_number = $1 AND status = \'completed\'',
+  registration_update_pan: 'UPDATE registrations SET organization_type = $1, pan_number = $2, gstin = $3, filed_itr = $4, step_completed = GREATEST(step_completed, 2), updated_at = CURRENT_TIMESTAMP WHERE id = $5 RETURNING aadhaar_number',
+  registration_by_id: 'SELECT * FROM registrations WHERE id = $1',
+  // No row when another request completed the registration first
+  registration_complete: 'UPDATE registrations SET status = $1, udyam_number = $2, completed_at = CURRENT_TIMESTAMP WHERE id = $3 AND status <> \'completed\' RETURNING udyam_number',
+  registration_status_by_aadhaar: 'SELECT status, step_completed, udyam_number, created_at, completed_at FROM registrations WHERE aadhaar_number = $1'
+};
+
+const envInt = (env, name, fallback) => (env[name] ? parseInt(env[name], 10) : fallback);
+
+// pg.Pool options from the environment; unset values keep the pg defaults
+function poolConfig(env = process.env) {
+  const config = {
+    host: env.DB_HOST || 'localhost',
+    port: env.DB_PORT || 5432,
+    database: env.DB_NAME || 'udyam_db',
+    user: env.DB_USER || 'postgres',
+    password: env.DB_PASSWORD || 'password',
+    ssl: env.NODE_ENV === 'production' ? { rejectUnauthorized: false } : false,
+    application_name: env.DB_APPLICATION_NAME || 'udyam-api',
+    max: envInt(env, 'DB_POOL_MAX', 10),
+    idleTimeoutMillis: envInt(env, 'DB_POOL_IDLE_TIMEOUT_MS', 10000),
+    connectionTimeoutMillis: envInt(env, 'DB_POOL_CONNECTION_TIMEOUT_MS', 0)
+  };
+  if (env.DB_POOL_MAX_USES) config.maxUses = parseInt(env.DB_POOL_MAX_USES, 10);
+  if (env.DB_STATEMENT_TIMEOUT_MS) config.statement_timeout = parseInt(env.DB_STATEMENT_TIMEOUT_MS, 10);
+  if (env.DB_QUERY_TIMEOUT_MS) config.query_timeout = parseInt(env.DB_QUERY_TIMEOUT_MS, 10);
+  return config;
+}
+
+// Log-linear latency histogram (8 buckets per power of two, about 9% resolution) in
+// microseconds, so percentiles stay cheap with millions of samples
+class LatencyHistogram {
+  constructor() {
+    this.counts = new Map();
+    this.count = 0;
+    this.sum = 0;
+    this.max = 0;
+  }
+
+  record(ms) {
+    const us = Math.max(1, Math.round(ms * 1000));
+    const index = Math.floor(Math.log2(us) * SUB_BUCKETS);
+    this.counts.set(index, (this.counts.get(index) || 0) + 1);
+    this.count++;
+    this.sum += ms;
+    if (ms > this.max) this.max = ms;
+  }
+
+  // Upper bound of the bucket holding the q-th percentile, in milliseconds
+  percentile(q) {
+    if (!this.count) return 0;
+    const rank = Math.ceil((q / 100) * this.count);
+    let seen = 0;
+    for (const index of [...this.counts.keys()].sort((a, b) => a - b)) {
+      seen += this.counts.get(index);
+      if (seen >= rank) {
+        return Math.min(this.max, 2 ** ((index + 1) / SUB_BUCKETS) / 1000);
+      }
+    }
+    return this.max;
+  }
+
+  summary() {
+    const round = (ms) => Math.round(ms * 1000) / 1000;
+    return {
+      count: this.count,
+      mean_ms: round(this.count ? this.sum / this.count : 0),
+      p50_ms: round(this.percentile(50)),
+      p99_ms: round(this.percentile(99)),
+      max_ms: round(this.max)
+    };
+  }
+}
+
+// Wraps a pg.Pool. query() has pool.query's signature, so the OTP store and queue can take a
+// Database wherever they take a pool; execute() runs a statement from STATEMENTS by name.
+class Database {
+  constructor(pool, { statements = STATEMENTS, now = () => Number(process.hrtime.bigint()) / 1e6 } = {}) {
+    this.pool = pool;
+    this.statements = statements;
+    this.now = now;
+    this.checkout = new LatencyHistogram();
+    this.timings = new Map();
+    this.counters = { checkout_errors: 0, max_waiting: 0 };
+  }
+
+  execute(name, values = []) {
+    const text = this.statements[name];
+    if (!text) throw new Error(`Unknown statement: ${name}`);
+    return this.query({ name, text, values });
+  }
+
+  // Text or a pg query config; unnamed queries are timed under "unnamed"
+  async query(textOrConfig, values) {
+    const config = typeof textOrConfig === 'string' ? { text: textOrConfig, values } : textOrConfig;
+    const label = config.name || 'unnamed';
+
+    const requested = this.now();
+    let client;
+    try {
+      const pending = this.pool.connect();
+      // connect() queues the request synchronously when no client is free
+      this.counters.max_waiting = Math.max(this.counters.max_waiting, this.pool.waitingCount || 0);
+      client = await pending;
+    } catch (error) {
+      this.counters.checkout_errors++;
+      throw error;
+    }
+    const started = this.now();
+    this.checkout.record(started - requested);
+
+    const timing = this.statementTiming(label);
+    let broken;
+    try {
+      return await client.query(config);
+    } catch (error) {
+      timing.errors++;
+      // Errors from the server carry a SQLSTATE code; anything else (a dropped connection,
+      // query_timeout) leaves the client unusable, so it is discarded instead of returned
+      if (!error.code) broken = error;
+      throw error;
+    } finally {
+      timing.histogram.record(this.now() - started);
+      client.release(broken);
+    }
+  }
+
+  statementTiming(label) {
+    let timing = this.timings.get(label);
+    if (!timing) {
+      timing = { histogram: new LatencyHistogram(), errors: 0 };
+      this.timings.set(label, timing);
+    }
+    return timing;
+  }
+
+  stats() {
+    const statements = {};
+    for (const [label, timing] of this.timings) {
+      statements[label] = { ...timing.histogram.summary(), errors: timing.errors };
+    }
+    return {
+      pool: {
+        max: this.pool.options ? this.pool.options.max : undefined,
+        total: this.pool.totalCount || 0,
+        idle: this.pool.idleCount || 0,
+        waiting: this.pool.waitingCount || 0,
+        max_waiting: this.counters.max_waiting
+      },
+      checkout: { ...this.checkout.summary(), errors: this.counters.checkout_errors },
+      statements
+    };
+  }
+
+  // A client held outside query(), for session state such as LISTEN; the caller releases it
+  connect() {
+    return this.pool.connect();
+  }
+
+  end() {
+    return this.pool.end();
+  }
+}
+
+module.exports = {
+  STATEMENTS,
+  poolConfig,
+  LatencyHistogram,
+  Database,
+};
@@ -0,0 +1,482 @@
+// In-memory existence filters for the duplicate checks in generate-otp (registered Aadhaar)
+// and validate-pan (completed PAN). Most of those lookups find nothing; a Bloom filter answers
+// "definitely not registered" without the database, and any possible hit is still confirmed
+// in SQL, so a false positive costs one query and never a wrong answer.
+//
+// Filters are built with one keyset scan of registrations at startup (or loaded from a
+// snapshot and caught up), then kept current by adding rows as this process completes them
+// and by a periodic delta scan on updated_at for rows completed elsewhere. With a snapshot
+// directory, only one process scans; the others load the snapshot it writes.
+//
+// A filter miss is not the last word on uniqueness: a row that commits later than the delta
+// scan's overlap is never added, so the database still refuses a second completed PAN
+// (idx_registrations_completed_pan in database_schema.sql).
+//
+// Hashing and the snapshot format are shared with validators/existence.py, which builds and
+// verifies the same files offline from a database dump.
+
+const cluster = require('cluster');
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const MAGIC = 'UDBF';
+const FORMAT_VERSION = 1;
+const HEADER_BYTES = 62;
+const MAX_HASHES = 16;
+
+const DEFAULT_FPR = 0.01;
+const DEFAULT_MIN_CAPACITY = 100000;
+const DEFAULT_SYNC_MS = 1000;
+const DEFAULT_SNAPSHOT_MS = 5 * 60 * 1000;
+// Delta scans reach back this far so a transaction that committed late is not missed
+const DEFAULT_OVERLAP_MS = 5000;
+const DEFAULT_BATCH_ROWS = 50000;
+// How long a process waits for another's build before scanning itself
+const DEFAULT_BUILD_WAIT_MS = 5 * 60 * 1000;
+const BUILD_POLL_MS = 500;
+const BUILD_LOCK = 'build.lock';
+
+let saveSequence = 0;
+
+const FNV_OFFSET = 0x811c9dc5;
+const FNV_PRIME = 0x01000193;
+const SECOND_SEED = 0x050c5d1f;
+
+// Murmur3 finalizer; spreads FNV output so the two hashes are independent enough
+function fmix32(h) {
+  h ^= h >>> 16;
+  h = Math.imul(h, 0x85ebca6b);
+  h ^= h >>> 13;
+  h = Math.imul(h, 0xc2b2ae35);
+  h ^= h >>> 16;
+  return h >>> 0;
+}
+
+function fnv1a(bytes, seed) {
+  let h = seed;
+  for (let i = 0; i < bytes.length; i++) {
+    h ^= bytes[i];
+    h = Math.imul(h, FNV_PRIME);
+  }
+  return h >>> 0;
+}
+
+// Two base hashes; probe i is (h1 + i * h2) mod m (Kirsch-Mitzenmacher double hashing)
+function hashPair(value) {
+  const bytes = Buffer.from(String(value), 'utf8');
+  return [fmix32(fnv1a(bytes, FNV_OFFSET)), (fmix32(fnv1a(bytes, SECOND_SEED)) | 1) >>> 0];
+}
+
+class BloomFilter {
+  constructor({ bits, hashes, capacity, count = 0, buffer = null }) {
+    this.m = bits;
+    this.k = hashes;
+    this.capacity = capacity;
+    this.count = count;
+    this.bits = buffer || new Uint8Array(Math.ceil(bits / 8));
+  }
+
+  // Sized for `capacity` members at false-positive rate `fpr`
+  static forCapacity(capacity, fpr = DEFAULT_FPR) {
+    const n = Math.max(1, capacity);
+    const m = Math.ceil((-n * Math.log(fpr)) / (Math.LN2 * Math.LN2) / 8) * 8;
+    const k = Math.min(MAX_HASHES, Math.max(1, Math.round((m / n) * Math.LN2)));
+    return new BloomFilter({ bits: m, hashes: k, capacity: n });
+  }
+
+  add(value) {
+    const [h1, h2] = hashPair(value);
+    let added = false;
+    for (let i = 0; i < this.k; i++) {
+      const bit = (h1 + i * h2) % this.m;
+      const mask = 1 << (bit & 7);
+      if (!(this.bits[bit >>> 3] & mask)) {
+        this.bits[bit >>> 3] |= mask;
+        added = true;
+      }
+    }
+    // Only count values that set a new bit, so re-adding a member leaves count alone
+    if (added) this.count++;
+    return added;
+  }
+
+  mightContain(value) {
+    const [h1, h2] = hashPair(value);
+    for (let i = 0; i < this.k; i++) {
+      const bit = (h1 + i * h2) % this.m;
+      if (!(this.bits[bit >>> 3] & (1 << (bit & 7)))) return false;
+    }
+    return true;
+  }
+
+  fillRatio() {
+    let set = 0;
+    for (let i = 0; i < this.bits.length; i++) {
+      let byte = this.bits[i];
+      while (byte) {
+        byte &= byte - 1;
+        set++;
+      }
+    }
+    return set / this.m;
+  }
+
+  // False-positive rate implied by the bits actually set
+  estimatedFpr() {
+    return this.fillRatio() ** this.k;
+  }
+
+  stats() {
+    const round = (x) => Math.round(x * 1e6) / 1e6;
+    return {
+      count: this.count,
+      capacity: this.capacity,
+      bits: this.m,
+      hashes: this.k,
+      fill_ratio: round(this.fillRatio()),
+      estimated_fpr: round(this.estimatedFpr())
+    };
+  }
+
+  // Little-endian: magic, u16 version, u16 k, u32 m, u32 count, u32 capacity,
+  // f64 watermark (epoch ms), sha256 of the bits, u16 name length, name, bits
+  serialize(name, watermark = 0) {
+    const nameBytes = Buffer.from(name, 'utf8');
+    const header = Buffer.alloc(HEADER_BYTES + nameBytes.length);
+    header.write(MAGIC, 0, 'ascii');
+    header.writeUInt16LE(FORMAT_VERSION, 4);
+    header.writeUInt16LE(this.k, 6);
+    header.writeUInt32LE(this.m, 8);
+    header.writeUInt32LE(this.count, 12);
+    header.writeUInt32LE(this.capacity, 16);
+    header.writeDoubleLE(watermark, 20);
+    crypto.createHash('sha256').update(this.bits).digest().copy(header, 28);
+    header.writeUInt16LE(nameBytes.length, 60);
+    nameBytes.copy(header, HEADER_BYTES);
+    return Buffer.concat([header, Buffer.from(this.bits.buffer, this.bits.byteOffset, this.bits.length)]);
+  }
+
+  // Returns { name, watermark, filter }; throws on a corrupt or foreign file
+  static deserialize(buffer) {
+    if (buffer.length < HEADER_BYTES || buffer.toString('ascii', 0, 4) !== MAGIC) {
+      throw new Error('Not an existence filter snapshot');
+    }
+    const version = buffer.readUInt16LE(4);
+    if (version !== FORMAT_VERSION) throw new Error(`Unsupported snapshot version ${version}`);
+    const k = buffer.readUInt16LE(6);
+    const m = buffer.readUInt32LE(8);
+    const nameLength = buffer.readUInt16LE(60);
+    const name = buffer.toString('utf8', HEADER_BYTES, HEADER_BYTES + nameLength);
+    const bits = new Uint8Array(buffer.subarray(HEADER_BYTES + nameLength));
+    if (bits.length !== Math.ceil(m / 8)) throw new Error('Snapshot is truncated');
+    const digest = crypto.createHash('sha256').update(bits).digest();
+    if (!digest.equals(buffer.subarray(28, 60))) throw new Error('Snapshot checksum mismatch');
+    const filter = new BloomFilter({
+      bits: m,
+      hashes: k,
+      count: buffer.readUInt32LE(12),
+      capacity: buffer.readUInt32LE(16),
+      buffer: bits
+    });
+    return { name, watermark: buffer.readDoubleLE(20), filter };
+  }
+}
+
+// Rows enter the filters by status, matching registration_active_by_aadhaar and
+// registration_completed_by_pan
+const isRegisteredAadhaar = (row) => Boolean(row.aadhaar_number) && row.status !== 'draft';
+const isCompletedPan = (row) => Boolean(row.pan_number) && row.status === 'completed';
+
+// Timestamps are compared as the naive local time registrations stores; LOCALTIMESTAMP and
+// AT TIME ZONE 'UTC' keep the round trip through epoch milliseconds lossless.
+const SCAN_BOUNDS = {
+  name: 'existence_scan_bounds',
+  text: `SELECT count(*) FILTER (WHERE status != 'draft') AS aadhaar,
+    count(*) FILTER (WHERE status = 'completed' AND pan_number IS NOT NULL) AS pan,
+    EXTRACT(EPOCH FROM LOCALTIMESTAMP) * 1000 AS started_ms
+    FROM registrations`
+};
+const SCAN_BATCH = {
+  name: 'existence_scan_batch',
+  text: `SELECT id, aadhaar_number, pan_number, status FROM registrations
+    WHERE id > $1 AND status != 'draft' ORDER BY id LIMIT $2`
+};
+const SCAN_CHANGED = {
+  name: 'existence_scan_changed',
+  text: `SELECT id, aadhaar_number, pan_number, status, EXTRACT(EPOCH FROM updated_at) * 1000 AS updated_ms
+    FROM registrations
+    WHERE updated_at > to_timestamp($1 / 1000.0) AT TIME ZONE 'UTC' AND status != 'draft' AND id > $2
+    ORDER BY id LIMIT $3`
+};
+
+class ExistenceFilters {
+  constructor(db, {
+    fpr = DEFAULT_FPR,
+    minCapacity = DEFAULT_MIN_CAPACITY,
+    syncMs = DEFAULT_SYNC_MS,
+    snapshotMs = DEFAULT_SNAPSHOT_MS,
+    snapshotDir = null,
+    overlapMs = DEFAULT_OVERLAP_MS,
+    batchRows = DEFAULT_BATCH_ROWS,
+    buildWaitMs = DEFAULT_BUILD_WAIT_MS,
+    log = console.log
+  } = {}) {
+    this.db = db;
+    this.fpr = fpr;
+    this.minCapacity = minCapacity;
+    this.syncMs = syncMs;
+    this.snapshotMs = snapshotMs;
+    this.snapshotDir = snapshotDir;
+    this.overlapMs = overlapMs;
+    this.batchRows = batchRows;
+    this.buildWaitMs = buildWaitMs;
+    this.log = log;
+    this.aadhaar = null;
+    this.pan = null;
+    this.watermark = 0;
+    this.source = null;
+    this.syncing = false;
+    this.rebuilding = null;
+    this.timers = [];
+    this.counters = {
+      skipped: 0,
+      confirmed: 0,
+      false_positives: 0,
+      unchecked: 0,
+      syncs: 0,
+      sync_errors: 0,
+      rebuilds: 0
+    };
+  }
+
+  // Until a filter is loaded every lookup goes to the database
+  get ready() {
+    return Boolean(this.aadhaar && this.pan);
+  }
+
+  // Run the check, skipping confirm() when the filter rules the value out.
+  // confirm() resolves true when the database has a matching row.
+  async exists(kind, value, confirm) {
+    const filter = kind === 'aadhaar' ? this.aadhaar : this.pan;
+    if (!filter) {
+      this.counters.unchecked++;
+      return confirm();
+    }
+    if (!filter.mightContain(value)) {
+      this.counters.skipped++;
+      return false;
+    }
+    this.counters.confirmed++;
+    const found = await confirm();
+    if (!found) this.counters.false_positives++;
+    return found;
+  }
+
+  // Call after a registration changed status in this process
+  add(row) {
+    if (this.aadhaar && isRegisteredAadhaar(row)) this.aadhaar.add(row.aadhaar_number);
+    if (this.pan && isCompletedPan(row)) this.pan.add(row.pan_number);
+  }
+
+  // Full keyset scan into fresh filters, swapped in when complete
+  async build() {
+    const started = Date.now();
+    const bounds = (await this.db.query(SCAN_BOUNDS)).rows[0];
+    const sized = (count) => BloomFilter.forCapacity(Math.max(this.minCapacity, Number(count) * 2), this.fpr);
+    const aadhaar = sized(bounds.aadhaar);
+    const pan = sized(bounds.pan);
+
+    let lastId = 0;
+    for (;;) {
+      const { rows } = await this.db.query({ ...SCAN_BATCH, values: [lastId, this.batchRows] });
+      for (const row of rows) {
+        if (isRegisteredAadhaar(row)) aadhaar.add(row.aadhaar_number);
+        if (isCompletedPan(row)) pan.add(row.pan_number);
+      }
+      if (rows.length < this.batchRows) break;
+      lastId = rows[rows.length - 1].id;
+    }
+
+    this.aadhaar = aadhaar;
+    this.pan = pan;
+    this.watermark = Number(bounds.started_ms);
+    this.source = 'scan';
+    this.counters.rebuilds++;
+    this.log(`🔎 Existence filters built from ${aadhaar.count} Aadhaar and ${pan.count} PAN numbers in ${Date.now() - started} ms`);
+    // Rows completed while the scan ran are picked up by the delta scan
+    await this.sync();
+  }
+
+  // Add rows that reached a registered status since the watermark, in any process
+  async sync() {
+    if (!this.ready || this.syncing) return;
+    this.syncing = true;
+    const since = this.watermark - this.overlapMs;
+    let lastId = 0;
+    let newest = this.watermark;
+    try {
+      for (;;) {
+        const { rows } = await this.db.query({ ...SCAN_CHANGED, values: [since, lastId, this.batchRows] });
+        for (const row of rows) {
+          this.add(row);
+          newest = Math.max(newest, Number(row.updated_ms));
+        }
+        if (rows.length < this.batchRows) break;
+        lastId = rows[rows.length - 1].id;
+      }
+      this.watermark = newest;
+      this.counters.syncs++;
+    } catch (error) {
+      this.counters.sync_errors++;
+      console.error('Existence filter sync error:', error.message);
+    } finally {
+      this.syncing = false;
+    }
+    // Past capacity the false-positive rate climbs; rebuild larger in the background
+    if (!this.rebuilding && (this.aadhaar.count > this.aadhaar.capacity || this.pan.count > this.pan.capacity)) {
+      this.rebuilding = this.build()
+        .catch((error) => console.error('Existence filter rebuild error:', error.message))
+        .finally(() => { this.rebuilding = null; });
+    }
+  }
+
+  snapshotPath(name) {
+    return path.join(this.snapshotDir, `${name}.bloom`);
+  }
+
+  // Write both filters atomically (temp file, then rename)
+  async save() {
+    if (!this.snapshotDir || !this.ready) return false;
+    await fs.promises.mkdir(this.snapshotDir, { recursive: true });
+    for (const [name, filter] of [['aadhaar', this.aadhaar], ['pan', this.pan]]) {
+      const target = this.snapshotPath(name);
+      // Unique per call, so overlapping saves don't share a temp file
+      const temp = `${target}.${process.pid}.${++saveSequence}.tmp`;
+      await fs.promises.writeFile(temp, filter.serialize(name, this.watermark));
+      await fs.promises.rename(temp, target);
+    }
+    return true;
+  }
+
+  // Load both snapshots; false when either is missing or unreadable
+  async load() {
+    if (!this.snapshotDir) return false;
+    try {
+      const loaded = {};
+      for (const name of ['aadhaar', 'pan']) {
+        const snapshot = BloomFilter.deserialize(await fs.promises.readFile(this.snapshotPath(name)));
+        if (snapshot.name !== name) throw new Error(`${this.snapshotPath(name)} holds the ${snapshot.name} filter`);
+        loaded[name] = snapshot;
+      }
+      this.aadhaar = loaded.aadhaar.filter;
+      this.pan = loaded.pan.filter;
+      // Catch up from the older of the two
+      this.watermark = Math.min(loaded.aadhaar.watermark, loaded.pan.watermark);
+      this.source = 'snapshot';
+      this.log(`🔎 Existence filters loaded from ${this.snapshotDir}`);
+      return true;
+    } catch (error) {
+      if (error.code !== 'ENOENT') console.error('Existence filter snapshot ignored:', error.message);
+      return false;
+    }
+  }
+
+  // True when this process created the build lock; an existing lock is taken over once it
+  // is older than buildWaitMs, since its holder has died
+  async claimBuild() {
+    const lock = path.join(this.snapshotDir, BUILD_LOCK);
+    try {
+      await (await fs.promises.open(lock, 'wx')).close();
+      return true;
+    } catch (error) {
+      if (error.code !== 'EEXIST') throw error;
+    }
+    const held = await fs.promises.stat(lock).catch(() => null);
+    if (held && Date.now() - held.mtimeMs > this.buildWaitMs) {
+      await fs.promises.rm(lock, { force: true });
+      return this.claimBuild();
+    }
+    return false;
+  }
+
+  // One process scans and saves; the rest wait for its snapshot, and scan themselves only
+  // if none appears within buildWaitMs
+  async buildShared() {
+    if (!this.snapshotDir) return this.build();
+    await fs.promises.mkdir(this.snapshotDir, { recursive: true });
+    const deadline = Date.now() + this.buildWaitMs;
+    for (;;) {
+      if (await this.claimBuild()) {
+        try {
+          await this.build();
+          await this.save();
+        } finally {
+          await fs.promises.rm(path.join(this.snapshotDir, BUILD_LOCK), { force: true });
+        }
+        return;
+      }
+      if (Date.now() > deadline) return this.build();
+      await new Promise((resolve) => setTimeout(resolve, BUILD_POLL_MS));
+      if (await this.load()) return this.sync();
+    }
+  }
+
+  // Warm start from snapshots when present, otherwise scan; then keep in sync
+  async start() {
+    if (await this.load()) {
+      await this.sync();
+    } else {
+      await this.buildShared();
+    }
+    await this.save();
+    const every = (ms, task) => {
+      if (ms <= 0) return;
+      const timer = setInterval(task, ms);
+      timer.unref();
+      this.timers.push(timer);
+    };
+    every(this.syncMs, () => this.sync());
+    every(this.snapshotMs, () => this.save().catch((error) => console.error('Existence filter snapshot error:', error.message)));
+    return this;
+  }
+
+  async stop() {
+    for (const timer of this.timers) clearInterval(timer);
+    this.timers = [];
+    await this.save();
+  }
+
+  stats() {
+    return {
+      ready: this.ready,
+      source: this.source,
+      watermark: this.watermark ? new Date(this.watermark).toISOString() : null,
+      aadhaar: this.aadhaar ? this.aadhaar.stats() : null,
+      pan: this.pan ? this.pan.stats() : null,
+      ...this.counters
+    };
+  }
+}
+
+// Options from EXISTENCE_FILTER_*; the filters stay empty until start(). Cluster workers
+// default to a shared snapshot directory so that only one of them scans at startup.
+function createExistenceFilters(db, { env = process.env, isWorker = cluster.isWorker } = {}) {
+  const number = (name, fallback) => (env[name] ? Number(env[name]) : fallback);
+  return new ExistenceFilters(db, {
+    fpr: number('EXISTENCE_FILTER_FPR', DEFAULT_FPR),
+    minCapacity: number('EXISTENCE_FILTER_MIN_CAPACITY', DEFAULT_MIN_CAPACITY),
+    syncMs: number('EXISTENCE_FILTER_SYNC_MS', DEFAULT_SYNC_MS),
+    snapshotMs: number('EXISTENCE_FILTER_SNAPSHOT_MS', DEFAULT_SNAPSHOT_MS),
+    snapshotDir: env.EXISTENCE_FILTER_SNAPSHOT_DIR || (isWorker ? path.join(os.tmpdir(), 'udyam-existence-filters') : null),
+    buildWaitMs: number('EXISTENCE_FILTER_BUILD_WAIT_MS', DEFAULT_BUILD_WAIT_MS)
+  });
+}
+
+module.exports = {
+  BloomFilter,
+  ExistenceFilters,
+  createExistenceFilters,
+  hashPair,
+};
@@ -0,0 +1,129 @@
+// Clients for the downstream services: UIDAI (mobile number behind an Aadhaar), the SMS
+// gateway and the Income Tax PAN check. Each base URL comes from the environment; when it
+// is unset the call is simulated in-process, as server.js did before these clients existed.
+
+const http = require('http');
+const https = require('https');
+
+const DEFAULT_TIMEOUT_MS = 5000;
+const SIMULATED_MOBILE = '9876543210';
+
+const agents = {
+  'http:': new http.Agent({ keepAlive: true, maxSockets: parseInt(process.env.EXTERNAL_MAX_SOCKETS || '256', 10) }),
+  'https:': new https.Agent({ keepAlive: true, maxSockets: parseInt(process.env.EXTERNAL_MAX_SOCKETS || '256', 10) })
+};
+
+class ServiceError extends Error {
+  constructor(service, message, status = null) {
+    super(message);
+    this.name = 'ServiceError';
+    this.service = service;
+    this.status = status;
+  }
+}
+
+function serviceUrl(name) {
+  const urls = {
+    uidai: process.env.UIDAI_API_URL,
+    sms: process.env.SMS_GATEWAY_URL,
+    pan: process.env.PAN_API_URL
+  };
+  return urls[name] ? urls[name].replace(/\/+$/, '') : null;
+}
+
+function timeoutMs() {
+  return parseInt(process.env.EXTERNAL_TIMEOUT_MS || String(DEFAULT_TIMEOUT_MS), 10);
+}
+
+// POST a JSON body and resolve with { status, body }; rejects with ServiceError on network errors
+function postJson(service, url, payload) {
+  return new Promise((resolve, reject) => {
+    const target = new URL(url);
+    const data = JSON.stringify(payload);
+    const client = target.protocol === 'https:' ? https : http;
+    const req = client.request(target, {
+      method: 'POST',
+      agent: agents[target.protocol],
+      headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(data) },
+      timeout: timeoutMs()
+    }, (res) => {
+      let text = '';
+      res.setEncoding('utf8');
+      res.on('data', (chunk) => { text += chunk; });
+      res.on('end', () => {
+        let body = null;
+        try {
+          body = text ? JSON.parse(text) : null;
+        } catch (error) {
+          body = { raw: text };
+        }
+        resolve({ status: res.statusCode, body });
+      });
+    });
+    req.on('timeout', () => req.destroy(new ServiceError(service, `${service} request timed out`)));
+    req.on('error', (error) => reject(error instanceof ServiceError ? error : new ServiceError(service, error.message)));
+    req.end(data);
+  });
+}
+
+async function call(service, path, payload) {
+  const { status, body } = await postJson(service, `${serviceUrl(service)}${path}`, payload);
+  if (status < 200 || status >= 300) {
+    throw new ServiceError(service, (body && body.error) || `${service} returned ${status}`, status);
+  }
+  return body;
+}
+
+const simulateDelay = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Mobile number registered against an Aadhaar
+async function lookupAadhaarMobile(aadhaarNumber) {
+  if (!serviceUrl('uidai')) return SIMULATED_MOBILE;
+  const body = await call('uidai', '/otp', { aadhaar_number: aadhaarNumber });
+  return body.mobile;
+}
+
+// Resolves { success, message } like the old in-process simulation; never throws
+async function sendSms(mobile, message) {
+  if (!serviceUrl('sms')) {
+    console.log(`Sending SMS to mobile number: ${mobile}: ${message}`);
+    await simulateDelay(parseInt(process.env.SMS_SIMULATED_LATENCY_MS || '1000', 10));
+    return { success: true, message: 'OTP sent successfully' };
+  }
+  try {
+    const body = await call('sms', '/send', { to: mobile, message });
+    return { success: true, message: 'OTP sent successfully', id: body && body.id };
+  } catch (error) {
+    return { success: false, message: error.message, status: error.status };
+  }
+}
+
+// Several messages in one provider call; resolves one { success, ... } per message
+async function sendSmsBatch(messages) {
+  if (!serviceUrl('sms')) {
+    return Promise.all(messages.map((m) => sendSms(m.to, m.message)));
+  }
+  try {
+    const body = await call('sms', '/send-batch', { messages });
+    const results = (body && body.results) || [];
+    return messages.map((m, i) => results[i] || { success: false, message: 'Missing result' });
+  } catch (error) {
+    return messages.map(() => ({ success: false, message: error.message, status: error.status }));
+  }
+}
+
+// { valid, simulated? }; throws ServiceError when the PAN service can't answer
+async function verifyPan(panNumber) {
+  if (!serviceUrl('pan')) return { valid: true, simulated: true };
+  const body = await call('pan', '/verify', { pan_number: panNumber });
+  return { valid: Boolean(body && body.valid), status: body && body.status };
+}
+
+module.exports = {
+  ServiceError,
+  serviceUrl,
+  lookupAadhaarMobile,
+  sendSms,
+  sendSmsBatch,
+  verifyPan,
+};
@@ -0,0 +1,117 @@
+// Generated by `python -m validators.codegen` from udyam_form_schema.json
+// (schema version b7212db7c67e28f5). Do not edit by hand; rerun the generator.
+
+const SCHEMA_VERSION = 'b7212db7c67e28f5';
+
+function charTable(chars) {
+  const table = new Uint8Array(128);
+  for (let i = 0; i < chars.length; i++) table[chars.charCodeAt(i)] = 1;
+  return table;
+}
+
+const CLASS_0 = charTable("\t\n\u000b\f\r .ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"); // [\t-\r .A-Za-z]
+
+// aadhaar_number: ^[2-9][0-9]{11}$
+function isAadhaarNumber(value) {
+  if (typeof value !== 'string' || value.length !== 12) return false;
+  let c;
+  c = value.charCodeAt(0);
+  if (c < 50 || c > 57) return false;
+  for (let i = 1; i < 12; i++) {
+    c = value.charCodeAt(i);
+    if (c < 48 || c > 57) return false;
+  }
+  return true;
+}
+
+// entrepreneur_name: ^[a-zA-Z\s.]+$
+function isEntrepreneurName(value) {
+  if (typeof value !== 'string' || value.length < 1) return false;
+  for (let i = 0; i < value.length; i++) {
+    const c = value.charCodeAt(i);
+    if (c > 127 || CLASS_0[c] === 0) return false;
+  }
+  return true;
+}
+
+// otp: ^[0-9]{6}$
+function isOtp(value) {
+  if (typeof value !== 'string' || value.length !== 6) return false;
+  let c;
+  for (let i = 0; i < 6; i++) {
+    c = value.charCodeAt(i);
+    if (c < 48 || c > 57) return false;
+  }
+  return true;
+}
+
+// pan_number: ^[A-Z]{5}[0-9]{4}[A-Z]{1}$
+function isPanNumber(value) {
+  if (typeof value !== 'string' || value.length !== 10) return false;
+  let c;
+  for (let i = 0; i < 5; i++) {
+    c = value.charCodeAt(i);
+    if (c < 65 || c > 90) return false;
+  }
+  for (let i = 5; i < 9; i++) {
+    c = value.charCodeAt(i);
+    if (c < 48 || c > 57) return false;
+  }
+  c = value.charCodeAt(9);
+  if (c < 65 || c > 90) return false;
+  return true;
+}
+
+// gstin: ^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$
+function isGstin(value) {
+  if (typeof value !== 'string' || value.length !== 15) return false;
+  let c;
+  for (let i = 0; i < 2; i++) {
+    c = value.charCodeAt(i);
+    if (c < 48 || c > 57) return false;
+  }
+  for (let i = 2; i < 7; i++) {
+    c = value.charCodeAt(i);
+    if (c < 65 || c > 90) return false;
+  }
+  for (let i = 7; i < 11; i++) {
+    c = value.charCodeAt(i);
+    if (c < 48 || c > 57) return false;
+  }
+  c = value.charCodeAt(11);
+  if (c < 65 || c > 90) return false;
+  c = value.charCodeAt(12);
+  if (!((c >= 49 && c <= 57) || (c >= 65 && c <= 90))) return false;
+  c = value.charCodeAt(13);
+  if (c !== 90) return false;
+  c = value.charCodeAt(14);
+  if (!((c >= 48 && c <= 57) || (c >= 65 && c <= 90))) return false;
+  return true;
+}
+
+const PATTERNS = {
+  aadhaar_number: "^[2-9][0-9]{11}$",
+  entrepreneur_name: "^[a-zA-Z\\s.]+$",
+  otp: "^[0-9]{6}$",
+  pan_number: "^[A-Z]{5}[0-9]{4}[A-Z]{1}$",
+  gstin: "^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$",
+};
+
+const patternChecks = {
+  aadhaar_number: isAadhaarNumber,
+  entrepreneur_name: isEntrepreneurName,
+  otp: isOtp,
+  pan_number: isPanNumber,
+  gstin: isGstin,
+};
+
+module.exports = {
+  isAadhaarNumber,
+  isEntrepreneurName,
+  isOtp,
+  isPanNumber,
+  isGstin,
+  PATTERNS,
+  patternChecks,
+  SCHEMA_VERSION,
+};
@@ -0,0 +1,95 @@
+// In-process stand-in for the node-redis v4 calls the OTP store, the rate-limit store and
+// the status cache make, so their tests run without a Redis server. The Lua scripts those stores
+// send are recognised by their text and executed in JavaScript with the same semantics.
+// Every command counts as one round trip in `commands`.
+
+const { COMPARE_AND_DELETE } = require('./otpStore');
+const { SLIDING_WINDOW } = require('./rateLimitStore');
+
+class MemoryRedis {
+  constructor({ now = Date.now } = {}) {
+    this.now = now;
+    this.data = new Map();
+    this.commands = 0;
+    this.scripts = new Map([
+      [COMPARE_AND_DELETE, (keys, args) => this.compareAndDelete(keys, args)],
+      [SLIDING_WINDOW, (keys, args) => this.slidingWindow(keys, args)]
+    ]);
+  }
+
+  read(key) {
+    const entry = this.data.get(key);
+    if (!entry) return null;
+    if (entry.expiresAt !== null && entry.expiresAt <= this.now()) {
+      this.data.delete(key);
+      return null;
+    }
+    return entry.value;
+  }
+
+  write(key, value, px) {
+    this.data.set(key, { value: String(value), expiresAt: px ? this.now() + px : null });
+  }
+
+  async get(key) {
+    this.commands++;
+    return this.read(key);
+  }
+
+  async set(key, value, { PX, NX } = {}) {
+    this.commands++;
+    if (NX && this.read(key) !== null) return null;
+    this.write(key, value, PX);
+    return 'OK';
+  }
+
+  async del(keys) {
+    this.commands++;
+    let removed = 0;
+    for (const key of [].concat(keys)) {
+      if (this.read(key) !== null) {
+        this.data.delete(key);
+        removed++;
+      }
+    }
+    return removed;
+  }
+
+  async eval(script, { keys = [], arguments: args = [] } = {}) {
+    this.commands++;
+    const run = this.scripts.get(script);
+    if (!run) throw new Error('MemoryRedis: unknown script');
+    return run(keys, args);
+  }
+
+  compareAndDelete([key], [otp]) {
+    if (this.read(key) !== otp) return 0;
+    this.data.delete(key);
+    return 1;
+  }
+
+  slidingWindow([key], [windowArg, deltaArg, reset]) {
+    const now = this.now();
+    const window = Number(windowArg);
+    const index = Math.floor(now / window);
+    const current = `{${key}}:${index}`;
+    const previousKey = `{${key}}:${index - 1}`;
+    if (reset === '1') {
+      this.data.delete(current);
+      this.data.delete(previousKey);
+      return [0, 0, now - index * window];
+    }
+    let hits = Number(this.read(current) || 0);
+    const delta = Number(deltaArg);
+    if (delta !== 0) {
+      hits = Math.max(0, hits + delta);
+      this.write(current, hits, window * 2);
+    }
+    const previous = Number(this.read(previousKey) || 0);
+    return [hits, previous, now - index * window];
+  }
+}
+
+module.exports = {
+  MemoryRedis,
+};
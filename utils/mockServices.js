@@ -0,0 +1,218 @@
+// Local stand-ins for the downstream services the API depends on: UIDAI (Aadhaar OTP and
+// demographic match), the SMS gateway and the Income Tax PAN check.
+// Each service has its own latency distribution, failure rate and rate limit, so backend
+// concurrency can be benchmarked against realistic downstream behaviour.
+
+const express = require('express');
+
+const SERVICES = ['uidai', 'sms', 'pan'];
+
+const DEFAULT_CONFIG = {
+  uidai: { latency: 'lognormal:180:900', failureRate: 0.01, rateLimit: 0 },
+  sms: { latency: 'lognormal:400:2500', failureRate: 0.02, rateLimit: 0, maxBatch: 100 },
+  pan: { latency: 'lognormal:250:1500', failureRate: 0.01, rateLimit: 0 }
+};
+
+// Standard normal quantile at 0.99, for lognormal distributions given by median and p99
+const Z_99 = 2.3263;
+
+function gaussian(random) {
+  const u = 1 - random();
+  const v = random();
+  return Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * v);
+}
+
+// Parse a latency spec into a sampler returning milliseconds:
+//   fixed:MS  uniform:MIN:MAX  normal:MEAN:SD  exp:MEAN  lognormal:MEDIAN:P99
+function parseLatency(spec, random = Math.random) {
+  const [kind, ...rest] = String(spec).trim().split(':');
+  const args = rest.map(Number);
+  if (args.some((n) => !Number.isFinite(n) || n < 0)) {
+    throw new Error(`Invalid latency spec: ${spec}`);
+  }
+  switch (kind) {
+    case 'fixed':
+      return () => args[0] || 0;
+    case 'uniform':
+      return () => args[0] + random() * (args[1] - args[0]);
+    case 'normal':
+      return () => Math.max(0, args[0] + gaussian(random) * args[1]);
+    case 'exp':
+      return () => -Math.log(1 - random()) * args[0];
+    case 'lognormal': {
+      const mu = Math.log(args[0]);
+      const sigma = args[1] > args[0] ? Math.log(args[1] / args[0]) / Z_99 : 0;
+      return () => Math.exp(mu + sigma * gaussian(random));
+    }
+    default:
+      throw new Error(`Invalid latency spec: ${spec}`);
+  }
+}
+
+// Token bucket allowing `rate` requests per second with bursts of the same size; 0 disables it
+class TokenBucket {
+  constructor(rate, now = Date.now) {
+    this.rate = rate;
+    this.now = now;
+    this.tokens = rate;
+    this.updatedAt = now();
+  }
+
+  take() {
+    if (!this.rate) return true;
+    const now = this.now();
+    this.tokens = Math.min(this.rate, this.tokens + ((now - this.updatedAt) / 1000) * this.rate);
+    this.updatedAt = now;
+    if (this.tokens < 1) return false;
+    this.tokens -= 1;
+    return true;
+  }
+}
+
+// Per-service settings from MOCK_<SERVICE>_LATENCY, _FAILURE_RATE, _RATE_LIMIT and _MAX_BATCH
+function configFromEnv(env = process.env) {
+  const config = {};
+  SERVICES.forEach((name) => {
+    const prefix = `MOCK_${name.toUpperCase()}_`;
+    const defaults = DEFAULT_CONFIG[name];
+    config[name] = {
+      ...defaults,
+      latency: env[`${prefix}LATENCY`] || defaults.latency,
+      failureRate: env[`${prefix}FAILURE_RATE`] !== undefined ? parseFloat(env[`${prefix}FAILURE_RATE`]) : defaults.failureRate,
+      rateLimit: env[`${prefix}RATE_LIMIT`] !== undefined ? parseFloat(env[`${prefix}RATE_LIMIT`]) : defaults.rateLimit
+    };
+    if (env[`${prefix}MAX_BATCH`] !== undefined) {
+      config[name].maxBatch = parseInt(env[`${prefix}MAX_BATCH`], 10);
+    }
+  });
+  return config;
+}
+
+// Deterministic 10-digit mobile number for an Aadhaar, so repeated lookups agree
+function mobileFor(aadhaar) {
+  let hash = 0;
+  for (const ch of String(aadhaar)) hash = (hash * 31 + ch.charCodeAt(0)) % 1000000000;
+  return `9${String(hash).padStart(9, '0')}`;
+}
+
+const PAN_PATTERN = /^[A-Z]{5}[0-9]{4}[A-Z]$/;
+const AADHAAR_PATTERN = /^[2-9][0-9]{11}$/;
+
+function createMockServices(options = {}) {
+  const random = options.random || Math.random;
+  const sleep = options.sleep || ((ms) => new Promise((resolve) => setTimeout(resolve, ms)));
+  const now = options.now || Date.now;
+  const services = {};
+  const app = express();
+  app.use(express.json({ limit: '1mb' }));
+
+  function configure(name, settings) {
+    const merged = { ...DEFAULT_CONFIG[name], ...(services[name] && services[name].config), ...settings };
+    services[name] = {
+      config: merged,
+      sample: parseLatency(merged.latency, random),
+      bucket: new TokenBucket(merged.rateLimit, now),
+      stats: (services[name] && services[name].stats) || { requests: 0, ok: 0, failed: 0, throttled: 0 }
+    };
+  }
+  SERVICES.forEach((name) => configure(name, (options.config || {})[name]));
+
+  // Rate limit, then latency, then injected failure; handler runs only for successful calls
+  const simulate = (name, handler) => async (req, res) => {
+    const service = services[name];
+    service.stats.requests++;
+    if (!service.bucket.take()) {
+      service.stats.throttled++;
+      res.set('Retry-After', '1');
+      return res.status(429).json({ error: 'Too many requests', service: name });
+    }
+    await sleep(service.sample());
+    if (random() < service.config.failureRate) {
+      service.stats.failed++;
+      return res.status(503).json({ error: 'Service unavailable', service: name });
+    }
+    const result = handler(req, service.config);
+    service.stats.ok++;
+    return res.status(result.status || 200).json(result.body);
+  };
+
+  app.post('/uidai/otp', simulate('uidai', (req) => {
+    const { aadhaar_number: aadhaar } = req.body || {};
+    if (!AADHAAR_PATTERN.test(aadhaar || '')) {
+      return { status: 400, body: { error: 'Invalid Aadhaar number' } };
+    }
+    return { body: { success: true, txn: `UIDAI${now()}${Math.floor(random() * 1000)}`, mobile: mobileFor(aadhaar) } };
+  }));
+
+  app.post('/uidai/demographic', simulate('uidai', (req) => {
+    const { aadhaar_number: aadhaar, name } = req.body || {};
+    if (!AADHAAR_PATTERN.test(aadhaar || '')) {
+      return { status: 400, body: { error: 'Invalid Aadhaar number' } };
+    }
+    return { body: { success: true, match: Boolean(name && String(name).trim().length >= 2) } };
+  }));
+
+  app.post('/sms/send', simulate('sms', (req) => {
+    const { to, message } = req.body || {};
+    if (!to || !message) {
+      return { status: 400, body: { error: 'to and message are required' } };
+    }
+    return { body: { success: true, id: `SMS${now()}${Math.floor(random() * 100000)}` } };
+  }));
+
+  // One provider call for many messages; the whole batch shares one latency sample
+  app.post('/sms/send-batch', simulate('sms', (req, config) => {
+    const messages = (req.body && req.body.messages) || [];
+    if (!Array.isArray(messages) || messages.length === 0 || messages.length > config.maxBatch) {
+      return { status: 400, body: { error: `messages must hold 1-${config.maxBatch} entries` } };
+    }
+    return {
+      body: {
+        success: true,
+        results: messages.map((m) => (m && m.to && m.message
+          ? { success: true, id: `SMS${now()}${Math.floor(random() * 100000)}` }
+          : { success: false, error: 'to and message are required' }))
+      }
+    };
+  }));
+
+  app.post('/pan/verify', simulate('pan', (req) => {
+    const { pan_number: pan } = req.body || {};
+    if (!PAN_PATTERN.test(pan || '')) {
+      return { body: { valid: false, status: 'INVALID', message: 'PAN does not exist' } };
+    }
+    return { body: { valid: true, status: 'E', pan_number: pan, holder_type: pan.charAt(3) } };
+  }));
+
+  app.get('/stats', (req, res) => {
+    const body = {};
+    SERVICES.forEach((name) => { body[name] = { config: services[name].config, ...services[name].stats }; });
+    res.json(body);
+  });
+
+  // Change a service's behaviour mid-run, e.g. to inject an SMS outage during a load test
+  app.put('/config/:service', (req, res) => {
+    if (!services[req.params.service]) {
+      return res.status(404).json({ error: 'Unknown service' });
+    }
+    try {
+      configure(req.params.service, req.body || {});
+    } catch (error) {
+      return res.status(400).json({ error: error.message });
+    }
+    return res.json(services[req.params.service].config);
+  });
+
+  app.services = services;
+  return app;
+}
+
+module.exports = {
+  SERVICES,
+  DEFAULT_CONFIG,
+  parseLatency,
+  TokenBucket,
+  configFromEnv,
+  mobileFor,
+  createMockServices,
+};
@@ -0,0 +1,370 @@
+// OTP delivery queue. /api/generate-otp enqueues a job once the OTP row is stored and
+// responds immediately; a pool of dispatcher workers sends the SMS in batches, retries
+// failures with backoff and parks jobs that keep failing in a dead-letter list.
+//
+// Two backends share one interface: PostgresQueue (durable, the otp_dispatch_jobs table)
+// and MemoryQueue (a local stand-in for tests and single-process development).
+
+const DEFAULT_VISIBILITY_MS = 30 * 1000;
+const NOTIFY_CHANNEL = 'otp_dispatch';
+
+const otpMessage = (otp) => `${otp} is your OTP for Udyam Registration. It is valid for 10 minutes.`;
+
+class MemoryQueue {
+  constructor({ now = Date.now } = {}) {
+    this.now = now;
+    this.jobs = new Map();
+    this.dead = [];
+    this.nextId = 1;
+    this.waiters = [];
+  }
+
+  async enqueue({ aadhaar_number, mobile, otp, expires_at }) {
+    const id = this.nextId++;
+    this.jobs.set(id, {
+      id, aadhaar_number, mobile, otp,
+      expires_at: new Date(expires_at),
+      attempts: 0,
+      run_at: this.now(),
+      last_error: null
+    });
+    this.wake();
+    return id;
+  }
+
+  // Claimed jobs become visible again after visibilityMs unless completed or retried first
+  async claim(limit, visibilityMs = DEFAULT_VISIBILITY_MS) {
+    const now = this.now();
+    const due = [...this.jobs.values()]
+      .filter((job) => job.run_at <= now)
+      .sort((a, b) => a.run_at - b.run_at)
+      .slice(0, limit);
+    due.forEach((job) => {
+      job.attempts++;
+      job.run_at = now + visibilityMs;
+    });
+    return due.map((job) => ({ ...job }));
+  }
+
+  async complete(ids) {
+    ids.forEach((id) => this.jobs.delete(id));
+  }
+
+  async retry(id, delayMs, error) {
+    const job = this.jobs.get(id);
+    if (job) {
+      job.run_at = this.now() + delayMs;
+      job.last_error = error;
+    }
+  }
+
+  async deadLetter(id, error) {
+    const job = this.jobs.get(id);
+    if (job) {
+      this.jobs.delete(id);
+      // The OTP is never sent now, so it is not kept
+      this.dead.push({ ...job, otp: null, last_error: error, failed_at: new Date(this.now()) });
+    }
+  }
+
+  async deadLetters(limit = 100) {
+    return this.dead.slice(-limit);
+  }
+
+  // Resolves when a job is enqueued or after timeoutMs, so idle workers don't spin
+  waitForWork(timeoutMs) {
+    return new Promise((resolve) => {
+      const now = this.now();
+      if ([...this.jobs.values()].some((job) => job.run_at <= now)) {
+        resolve();
+        return;
+      }
+      const timer = setTimeout(resolve, timeoutMs);
+      this.waiters.push(() => {
+        clearTimeout(timer);
+        resolve();
+      });
+    });
+  }
+
+  wake() {
+    this.waiters.splice(0).forEach((wake) => wake());
+  }
+
+  async depth() {
+    return { pending: this.jobs.size, dead: this.dead.length };
+  }
+}
+
+// Jobs live in otp_dispatch_jobs (database_schema.sql). Claiming moves run_at forward by the
+// visibility timeout, so a worker that dies mid-send releases its jobs without a sweeper.
+//
+// Idle workers don't poll the table each: enqueue sends a NOTIFY that wakes one of them
+// (listen() holds one connection per process for it), and a single timer per process wakes
+// one worker every pollMs to pick up retries as they fall due.
+class PostgresQueue {
+  constructor(pool, { pollMs = 1000 } = {}) {
+    this.pool = pool;
+    this.pollMs = pollMs;
+    this.waiters = [];
+    this.pollTimer = null;
+    this.listening = null;
+  }
+
+  async enqueue({ aadhaar_number, mobile, otp, expires_at }) {
+    const result = await this.pool.query({
+      name: 'otp_dispatch_enqueue',
+      text: `WITH job AS (
+         INSERT INTO otp_dispatch_jobs (aadhaar_number, mobile, otp, expires_at) VALUES ($1, $2, $3, $4) RETURNING id
+       )
+       SELECT id, pg_notify('${NOTIFY_CHANNEL}', '') FROM job`,
+      values: [aadhaar_number, mobile, otp, expires_at]
+    });
+    return result.rows[0].id;
+  }
+
+  async claim(limit, visibilityMs = DEFAULT_VISIBILITY_MS) {
+    const result = await this.pool.query({
+      name: 'otp_dispatch_claim',
+      text: `UPDATE otp_dispatch_jobs
+       SET attempts = attempts + 1, run_at = CURRENT_TIMESTAMP + ($2 || ' milliseconds')::interval
+       WHERE id IN (
+         SELECT id FROM otp_dispatch_jobs
+         WHERE status = 'queued' AND run_at <= CURRENT_TIMESTAMP
+         ORDER BY run_at
+         LIMIT $1
+         FOR UPDATE SKIP LOCKED
+       )
+       RETURNING id, aadhaar_number, mobile, otp, expires_at, attempts`,
+      values: [limit, String(visibilityMs)]
+    });
+    return result.rows;
+  }
+
+  async complete(ids) {
+    if (ids.length) {
+      await this.pool.query({
+        name: 'otp_dispatch_complete',
+        text: 'DELETE FROM otp_dispatch_jobs WHERE id = ANY($1)',
+        values: [ids]
+      });
+    }
+  }
+
+  async retry(id, delayMs, error) {
+    await this.pool.query(
+      'UPDATE otp_dispatch_jobs SET run_at = CURRENT_TIMESTAMP + ($2 || \' milliseconds\')::interval, last_error = $3 WHERE id = $1',
+      [id, String(delayMs), error]
+    );
+  }
+
+  async deadLetter(id, error) {
+    await this.pool.query(
+      'UPDATE otp_dispatch_jobs SET status = \'dead\', otp = NULL, last_error = $2, failed_at = CURRENT_TIMESTAMP WHERE id = $1',
+      [id, error]
+    );
+  }
+
+  async deadLetters(limit = 100) {
+    const result = await this.pool.query(
+      'SELECT id, aadhaar_number, mobile, attempts, last_error, created_at, failed_at FROM otp_dispatch_jobs WHERE status = \'dead\' ORDER BY failed_at DESC LIMIT $1',
+      [limit]
+    );
+    return result.rows;
+  }
+
+  // Dedicated connection for LISTEN; without it the poll timer alone finds new jobs
+  listen() {
+    if (!this.listening) {
+      this.listening = this.connectListener().catch((error) => {
+        console.error('OTP queue LISTEN failed:', error.message);
+        this.listening = null;
+        return null;
+      });
+    }
+    return this.listening;
+  }
+
+  async connectListener() {
+    const client = await this.pool.connect();
+    client.on('notification', () => this.wakeOne());
+    client.on('error', (error) => {
+      console.error('OTP queue listener error:', error.message);
+      this.listening = null;
+      client.release(error);
+    });
+    await client.query(`LISTEN ${NOTIFY_CHANNEL}`);
+    return client;
+  }
+
+  async unlisten() {
+    const client = this.listening && await this.listening;
+    this.listening = null;
+    if (client) {
+      await client.query(`UNLISTEN ${NOTIFY_CHANNEL}`).catch(() => {});
+      client.release();
+    }
+  }
+
+  waitForWork(timeoutMs) {
+    return new Promise((resolve) => {
+      this.waiters.push(resolve);
+      if (!this.pollTimer) {
+        this.pollTimer = setTimeout(() => {
+          this.pollTimer = null;
+          this.wakeOne();
+        }, Math.min(timeoutMs, this.pollMs));
+      }
+    });
+  }
+
+  // The woken worker claims; if it finds nothing it waits again and re-arms the timer
+  wakeOne() {
+    const wake = this.waiters.shift();
+    if (wake) wake();
+    if (!this.waiters.length && this.pollTimer) {
+      clearTimeout(this.pollTimer);
+      this.pollTimer = null;
+    }
+  }
+
+  wake() {
+    clearTimeout(this.pollTimer);
+    this.pollTimer = null;
+    this.waiters.splice(0).forEach((wake) => wake());
+  }
+
+  async depth() {
+    const result = await this.pool.query(
+      'SELECT COUNT(*) FILTER (WHERE status = \'queued\')::int AS pending, COUNT(*) FILTER (WHERE status = \'dead\')::int AS dead FROM otp_dispatch_jobs'
+    );
+    return result.rows[0];
+  }
+}
+
+// Worker pool draining a queue through an SMS sender.
+// sendBatch(messages) resolves one { success, message } per { to, message }.
+class OtpDispatcher {
+  constructor(queue, sendBatch, {
+    workers = 4,
+    batchSize = 50,
+    maxAttempts = 5,
+    backoffMs = 1000,
+    maxBackoffMs = 60 * 1000,
+    visibilityMs = DEFAULT_VISIBILITY_MS,
+    idleMs = 1000,
+    now = Date.now,
+    random = Math.random
+  } = {}) {
+    this.queue = queue;
+    this.sendBatch = sendBatch;
+    this.options = { workers, batchSize, maxAttempts, backoffMs, maxBackoffMs, visibilityMs, idleMs };
+    this.now = now;
+    this.random = random;
+    this.running = false;
+    this.loops = [];
+    this.counters = { batches: 0, sent: 0, retried: 0, dead_lettered: 0, expired: 0, errors: 0 };
+  }
+
+  // Exponential backoff, jittered over the upper half of each step
+  backoff(attempts) {
+    const ceiling = Math.min(this.options.maxBackoffMs, this.options.backoffMs * 2 ** (attempts - 1));
+    return Math.round(ceiling / 2 + this.random() * (ceiling / 2));
+  }
+
+  // Claim and send one batch; returns the number of jobs handled
+  async runOnce() {
+    const jobs = await this.queue.claim(this.options.batchSize, this.options.visibilityMs);
+    if (!jobs.length) return 0;
+
+    const now = this.now();
+    const live = [];
+    for (const job of jobs) {
+      if (new Date(job.expires_at).getTime() <= now) {
+        // Sending an OTP the user can no longer use only costs money
+        this.counters.expired++;
+        await this.queue.deadLetter(job.id, 'expired before delivery');
+      } else {
+        live.push(job);
+      }
+    }
+    if (!live.length) return jobs.length;
+
+    this.counters.batches++;
+    let results;
+    try {
+      results = await this.sendBatch(live.map((job) => ({ to: job.mobile, message: otpMessage(job.otp) })));
+    } catch (error) {
+      results = live.map(() => ({ success: false, message: error.message }));
+    }
+
+    const delivered = [];
+    for (let i = 0; i < live.length; i++) {
+      const job = live[i];
+      const result = results[i] || { success: false, message: 'No result from SMS provider' };
+      if (result.success) {
+        delivered.push(job.id);
+      } else if (job.attempts >= this.options.maxAttempts) {
+        this.counters.dead_lettered++;
+        await this.queue.deadLetter(job.id, result.message || 'SMS delivery failed');
+      } else {
+        this.counters.retried++;
+        await this.queue.retry(job.id, this.backoff(job.attempts), result.message || 'SMS delivery failed');
+      }
+    }
+    await this.queue.complete(delivered);
+    this.counters.sent += delivered.length;
+    return jobs.length;
+  }
+
+  async loop() {
+    while (this.running) {
+      try {
+        const handled = await this.runOnce();
+        if (!handled && this.running) {
+          await this.queue.waitForWork(this.options.idleMs);
+        }
+      } catch (error) {
+        this.counters.errors++;
+        console.error('OTP dispatch error:', error.message);
+        await new Promise((resolve) => setTimeout(resolve, this.options.idleMs));
+      }
+    }
+  }
+
+  start() {
+    if (this.running) return this;
+    this.running = true;
+    if (this.queue.listen) this.queue.listen();
+    this.loops = Array.from({ length: this.options.workers }, () => this.loop());
+    return this;
+  }
+
+  async stop() {
+    this.running = false;
+    this.queue.wake();
+    await Promise.all(this.loops);
+    this.loops = [];
+    if (this.queue.unlisten) await this.queue.unlisten();
+  }
+
+  stats() {
+    return { running: this.running, workers: this.options.workers, ...this.counters };
+  }
+}
+
+// OTP_QUEUE_BACKEND=postgres|memory; durable Postgres by default in production
+function createOtpQueue(pool, backend = process.env.OTP_QUEUE_BACKEND) {
+  const choice = backend || (process.env.NODE_ENV === 'production' ? 'postgres' : 'memory');
+  if (choice === 'postgres') return new PostgresQueue(pool);
+  if (choice === 'memory') return new MemoryQueue();
+  throw new Error(`Unknown OTP_QUEUE_BACKEND: ${choice}`);
+}
+
+module.exports = {
+  MemoryQueue,
+  PostgresQueue,
+  OtpDispatcher,
+  createOtpQueue,
+  otpMessage,
+};
@@ -0,0 +1,176 @@
+// OTP storage. The API saves one live OTP per (aadhaar_number, type) and consumes it on a
+// successful verification, so an OTP can be used only once. verifyAndRegister() also
+// upserts the draft registration and returns its id.
+//
+// RedisOtpStore keeps OTPs out of the primary database: keys expire on their own (no table
+// churn) and verification is an atomic compare-and-delete script.
+// PostgresOtpStore is the original otp_verifications implementation, kept as the fallback.
+//
+// Either store runs cleanup_expired_otps() (database_schema.sql) on an interval, which also
+// purges dead-lettered OTP deliveries older than the retention.
+
+const DEFAULT_KEY_PREFIX = 'otp';
+const DEFAULT_CLEANUP_INTERVAL_MS = 60 * 60 * 1000;
+const DEFAULT_DEAD_JOB_RETENTION_DAYS = 7;
+
+function startCleanupTimer(pool, intervalMs, deadJobRetentionDays) {
+  const timer = setInterval(() => {
+    pool.query('SELECT cleanup_expired_otps(make_interval(days => $1))', [deadJobRetentionDays]).catch((error) => {
+      console.error('OTP cleanup error:', error.message);
+    });
+  }, intervalMs);
+  timer.unref();
+  return timer;
+}
+
+const UPSERT_DRAFT_REGISTRATION = 'INSERT INTO registrations (aadhaar_number, status, step_completed) VALUES ($1, $2, $3) ON CONFLICT (aadhaar_number) DO UPDATE SET step_completed = GREATEST(registrations.step_completed, $3), updated_at = CURRENT_TIMESTAMP RETURNING id';
+
+// One statement, one round trip: the UPDATE consumes the OTP only if it matches, is unexpired
+// and unused (its row lock makes concurrent attempts wait and then find used_at set), and
+// the draft registration is upserted only when a row was consumed.
+const VERIFY_AND_REGISTER = `
+WITH consumed AS (
+  UPDATE otp_verifications
+  SET used_at = CURRENT_TIMESTAMP
+  WHERE aadhaar_number = $1 AND type = $2 AND otp = $3
+    AND expires_at > CURRENT_TIMESTAMP AND used_at IS NULL
+  RETURNING aadhaar_number
+)
+INSERT INTO registrations (aadhaar_number, status, step_completed)
+SELECT aadhaar_number, 'draft', $4 FROM consumed
+ON CONFLICT (aadhaar_number) DO UPDATE
+  SET step_completed = GREATEST(registrations.step_completed, EXCLUDED.step_completed),
+      updated_at = CURRENT_TIMESTAMP
+RETURNING id
+`;
+
+// Deletes the key only if it still holds the submitted OTP; returns 1 when consumed
+const COMPARE_AND_DELETE = `
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  redis.call('DEL', KEYS[1])
+  return 1
+end
+return 0
+`;
+
+class PostgresOtpStore {
+  constructor(pool) {
+    this.pool = pool;
+    this.cleanupTimer = null;
+  }
+
+  async save(aadhaarNumber, type, otp, expiresAt) {
+    await this.pool.query({
+      name: 'otp_save',
+      text: 'INSERT INTO otp_verifications (aadhaar_number, otp, expires_at, type) VALUES ($1, $2, $3, $4) ON CONFLICT (aadhaar_number, type) DO UPDATE SET otp = $2, expires_at = $3, created_at = CURRENT_TIMESTAMP, used_at = NULL',
+      values: [aadhaarNumber, otp, expiresAt, type]
+    });
+  }
+
+  // One statement: the row lock makes concurrent attempts wait and then find used_at set,
+  // so only one of them consumes the OTP
+  async verify(aadhaarNumber, type, otp) {
+    const consumed = await this.pool.query({
+      name: 'otp_verify',
+      text: 'UPDATE otp_verifications SET used_at = CURRENT_TIMESTAMP WHERE aadhaar_number = $1 AND type = $2 AND otp = $3 AND expires_at > CURRENT_TIMESTAMP AND used_at IS NULL RETURNING 1',
+      values: [aadhaarNumber, type, otp]
+    });
+    return consumed.rows.length > 0;
+  }
+
+  // Registration id when the OTP was consumed, null otherwise
+  async verifyAndRegister(aadhaarNumber, type, otp, step = 1) {
+    const result = await this.pool.query({
+      name: 'otp_verify_and_register',
+      text: VERIFY_AND_REGISTER,
+      values: [aadhaarNumber, type, otp, step]
+    });
+    return result.rows.length ? result.rows[0].id : null;
+  }
+
+  startCleanup(intervalMs = DEFAULT_CLEANUP_INTERVAL_MS, deadJobRetentionDays = DEFAULT_DEAD_JOB_RETENTION_DAYS) {
+    if (this.cleanupTimer || !intervalMs) return;
+    this.cleanupTimer = startCleanupTimer(this.pool, intervalMs, deadJobRetentionDays);
+  }
+
+  stopCleanup() {
+    clearInterval(this.cleanupTimer);
+    this.cleanupTimer = null;
+  }
+}
+
+// client is a connected node-redis v4 client (or anything with the same set/eval signatures);
+// pool is only needed for verifyAndRegister()
+class RedisOtpStore {
+  constructor(client, { pool = null, prefix = DEFAULT_KEY_PREFIX, now = Date.now } = {}) {
+    this.client = client;
+    this.pool = pool;
+    this.prefix = prefix;
+    this.now = now;
+    this.cleanupTimer = null;
+  }
+
+  key(aadhaarNumber, type) {
+    return `${this.prefix}:${type}:${aadhaarNumber}`;
+  }
+
+  async save(aadhaarNumber, type, otp, expiresAt) {
+    const ttlMs = Math.max(new Date(expiresAt).getTime() - this.now(), 1);
+    await this.client.set(this.key(aadhaarNumber, type), otp, { PX: ttlMs });
+  }
+
+  async verify(aadhaarNumber, type, otp) {
+    const consumed = await this.client.eval(COMPARE_AND_DELETE, {
+      keys: [this.key(aadhaarNumber, type)],
+      arguments: [String(otp)]
+    });
+    return Number(consumed) === 1;
+  }
+
+  // One Redis round trip to consume the OTP, then one database round trip for the draft
+  async verifyAndRegister(aadhaarNumber, type, otp, step = 1) {
+    if (!(await this.verify(aadhaarNumber, type, otp))) {
+      return null;
+    }
+    const result = await this.pool.query({
+      name: 'registration_upsert_draft',
+      text: UPSERT_DRAFT_REGISTRATION,
+      values: [aadhaarNumber, 'draft', step]
+    });
+    return result.rows[0].id;
+  }
+
+  // Nothing to expire here, but the dispatch queue's dead letters are still in the database
+  startCleanup(intervalMs = DEFAULT_CLEANUP_INTERVAL_MS, deadJobRetentionDays = DEFAULT_DEAD_JOB_RETENTION_DAYS) {
+    if (this.cleanupTimer || !intervalMs || !this.pool) return;
+    this.cleanupTimer = startCleanupTimer(this.pool, intervalMs, deadJobRetentionDays);
+  }
+
+  stopCleanup() {
+    clearInterval(this.cleanupTimer);
+    this.cleanupTimer = null;
+  }
+}
+
+// OTP_STORE=redis (with REDIS_URL) or postgres (default)
+function createOtpStore(pool, { backend = process.env.OTP_STORE, redisUrl = process.env.REDIS_URL } = {}) {
+  const choice = backend || 'postgres';
+  if (choice === 'postgres') return new PostgresOtpStore(pool);
+  if (choice !== 'redis') throw new Error(`Unknown OTP_STORE: ${choice}`);
+
+  // Loaded only when selected, so deployments on the Postgres store don't need the package
+  const { createClient } = require('redis');
+  const client = createClient({ url: redisUrl || 'redis://localhost:6379' });
+  client.on('error', (error) => console.error('Redis OTP store error:', error.message));
+  client.connect().catch((error) => console.error('Redis OTP store connection failed:', error.message));
+  return new RedisOtpStore(client, { pool });
+}
+
+module.exports = {
+  COMPARE_AND_DELETE,
+  VERIFY_AND_REGISTER,
+  UPSERT_DRAFT_REGISTRATION,
+  PostgresOtpStore,
+  RedisOtpStore,
+  createOtpStore,
+};
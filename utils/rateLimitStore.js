@@ -0,0 +1,358 @@
+// Rate-limit stores for express-rate-limit. Under the cluster supervisor (cluster.js) each
+// worker is a separate process, so the default in-memory store would give every worker its
+// own counters and multiply the effective limit by the worker count. ClusterStore forwards
+// every hit to the primary, which holds the only counters for the host.
+//
+// With several hosts behind nginx the counters have to live outside the hosts:
+// RedisWindowStore keeps sliding-window counters in Redis and coalesces the hits each
+// process sees for a key into one atomic script call.
+
+const cluster = require('cluster');
+
+const MESSAGE_TYPE = 'rate-limit';
+const DEFAULT_IPC_TIMEOUT_MS = 1000;
+const DEFAULT_FLUSH_MS = 2;
+const DEFAULT_BLOCK_CACHE_MS = 1000;
+
+// Sliding-window counter: hits in the current fixed window plus the previous window's hits
+// weighted by how much of it still overlaps the sliding window. Adds ARGV[2] (which may be
+// negative, for express-rate-limit's decrement) to the current window and returns
+// { current, previous, ms into the current window }; ARGV[3] = '1' deletes both windows.
+// Redis' clock aligns the windows, so hosts with skewed clocks still share them.
+// Both keys carry KEYS[1] as a hash tag.
+const SLIDING_WINDOW = `
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local index = math.floor(now / window)
+local current = '{' .. KEYS[1] .. '}:' .. index
+if ARGV[3] == '1' then
+  redis.call('DEL', current, '{' .. KEYS[1] .. '}:' .. (index - 1))
+  return { 0, 0, now - index * window }
+end
+local hits = tonumber(redis.call('GET', current) or '0')
+local delta = tonumber(ARGV[2])
+if delta ~= 0 then
+  hits = math.max(0, hits + delta)
+  redis.call('SET', current, hits, 'PX', window * 2)
+end
+local previous = tonumber(redis.call('GET', '{' .. KEYS[1] .. '}:' .. (index - 1)) or '0')
+return { hits, previous, now - index * window }
+`;
+
+// Fixed-window hit counters, as express-rate-limit's own MemoryStore keeps them
+class WindowCounter {
+  constructor({ now = Date.now } = {}) {
+    this.now = now;
+    this.windows = new Map();
+    this.sweepTimer = null;
+  }
+
+  increment(key, windowMs) {
+    const now = this.now();
+    let entry = this.windows.get(key);
+    if (!entry || entry.resetTime <= now) {
+      entry = { totalHits: 0, resetTime: now + windowMs };
+      this.windows.set(key, entry);
+    }
+    entry.totalHits++;
+    return { totalHits: entry.totalHits, resetTime: entry.resetTime };
+  }
+
+  get(key) {
+    const entry = this.windows.get(key);
+    if (!entry || entry.resetTime <= this.now()) return undefined;
+    return { totalHits: entry.totalHits, resetTime: entry.resetTime };
+  }
+
+  decrement(key) {
+    const entry = this.windows.get(key);
+    if (entry && entry.totalHits > 0) entry.totalHits--;
+  }
+
+  resetKey(key) {
+    this.windows.delete(key);
+  }
+
+  // Drop windows that have ended so idle keys don't accumulate
+  sweep() {
+    const now = this.now();
+    for (const [key, entry] of this.windows) {
+      if (entry.resetTime <= now) this.windows.delete(key);
+    }
+  }
+
+  startSweep(intervalMs = 60 * 1000) {
+    if (this.sweepTimer) return;
+    this.sweepTimer = setInterval(() => this.sweep(), intervalMs);
+    this.sweepTimer.unref();
+  }
+
+  stopSweep() {
+    clearInterval(this.sweepTimer);
+    this.sweepTimer = null;
+  }
+}
+
+// Worker side: every operation is a request/response over the cluster IPC channel.
+// If the primary doesn't answer within ipcTimeoutMs the hit is counted locally instead,
+// so a stalled primary degrades to per-worker limits rather than failing requests.
+class ClusterStore {
+  constructor({ prefix = '', ipcTimeoutMs = DEFAULT_IPC_TIMEOUT_MS, channel = process } = {}) {
+    this.prefix = prefix;
+    this.ipcTimeoutMs = ipcTimeoutMs;
+    this.channel = channel;
+    this.windowMs = 60 * 1000;
+    this.pending = new Map();
+    this.nextId = 1;
+    this.fallback = new WindowCounter();
+    this.localKeys = false;
+    this.onMessage = (message) => {
+      if (!message || message.type !== MESSAGE_TYPE || !this.pending.has(message.id)) return;
+      const { resolve, timer } = this.pending.get(message.id);
+      clearTimeout(timer);
+      this.pending.delete(message.id);
+      resolve(message.result);
+    };
+    channel.on('message', this.onMessage);
+  }
+
+  // Called by express-rate-limit with the limiter's options
+  init(options) {
+    this.windowMs = options.windowMs;
+  }
+
+  request(op, key) {
+    const id = `${process.pid}:${this.nextId++}`;
+    const fullKey = `${this.prefix}${key}`;
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        resolve(this.local(op, fullKey));
+      }, this.ipcTimeoutMs);
+      this.pending.set(id, { resolve, timer });
+      this.channel.send({ type: MESSAGE_TYPE, id, op, key: fullKey, windowMs: this.windowMs });
+    });
+  }
+
+  local(op, key) {
+    if (op === 'increment') return this.fallback.increment(key, this.windowMs);
+    if (op === 'get') return this.fallback.get(key);
+    if (op === 'decrement') return this.fallback.decrement(key);
+    return this.fallback.resetKey(key);
+  }
+
+  async increment(key) {
+    const result = await this.request('increment', key);
+    return { totalHits: result.totalHits, resetTime: new Date(result.resetTime) };
+  }
+
+  async get(key) {
+    const result = await this.request('get', key);
+    return result ? { totalHits: result.totalHits, resetTime: new Date(result.resetTime) } : undefined;
+  }
+
+  async decrement(key) {
+    await this.request('decrement', key);
+  }
+
+  async resetKey(key) {
+    await this.request('resetKey', key);
+  }
+}
+
+// Redis-backed sliding windows shared by every process and host.
+//
+// Hits a process sees for the same key within flushMs are pre-aggregated into one script
+// call (INCRBY n rather than n round trips); each caller still gets its own position in
+// the count. Once a key is over the limit the process answers further hits for it locally
+// for up to blockCacheMs, since those requests are rejected whatever Redis says.
+// If Redis fails, hits are counted in-process until it is back.
+class RedisWindowStore {
+  constructor(client, {
+    prefix = 'rl:',
+    flushMs = DEFAULT_FLUSH_MS,
+    blockCacheMs = DEFAULT_BLOCK_CACHE_MS,
+    now = Date.now
+  } = {}) {
+    this.client = client;
+    this.prefix = prefix;
+    this.flushMs = flushMs;
+    this.blockCacheMs = blockCacheMs;
+    this.now = now;
+    this.windowMs = 60 * 1000;
+    this.limit = null;
+    this.batches = new Map();
+    this.blocked = new Map();
+    this.fallback = new WindowCounter({ now });
+    this.counters = { hits: 0, round_trips: 0, blocked_locally: 0, redis_errors: 0 };
+    this.localKeys = false;
+  }
+
+  init(options) {
+    this.windowMs = options.windowMs;
+    // A limit that is a function can differ per request, so it can't be cached
+    const limit = options.limit !== undefined ? options.limit : options.max;
+    this.limit = typeof limit === 'number' ? limit : null;
+  }
+
+  // Adds delta to the key's pending batch; increments wait for the flush
+  enqueue(key, delta, waiter) {
+    let batch = this.batches.get(key);
+    if (!batch) {
+      batch = { delta: 0, waiters: [] };
+      this.batches.set(key, batch);
+      setTimeout(() => this.flush(key), this.flushMs);
+    }
+    batch.delta += delta;
+    if (waiter) batch.waiters.push(waiter);
+  }
+
+  async flush(key) {
+    const batch = this.batches.get(key);
+    this.batches.delete(key);
+    const increments = batch.waiters.length;
+
+    let window;
+    try {
+      window = await this.run(key, batch.delta);
+    } catch (error) {
+      this.counters.redis_errors++;
+      batch.waiters.forEach(({ resolve }) => resolve(this.fallback.increment(key, this.windowMs)));
+      return;
+    }
+
+    const total = this.estimate(window);
+    const resetTime = this.now() + (this.windowMs - window.elapsed);
+    // The batch's own hits are the last `increments` of the total, in arrival order
+    batch.waiters.forEach(({ resolve }, i) => {
+      resolve({ totalHits: Math.max(total - increments + i + 1, i + 1), resetTime });
+    });
+    if (this.limit !== null && total >= this.limit) {
+      const until = this.now() + Math.min(this.blockCacheMs, this.windowMs - window.elapsed);
+      this.blocked.set(key, { until, totalHits: total, resetTime, extra: 0 });
+    }
+  }
+
+  async run(key, delta, reset = false) {
+    this.counters.round_trips++;
+    const [current, previous, elapsed] = await this.client.eval(SLIDING_WINDOW, {
+      keys: [`${this.prefix}${key}`],
+      arguments: [String(this.windowMs), String(delta), reset ? '1' : '0']
+    });
+    return { current: Number(current), previous: Number(previous), elapsed: Number(elapsed) };
+  }
+
+  estimate({ current, previous, elapsed }) {
+    return current + Math.floor(previous * (this.windowMs - elapsed) / this.windowMs);
+  }
+
+  // Local answer while the key is known to be over its limit, otherwise null
+  blockedHit(key) {
+    const entry = this.blocked.get(key);
+    if (!entry) return null;
+    if (entry.until <= this.now()) {
+      this.blocked.delete(key);
+      return null;
+    }
+    entry.extra++;
+    this.counters.blocked_locally++;
+    return { totalHits: entry.totalHits + entry.extra, resetTime: entry.resetTime };
+  }
+
+  async increment(key) {
+    this.counters.hits++;
+    const local = this.blockedHit(key);
+    const result = local || await new Promise((resolve) => this.enqueue(key, 1, { resolve }));
+    return { totalHits: result.totalHits, resetTime: new Date(result.resetTime) };
+  }
+
+  // Hits answered locally never reached Redis, so their decrements stay local too
+  async decrement(key) {
+    const entry = this.blocked.get(key);
+    if (entry && entry.extra > 0) {
+      entry.extra--;
+      return;
+    }
+    this.enqueue(key, -1, null);
+  }
+
+  async get(key) {
+    try {
+      const window = await this.run(key, 0);
+      return {
+        totalHits: this.estimate(window),
+        resetTime: new Date(this.now() + (this.windowMs - window.elapsed))
+      };
+    } catch (error) {
+      this.counters.redis_errors++;
+      const local = this.fallback.get(key);
+      return local ? { totalHits: local.totalHits, resetTime: new Date(local.resetTime) } : undefined;
+    }
+  }
+
+  async resetKey(key) {
+    this.blocked.delete(key);
+    this.fallback.resetKey(key);
+    await this.run(key, 0, true);
+  }
+
+  stats() {
+    return { ...this.counters, pending_keys: this.batches.size, blocked_keys: this.blocked.size };
+  }
+}
+
+// Primary side: answer ClusterStore requests from every worker out of one WindowCounter
+function serveClusterRateLimits(clusterModule = cluster, counter = new WindowCounter()) {
+  counter.startSweep();
+  clusterModule.on('message', (worker, message) => {
+    if (!message || message.type !== MESSAGE_TYPE) return;
+    let result = null;
+    if (message.op === 'increment') result = counter.increment(message.key, message.windowMs);
+    else if (message.op === 'get') result = counter.get(message.key) || null;
+    else if (message.op === 'decrement') counter.decrement(message.key);
+    else if (message.op === 'resetKey') counter.resetKey(message.key);
+    if (worker.isConnected()) {
+      worker.send({ type: MESSAGE_TYPE, id: message.id, result });
+    }
+  });
+  return counter;
+}
+
+let sharedRedisClient = null;
+
+function redisClient(redisUrl) {
+  if (!sharedRedisClient) {
+    // Loaded only when selected, like the Redis OTP store
+    const { createClient } = require('redis');
+    sharedRedisClient = createClient({ url: redisUrl || 'redis://localhost:6379' });
+    sharedRedisClient.on('error', (error) => console.error('Redis rate-limit store error:', error.message));
+    sharedRedisClient.connect().catch((error) => console.error('Redis rate-limit store connection failed:', error.message));
+  }
+  return sharedRedisClient;
+}
+
+// Store for one limiter. RATE_LIMIT_STORE=redis shares counters across hosts; otherwise
+// cluster workers share the primary's counters and a single process keeps
+// express-rate-limit's own MemoryStore (undefined). express-rate-limit refuses to share a
+// store between limiters, hence one per prefix.
+function createRateLimitStore(prefix, {
+  backend = process.env.RATE_LIMIT_STORE,
+  redisUrl = process.env.REDIS_URL,
+  flushMs = parseInt(process.env.RATE_LIMIT_FLUSH_MS || String(DEFAULT_FLUSH_MS), 10)
+} = {}) {
+  const choice = backend || (cluster.isWorker ? 'cluster' : 'memory');
+  if (choice === 'redis') return new RedisWindowStore(redisClient(redisUrl), { prefix: `rl:${prefix}:`, flushMs });
+  if (choice === 'cluster') return cluster.isWorker ? new ClusterStore({ prefix: `${prefix}:` }) : undefined;
+  if (choice === 'memory') return undefined;
+  throw new Error(`Unknown RATE_LIMIT_STORE: ${choice}`);
+}
+
+module.exports = {
+  SLIDING_WINDOW,
+  WindowCounter,
+  ClusterStore,
+  RedisWindowStore,
+  serveClusterRateLimits,
+  createRateLimitStore,
+};
@@ -0,0 +1,194 @@
+// Read-through cache for registration status lookups, the most frequent read in the API.
+// An in-process LRU with a short TTL sits in front of an optional Redis tier shared by every
+// process; a miss in both loads from the database once, however many requests are waiting.
+// Unknown Aadhaar numbers are cached too (negative caching), for a shorter time.
+//
+// Writers call invalidate() after updating a registration. That clears this process's LRU
+// and replaces the Redis entry with a short-lived tombstone; other processes' LRU entries
+// expire within ttlMs.
+
+const DEFAULT_MAX_ENTRIES = 10000;
+const DEFAULT_TTL_MS = 5000;
+const DEFAULT_NEGATIVE_TTL_MS = 2000;
+const DEFAULT_REDIS_TTL_MS = 30 * 1000;
+const TOMBSTONE = 'invalidated';
+
+class StatusCache {
+  // loader(aadhaar) resolves the status row, or null when there is none
+  constructor(loader, {
+    redis = null,
+    max = DEFAULT_MAX_ENTRIES,
+    ttlMs = DEFAULT_TTL_MS,
+    negativeTtlMs = DEFAULT_NEGATIVE_TTL_MS,
+    redisTtlMs = DEFAULT_REDIS_TTL_MS,
+    prefix = 'status:',
+    now = Date.now
+  } = {}) {
+    this.loader = loader;
+    this.redis = redis;
+    this.max = max;
+    this.ttlMs = ttlMs;
+    this.negativeTtlMs = negativeTtlMs;
+    this.redisTtlMs = redisTtlMs;
+    this.prefix = prefix;
+    this.now = now;
+    this.entries = new Map();
+    this.loading = new Map();
+    this.counters = {
+      hits: 0,
+      redis_hits: 0,
+      misses: 0,
+      negative_hits: 0,
+      coalesced: 0,
+      invalidations: 0,
+      evictions: 0,
+      redis_errors: 0
+    };
+  }
+
+  async get(aadhaar) {
+    const entry = this.entries.get(aadhaar);
+    if (entry && entry.expiresAt > this.now()) {
+      // Re-insert to mark as most recently used
+      this.entries.delete(aadhaar);
+      this.entries.set(aadhaar, entry);
+      this.counters.hits++;
+      if (entry.row === null) this.counters.negative_hits++;
+      return entry.row;
+    }
+    if (entry) this.entries.delete(aadhaar);
+
+    // Concurrent misses for the same key share one load
+    const pending = this.loading.get(aadhaar);
+    if (pending) {
+      this.counters.coalesced++;
+      return pending.promise;
+    }
+    const load = { stale: false };
+    load.promise = this.load(aadhaar, load).finally(() => {
+      if (this.loading.get(aadhaar) === load) this.loading.delete(aadhaar);
+    });
+    this.loading.set(aadhaar, load);
+    return load.promise;
+  }
+
+  async load(aadhaar, load) {
+    const cached = await this.readRedis(aadhaar);
+    if (cached !== undefined) {
+      this.counters.redis_hits++;
+      if (!load.stale) this.remember(aadhaar, cached);
+      return cached;
+    }
+
+    this.counters.misses++;
+    const row = (await this.loader(aadhaar)) || null;
+    // An invalidation while the load was running means the row may already be out of date
+    if (!load.stale) {
+      this.remember(aadhaar, row);
+      await this.writeRedis(aadhaar, row);
+    }
+    return row;
+  }
+
+  remember(aadhaar, row) {
+    const ttl = row === null ? this.negativeTtlMs : this.ttlMs;
+    if (ttl <= 0) return;
+    this.entries.set(aadhaar, { row, expiresAt: this.now() + ttl });
+    if (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.counters.evictions++;
+    }
+  }
+
+  // undefined on a miss or a Redis error, so the database stays the fallback
+  async readRedis(aadhaar) {
+    if (!this.redis) return undefined;
+    try {
+      const text = await this.redis.get(this.prefix + aadhaar);
+      return text === null || text === TOMBSTONE ? undefined : JSON.parse(text).row;
+    } catch (error) {
+      this.counters.redis_errors++;
+      return undefined;
+    }
+  }
+
+  async writeRedis(aadhaar, row) {
+    if (!this.redis) return;
+    const ttl = row === null ? this.negativeTtlMs : this.redisTtlMs;
+    try {
+      // NX: never overwrite a tombstone, which is what keeps a load that read the row before
+      // another process's write from caching the old row
+      await this.redis.set(this.prefix + aadhaar, JSON.stringify({ row }), { PX: ttl, NX: true });
+    } catch (error) {
+      this.counters.redis_errors++;
+    }
+  }
+
+  // Call after the registration row for this Aadhaar changed
+  async invalidate(aadhaar) {
+    if (!aadhaar) return;
+    this.counters.invalidations++;
+    this.entries.delete(aadhaar);
+    const load = this.loading.get(aadhaar);
+    if (load) {
+      load.stale = true;
+      this.loading.delete(aadhaar);
+    }
+    if (this.redis) {
+      try {
+        // Outlives any load that could have started before the write
+        await this.redis.set(this.prefix + aadhaar, TOMBSTONE, { PX: Math.max(this.ttlMs, 1000) });
+      } catch (error) {
+        this.counters.redis_errors++;
+      }
+    }
+  }
+
+  // Forget every entry in this process (the Redis tier is left alone)
+  clear() {
+    this.entries.clear();
+    for (const load of this.loading.values()) load.stale = true;
+    this.loading.clear();
+  }
+
+  stats() {
+    const lookups = this.counters.hits + this.counters.redis_hits + this.counters.misses + this.counters.coalesced;
+    return {
+      size: this.entries.size,
+      max: this.max,
+      redis: Boolean(this.redis),
+      ...this.counters,
+      hit_rate: lookups ? (lookups - this.counters.misses) / lookups : 0
+    };
+  }
+}
+
+// STATUS_CACHE_REDIS=true adds the shared Redis tier (REDIS_URL)
+function createStatusCache(loader, {
+  useRedis = process.env.STATUS_CACHE_REDIS === 'true',
+  redisUrl = process.env.REDIS_URL,
+  env = process.env
+} = {}) {
+  let redis = null;
+  if (useRedis) {
+    // Loaded only when selected, like the Redis OTP store
+    const { createClient } = require('redis');
+    // Fail fast while disconnected rather than queueing: the database is the fallback
+    redis = createClient({ url: redisUrl || 'redis://localhost:6379', disableOfflineQueue: true });
+    redis.on('error', (error) => console.error('Redis status cache error:', error.message));
+    redis.connect().catch((error) => console.error('Redis status cache connection failed:', error.message));
+  }
+  const number = (name, fallback) => (env[name] ? parseInt(env[name], 10) : fallback);
+  return new StatusCache(loader, {
+    redis,
+    max: number('STATUS_CACHE_MAX', DEFAULT_MAX_ENTRIES),
+    ttlMs: number('STATUS_CACHE_TTL_MS', DEFAULT_TTL_MS),
+    negativeTtlMs: number('STATUS_CACHE_NEGATIVE_TTL_MS', DEFAULT_NEGATIVE_TTL_MS),
+    redisTtlMs: number('STATUS_CACHE_REDIS_TTL_MS', DEFAULT_REDIS_TTL_MS)
+  });
+}
+
+module.exports = {
+  StatusCache,
+  createStatusCache,
+};
@@ -0,0 +1,179 @@
+// Udyam Registration Number allocation: UDYAM-<state>-<district>-<7-digit sequence>, with one
+// sequence per state and district in udyam_sequences. Each process leases a block of numbers
+// with a single upsert and hands them out from memory, so the sequence row is locked once
+// per block rather than once per registration.
+//
+// Blocks never overlap, so numbers are unique across processes. Numbers left in a block when
+// a process exits are skipped, not reused: sequences have gaps but no duplicates. Numbers
+// issued by the earlier random scheme can still be taken; withNumber() skips those on the
+// unique-constraint violation.
+
+const DEFAULT_BLOCK_SIZE = 100;
+const DEFAULT_MAX_BLOCK_SIZE = 10000;
+// A block used up faster than this doubles the next lease; one lasting ten times longer halves it
+const DEFAULT_TARGET_LEASE_MS = 1000;
+// Lease the next block in the background once this fraction of the current one is left
+const DEFAULT_PREFETCH_RATIO = 0.2;
+const MAX_SEQUENCE = 9999999;
+const MAX_COLLISION_RETRIES = 5;
+
+// One round trip per block. The row lock is held only for this statement.
+const LEASE_BLOCK = `
+INSERT INTO udyam_sequences (state_code, district_code, next_value)
+VALUES ($1, $2, 1 + $3::bigint)
+ON CONFLICT (state_code, district_code) DO UPDATE
+  SET next_value = udyam_sequences.next_value + $3::bigint,
+      updated_at = CURRENT_TIMESTAMP
+RETURNING next_value - $3::bigint AS first_value
+`;
+
+const CODE_PATTERN = /^[0-9]{2}$/;
+
+const formatUdyamNumber = (state, district, value) => `UDYAM-${state}-${district}-${String(value).padStart(7, '0')}`;
+
+// True for the registrations.udyam_number unique violation
+const isUdyamCollision = (error) => error && error.code === '23505' && /udyam_number/.test(error.constraint || '');
+
+class UdyamAllocator {
+  constructor(db, {
+    blockSize = DEFAULT_BLOCK_SIZE,
+    maxBlockSize = DEFAULT_MAX_BLOCK_SIZE,
+    targetLeaseMs = DEFAULT_TARGET_LEASE_MS,
+    prefetchRatio = DEFAULT_PREFETCH_RATIO,
+    now = Date.now
+  } = {}) {
+    this.db = db;
+    this.blockSize = blockSize;
+    this.maxBlockSize = Math.max(blockSize, maxBlockSize);
+    this.targetLeaseMs = targetLeaseMs;
+    this.prefetchRatio = prefetchRatio;
+    this.now = now;
+    this.sequences = new Map();
+    this.counters = {
+      allocated: 0,
+      leases: 0,
+      lease_errors: 0,
+      waits: 0,
+      collisions: 0
+    };
+  }
+
+  sequence(state, district) {
+    const key = `${state}-${district}`;
+    let sequence = this.sequences.get(key);
+    if (!sequence) {
+      sequence = { state, district, blocks: [], size: this.blockSize, leasedAt: null, pending: null };
+      this.sequences.set(key, sequence);
+    }
+    return sequence;
+  }
+
+  remaining(sequence) {
+    return sequence.blocks.reduce((sum, block) => sum + block.end - block.next, 0);
+  }
+
+  // Next number for this state and district. Synchronous once a block is in hand, so two
+  // callers in one process can never get the same value.
+  async allocate(state, district) {
+    if (!CODE_PATTERN.test(state) || !CODE_PATTERN.test(district)) {
+      throw new Error(`Invalid state/district code: ${state}/${district}`);
+    }
+    const sequence = this.sequence(state, district);
+    for (;;) {
+      const block = sequence.blocks[0];
+      if (block && block.next < block.end) {
+        const value = block.next++;
+        if (block.next === block.end) sequence.blocks.shift();
+        this.counters.allocated++;
+        if (!sequence.pending && this.remaining(sequence) < sequence.size * this.prefetchRatio) {
+          this.lease(sequence).catch(() => {});
+        }
+        return formatUdyamNumber(state, district, value);
+      }
+      if (block) sequence.blocks.shift();
+      this.counters.waits++;
+      await this.lease(sequence);
+    }
+  }
+
+  // Leases the next block; concurrent callers for one sequence share the round trip
+  lease(sequence) {
+    if (sequence.pending) return sequence.pending;
+    sequence.pending = this.leaseBlock(sequence).finally(() => { sequence.pending = null; });
+    return sequence.pending;
+  }
+
+  async leaseBlock(sequence) {
+    const now = this.now();
+    if (sequence.leasedAt !== null) {
+      const lasted = now - sequence.leasedAt;
+      if (lasted < this.targetLeaseMs) {
+        sequence.size = Math.min(this.maxBlockSize, sequence.size * 2);
+      } else if (lasted > this.targetLeaseMs * 10) {
+        sequence.size = Math.max(this.blockSize, Math.floor(sequence.size / 2));
+      }
+    }
+    const size = sequence.size;
+    let result;
+    try {
+      result = await this.db.query({
+        name: 'udyam_sequence_lease',
+        text: LEASE_BLOCK,
+        values: [sequence.state, sequence.district, size]
+      });
+    } catch (error) {
+      this.counters.lease_errors++;
+      throw error;
+    }
+    this.counters.leases++;
+    sequence.leasedAt = now;
+    const first = Number(result.rows[0] && result.rows[0].first_value);
+    if (!Number.isSafeInteger(first) || first < 1) {
+      throw new Error(`Unexpected Udyam sequence lease result: ${JSON.stringify(result.rows[0])}`);
+    }
+    if (first > MAX_SEQUENCE) {
+      throw new Error(`Udyam numbers exhausted for state ${sequence.state} district ${sequence.district}`);
+    }
+    sequence.blocks.push({ next: first, end: Math.min(first + size, MAX_SEQUENCE + 1) });
+  }
+
+  // Allocate a number and hand it to use(), which stores it. A number already held by
+  // another registration is skipped and the next one tried.
+  async withNumber(state, district, use) {
+    for (let attempt = 0; attempt < MAX_COLLISION_RETRIES; attempt++) {
+      const number = await this.allocate(state, district);
+      try {
+        await use(number);
+        return number;
+      } catch (error) {
+        if (!isUdyamCollision(error)) throw error;
+        this.counters.collisions++;
+      }
+    }
+    throw new Error(`No free Udyam number for state ${state} district ${district} after ${MAX_COLLISION_RETRIES} attempts`);
+  }
+
+  stats() {
+    const sequences = {};
+    for (const [key, sequence] of this.sequences) {
+      sequences[key] = { block_size: sequence.size, remaining: this.remaining(sequence) };
+    }
+    return { ...this.counters, sequences };
+  }
+}
+
+// Block sizes from UDYAM_BLOCK_SIZE and UDYAM_MAX_BLOCK_SIZE
+function createUdyamAllocator(db, { env = process.env } = {}) {
+  const number = (name, fallback) => (env[name] ? parseInt(env[name], 10) : fallback);
+  return new UdyamAllocator(db, {
+    blockSize: number('UDYAM_BLOCK_SIZE', DEFAULT_BLOCK_SIZE),
+    maxBlockSize: number('UDYAM_MAX_BLOCK_SIZE', DEFAULT_MAX_BLOCK_SIZE)
+  });
+}
+
+module.exports = {
+  LEASE_BLOCK,
+  UdyamAllocator,
+  createUdyamAllocator,
+  formatUdyamNumber,
+};
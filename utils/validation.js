@@ -1,50 +1,84 @@
-const AADHAAR_REGEX = /^[2-9][0-9]{11}$/;
-const PAN_REGEX = /^[A-Z]{5}[0-9]{4}[A-Z]{1}$/;
-const OTP_REGEX = /^[0-9]{6}$/;
-const GSTIN_REGEX = /^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$/;
+// Positional checkers generated from udyam_form_schema.json (python -m validators.codegen)
+const { isAadhaarNumber, isPanNumber, isOtp, isGstin } = require('./generatedValidators');
+
+// Verhoeff tables (same as validators/checksum.py)
+const VERHOEFF_D = [
+  [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+  [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
+  [2, 3, 4, 0, 1, 7, 8, 9, 5, 6],
+  [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
+  [4, 0, 1, 2, 3, 9, 5, 6, 7, 8],
+  [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+  [6, 5, 9, 8, 7, 1, 0, 4, 3, 2],
+  [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
+  [8, 7, 6, 5, 9, 3, 2, 1, 0, 4],
+  [9, 8, 7, 6, 5, 4, 3, 2, 1, 0]
+];
+const VERHOEFF_P = [
+  [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+  [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
+  [5, 8, 0, 3, 7, 9, 6, 1, 4, 2],
+  [8, 9, 1, 6, 0, 4, 3, 5, 7, 2],
+  [9, 4, 5, 3, 1, 2, 6, 8, 7, 0],
+  [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
+  [2, 7, 9, 3, 8, 0, 6, 4, 1, 5],
+  [7, 0, 4, 6, 9, 1, 3, 2, 5, 8]
+];
+const GSTIN_CHARSET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ';
 
 function validateAadhaar(value) {
   if (typeof value !== 'string') return false;
-  return AADHAAR_REGEX.test(value.trim());
+  return isAadhaarNumber(value.trim());
 }
 
 function validatePAN(value) {
   if (typeof value !== 'string') return false;
-  return PAN_REGEX.test(value.trim());
+  return isPanNumber(value.trim());
 }
 
 function validateOTP(value) {
   if (typeof value !== 'string') return false;
-  return OTP_REGEX.test(value.trim());
+  return isOtp(value.trim());
 }
 
 function validateGSTIN(value) {
   if (value === '' || value === null || typeof value === 'undefined') return true;
   if (typeof value !== 'string') return false;
+  return isGstin(value.trim());
+}
+
+// Verhoeff check over a string of digits (the last digit is the check digit)
+function verhoeffValid(value) {
+  if (typeof value !== 'string' || !/^[0-9]+$/.test(value)) return false;
+  let c = 0;
+  for (let i = 0; i < value.length; i++) {
+    const digit = value.charCodeAt(value.length - 1 - i) - 48;
+    c = VERHOEFF_D[c][VERHOEFF_P[i % 8][digit]];
+  }
+  return c === 0;
+}
+
+// mod-36 check character for the first 14 GSTIN characters
+function gstinCheckChar(value) {
+  let total = 0;
+  for (let i = 0; i < 14; i++) {
+    const code = GSTIN_CHARSET.indexOf(value[i]);
+    if (code < 0) return null;
+    const product = code * (i % 2 ? 2 : 1);
+    total += Math.floor(product / 36) + (product % 36);
+  }
+  return GSTIN_CHARSET[(36 - (total % 36)) % 36];
+}
+
+function validateAadhaarChecksum(value) {
+  return validateAadhaar(value) && verhoeffValid(value.trim());
+}
+
+function validateGSTINChecksum(value) {
+  if (value === '' || value === null || typeof value === 'undefined') return true;
+  if (!validateGSTIN(value)) return false;
   const v = value.trim();
-  if (v.length !== 15) return false;
-  if (v !== v.toUpperCase()) return false;
-  // Explicit positional checks to avoid false positives
-  const isDigit = (c) => c >= '0' && c <= '9';
-  const isUpper = (c) => c >= 'A' && c <= 'Z';
-  const isAlphaNumNoZero = (c) => (c >= '1' && c <= '9') || isUpper(c);
-  const isAlphaNum = (c) => isDigit(c) || isUpper(c);
-
-  // 0-1: state code digits
-  if (!isDigit(v[0]) || !isDigit(v[1])) return false;
-  // 2-6: letters
-  for (let i = 2; i <= 6; i++) if (!isUpper(v[i])) return false;
-  // 7-10: digits
-  for (let i = 7; i <= 10; i++) if (!isDigit(v[i])) return false;
-  // 11: letter
-  if (!isUpper(v[11])) return false;
-  // 12: 1-9 or A-Z
-  if (!isAlphaNumNoZero(v[12])) return false;
-  // 13: must be Z
-  if (v[13] !== 'Z') return false;
-  // 14: 0-9 or A-Z
-  if (!isAlphaNum(v[14])) return false;
-  return true;
+  return gstinCheckChar(v) === v[14];
 }
 
 module.exports = {
@@ -52,6 +86,10 @@ module.exports = {
   validatePAN,
   validateOTP,
   validateGSTIN,
+  validateAadhaarChecksum,
+  validateGSTINChecksum,
+  verhoeffValid,
+  gstinCheckChar,
 };
 
 
@@ -0,0 +1,93 @@
+// Bounded LRU memo for validation results, keyed by (rule, value).
+// Plain JS with no Node-only imports so the same module works in server.js and the form.
+
+const DEFAULT_MAX_ENTRIES = 10000;
+// Longer values are validated but never cached, so junk input can't crowd out real keys
+const MAX_CACHED_VALUE_LENGTH = 64;
+
+// FNV-1a hash of a JSON-serialisable value, used as a schema version tag
+function versionOf(value) {
+  const text = typeof value === 'string' ? value : JSON.stringify(value);
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return (hash >>> 0).toString(16).padStart(8, '0');
+}
+
+class ValidationCache {
+  constructor({ max = DEFAULT_MAX_ENTRIES, version = null } = {}) {
+    this.max = max;
+    this.version = version;
+    this.entries = new Map();
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+    this.invalidations = 0;
+  }
+
+  // Drop every entry when the schema version changes
+  setVersion(version) {
+    if (version !== this.version) {
+      if (this.version !== null) {
+        this.invalidations++;
+      }
+      this.version = version;
+      this.clear();
+    }
+  }
+
+  // Return fn(value), memoised per rule; fn must be a pure function of value
+  check(rule, value, fn) {
+    const text = value === undefined || value === null ? '' : String(value);
+    if (text.length > MAX_CACHED_VALUE_LENGTH) {
+      this.misses++;
+      return fn(text);
+    }
+
+    const key = `${rule}\u0000${text}`;
+    if (this.entries.has(key)) {
+      const result = this.entries.get(key);
+      // Re-insert to mark as most recently used
+      this.entries.delete(key);
+      this.entries.set(key, result);
+      this.hits++;
+      return result;
+    }
+
+    this.misses++;
+    const result = fn(text);
+    this.entries.set(key, result);
+    if (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.evictions++;
+    }
+    return result;
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  stats() {
+    const lookups = this.hits + this.misses;
+    return {
+      version: this.version,
+      size: this.entries.size,
+      max: this.max,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      invalidations: this.invalidations,
+      hit_rate: lookups ? this.hits / lookups : 0
+    };
+  }
+}
+
+module.exports = {
+  ValidationCache,
+  versionOf,
+  DEFAULT_MAX_ENTRIES,
+  MAX_CACHED_VALUE_LENGTH,
+};
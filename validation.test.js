@@ -1,4 +1,13 @@
-const { validateAadhaar, validatePAN, validateOTP, validateGSTIN } = require('./utils/validation');
+const {
+  validateAadhaar,
+  validatePAN,
+  validateOTP,
+  validateGSTIN,
+  validateAadhaarChecksum,
+  validateGSTINChecksum,
+  verhoeffValid,
+  gstinCheckChar
+} = require('./utils/validation');
 
 describe('Form Validation Tests', () => {
   describe('Aadhaar Validation', () => {
@@ -124,6 +133,48 @@ describe('Form Validation Tests', () => {
       expect(validateGSTIN(undefined)).toBe(true);
     });
   });
+
+  describe('Check Digit Validation', () => {
+    test('should accept Aadhaar numbers with a valid Verhoeff check digit', () => {
+      const validAadhaars = [
+        '234567890124',
+        '987654321018',
+        '556677889908'
+      ];
+
+      validAadhaars.forEach(aadhaar => {
+        expect(validateAadhaarChecksum(aadhaar)).toBe(true);
+      });
+      expect(verhoeffValid('2363')).toBe(true);
+    });
+
+    test('should reject Aadhaar numbers with a wrong check digit', () => {
+      const invalidAadhaars = [
+        '234567890123', // Last digit should be 4
+        '234567890142', // Transposed digits
+        '123456789012', // Starts with 1
+        ''
+      ];
+
+      invalidAadhaars.forEach(aadhaar => {
+        expect(validateAadhaarChecksum(aadhaar)).toBe(false);
+      });
+    });
+
+    test('should compute the GSTIN mod-36 check character', () => {
+      expect(gstinCheckChar('27AAPFU0939F1Z')).toBe('V');
+      expect(gstinCheckChar('27ABCPD1234E1Z')).toBe('E');
+      expect(gstinCheckChar('27ABCPD1234E1z')).toBe(null);
+    });
+
+    test('should validate GSTIN check characters', () => {
+      expect(validateGSTINChecksum('27AAPFU0939F1ZV')).toBe(true);
+      expect(validateGSTINChecksum('27ABCPD1234E1ZE')).toBe(true);
+      expect(validateGSTINChecksum('27ABCPD1234E1ZF')).toBe(false); // Format ok, check char wrong
+      expect(validateGSTINChecksum('27ABCPD1234E1YE')).toBe(false); // 14th char not Z
+      expect(validateGSTINChecksum('')).toBe(true);
+    });
+  });
 });
 
 describe('Form Integration Tests', () => {
@@ -0,0 +1,56 @@
+const { ValidationCache, versionOf, MAX_CACHED_VALUE_LENGTH } = require('./utils/validationCache');
+const { validateAadhaar, validatePAN } = require('./utils/validation');
+
+describe('Validation Cache Tests', () => {
+  test('should return memoised results and count hits', () => {
+    const cache = new ValidationCache();
+    const fn = jest.fn(validateAadhaar);
+
+    expect(cache.check('aadhaar', '234567890123', fn)).toBe(true);
+    expect(cache.check('aadhaar', '234567890123', fn)).toBe(true);
+    expect(cache.check('aadhaar', '123456789012', fn)).toBe(false);
+
+    expect(fn).toHaveBeenCalledTimes(2);
+    expect(cache.stats()).toMatchObject({ hits: 1, misses: 2, size: 2 });
+  });
+
+  test('should keep results separate per rule', () => {
+    const cache = new ValidationCache();
+    expect(cache.check('aadhaar', 'ABCPD1234E', validateAadhaar)).toBe(false);
+    expect(cache.check('pan', 'ABCPD1234E', validatePAN)).toBe(true);
+  });
+
+  test('should evict the least recently used entry', () => {
+    const cache = new ValidationCache({ max: 2 });
+    const fn = jest.fn(() => true);
+
+    cache.check('rule', 'a', fn);
+    cache.check('rule', 'b', fn);
+    cache.check('rule', 'a', fn); // a is now most recent
+    cache.check('rule', 'c', fn); // evicts b
+
+    expect(cache.stats().evictions).toBe(1);
+    cache.check('rule', 'a', fn);
+    expect(fn).toHaveBeenCalledTimes(3);
+    cache.check('rule', 'b', fn);
+    expect(fn).toHaveBeenCalledTimes(4);
+  });
+
+  test('should not cache oversized values', () => {
+    const cache = new ValidationCache();
+    const long = 'x'.repeat(MAX_CACHED_VALUE_LENGTH + 1);
+    cache.check('rule', long, () => false);
+    expect(cache.stats().size).toBe(0);
+  });
+
+  test('should clear when the schema version changes', () => {
+    const cache = new ValidationCache({ version: versionOf({ pattern: '^[0-9]{6}$' }) });
+    cache.check('otp', '123456', () => true);
+
+    cache.setVersion(versionOf({ pattern: '^[0-9]{6}$' }));
+    expect(cache.stats().size).toBe(1);
+
+    cache.setVersion(versionOf({ pattern: '^[0-9]{4}$' }));
+    expect(cache.stats()).toMatchObject({ size: 0, invalidations: 1 });
+  });
+});
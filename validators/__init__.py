@@ -0,0 +1,21 @@
+"""
+Python validators for Udyam registration data
+Compiled from udyam_form_schema.json for batch and offline use
+"""
+
+from .cache import ValidationCache, validate_field
+from .compiler import compile_pattern
+from .records import validate_many, validate_record
+from .schema import CompiledSchema, FieldError, FieldRule, load_schema
+
+__all__ = [
+    "CompiledSchema",
+    "FieldError",
+    "FieldRule",
+    "ValidationCache",
+    "compile_pattern",
+    "load_schema",
+    "validate_field",
+    "validate_many",
+    "validate_record",
+]
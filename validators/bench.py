@@ -0,0 +1,282 @@
+"""
+Validator conformance and micro-benchmarks
+Runs the Python and JS validators over one generated corpus and reports ops/sec, mismatches and allocations
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from . import codegen
+from .cache import ValidationCache
+from .schema import DEFAULT_SCHEMA_PATH, load_schema
+
+DEFAULT_SIZE = 20_000
+DEFAULT_MIN_TIME = 0.2
+JS_BENCH = os.path.join(codegen.REPO_ROOT, "scripts", "validator-bench.js")
+
+# Wrappers trim input and the API enforces 2-100 characters for names, so values
+# whose answer depends on those layers are left out of the cross-language corpus
+NAME_LENGTH = (2, 100)
+MAX_EXAMPLES = 5
+
+# Raw regex engines, reported for comparison only; their mismatches don't fail the run
+BASELINES = ("re.fullmatch", "RegExp")
+
+
+def comparable(field: str, value: str) -> bool:
+    """True when every implementation should agree with the bare pattern on value"""
+    if not value or value[0].isspace() or value[-1].isspace() or "\ufeff" in (value[0], value[-1]):
+        return False
+    if field == "entrepreneur_name":
+        return NAME_LENGTH[0] <= len(value) <= NAME_LENGTH[1]
+    return True
+
+
+def _mutate(rng: random.Random, value: str) -> str:
+    pos = rng.randrange(len(value)) if value else 0
+    action = rng.random()
+    if action < 0.6:
+        return value[:pos] + rng.choice(codegen.PROBE_CHARS) + value[pos + 1:]
+    if action < 0.8:
+        return value[:pos] + value[pos + 1:]
+    return value[:pos] + rng.choice(codegen.PROBE_CHARS) + value[pos:]
+
+
+def build_corpus(size: int = DEFAULT_SIZE, seed: int = codegen.CORPUS_SEED,
+                 schema_path: str = DEFAULT_SCHEMA_PATH) -> Dict:
+    """
+    Roughly size cases per field: the checked-in conformance cases plus random
+    valid values and single-edit mutations of them, about half of each.
+    """
+    schema = load_schema(schema_path)
+    fields = {}
+    for spec in codegen.field_specs(schema):
+        rng = random.Random(f"{seed}:{spec.name}:bench")
+        seen = set()
+        cases = []
+
+        def add(value: str):
+            if value not in seen and comparable(spec.name, value):
+                seen.add(value)
+                cases.append((value, codegen.expected(spec, value)))
+
+        for value, _ in codegen.corpus_cases(spec):
+            add(value)
+        attempts = 0
+        while len(cases) < size and attempts < size * 10:
+            attempts += 1
+            value = codegen.sample_value(rng, spec)
+            add(_mutate(rng, value) if rng.random() < 0.5 else value)
+        fields[spec.name] = {"pattern": spec.pattern, "cases": cases}
+    return {"schema_version": schema.version, "seed": seed, "fields": fields}
+
+
+def _result(language: str, implementation: str, field: str, cases: List, answers: List[bool],
+            ops_per_sec: float, alloc: float, alloc_unit: str, baseline: bool = False) -> Dict:
+    wrong = [value for (value, want), got in zip(cases, answers) if bool(got) != want]
+    return {
+        "language": language,
+        "implementation": implementation,
+        "field": field,
+        "cases": len(cases),
+        "ops_per_sec": ops_per_sec,
+        "mismatches": len(wrong),
+        "examples": wrong[:MAX_EXAMPLES],
+        "alloc": alloc,
+        "alloc_unit": alloc_unit,
+        "baseline": baseline,
+    }
+
+
+def _peak_kib(run: Callable[[], object]) -> float:
+    """Peak traced memory while run() executes, in KiB"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(peak - base, 0) / 1024
+
+
+def bench_scalar(fn: Callable[[str], object], values: List[str],
+                 min_time: float = DEFAULT_MIN_TIME) -> Dict:
+    """Call fn once per value, repeating passes until min_time has elapsed"""
+    answers = [fn(v) for v in values]
+    passes = 0
+    started = time.perf_counter()
+    while True:
+        for v in values:
+            fn(v)
+        passes += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+
+    def one_pass():
+        for v in values:
+            fn(v)
+
+    peak = _peak_kib(one_pass)
+    return {"answers": answers, "ops_per_sec": passes * len(values) / elapsed, "alloc": peak}
+
+
+def bench_batch(fn: Callable[[List[str]], List[bool]], values: List[str],
+                min_time: float = DEFAULT_MIN_TIME) -> Dict:
+    """Call fn on the whole column, repeating until min_time has elapsed"""
+    answers = fn(values)
+    passes = 0
+    started = time.perf_counter()
+    while True:
+        fn(values)
+        passes += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+    peak = _peak_kib(lambda: fn(values))
+    return {"answers": answers, "ops_per_sec": passes * len(values) / elapsed, "alloc": peak}
+
+
+def python_implementations(field: str, schema_path: str = DEFAULT_SCHEMA_PATH) -> Dict[str, Dict]:
+    """{name: {"scalar" or "batch": callable}} for every Python validator of field"""
+    rule = load_schema(schema_path).rules[field]
+    fullmatch = re.compile(rule.pattern, re.ASCII).fullmatch
+    cache = ValidationCache(schema_path=schema_path)
+    cache.sync(load_schema(schema_path).version)
+
+    impls: Dict[str, Dict] = {
+        "re.fullmatch": {"scalar": lambda v: fullmatch(v) is not None},
+        "FieldRule": {"scalar": lambda v: rule.validate(v, False) is None},
+        "ValidationCache": {"scalar": lambda v: cache.lookup(rule, v, False) is None},
+    }
+    try:
+        from .vectorized import FIXED_WIDTH_FIELDS, validate_column
+    except ImportError:
+        return impls
+    if field in FIXED_WIDTH_FIELDS:
+        impls["vectorized"] = {
+            "batch": lambda values: validate_column(values, field, schema_path=schema_path,
+                                                    checksum=False).mask.tolist()
+        }
+    return impls
+
+
+def run_python(corpus: Dict, min_time: float = DEFAULT_MIN_TIME,
+               schema_path: str = DEFAULT_SCHEMA_PATH) -> List[Dict]:
+    results = []
+    for field, entry in corpus["fields"].items():
+        cases = [tuple(case) for case in entry["cases"]]
+        values = [value for value, _ in cases]
+        for name, impl in python_implementations(field, schema_path).items():
+            if "batch" in impl:
+                stats = bench_batch(impl["batch"], values, min_time)
+            else:
+                stats = bench_scalar(impl["scalar"], values, min_time)
+            results.append(_result("python", name, field, cases, stats["answers"],
+                                   stats["ops_per_sec"], stats["alloc"], "peak KiB",
+                                   baseline=name in BASELINES))
+    return results
+
+
+def run_js(corpus_path: str, min_time: float = DEFAULT_MIN_TIME, node: str = "node") -> List[Dict]:
+    """Run scripts/validator-bench.js over the corpus file and return its results"""
+    if shutil.which(node) is None:
+        raise RuntimeError(f"{node} not found on PATH")
+    env = dict(os.environ)
+    # The mock OTP shortcut would make '1234' valid in the API chain
+    env.pop("OTPMOCK", None)
+    env.pop("OTP_MOCK", None)
+    proc = subprocess.run(
+        [node, "--expose-gc", "--max-semi-space-size=64", JS_BENCH, corpus_path,
+         "--min-time", str(min_time)],
+        capture_output=True, text=True, env=env, cwd=codegen.REPO_ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"{JS_BENCH} exited with {proc.returncode}")
+    return json.loads(proc.stdout)
+
+
+def format_report(corpus: Dict, results: List[Dict]) -> str:
+    lines = []
+    for field, entry in corpus["fields"].items():
+        lines.append(f"📊 {field} ({len(entry['cases']):,} cases, {entry['pattern']})")
+        for r in results:
+            if r["field"] != field:
+                continue
+            label = f"{r['language']:<7} {r['implementation']:<18}"
+            if r.get("baseline"):
+                label = f"{r['language']:<7} {r['implementation'] + ' (ref)':<18}"
+            if r.get("skipped"):
+                lines.append(f"   {label} skipped: {r['skipped']}")
+                continue
+            status = "✅" if r["mismatches"] == 0 else ("⚠️ " if r.get("baseline") else "❌")
+            lines.append(
+                f"   {label} {r['ops_per_sec']:>14,.0f} ops/s  {status} {r['mismatches']:>5} mismatches"
+                f"  {r['alloc']:>10,.1f} {r['alloc_unit']}"
+            )
+            for value in r["examples"]:
+                lines.append(f"      {value!r}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.bench",
+        description="Cross-language validator conformance and micro-benchmarks",
+    )
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Cases per field")
+    parser.add_argument("--seed", type=int, default=codegen.CORPUS_SEED, help="Corpus seed")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="Seconds to spend timing each implementation")
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_PATH, help="Path to udyam_form_schema.json")
+    parser.add_argument("--no-js", action="store_true", help="Skip the Node.js implementations")
+    parser.add_argument("--node", default="node", help="Node.js binary")
+    parser.add_argument("--corpus-out", help="Also save the generated corpus here")
+    parser.add_argument("--json", help="Write results as JSON here")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.size, args.seed, args.schema)
+    results = run_python(corpus, args.min_time, args.schema)
+
+    if not args.no_js:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus_path = args.corpus_out or os.path.join(tmp, "corpus.json")
+            with open(corpus_path, "w", encoding="utf-8") as f:
+                json.dump(corpus, f)
+            try:
+                results += run_js(corpus_path, args.min_time, args.node)
+            except RuntimeError as e:
+                print(f"⚠️  JS benchmarks skipped: {e}", file=sys.stderr)
+    elif args.corpus_out:
+        with open(args.corpus_out, "w", encoding="utf-8") as f:
+            json.dump(corpus, f)
+
+    print(format_report(corpus, results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"schema_version": corpus["schema_version"], "seed": corpus["seed"],
+                       "results": results}, f, indent=2)
+
+    mismatched = sum(r.get("mismatches", 0) for r in results if not r.get("baseline"))
+    if mismatched:
+        print(f"❌ {mismatched:,} disagreements with the schema patterns", file=sys.stderr)
+        return 1
+    print(f"✅ All {len(results)} runs agree with the schema patterns", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""
+Streaming bulk validator for CSV/NDJSON partner uploads
+Reads records in chunks, validates them in a process pool and writes accepted/rejected files
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import ValidationCache
+from .schema import DEFAULT_SCHEMA_PATH, FieldError, load_schema
+
+DEFAULT_CHUNK_SIZE = 20_000
+
+# Field each consistency rule reports against
+CONSISTENCY_FIELDS = {
+    "pan_entity_char": "pan_number",
+    "pan_org_type": "pan_number",
+    "gstin_embeds_pan": "gstin",
+    "gstin_state_code": "gstin",
+}
+
+CONSISTENCY_MESSAGES = {
+    "pan_entity_char": "PAN fourth character is not a known holder type",
+    "pan_org_type": "PAN fourth character doesn't match the selected organization type",
+    "gstin_embeds_pan": "GSTIN does not contain the PAN",
+    "gstin_state_code": "GSTIN state code is unknown",
+}
+
+
+def detect_format(path: str) -> str:
+    """Guess csv/ndjson from the file extension"""
+    lower = path.lower()
+    if lower.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_records(stream, fmt: str) -> Iterator[str]:
+    """
+    Yield raw records (with line endings) from a text stream.
+
+    CSV records may span lines inside quoted fields, so lines are joined until
+    the record holds an even number of quote characters.
+    """
+    if fmt == "ndjson":
+        for line in stream:
+            if line.strip():
+                yield line
+        return
+
+    pending = ""
+    for line in stream:
+        pending += line
+        if pending.count('"') % 2 == 0:
+            if pending.strip():
+                yield pending
+            pending = ""
+    if pending.strip():
+        yield pending
+
+
+def iter_chunks(records: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Group records into lists of at most size items"""
+    chunk: List[str] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _chain_first(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+class ChunkValidator:
+    """Validates one chunk of raw records; one instance lives in each worker process"""
+
+    def __init__(self, fmt: str, header: Optional[List[str]], fields: Optional[List[str]],
+                 checksums: bool = True, consistency: bool = False,
+                 schema_path: str = DEFAULT_SCHEMA_PATH, expected: Optional[List[str]] = None):
+        self.fmt = fmt
+        self.header = header
+        self.checksums = checksums
+        self.consistency = consistency
+        schema = load_schema(schema_path)
+        self.schema = schema
+        # fields=None (NDJSON without --fields): each record is checked on the schema fields it
+        # has plus `expected`, the fields of the file's first record, like the columns of a CSV
+        self.rules = schema.select(fields) if fields is not None else None
+        self.expected = frozenset(expected or ())
+        self.rules_by_keys: Dict[frozenset, List] = {}
+        self.schema_path = schema_path
+        # Partner files repeat the same PANs/GSTINs across many rows
+        self.cache = ValidationCache(schema_path=schema_path)
+        self.cache.sync(schema.version)
+
+    def parse(self, records: List[str]) -> List[Optional[Dict]]:
+        """Parse raw records into dicts (None for unparseable records)"""
+        rows: List[Optional[Dict]] = []
+        if self.fmt == "ndjson":
+            for record in records:
+                try:
+                    value = json.loads(record)
+                except ValueError:
+                    value = None
+                rows.append(value if isinstance(value, dict) else None)
+            return rows
+        header = self.header
+        for values in csv.reader(io.StringIO("".join(records), newline="")):
+            rows.append(dict(zip(header, values)) if len(values) == len(header) else None)
+        return rows
+
+    def rules_for(self, row: Dict) -> List:
+        """Rules that apply to row; per distinct key set when no field list was given"""
+        if self.rules is not None:
+            return self.rules
+        keys = frozenset(row)
+        rules = self.rules_by_keys.get(keys)
+        if rules is None:
+            wanted = keys | self.expected
+            rules = [rule for name, rule in self.schema.rules.items() if name in wanted]
+            self.rules_by_keys[keys] = rules
+        return rules
+
+    def validate(self, rows: List[Optional[Dict]]) -> List[List[FieldError]]:
+        results = []
+        checksums = self.checksums
+        lookup = self.cache.lookup
+        for row in rows:
+            if row is None:
+                results.append([FieldError("_record", "parse", "Record could not be parsed")])
+                continue
+            errors = []
+            for rule in self.rules_for(row):
+                error = lookup(rule, row.get(rule.name), checksums)
+                if error is not None:
+                    errors.append(error)
+            results.append(errors)
+
+        if self.consistency:
+            from .consistency import check_consistency
+
+            report = check_consistency([row or {} for row in rows], self.schema_path)
+            for rule, failed in report.failed.items():
+                for index in failed.nonzero()[0]:
+                    results[index].append(
+                        FieldError(CONSISTENCY_FIELDS[rule], rule, CONSISTENCY_MESSAGES[rule])
+                    )
+        return results
+
+    def format_reject(self, record: str, errors: List[FieldError]) -> str:
+        if self.fmt == "ndjson":
+            try:
+                value = json.loads(record)
+            except ValueError:
+                value = {"_raw": record.rstrip("\r\n")}
+            if not isinstance(value, dict):
+                value = {"_raw": value}
+            value["errors"] = [e._asdict() for e in errors]
+            return json.dumps(value, ensure_ascii=False) + "\n"
+        reasons = ";".join(f"{e.field}:{e.code}" for e in errors)
+        return record.rstrip("\r\n") + ',"' + reasons.replace('"', '""') + '"\n'
+
+    def __call__(self, records: List[str]) -> Tuple[str, str, int, int, Counter]:
+        """Return (accepted text, rejected text, rows, rejected rows, error counts)"""
+        results = self.validate(self.parse(records))
+        if len(results) != len(records):
+            # The quote-balancing splitter and csv.reader disagreed; treat the
+            # whole chunk as one parse failure per record rather than misalign
+            results = [[FieldError("_record", "parse", "Record could not be parsed")]] * len(records)
+        accepted, rejected = [], []
+        codes: Counter = Counter()
+        for record, errors in zip(records, results):
+            if errors:
+                rejected.append(self.format_reject(record, errors))
+                codes.update(f"{e.field}:{e.code}" for e in errors)
+            else:
+                accepted.append(record if record.endswith("\n") else record + "\n")
+        return "".join(accepted), "".join(rejected), len(records), len(rejected), codes
+
+
+_worker: Optional[ChunkValidator] = None
+
+
+def _init_worker(*args):
+    global _worker
+    _worker = ChunkValidator(*args)
+
+
+def _run_chunk(records: List[str]):
+    return _worker(records)
+
+
+def _open_input(path: str):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _open_output(path: Optional[str]):
+    if path is None:
+        return None
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def validate_file(input_path: str, accepted_path: Optional[str], rejects_path: Optional[str],
+                  fmt: Optional[str] = None, fields: Optional[List[str]] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None,
+                  checksums: bool = True, consistency: bool = False,
+                  schema_path: str = DEFAULT_SCHEMA_PATH, progress: bool = False) -> Dict:
+    """
+    Stream input_path through the validators and write accepted/rejected records.
+
+    At most 2 * workers chunks are in flight at any time, so memory stays
+    bounded by chunk_size regardless of the file size. Output keeps input order.
+    """
+    fmt = fmt or detect_format(input_path)
+    workers = workers or os.cpu_count() or 1
+    schema = load_schema(schema_path)
+    started = time.perf_counter()
+
+    source = _open_input(input_path)
+    accepted_out = _open_output(accepted_path)
+    rejects_out = _open_output(rejects_path)
+    try:
+        records = iter_records(source, fmt)
+        header = None
+        if fmt == "csv":
+            header_line = next(records, None)
+            if header_line is None:
+                raise ValueError(f"{input_path}: empty CSV input")
+            header = next(csv.reader([header_line]))
+            present = header
+        else:
+            first = next(records, None)
+            present = []
+            if first is not None:
+                try:
+                    value = json.loads(first)
+                except ValueError:
+                    value = None
+                if isinstance(value, dict):
+                    present = list(value)
+                records = _chain_first(first, records)
+
+        if fields is None and (header is not None or present):
+            missing = [name for name, rule in schema.rules.items()
+                       if rule.required and name not in present]
+            if missing:
+                raise ValueError(f"{input_path}: missing required fields {', '.join(missing)} "
+                                 "(pass --fields to validate a subset)")
+        if header is not None:
+            if accepted_out:
+                accepted_out.write(header_line if header_line.endswith("\n") else header_line + "\n")
+            if rejects_out:
+                rejects_out.write(header_line.rstrip("\r\n") + ",errors\n")
+
+        expected = [name for name in schema.rules if name in present]
+        if fields is None and fmt == "csv":
+            fields = expected
+        validator_args = (fmt, header, fields, checksums, consistency, schema_path, expected)
+
+        stats = {"rows": 0, "accepted": 0, "rejected": 0, "errors": Counter()}
+
+        def collect(result):
+            accepted_text, rejected_text, rows, rejected, codes = result
+            if accepted_out and accepted_text:
+                accepted_out.write(accepted_text)
+            if rejects_out and rejected_text:
+                rejects_out.write(rejected_text)
+            stats["rows"] += rows
+            stats["rejected"] += rejected
+            stats["accepted"] += rows - rejected
+            stats["errors"].update(codes)
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"  {stats['rows']:,} rows, {stats['rows'] / elapsed:,.0f} rows/sec",
+                      file=sys.stderr)
+
+        chunks = iter_chunks(records, chunk_size)
+        if workers == 1:
+            validator = ChunkValidator(*validator_args)
+            for chunk in chunks:
+                collect(validator(chunk))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=validator_args) as pool:
+                in_flight: deque = deque()
+                for chunk in chunks:
+                    in_flight.append(pool.submit(_run_chunk, chunk))
+                    if len(in_flight) >= workers * 2:
+                        collect(in_flight.popleft().result())
+                while in_flight:
+                    collect(in_flight.popleft().result())
+    finally:
+        if input_path != "-":
+            source.close()
+        for out in (accepted_out, rejects_out):
+            if out is not None and out is not sys.stdout:
+                out.close()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    stats["rows_per_sec"] = stats["rows"] / elapsed if elapsed else 0.0
+    # For NDJSON without --fields, the fields of the first record; later records may add more
+    stats["fields"] = fields if fields is not None else expected
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m validators",
+        description="Validate CSV/NDJSON registration uploads against udyam_form_schema.json",
+    )
+    parser.add_argument("input", help="Input file ('-' for stdin)")
+    parser.add_argument("--accepted", help="Write valid records here")
+    parser.add_argument("--rejects", help="Write invalid records with their errors here")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from extension)")
+    parser.add_argument("--fields", help="Comma-separated fields to validate (default: all schema fields present; required ones must be)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per work unit")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-checksums", action="store_true", help="Skip Aadhaar/GSTIN check-digit tests")
+    parser.add_argument("--consistency", action="store_true",
+                        help="Also run PAN/GSTIN/organisation-type consistency rules (needs numpy)")
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_PATH, help="Path to udyam_form_schema.json")
+    parser.add_argument("--progress", action="store_true", help="Print throughput after every chunk")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    fields = [f.strip() for f in args.fields.split(",")] if args.fields else None
+    try:
+        stats = validate_file(
+            args.input, args.accepted, args.rejects,
+            fmt=args.format, fields=fields, chunk_size=args.chunk_size, workers=args.workers,
+            checksums=not args.no_checksums, consistency=args.consistency,
+            schema_path=args.schema, progress=args.progress,
+        )
+    except ValueError as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    print(f"✅ Validated {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)", file=sys.stderr)
+    print(f"📄 Accepted: {stats['accepted']:,}  Rejected: {stats['rejected']:,}", file=sys.stderr)
+    for code, count in stats["errors"].most_common():
+        print(f"   {code}: {count:,}", file=sys.stderr)
+    return 0
@@ -0,0 +1,103 @@
+"""
+Memoized field validation
+Bounded LRU of validation results keyed by (field, value), dropped when the schema version changes
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .schema import DEFAULT_SCHEMA_PATH, FieldError, load_schema
+
+DEFAULT_MAX_ENTRIES = 100_000
+# Longer values are validated but never cached, so junk input can't crowd out real keys
+MAX_CACHED_VALUE_LENGTH = 64
+
+_MISSING = object()
+
+
+class ValidationCache:
+    """LRU memo of FieldRule results with hit/miss counters"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_ENTRIES, schema_path: str = DEFAULT_SCHEMA_PATH):
+        self.maxsize = maxsize
+        self.schema_path = schema_path
+        self.version: Optional[str] = None
+        self.entries: "OrderedDict[tuple, Optional[FieldError]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def sync(self, version: str):
+        """Clear the cache if it was filled under a different schema version"""
+        if version != self.version:
+            if self.version is not None:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = version
+
+    def validate(self, field: str, value, checksum: bool = True) -> Optional[FieldError]:
+        """Memoized FieldRule.validate for one field of the current schema"""
+        schema = load_schema(self.schema_path)
+        self.sync(schema.version)
+        return self.lookup(schema.rules[field], value, checksum)
+
+    def lookup(self, rule, value, checksum: bool = True) -> Optional[FieldError]:
+        """Memoized rule.validate; the caller is responsible for calling sync()"""
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        if value is not None and len(value) > MAX_CACHED_VALUE_LENGTH:
+            self.misses += 1
+            return rule.validate(value, checksum)
+
+        key = (rule.name, value, checksum)
+        entries = self.entries
+        result = entries.get(key, _MISSING)
+        if result is not _MISSING:
+            entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = rule.validate(value, checksum)
+        entries[key] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __repr__(self):
+        stats = self.stats()
+        return f"ValidationCache(size={stats['size']}, hit_rate={stats['hit_rate']:.2%})"
+
+
+_default_cache: Optional[ValidationCache] = None
+
+
+def default_cache() -> ValidationCache:
+    """Process-wide cache used by validate_field"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ValidationCache()
+    return _default_cache
+
+
+def validate_field(field: str, value, checksum: bool = True) -> Optional[FieldError]:
+    """Validate a single field value through the process-wide memo"""
+    return default_cache().validate(field, value, checksum)
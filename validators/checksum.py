@@ -0,0 +1,124 @@
+"""
+Check-digit validation for Aadhaar (Verhoeff) and GSTIN (mod 36)
+Scalar functions plus NumPy batch versions driven by the same lookup tables
+"""
+
+from typing import Callable, Dict
+
+# Verhoeff dihedral group D5 multiplication table
+VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8),
+    (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2),
+    (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0),
+)
+
+# Verhoeff position permutation table (row = position mod 8)
+VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 7, 2),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0),
+    (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5),
+    (7, 0, 4, 6, 9, 1, 3, 2, 5, 8),
+)
+
+VERHOEFF_INV = (0, 4, 3, 2, 1, 5, 6, 7, 8, 9)
+
+GSTIN_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+GSTIN_VALUES = {ch: i for i, ch in enumerate(GSTIN_CHARSET)}
+
+
+def verhoeff_digit(digits: str) -> str:
+    """Return the Verhoeff check digit to append to digits"""
+    c = 0
+    for i, ch in enumerate(reversed(digits)):
+        c = VERHOEFF_D[c][VERHOEFF_P[(i + 1) % 8][ord(ch) - 48]]
+    return str(VERHOEFF_INV[c])
+
+
+def verhoeff_valid(number: str) -> bool:
+    """True if number (digits only) ends in a correct Verhoeff check digit"""
+    if not number or not number.isascii() or not number.isdigit():
+        return False
+    c = 0
+    for i, ch in enumerate(reversed(number)):
+        c = VERHOEFF_D[c][VERHOEFF_P[i % 8][ord(ch) - 48]]
+    return c == 0
+
+
+def gstin_check_char(body: str) -> str:
+    """Return the mod-36 check character for the first 14 GSTIN characters"""
+    total = 0
+    for i, ch in enumerate(body[:14]):
+        product = GSTIN_VALUES[ch] * (2 if i % 2 else 1)
+        total += product // 36 + product % 36
+    return GSTIN_CHARSET[(36 - total % 36) % 36]
+
+
+def gstin_checksum_valid(gstin: str) -> bool:
+    """True if the 15th GSTIN character matches the mod-36 check character"""
+    if len(gstin) != 15:
+        return False
+    try:
+        return gstin_check_char(gstin) == gstin[14]
+    except KeyError:
+        return False
+
+
+# Checksum functions applied by the schema validators, keyed by field name
+FIELD_CHECKSUMS: Dict[str, Callable[[str], bool]] = {
+    "aadhaar_number": verhoeff_valid,
+    "gstin": gstin_checksum_valid,
+}
+
+
+def verhoeff_valid_batch(matrix):
+    """
+    Vectorized Verhoeff validation.
+
+    matrix is a (rows, n) uint8 array of ASCII digits, such as the matrix built
+    by validators.vectorized. Rows holding non-digits give meaningless results
+    and must be masked out by the caller.
+    """
+    import numpy as np
+
+    d = np.array(VERHOEFF_D, dtype=np.uint8)
+    p = np.array(VERHOEFF_P, dtype=np.uint8)
+    digits = np.minimum(matrix - np.uint8(48), np.uint8(9))
+    width = digits.shape[1]
+    c = np.zeros(len(digits), dtype=np.uint8)
+    for i in range(width):
+        c = d[c, p[i % 8][digits[:, width - 1 - i]]]
+    return c == 0
+
+
+def gstin_checksum_valid_batch(matrix):
+    """
+    Vectorized GSTIN check-character validation.
+
+    matrix is a (rows, >=15) uint8 array of upper-case ASCII GSTIN characters.
+    """
+    import numpy as np
+
+    values = np.zeros(256, dtype=np.int32)
+    for ch, v in GSTIN_VALUES.items():
+        values[ord(ch)] = v
+    codes = values[matrix[:, :15]]
+    products = codes[:, :14] * np.tile(np.array([1, 2], dtype=np.int32), 7)
+    total = (products // 36 + products % 36).sum(axis=1)
+    return (36 - total % 36) % 36 == codes[:, 14]
+
+
+BATCH_CHECKSUMS = {
+    "aadhaar_number": verhoeff_valid_batch,
+    "gstin": gstin_checksum_valid_batch,
+}
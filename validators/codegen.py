@@ -0,0 +1,380 @@
+"""
+Validator code generator
+Emits regex-free JS pattern checkers, SQL CHECK expressions and a conformance corpus from udyam_form_schema.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .compiler import UnsupportedPattern, _runs, expand_positions, parse_pattern
+from .schema import DEFAULT_SCHEMA_PATH, CompiledSchema, load_schema
+
+REPO_ROOT = os.path.dirname(DEFAULT_SCHEMA_PATH)
+
+JS_OUTPUT = os.path.join("utils", "generatedValidators.js")
+SQL_OUTPUT = "database_checks.sql"
+CORPUS_OUTPUT = "validation_corpus.json"
+SCHEMA_SQL = "database_schema.sql"
+
+# field -> (table, column, constraint name, column allows NULL)
+SQL_CONSTRAINTS = {
+    "aadhaar_number": ("registrations", "aadhaar_number", "valid_aadhaar", False),
+    "pan_number": ("registrations", "pan_number", "valid_pan", True),
+    "gstin": ("registrations", "gstin", "valid_gstin", True),
+    "otp": ("otp_verifications", "otp", "valid_otp", False),
+}
+
+# Characters substituted into valid values to build invalid corpus cases
+PROBE_CHARS = "09AZaz .-_\t\u00a0०０é"
+CORPUS_SEED = 20240
+CORPUS_VALID_SAMPLES = 25
+
+Run = Tuple[int, int, str]
+
+
+class FieldSpec:
+    """One schema field with a pattern, parsed for code generation"""
+
+    __slots__ = ("name", "pattern", "segments", "positions", "runs")
+
+    def __init__(self, name: str, pattern: str):
+        self.name = name
+        self.pattern = pattern
+        try:
+            self.segments = parse_pattern(pattern)
+        except (UnsupportedPattern, ValueError, IndexError):
+            self.segments = None
+        self.positions = expand_positions(self.segments) if self.segments else None
+        self.runs: Optional[List[Run]] = _runs(self.positions) if self.positions else None
+
+    @property
+    def variable_run(self) -> Optional[Tuple[str, int, Optional[int]]]:
+        """(charset, min, max) for a single variable-length class, else None"""
+        if self.positions is None and self.segments and len(self.segments) == 1:
+            return self.segments[0]
+        return None
+
+    @property
+    def js_name(self) -> str:
+        return "is" + "".join(part.capitalize() for part in self.name.split("_"))
+
+
+def field_specs(schema: CompiledSchema) -> List[FieldSpec]:
+    """Fields that carry a pattern, in schema order"""
+    return [FieldSpec(name, rule.pattern) for name, rule in schema.rules.items() if rule.pattern]
+
+
+def _ranges(chars: str) -> List[Tuple[int, int]]:
+    """Collapse a charset into sorted inclusive code point ranges"""
+    ranges: List[Tuple[int, int]] = []
+    for code in sorted(set(map(ord, chars))):
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+    return ranges
+
+
+def _describe(chars: str) -> str:
+    """Human-readable [..] form of a charset for comments"""
+    parts = []
+    for lo, hi in _ranges(chars):
+        a, b = chr(lo).encode("unicode_escape").decode(), chr(hi).encode("unicode_escape").decode()
+        parts.append(a if lo == hi else f"{a}-{b}")
+    return "[" + "".join(parts) + "]"
+
+
+def _header(comment: str, schema: CompiledSchema) -> List[str]:
+    return [
+        f"{comment} Generated by `python -m validators.codegen` from udyam_form_schema.json",
+        f"{comment} (schema version {schema.version}). Do not edit by hand; rerun the generator.",
+    ]
+
+
+# JavaScript
+
+def _js_miss(chars: str) -> str:
+    """JS condition that is true when char code c is NOT in chars"""
+    ranges = _ranges(chars)
+    if len(ranges) == 1:
+        lo, hi = ranges[0]
+        return f"c !== {lo}" if lo == hi else f"c < {lo} || c > {hi}"
+    parts = [f"c === {lo}" if lo == hi else f"(c >= {lo} && c <= {hi})" for lo, hi in ranges]
+    return "!(" + " || ".join(parts) + ")"
+
+
+def render_js(specs: List[FieldSpec], schema: CompiledSchema) -> str:
+    out = _header("//", schema) + [""]
+    out.append(f"const SCHEMA_VERSION = '{schema.version}';")
+    out.append("")
+
+    # Variable-length classes with several ranges are checked through a
+    # 128-entry lookup table; one load per character beats a chain of compares
+    tables: Dict[str, str] = {}
+    for spec in specs:
+        run = spec.variable_run
+        if run is not None and len(_ranges(run[0])) > 1 and max(map(ord, run[0])) < 128:
+            tables[run[0]] = f"CLASS_{len(tables)}"
+    if tables:
+        out.append("function charTable(chars) {")
+        out.append("  const table = new Uint8Array(128);")
+        out.append("  for (let i = 0; i < chars.length; i++) table[chars.charCodeAt(i)] = 1;")
+        out.append("  return table;")
+        out.append("}")
+        out.append("")
+        for chars, name in tables.items():
+            out.append(f"const {name} = charTable({json.dumps(chars)}); // {_describe(chars)}")
+        out.append("")
+
+    for spec in specs:
+        out.append(f"// {spec.name}: {spec.pattern}")
+        out.append(f"function {spec.js_name}(value) {{")
+        if spec.runs is not None:
+            out.append(f"  if (typeof value !== 'string' || value.length !== {len(spec.positions)}) return false;")
+            out.append("  let c;")
+            for start, end, chars in spec.runs:
+                if end - start == 1:
+                    out.append(f"  c = value.charCodeAt({start});")
+                    out.append(f"  if ({_js_miss(chars)}) return false;")
+                else:
+                    out.append(f"  for (let i = {start}; i < {end}; i++) {{")
+                    out.append("    c = value.charCodeAt(i);")
+                    out.append(f"    if ({_js_miss(chars)}) return false;")
+                    out.append("  }")
+            out.append("  return true;")
+        elif spec.variable_run is not None:
+            chars, lo, hi = spec.variable_run
+            length = f"value.length < {lo}" + (f" || value.length > {hi}" if hi is not None else "")
+            out.append(f"  if (typeof value !== 'string' || {length}) return false;")
+            out.append("  for (let i = 0; i < value.length; i++) {")
+            out.append("    const c = value.charCodeAt(i);")
+            miss = f"c > 127 || {tables[chars]}[c] === 0" if chars in tables else _js_miss(chars)
+            out.append(f"    if ({miss}) return false;")
+            out.append("  }")
+            out.append("  return true;")
+        else:
+            out.append(f"  return typeof value === 'string' && {_js_regex(spec.pattern)}.test(value);")
+        out.append("}")
+        out.append("")
+    out.append("const PATTERNS = {")
+    out += [f"  {spec.name}: {json.dumps(spec.pattern)}," for spec in specs]
+    out.append("};")
+    out.append("")
+    out.append("const patternChecks = {")
+    out += [f"  {spec.name}: {spec.js_name}," for spec in specs]
+    out.append("};")
+    out.append("")
+    out.append("module.exports = {")
+    out += [f"  {spec.js_name}," for spec in specs]
+    out += ["  PATTERNS,", "  patternChecks,", "  SCHEMA_VERSION,", "};", ""]
+    return "\n".join(out)
+
+
+def _js_regex(pattern: str) -> str:
+    return "/" + pattern.replace("/", "\\/") + "/"
+
+
+# SQL
+
+def sql_check(spec: FieldSpec) -> Optional[str]:
+    """CHECK expression for a field's database column, or None if it has none"""
+    target = SQL_CONSTRAINTS.get(spec.name)
+    if target is None:
+        return None
+    _, column, _, nullable = target
+    match = f"{column} ~ '{spec.pattern.replace(chr(39), chr(39) * 2)}'"
+    return f"{column} IS NULL OR {match}" if nullable else match
+
+
+def render_sql(specs: List[FieldSpec], schema: CompiledSchema) -> str:
+    out = _header("--", schema)
+    out.append("-- Re-applies the column CHECK constraints; safe to run more than once.")
+    out.append("-- Each constraint is swapped in NOT VALID, which needs the table lock only for a catalog")
+    out.append("-- change; VALIDATE then scans the existing rows without blocking reads or writes.")
+    for spec in specs:
+        expression = sql_check(spec)
+        if expression is None:
+            continue
+        table, _, constraint, _ = SQL_CONSTRAINTS[spec.name]
+        out.append("")
+        out.append("BEGIN;")
+        out.append(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint};")
+        out.append(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({expression}) NOT VALID;")
+        out.append("COMMIT;")
+        out.append(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint};")
+    out.append("")
+    return "\n".join(out)
+
+
+def schema_sql_drift(specs: List[FieldSpec], sql_text: str) -> List[str]:
+    """Constraints in database_schema.sql whose CHECK differs from the schema pattern"""
+    drift = []
+    for spec in specs:
+        expression = sql_check(spec)
+        if expression is None:
+            continue
+        constraint = SQL_CONSTRAINTS[spec.name][2]
+        if f"CONSTRAINT {constraint} CHECK ({expression})" not in sql_text:
+            drift.append(constraint)
+    return drift
+
+
+# Conformance corpus
+
+def expected(spec: FieldSpec, value: str) -> bool:
+    """Reference answer: the schema regex with ASCII classes, matched in full"""
+    return re.fullmatch(spec.pattern, value, re.ASCII) is not None
+
+
+def sample_value(rng: random.Random, spec: FieldSpec) -> str:
+    """A random value that matches spec's pattern"""
+    if spec.positions is not None:
+        return "".join(rng.choice(chars) for chars in spec.positions)
+    if spec.variable_run is not None:
+        chars, lo, hi = spec.variable_run
+        return "".join(rng.choice(chars) for _ in range(rng.randint(max(lo, 1), hi or lo + 30)))
+    return ""
+
+
+def corpus_cases(spec: FieldSpec, seed: int = CORPUS_SEED) -> List[Tuple[str, bool]]:
+    """Valid samples plus single-character, length and padding mutations"""
+    rng = random.Random(f"{seed}:{spec.name}")
+    valid = [sample_value(rng, spec) for _ in range(CORPUS_VALID_SAMPLES)]
+    values = list(valid) + ["", " ", "\n"]
+    base = valid[0] if valid else ""
+    for i in range(len(base)):
+        for probe in PROBE_CHARS:
+            values.append(base[:i] + probe + base[i + 1:])
+    for value in valid[:5]:
+        values += [
+            value[:-1], value + value[-1:], value[1:],
+            " " + value, value + " ", value + "\n", value.lower(), value.upper(),
+        ]
+    values.append(base * 10)
+
+    seen = set()
+    cases = []
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            cases.append((value, expected(spec, value)))
+    return cases
+
+
+def build_corpus(specs: List[FieldSpec], schema: CompiledSchema) -> Dict:
+    return {
+        "schema_version": schema.version,
+        "fields": {
+            spec.name: {"pattern": spec.pattern, "cases": corpus_cases(spec)}
+            for spec in specs
+        },
+    }
+
+
+def render_corpus(corpus: Dict) -> str:
+    """JSON with one case per line, so diffs stay readable"""
+    lines = ["{", f'  "schema_version": {json.dumps(corpus["schema_version"])},', '  "fields": {']
+    fields = list(corpus["fields"].items())
+    for i, (field, entry) in enumerate(fields):
+        lines.append(f"    {json.dumps(field)}: {{")
+        lines.append(f'      "pattern": {json.dumps(entry["pattern"])},')
+        lines.append('      "cases": [')
+        cases = entry["cases"]
+        for j, case in enumerate(cases):
+            lines.append("        " + json.dumps(list(case)) + ("," if j < len(cases) - 1 else ""))
+        lines.append("      ]")
+        lines.append("    }" + ("," if i < len(fields) - 1 else ""))
+    lines += ["  }", "}", ""]
+    return "\n".join(lines)
+
+
+def check_corpus(corpus: Dict, checks: Dict[str, Callable[[str], bool]]) -> List[Tuple[str, str, bool]]:
+    """Run checkers over the corpus and return (field, value, expected) mismatches"""
+    mismatches = []
+    for field, entry in corpus["fields"].items():
+        check = checks.get(field)
+        if check is None:
+            continue
+        for value, want in entry["cases"]:
+            if bool(check(value)) != want:
+                mismatches.append((field, value, want))
+    return mismatches
+
+
+def generate(schema_path: str = DEFAULT_SCHEMA_PATH) -> Dict[str, str]:
+    """Return {relative output path: file contents}"""
+    schema = load_schema(schema_path)
+    specs = field_specs(schema)
+    return {
+        JS_OUTPUT: render_js(specs, schema),
+        SQL_OUTPUT: render_sql(specs, schema),
+        CORPUS_OUTPUT: render_corpus(build_corpus(specs, schema)),
+    }
+
+
+def runtime_checks(schema: CompiledSchema) -> Dict[str, Callable[[str], bool]]:
+    """The compiled checkers validators.schema uses, keyed by field"""
+    return {name: rule.check for name, rule in schema.rules.items() if rule.check is not None}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.codegen",
+        description="Generate validators, SQL checks and the conformance corpus from udyam_form_schema.json",
+    )
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_PATH, help="Path to udyam_form_schema.json")
+    parser.add_argument("--root", default=REPO_ROOT, help="Repository root to write into")
+    parser.add_argument("--check", action="store_true",
+                        help="Don't write; fail if generated files or database_schema.sql are out of date")
+    args = parser.parse_args(argv)
+
+    outputs = generate(args.schema)
+    schema = load_schema(args.schema)
+    specs = field_specs(schema)
+
+    corpus = json.loads(outputs[CORPUS_OUTPUT])
+    mismatches = check_corpus(corpus, runtime_checks(schema))
+    for field, value, want in mismatches[:20]:
+        print(f"❌ {field}: {value!r} should be {'valid' if want else 'invalid'}", file=sys.stderr)
+    if mismatches:
+        print(f"❌ validators.compiler disagrees with the corpus on {len(mismatches)} cases", file=sys.stderr)
+        return 1
+
+    failed = False
+    schema_sql = os.path.join(args.root, SCHEMA_SQL)
+    if os.path.exists(schema_sql):
+        with open(schema_sql, encoding="utf-8") as f:
+            drift = schema_sql_drift(specs, f.read())
+        for constraint in drift:
+            print(f"⚠️  {SCHEMA_SQL}: {constraint} doesn't match the schema pattern", file=sys.stderr)
+        failed = bool(drift)
+
+    for relative, text in outputs.items():
+        path = os.path.join(args.root, relative)
+        current = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8", newline="") as f:
+                current = f.read()
+        if current == text:
+            continue
+        if args.check:
+            print(f"⚠️  {relative} is out of date", file=sys.stderr)
+            failed = True
+        else:
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(text)
+            print(f"✅ Wrote {relative}", file=sys.stderr)
+
+    cases = sum(len(entry["cases"]) for entry in corpus["fields"].values())
+    print(f"📄 {len(specs)} fields, {cases} corpus cases, schema version {schema.version}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
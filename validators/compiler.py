@@ -0,0 +1,162 @@
+"""
+Pattern compiler for the Udyam form validators
+Turns the anchored regexes from udyam_form_schema.json into positional checkers
+"""
+
+import re
+import string
+from typing import Callable, List, Optional, Tuple
+
+# Characters matched by \s inside a character class (ASCII only, like the form)
+WHITESPACE = " \t\n\r\f\v"
+
+_CLASS_ESCAPES = {
+    "s": WHITESPACE,
+    "d": string.digits,
+    "w": string.ascii_letters + string.digits + "_",
+}
+
+Segment = Tuple[str, int, Optional[int]]
+
+
+class UnsupportedPattern(ValueError):
+    """Raised when a pattern is outside the positional subset"""
+
+
+def _parse_class(pattern: str, pos: int) -> Tuple[str, int]:
+    """Parse a [...] character class starting after the opening bracket"""
+    chars = []
+    if pos < len(pattern) and pattern[pos] == "^":
+        raise UnsupportedPattern("negated classes are not supported")
+    while pos < len(pattern) and pattern[pos] != "]":
+        ch = pattern[pos]
+        if ch == "\\":
+            esc = pattern[pos + 1]
+            chars.append(_CLASS_ESCAPES.get(esc, esc))
+            pos += 2
+            continue
+        if pos + 2 < len(pattern) and pattern[pos + 1] == "-" and pattern[pos + 2] != "]":
+            start, end = ord(ch), ord(pattern[pos + 2])
+            chars.append("".join(chr(c) for c in range(start, end + 1)))
+            pos += 3
+            continue
+        chars.append(ch)
+        pos += 1
+    if pos >= len(pattern):
+        raise UnsupportedPattern("unterminated character class")
+    return "".join(sorted(set("".join(chars)))), pos + 1
+
+
+def _parse_quantifier(pattern: str, pos: int) -> Tuple[int, Optional[int], int]:
+    """Parse an optional quantifier, returning (min, max, next position)"""
+    if pos >= len(pattern):
+        return 1, 1, pos
+    ch = pattern[pos]
+    if ch == "+":
+        return 1, None, pos + 1
+    if ch == "*":
+        return 0, None, pos + 1
+    if ch == "?":
+        return 0, 1, pos + 1
+    if ch == "{":
+        end = pattern.index("}", pos)
+        body = pattern[pos + 1:end]
+        if "," in body:
+            lo, hi = body.split(",", 1)
+            return int(lo or 0), (int(hi) if hi else None), end + 1
+        return int(body), int(body), end + 1
+    return 1, 1, pos
+
+
+def parse_pattern(pattern: str) -> List[Segment]:
+    """Split an anchored pattern into (charset, min, max) segments"""
+    if not (pattern.startswith("^") and pattern.endswith("$")):
+        raise UnsupportedPattern("pattern must be anchored with ^ and $")
+    body = pattern[1:-1]
+    segments: List[Segment] = []
+    pos = 0
+    while pos < len(body):
+        ch = body[pos]
+        if ch == "[":
+            chars, pos = _parse_class(body, pos + 1)
+        elif ch == "\\":
+            chars = _CLASS_ESCAPES.get(body[pos + 1], body[pos + 1])
+            pos += 2
+        elif ch in "()|.^$*+?{":
+            raise UnsupportedPattern(f"unsupported token {ch!r}")
+        else:
+            chars = ch
+            pos += 1
+        lo, hi, pos = _parse_quantifier(body, pos)
+        segments.append((chars, lo, hi))
+    return segments
+
+
+def expand_positions(segments: List[Segment]) -> Optional[List[str]]:
+    """Return one charset per position for fixed-width patterns, else None"""
+    positions: List[str] = []
+    for chars, lo, hi in segments:
+        if lo != hi:
+            return None
+        positions.extend([chars] * lo)
+    return positions
+
+
+def _runs(positions: List[str]) -> List[Tuple[int, int, str]]:
+    """Merge adjacent positions that share a charset into slices"""
+    runs: List[Tuple[int, int, str]] = []
+    for i, chars in enumerate(positions):
+        if runs and runs[-1][2] == chars:
+            start, _, _ = runs[-1]
+            runs[-1] = (start, i + 1, chars)
+        else:
+            runs.append((i, i + 1, chars))
+    return runs
+
+
+def compile_pattern(pattern: str) -> Callable[[str], bool]:
+    """
+    Compile an anchored pattern into a checker function.
+
+    Fixed-width patterns become a length test plus one str.strip() per run of
+    identical character classes; strip() leaves nothing behind only when every
+    character belongs to the class, and it runs in C. A single variable-length
+    class becomes a bounded length test plus one strip(). Anything else falls
+    back to re.fullmatch.
+    """
+    try:
+        segments = parse_pattern(pattern)
+    except (UnsupportedPattern, ValueError, IndexError):
+        return re.compile(pattern).fullmatch  # type: ignore[return-value]
+
+    positions = expand_positions(segments)
+    if positions is not None:
+        width = len(positions)
+        runs = tuple(_runs(positions))
+
+        if len(runs) == 1:
+            chars = runs[0][2]
+            return lambda value: len(value) == width and not value.strip(chars)
+
+        def check_fixed(value: str) -> bool:
+            if len(value) != width:
+                return False
+            for start, end, chars in runs:
+                if value[start:end].strip(chars):
+                    return False
+            return True
+
+        return check_fixed
+
+    if len(segments) == 1:
+        chars, lo, hi = segments[0]
+
+        def check_run(value: str) -> bool:
+            n = len(value)
+            if n < lo or (hi is not None and n > hi):
+                return False
+            return not value.strip(chars)
+
+        return check_run
+
+    return re.compile(pattern).fullmatch  # type: ignore[return-value]
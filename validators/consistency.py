@@ -0,0 +1,130 @@
+"""
+Bulk cross-field consistency checks for registration rows
+PAN 4th character vs organisation type, GSTIN embedding the PAN and GSTIN state codes
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+
+from .codes import GST_STATE_CODES, ORG_TYPE_PAN_CHAR
+from .schema import DEFAULT_SCHEMA_PATH, load_schema
+from .vectorized import VALID, get_rule
+
+RULES = ("pan_entity_char", "pan_org_type", "gstin_embeds_pan", "gstin_state_code")
+
+
+class ConsistencyReport:
+    """Per-rule failure masks for a batch of rows"""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.checked: Dict[str, np.ndarray] = {}
+        self.failed: Dict[str, np.ndarray] = {}
+
+    def add(self, rule: str, checked: np.ndarray, failed: np.ndarray):
+        self.checked[rule] = checked
+        self.failed[rule] = failed & checked
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Boolean mask of rows that pass every rule"""
+        ok = np.ones(self.rows, dtype=bool)
+        for failed in self.failed.values():
+            ok &= ~failed
+        return ok
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Rows checked and failed per rule"""
+        return {
+            rule: {"checked": int(self.checked[rule].sum()), "failed": int(self.failed[rule].sum())}
+            for rule in self.failed
+        }
+
+    def failing_rows(self, rule: str) -> np.ndarray:
+        """Row indices that failed the given rule"""
+        return np.flatnonzero(self.failed[rule])
+
+    def __repr__(self):
+        failed = {rule: int(mask.sum()) for rule, mask in self.failed.items()}
+        return f"ConsistencyReport(rows={self.rows}, failed={failed})"
+
+
+def _char_table(chars: Iterable[str]) -> np.ndarray:
+    table = np.zeros(256, dtype=bool)
+    for ch in chars:
+        table[ord(ch)] = True
+    return table
+
+
+def _as_bytes_array(values) -> np.ndarray:
+    """Organisation types as an S array (byte comparisons are ~4x cheaper than U)"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "S":
+        return values
+    if isinstance(values, np.ndarray) and values.dtype.kind == "U":
+        values = values.tolist()
+    values = ["" if v is None else v for v in values]
+    try:
+        return np.array(values, dtype="S32")
+    except UnicodeEncodeError:
+        return np.char.encode(np.array(values, dtype="U32"), "utf-8")
+
+
+def check_columns(organization_type, pan_number, gstin=None,
+                  schema_path: str = DEFAULT_SCHEMA_PATH) -> ConsistencyReport:
+    """
+    Run every consistency rule over parallel columns.
+
+    Rules only apply where their inputs are well formed (a malformed PAN is a
+    format error reported by validators.vectorized, not a consistency error);
+    rows without a GSTIN skip the GSTIN rules.
+    """
+    pan_rule = get_rule("pan_number", schema_path)
+    pan_matrix, pan_len, pan_non_ascii = pan_rule.to_matrix(pan_number)
+    pan_ok = pan_rule.check_matrix(pan_matrix, pan_len, pan_non_ascii, checksum=False)[1] == VALID
+    rows = len(pan_len)
+    report = ConsistencyReport(rows)
+    fourth = pan_matrix[:, 3]
+
+    # 4th character must be a known PAN holder type
+    entity_chars = load_schema(schema_path).validation_rules.get("pan", {}).get("fourth_char_types", {})
+    report.add("pan_entity_char", pan_ok, ~_char_table(entity_chars)[fourth])
+
+    # 4th character must match the declared organisation type
+    orgs = _as_bytes_array(organization_type)
+    expected = np.zeros(rows, dtype=np.uint8)
+    for org, ch in ORG_TYPE_PAN_CHAR.items():
+        expected[orgs == org.encode("ascii")] = ord(ch)
+    report.add("pan_org_type", pan_ok & (expected != 0), expected != fourth)
+
+    if gstin is not None:
+        gstin_rule = get_rule("gstin", schema_path)
+        gstin_matrix, gstin_len, gstin_non_ascii = gstin_rule.to_matrix(gstin)
+        gstin_reason = gstin_rule.check_matrix(gstin_matrix, gstin_len, gstin_non_ascii, checksum=False)[1]
+        gstin_ok = gstin_reason == VALID
+
+        # Characters 3-12 of a GSTIN are the holder's PAN
+        embeds = (gstin_matrix[:, 2:12] == pan_matrix[:, :10]).all(axis=1)
+        report.add("gstin_embeds_pan", gstin_ok & pan_ok, ~embeds)
+
+        states = np.zeros(100, dtype=bool)
+        states[[int(code) for code in GST_STATE_CODES]] = True
+        code = (gstin_matrix[:, 0].astype(np.intp) - 48) * 10 + (gstin_matrix[:, 1].astype(np.intp) - 48)
+        report.add("gstin_state_code", gstin_ok, ~states[np.clip(code, 0, 99)])
+
+    return report
+
+
+def check_consistency(rows: Iterable[Dict], schema_path: str = DEFAULT_SCHEMA_PATH) -> ConsistencyReport:
+    """
+    Run the consistency rules over registration rows (dicts).
+
+    The three columns are pulled out once and checked with array operations.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    return check_columns(
+        [r.get("organization_type") for r in rows],
+        [r.get("pan_number") for r in rows],
+        [r.get("gstin") for r in rows],
+        schema_path,
+    )
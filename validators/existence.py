@@ -0,0 +1,359 @@
+"""
+Existence filter builder
+Builds and verifies the API's Aadhaar/PAN Bloom filter snapshots offline from a database dump or a live scan
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .synthetic import TABLE_COLUMNS
+
+# Must match utils/existenceFilter.js
+MAGIC = b"UDBF"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIId32sH")
+MAX_HASHES = 16
+DEFAULT_FPR = 0.01
+DEFAULT_MIN_CAPACITY = 100_000
+FILTER_NAMES = ("aadhaar", "pan")
+
+FNV_OFFSET = 0x811C9DC5
+FNV_PRIME = 0x01000193
+SECOND_SEED = 0x050C5D1F
+MASK32 = 0xFFFFFFFF
+
+SCAN_BATCH_ROWS = 50_000
+
+
+def _fmix32(h: int) -> int:
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & MASK32
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & MASK32
+    h ^= h >> 16
+    return h
+
+
+def _fnv1a(data: bytes, seed: int) -> int:
+    h = seed
+    for byte in data:
+        h ^= byte
+        h = (h * FNV_PRIME) & MASK32
+    return h
+
+
+def hash_pair(value: str) -> Tuple[int, int]:
+    """The two base hashes; probe i is (h1 + i * h2) mod m"""
+    data = value.encode("utf-8")
+    return _fmix32(_fnv1a(data, FNV_OFFSET)), _fmix32(_fnv1a(data, SECOND_SEED)) | 1
+
+
+class BloomFilter:
+    """Bit-for-bit compatible with BloomFilter in utils/existenceFilter.js"""
+
+    def __init__(self, bits: int, hashes: int, capacity: int, count: int = 0,
+                 data: Optional[bytearray] = None):
+        self.m = bits
+        self.k = hashes
+        self.capacity = capacity
+        self.count = count
+        self.bits = data if data is not None else bytearray((bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fpr: float = DEFAULT_FPR) -> "BloomFilter":
+        n = max(1, capacity)
+        m = math.ceil(-n * math.log(fpr) / (math.log(2) ** 2) / 8) * 8
+        # JavaScript's Math.round: halves round up
+        k = min(MAX_HASHES, max(1, math.floor(m / n * math.log(2) + 0.5)))
+        return cls(m, k, n)
+
+    def _probes(self, value: str) -> Iterator[int]:
+        h1, h2 = hash_pair(value)
+        for i in range(self.k):
+            yield (h1 + i * h2) % self.m
+
+    def add(self, value: str) -> bool:
+        added = False
+        for bit in self._probes(value):
+            mask = 1 << (bit & 7)
+            if not self.bits[bit >> 3] & mask:
+                self.bits[bit >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[bit >> 3] & (1 << (bit & 7)) for bit in self._probes(value))
+
+    def fill_ratio(self) -> float:
+        return sum(bin(byte).count("1") for byte in self.bits) / self.m
+
+    def estimated_fpr(self) -> float:
+        return self.fill_ratio() ** self.k
+
+    def to_bytes(self, name: str, watermark: float = 0.0) -> bytes:
+        encoded = name.encode("utf-8")
+        digest = hashlib.sha256(self.bits).digest()
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.k, self.m, self.count, self.capacity,
+                             watermark, digest, len(encoded))
+        return header + encoded + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple[str, float, "BloomFilter"]:
+        """(name, watermark, filter); raises ValueError on a corrupt or foreign file"""
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            raise ValueError("not an existence filter snapshot")
+        _, version, k, m, count, capacity, watermark, digest, name_length = HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        name = data[HEADER.size:HEADER.size + name_length].decode("utf-8")
+        bits = bytearray(data[HEADER.size + name_length:])
+        if len(bits) != (m + 7) // 8:
+            raise ValueError("snapshot is truncated")
+        if hashlib.sha256(bits).digest() != digest:
+            raise ValueError("snapshot checksum mismatch")
+        return name, watermark, cls(m, k, capacity, count, bits)
+
+
+def snapshot_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.bloom")
+
+
+def write_snapshot(directory: str, name: str, bloom: BloomFilter, watermark: float) -> str:
+    """Write atomically, like the API, so a running server never reads half a file"""
+    os.makedirs(directory, exist_ok=True)
+    target = snapshot_path(directory, name)
+    temp = f"{target}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(bloom.to_bytes(name, watermark))
+    os.replace(temp, target)
+    return target
+
+
+def read_snapshot(directory: str, name: str) -> Tuple[float, BloomFilter]:
+    with open(snapshot_path(directory, name), "rb") as f:
+        stored_name, watermark, bloom = BloomFilter.from_bytes(f.read())
+    if stored_name != name:
+        raise ValueError(f"{snapshot_path(directory, name)} holds the {stored_name} filter")
+    return watermark, bloom
+
+
+# Membership rules, matching the API's duplicate checks
+
+def members(row: Dict[str, Optional[str]]) -> Tuple[Optional[str], Optional[str]]:
+    """(aadhaar, pan) this registration puts in the filters, None where it puts nothing"""
+    status = row.get("status")
+    aadhaar = row.get("aadhaar_number") if status and status != "draft" else None
+    pan = row.get("pan_number") if status == "completed" else None
+    return aadhaar or None, pan or None
+
+
+def _epoch_ms(value: Optional[str]) -> float:
+    """Naive timestamp text as the API reads it: wall time taken as UTC, in milliseconds"""
+    if not value:
+        return 0.0
+    parsed = datetime.fromisoformat(value.replace("T", " ").rstrip("Z"))
+    return parsed.replace(tzinfo=timezone.utc).timestamp() * 1000
+
+
+def dump_files(path: str) -> List[str]:
+    """A single dump file, or the registrations parts of a validators.synthetic directory"""
+    if os.path.isdir(path):
+        found = sorted(glob.glob(os.path.join(path, "registrations", "part-*")))
+        if not found:
+            raise ValueError(f"{path}: no registrations/part-* files")
+        return found
+    return [path]
+
+
+def iter_dump(path: str) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Registration rows from a .copy, .csv or .ndjson dump.
+
+    .copy files are in COPY text format with the table's column order, as
+    written by pg_dump and validators.synthetic; CSV files need a header.
+    """
+    columns = TABLE_COLUMNS["registrations"]
+    for file_path in dump_files(path):
+        ext = os.path.splitext(file_path)[1].lower()
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            if ext == ".copy":
+                for line in f:
+                    values = line.rstrip("\n").split("\t")
+                    if values == ["\\."]:
+                        break
+                    yield {c: (None if v == "\\N" else v) for c, v in zip(columns, values)}
+            elif ext in (".ndjson", ".jsonl", ".json"):
+                for line in f:
+                    if line.strip():
+                        yield {k: (None if v is None else str(v)) for k, v in json.loads(line).items()}
+            else:
+                for row in csv.DictReader(f):
+                    yield {k: (v if v != "" else None) for k, v in row.items()}
+
+
+def iter_database(conn) -> Iterator[Dict[str, Optional[str]]]:
+    """Keyset scan of non-draft registrations, the same scan the API runs at startup"""
+    last_id = 0
+    with conn.cursor() as cur:
+        while True:
+            cur.execute(
+                "SELECT id, aadhaar_number, pan_number, status, updated_at::text FROM registrations "
+                "WHERE id > %s AND status != 'draft' ORDER BY id LIMIT %s",
+                (last_id, SCAN_BATCH_ROWS),
+            )
+            rows = cur.fetchall()
+            for row_id, aadhaar, pan, status, updated_at in rows:
+                yield {"aadhaar_number": aadhaar, "pan_number": pan, "status": status, "updated_at": updated_at}
+            if len(rows) < SCAN_BATCH_ROWS:
+                return
+            last_id = rows[-1][0]
+
+
+def collect(rows: Iterator[Dict[str, Optional[str]]]) -> Tuple[Dict[str, set], float]:
+    """Distinct filter members per filter, and the newest updated_at seen"""
+    found: Dict[str, set] = {name: set() for name in FILTER_NAMES}
+    newest = 0.0
+    for row in rows:
+        aadhaar, pan = members(row)
+        if aadhaar:
+            found["aadhaar"].add(aadhaar)
+        if pan:
+            found["pan"].add(pan)
+        if aadhaar or pan:
+            newest = max(newest, _epoch_ms(row.get("updated_at")))
+    return found, newest
+
+
+def build_filters(found: Dict[str, set], fpr: float = DEFAULT_FPR,
+                  min_capacity: int = DEFAULT_MIN_CAPACITY) -> Dict[str, BloomFilter]:
+    """Sized like the API's startup build: twice the members, at least min_capacity"""
+    filters = {}
+    for name, values in found.items():
+        bloom = BloomFilter.for_capacity(max(min_capacity, len(values) * 2), fpr)
+        for value in values:
+            bloom.add(value)
+        filters[name] = bloom
+    return filters
+
+
+def _probe_values(name: str, count: int, exclude: set, seed: int) -> List[str]:
+    """Well-formed Aadhaar or PAN numbers that are not members"""
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    probes: List[str] = []
+    while len(probes) < count:
+        if name == "aadhaar":
+            value = str(rng.randint(200_000_000_000, 999_999_999_999))
+        else:
+            value = ("".join(rng.choice(letters) for _ in range(3)) + rng.choice("PFCHTA") + rng.choice(letters)
+                     + f"{rng.randint(0, 9999):04d}" + rng.choice(letters))
+        if value not in exclude:
+            probes.append(value)
+    return probes
+
+
+def verify_filters(filters: Dict[str, BloomFilter], found: Dict[str, set], probes: int,
+                   seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """False negatives (must be zero) and the measured false-positive rate per filter"""
+    report = {}
+    for name in FILTER_NAMES:
+        bloom = filters[name]
+        missing = sum(1 for value in found[name] if value not in bloom)
+        false_hits = sum(1 for value in _probe_values(name, probes, found[name], seed) if value in bloom)
+        report[name] = {
+            "members": len(found[name]),
+            "false_negatives": missing,
+            "measured_fpr": false_hits / probes if probes else 0.0,
+            "estimated_fpr": bloom.estimated_fpr(),
+            "fill_ratio": bloom.fill_ratio(),
+            "capacity": bloom.capacity,
+            "bits": bloom.m,
+            "hashes": bloom.k,
+        }
+    return report
+
+
+def format_report(report: Dict[str, Dict[str, float]], seconds: float) -> str:
+    lines = []
+    for name, entry in report.items():
+        lines.append(f"   {name:<8} {entry['members']:>12,} members  {entry['bits'] / 8 / 1048576:>8.2f} MiB  "
+                     f"k={entry['hashes']:<2}  fill {entry['fill_ratio']:.3f}  "
+                     f"fpr {entry['measured_fpr']:.4%} measured / {entry['estimated_fpr']:.4%} estimated  "
+                     f"{entry['false_negatives']:,} false negatives")
+    failed = any(entry["false_negatives"] for entry in report.values())
+    icon = "❌" if failed else "✅"
+    lines.insert(0, f"{icon} Checked {len(report)} filters in {seconds:.2f}s")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.existence",
+        description="Build and verify the API's Aadhaar/PAN existence filter snapshots",
+    )
+    parser.add_argument("command", choices=("build", "verify"),
+                        help="build writes aadhaar.bloom and pan.bloom; verify checks existing ones")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dump", help="registrations dump (.copy/.csv/.ndjson) or validators.synthetic directory")
+    source.add_argument("--dsn", help="Scan a live database (libpq connection string; '' for DATABASE_URL/DB_*)")
+    parser.add_argument("--snapshots", required=True, help="Snapshot directory (EXISTENCE_FILTER_SNAPSHOT_DIR)")
+    parser.add_argument("--fpr", type=float, default=DEFAULT_FPR, help="Target false-positive rate for build")
+    parser.add_argument("--min-capacity", type=int, default=DEFAULT_MIN_CAPACITY,
+                        help="Smallest capacity a filter is sized for")
+    parser.add_argument("--probes", type=int, default=100_000,
+                        help="Non-member lookups used to measure the false-positive rate")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the probe values")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.dump is not None:
+        found, watermark = collect(iter_dump(args.dump))
+    else:
+        from .loader import connect
+
+        conn = connect(args.dsn or None)
+        try:
+            with conn.cursor() as cur:
+                # Taken before the scan, so rows changed during it are caught by the API's delta scan
+                cur.execute("SELECT EXTRACT(EPOCH FROM LOCALTIMESTAMP) * 1000")
+                watermark = float(cur.fetchone()[0])
+            found, _ = collect(iter_database(conn))
+        finally:
+            conn.close()
+    print(f"📄 Read {len(found['aadhaar']):,} Aadhaar and {len(found['pan']):,} PAN numbers", file=sys.stderr)
+
+    if args.command == "build":
+        filters = build_filters(found, args.fpr, args.min_capacity)
+        for name, bloom in filters.items():
+            path = write_snapshot(args.snapshots, name, bloom, watermark)
+            print(f"🚀 Wrote {path}", file=sys.stderr)
+    else:
+        filters = {}
+        for name in FILTER_NAMES:
+            try:
+                filters[name] = read_snapshot(args.snapshots, name)[1]
+            except (OSError, ValueError) as error:
+                print(f"❌ {snapshot_path(args.snapshots, name)}: {error}", file=sys.stderr)
+                return 1
+
+    report = verify_filters(filters, found, args.probes, args.seed)
+    print(format_report(report, time.perf_counter() - started))
+    return 1 if any(entry["false_negatives"] for entry in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
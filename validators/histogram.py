@@ -0,0 +1,107 @@
+"""
+Latency histograms
+HDR-style log-linear buckets with bounded relative error, mergeable and cheap to record into
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+# 2**SUB_BUCKET_BITS linear sub-buckets per power of two: values up to 255 are
+# exact, larger ones keep 7 significant bits (relative error under 0.8%)
+SUB_BUCKET_BITS = 8
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+_FULL = 1 << SUB_BUCKET_BITS
+
+REPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99)
+
+
+def bucket_index(value: int) -> int:
+    """Bucket holding a non-negative integer value"""
+    if value < _FULL:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def bucket_bounds(index: int):
+    """(lowest, highest) value that lands in bucket index"""
+    if index < _FULL:
+        return index, index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    low = (index - (shift << (SUB_BUCKET_BITS - 1))) << shift
+    return low, low + (1 << shift) - 1
+
+
+class Histogram:
+    """Counts of integer values (microseconds by convention) in log-linear buckets"""
+
+    def __init__(self, unit: str = "us"):
+        self.unit = unit
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, value: int, count: int = 1):
+        value = max(int(value), 0)
+        self.counts[bucket_index(value)] += count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> int:
+        """Highest value equivalent to the q-th percentile (0-100), as HdrHistogram reports it"""
+        if not self.count:
+            return 0
+        rank = max(1, int(round(q / 100.0 * self.count + 0.4999999)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def percentiles(self, qs: Iterable[float] = REPORT_PERCENTILES) -> Dict[str, int]:
+        return {f"p{q:g}": self.percentile(q) for q in qs}
+
+    def to_dict(self) -> Dict:
+        """Summary plus the raw buckets, so histograms from several runs can be merged later"""
+        return {
+            "unit": self.unit,
+            "count": self.count,
+            "min": self.min or 0,
+            "max": self.max or 0,
+            "mean": round(self.mean(), 1),
+            **self.percentiles(),
+            "buckets": {str(index): n for index, n in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Histogram":
+        hist = cls(data.get("unit", "us"))
+        for index, n in data.get("buckets", {}).items():
+            hist.counts[int(index)] += n
+        hist.count = data["count"]
+        hist.total = int(data["mean"] * data["count"])
+        hist.min = data["min"] if data["count"] else None
+        hist.max = data["max"] if data["count"] else None
+        return hist
+
+    def __repr__(self):
+        return f"Histogram(count={self.count}, p50={self.percentile(50)}, max={self.max})"
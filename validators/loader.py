@@ -0,0 +1,376 @@
+"""
+Bulk PostgreSQL loader
+Streams generated or validated rows into the registration tables with COPY FROM STDIN in batches
+"""
+
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2 import sql
+
+from .bulk import _chain_first, iter_chunks, iter_records
+from .synthetic import TABLE_COLUMNS, RowWriter, _copy_escape, generate_rows
+
+# Parents first, so foreign keys resolve within each load
+LOAD_ORDER = ("registrations", "enterprise_details", "otp_verifications", "form_submissions",
+              "validation_logs")
+
+# Unique key used for ON CONFLICT when merging through a staging table
+CONFLICT_KEYS = {
+    "registrations": ("aadhaar_number",),
+    "enterprise_details": ("registration_id",),
+    "otp_verifications": ("aadhaar_number", "type"),
+}
+
+ENTERPRISE_COLUMNS = (
+    "registration_id", "enterprise_name", "major_activity", "nic_codes", "date_of_incorporation",
+    "date_of_commencement", "investment_plant_machinery", "previous_year_turnover",
+    "number_of_employees", "bank_account_number", "ifsc_code", "official_address",
+)
+LOADABLE_COLUMNS = dict(TABLE_COLUMNS, enterprise_details=ENTERPRISE_COLUMNS)
+
+CONFLICT_MODES = ("error", "skip", "update")
+DEFAULT_BATCH_ROWS = 100_000
+# Above this many rows, secondary indexes are dropped and rebuilt after the load
+DEFAULT_DEFER_INDEX_ROWS = 1_000_000
+
+
+def connect(dsn: Optional[str] = None):
+    """Connect using dsn, DATABASE_URL or the DB_* variables used by server.js and migrate.sh"""
+    dsn = dsn or os.environ.get("DATABASE_URL")
+    if dsn:
+        return psycopg2.connect(dsn)
+    return psycopg2.connect(
+        host=os.environ.get("DB_HOST", "localhost"),
+        port=int(os.environ.get("DB_PORT", "5432")),
+        dbname=os.environ.get("DB_NAME", "udyam_db"),
+        user=os.environ.get("DB_USER", "postgres"),
+        password=os.environ.get("DB_PASSWORD", "password"),
+    )
+
+
+class Batch:
+    """One COPY payload for a table"""
+
+    __slots__ = ("table", "columns", "fmt", "payload", "rows")
+
+    def __init__(self, table: str, columns: Sequence[str], fmt: str, payload: str, rows: int):
+        self.table = table
+        self.columns = tuple(columns)
+        self.fmt = fmt
+        self.payload = payload
+        self.rows = rows
+
+
+def _copy_statement(table: str, columns: Sequence[str], fmt: str) -> sql.Composed:
+    options = sql.SQL("(FORMAT csv)" if fmt == "csv" else "(FORMAT text)")
+    return sql.SQL("COPY {} ({}) FROM STDIN WITH {}").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns)), options,
+    )
+
+
+def _merge_statement(table: str, stage: str, columns: Sequence[str], mode: str) -> sql.Composed:
+    key = CONFLICT_KEYS[table]
+    cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+    key_cols = sql.SQL(", ").join(map(sql.Identifier, key))
+    if mode == "skip":
+        action = sql.SQL("DO NOTHING")
+    else:
+        updates = [c for c in columns if c not in key and c != "id"]
+        action = sql.SQL("DO UPDATE SET {}").format(sql.SQL(", ").join(
+            sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c)) for c in updates
+        )) if updates else sql.SQL("DO NOTHING")
+    # DISTINCT ON keeps the last copy of a key repeated within one batch; ON CONFLICT
+    # can't touch the same target row twice in one statement
+    return sql.SQL(
+        "INSERT INTO {table} ({cols}) SELECT DISTINCT ON ({key}) {cols} FROM {stage} "
+        "ORDER BY {key}, _row DESC ON CONFLICT ({key}) {action}"
+    ).format(table=sql.Identifier(table), cols=cols, key=key_cols, stage=sql.Identifier(stage),
+             action=action)
+
+
+class Loader:
+    """Copies batches into one database, merging through staging tables when asked"""
+
+    def __init__(self, conn, on_conflict: str = "error", synchronous_commit: bool = True):
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError(f"on_conflict must be one of {CONFLICT_MODES}")
+        self.conn = conn
+        self.on_conflict = on_conflict
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.dropped_indexes: List[Tuple[str, str, str]] = []
+        if not synchronous_commit:
+            with conn.cursor() as cur:
+                cur.execute("SET synchronous_commit = off")
+            conn.commit()
+
+    def _record(self, table: str, rows: int, inserted: int, seconds: float):
+        entry = self.stats.setdefault(table, {"rows": 0, "inserted": 0, "seconds": 0.0, "batches": 0})
+        entry["rows"] += rows
+        entry["inserted"] += inserted
+        entry["seconds"] += seconds
+        entry["batches"] += 1
+
+    def _copy(self, cur, batch: Batch, table: str):
+        cur.copy_expert(_copy_statement(table, batch.columns, batch.fmt).as_string(cur),
+                        io.StringIO(batch.payload))
+
+    def load_batches(self, batches: Iterable[Batch]):
+        """Load each batch (or group of batches) in its own transaction"""
+        for batch in batches:
+            self.load_group([batch])
+
+    def load_group(self, batches: Sequence[Batch]):
+        """Load several batches (e.g. a parent and its children) in one transaction"""
+        timings = []
+        try:
+            with self.conn.cursor() as cur:
+                for batch in batches:
+                    started = time.perf_counter()
+                    inserted = self._load_one(cur, batch)
+                    timings.append((batch, inserted, time.perf_counter() - started))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        for batch, inserted, seconds in timings:
+            self._record(batch.table, batch.rows, inserted, seconds)
+
+    def _load_one(self, cur, batch: Batch) -> int:
+        if self.on_conflict == "error" or batch.table not in CONFLICT_KEYS:
+            self._copy(cur, batch, batch.table)
+            return batch.rows
+
+        stage = f"_stage_{batch.table}"
+        cur.execute(sql.SQL(
+            "CREATE TEMP TABLE IF NOT EXISTS {stage} AS SELECT {cols} FROM {table} WITH NO DATA"
+        ).format(stage=sql.Identifier(stage), table=sql.Identifier(batch.table),
+                 cols=sql.SQL(", ").join(map(sql.Identifier, batch.columns))))
+        cur.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS _row BIGSERIAL").format(
+            sql.Identifier(stage)))
+        cur.execute(sql.SQL("TRUNCATE {}").format(sql.Identifier(stage)))
+        self._copy(cur, batch, stage)
+        cur.execute(_merge_statement(batch.table, stage, batch.columns, self.on_conflict))
+        return cur.rowcount
+
+    def drop_secondary_indexes(self, tables: Sequence[str]):
+        """Drop indexes that don't back a constraint; rebuild_indexes() puts them back"""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT i.tablename, i.indexname, i.indexdef
+                FROM pg_indexes i
+                JOIN pg_class c ON c.relname = i.indexname
+                WHERE i.schemaname = current_schema()
+                  AND i.tablename = ANY(%s)
+                  AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = c.oid)
+                """,
+                (list(tables),),
+            )
+            indexes = cur.fetchall()
+            for table, name, definition in indexes:
+                cur.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(name)))
+        self.conn.commit()
+        self.dropped_indexes.extend(indexes)
+        return indexes
+
+    def rebuild_indexes(self, maintenance_work_mem: str = "1GB") -> float:
+        started = time.perf_counter()
+        with self.conn.cursor() as cur:
+            cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+            for _, _, definition in self.dropped_indexes:
+                cur.execute(definition)
+        self.conn.commit()
+        self.dropped_indexes = []
+        return time.perf_counter() - started
+
+    def finish(self, tables: Sequence[str]):
+        """Move SERIAL sequences past explicitly loaded ids and refresh planner statistics"""
+        self.conn.autocommit = True
+        try:
+            with self.conn.cursor() as cur:
+                for table in tables:
+                    cur.execute(
+                        sql.SQL("SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                                "COALESCE((SELECT MAX(id) FROM {}), 0) + 1, false)").format(
+                            sql.Identifier(table)),
+                        (table,),
+                    )
+                    cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+        finally:
+            self.conn.autocommit = False
+
+
+# Batch sources
+
+def _ndjson_to_copy(records: Sequence[str], columns: Sequence[str]) -> str:
+    out = io.StringIO()
+    for record in records:
+        value = json.loads(record)
+        out.write("\t".join(_copy_escape(value.get(c)) for c in columns) + "\n")
+    return out.getvalue()
+
+
+def file_batches(path: str, table: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[Batch]:
+    """
+    Split a .copy, .csv or .ndjson file into COPY batches.
+
+    CSV files need a header; columns the table doesn't have (such as the
+    errors column of a rejects file) are dropped.
+    """
+    known = LOADABLE_COLUMNS[table]
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if ext == ".copy":
+            for chunk in iter_chunks(f, batch_rows):
+                yield Batch(table, known, "text", "".join(chunk), len(chunk))
+            return
+
+        if ext in (".ndjson", ".jsonl", ".json"):
+            records = iter_records(f, "ndjson")
+            first = next(records, None)
+            if first is None:
+                return
+            columns = [c for c in known if c in json.loads(first)]
+            for chunk in iter_chunks(_chain_first(first, records), batch_rows):
+                yield Batch(table, columns, "text", _ndjson_to_copy(chunk, columns), len(chunk))
+            return
+
+        records = iter_records(f, "csv")
+        header_line = next(records, None)
+        if header_line is None:
+            return
+        header = next(csv.reader([header_line]))
+        columns = [c for c in header if c in known]
+        if not columns:
+            raise ValueError(f"{path}: no {table} columns in header {header}")
+        passthrough = columns == header
+        for chunk in iter_chunks(records, batch_rows):
+            if passthrough:
+                payload = "".join(r if r.endswith("\n") else r + "\n" for r in chunk)
+            else:
+                keep = [header.index(c) for c in columns]
+                out = io.StringIO()
+                writer = csv.writer(out, lineterminator="\n")
+                for values in csv.reader(io.StringIO("".join(chunk), newline="")):
+                    writer.writerow([values[i] for i in keep])
+                payload = out.getvalue()
+            yield Batch(table, columns, "csv", payload, len(chunk))
+
+
+def directory_files(root: str, tables: Sequence[str]) -> List[Tuple[str, str]]:
+    """(table, path) pairs for a validators.synthetic output directory, parents first"""
+    found = []
+    for table in LOAD_ORDER:
+        if table not in tables:
+            continue
+        for path in sorted(glob.glob(os.path.join(root, table, "part-*"))):
+            found.append((table, path))
+    return found
+
+
+def generated_groups(rows: int, seed: int, shard_rows: int, tables: Sequence[str]) -> Iterator[List[Batch]]:
+    """One transaction's worth of COPY batches per generator shard, parents first"""
+    shards = (rows + shard_rows - 1) // shard_rows
+    for shard in range(shards):
+        buffers = {t: io.StringIO() for t in tables}
+        writers = {t: RowWriter(buffers[t], t, "copy") for t in tables}
+        for table, row in generate_rows(shard, rows, seed, shard_rows, tables=tables):
+            writers[table].write(row)
+        yield [
+            Batch(t, TABLE_COLUMNS[t], "text", buffers[t].getvalue(), writers[t].rows)
+            for t in LOAD_ORDER if t in writers
+        ]
+
+
+def format_report(stats: Dict[str, Dict[str, float]], total_seconds: float, index_seconds: float) -> str:
+    lines = []
+    total_rows = 0
+    for table in LOAD_ORDER:
+        entry = stats.get(table)
+        if not entry:
+            continue
+        total_rows += entry["rows"]
+        rate = entry["rows"] / entry["seconds"] if entry["seconds"] else 0.0
+        lines.append(f"   {table:<20} {entry['rows']:>12,} rows  {entry['inserted']:>12,} inserted  "
+                     f"{entry['batches']:>5} batches  {rate:>12,.0f} rows/sec")
+    if index_seconds:
+        lines.append(f"   index rebuild: {index_seconds:.1f}s")
+    rate = total_rows / total_seconds if total_seconds else 0.0
+    lines.insert(0, f"✅ Loaded {total_rows:,} rows in {total_seconds:.2f}s ({rate:,.0f} rows/sec)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.loader",
+        description="Bulk-load registration data into PostgreSQL with COPY",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="Output directory of python -m validators.synthetic")
+    source.add_argument("--file", help="One .copy/.csv/.ndjson file (needs --table)")
+    source.add_argument("--generate", type=int, metavar="ROWS",
+                        help="Generate this many registrations on the fly and load them")
+    parser.add_argument("--table", choices=LOAD_ORDER, help="Target table for --file")
+    parser.add_argument("--tables", default=",".join(LOAD_ORDER), help="Tables to load from --dir/--generate")
+    parser.add_argument("--dsn", help="libpq connection string (default: DATABASE_URL or DB_* variables)")
+    parser.add_argument("--on-conflict", choices=CONFLICT_MODES, default="error",
+                        help="Existing keys: fail the batch, skip the row or update it (default: error)")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Rows per COPY transaction")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --generate")
+    parser.add_argument("--defer-indexes", choices=("auto", "yes", "no"), default="auto",
+                        help=f"Drop and rebuild secondary indexes around the load "
+                             f"(auto: when loading {DEFAULT_DEFER_INDEX_ROWS:,}+ rows)")
+    parser.add_argument("--async-commit", action="store_true",
+                        help="SET synchronous_commit = off for the load session")
+    args = parser.parse_args(argv)
+
+    if args.file and not args.table:
+        parser.error("--file needs --table")
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+
+    if args.generate:
+        tables = [t for t in tables if t in TABLE_COLUMNS]
+        groups: Iterable[List[Batch]] = generated_groups(args.generate, args.seed, args.batch_rows, tables)
+        expected_rows = args.generate * 8
+    else:
+        files = [(args.table, args.file)] if args.file else directory_files(args.dir, tables)
+        tables = sorted({t for t, _ in files}, key=LOAD_ORDER.index)
+        groups = ([batch] for table, path in files for batch in file_batches(path, table, args.batch_rows))
+        # Rough size from bytes on disk; ~100 bytes per row across these tables
+        expected_rows = sum(os.path.getsize(path) for _, path in files) // 100
+
+    conn = connect(args.dsn)
+    loader = Loader(conn, args.on_conflict, synchronous_commit=not args.async_commit)
+    defer = args.defer_indexes == "yes" or (
+        args.defer_indexes == "auto" and expected_rows >= DEFAULT_DEFER_INDEX_ROWS)
+
+    started = time.perf_counter()
+    index_seconds = 0.0
+    try:
+        if defer:
+            dropped = loader.drop_secondary_indexes(tables)
+            print(f"📉 Dropped {len(dropped)} secondary indexes for the load", file=sys.stderr)
+        for group in groups:
+            loader.load_group(group)
+    finally:
+        if loader.dropped_indexes:
+            index_seconds = loader.rebuild_indexes()
+    loader.finish(tables)
+    conn.close()
+
+    print(format_report(loader.stats, time.perf_counter() - started, index_seconds), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
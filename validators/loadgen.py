@@ -0,0 +1,353 @@
+"""
+Open-loop load generator for the registration API
+Replays the generate-otp, validate-otp, validate-pan, submit-registration flow on a fixed arrival schedule
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .codes import GST_STATE_CODES, ORG_TYPE_PAN_CHAR
+from .histogram import REPORT_PERCENTILES, Histogram
+from .synthetic import AADHAAR_SPACE, FIRST_NAMES, PAN_SPACE, SURNAMES, aadhaar_for, gstin_for, pan_for
+
+ENDPOINTS = ("generate-otp", "validate-otp", "validate-pan", "submit-registration")
+MOCK_OTP = "1234"
+DEFAULT_TIMEOUT = 10.0
+MAX_ERROR_LENGTH = 80
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            return None
+
+
+class HttpClient:
+    """Keep-alive HTTP/1.1 client on asyncio streams, so the generator needs nothing outside the stdlib"""
+
+    def __init__(self, base_url: str, max_connections: int = 256, timeout: float = DEFAULT_TIMEOUT):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {base_url}")
+        self.host = url.hostname or "localhost"
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(max_connections)
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def _connect(self):
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def request(self, method: str, path: str, body=None,
+                      headers: Optional[Dict[str, str]] = None) -> Response:
+        payload = b"" if body is None else json.dumps(body, separators=(",", ":")).encode()
+        lines = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(payload)}", "Connection: keep-alive"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{k}: {v}" for k, v in (headers or {}).items())
+        data = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+        async with self.slots:
+            reused = bool(self.idle)
+            conn = self.idle.pop() if reused else await self._connect()
+            while True:
+                try:
+                    response, keep = await asyncio.wait_for(self._exchange(conn, data), self.timeout)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    if not reused:
+                        raise
+                    # The server closed an idle keep-alive connection; retry once on a fresh one
+                    reused = False
+                    conn = await self._connect()
+                except BaseException:
+                    conn[1].close()
+                    raise
+            if keep:
+                self.idle.append(conn)
+            else:
+                conn[1].close()
+            return response
+
+    async def _exchange(self, conn, data: bytes):
+        reader, writer = conn
+        writer.write(data)
+        await writer.drain()
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(parts)
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", "0")))
+        keep = headers.get("connection", "").lower() != "close"
+        return Response(status, headers, body), keep
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+def describe_error(response: Optional[Response] = None, exc: Optional[BaseException] = None) -> str:
+    """Short label used to group failures in the error breakdown"""
+    if exc is not None:
+        if isinstance(exc, asyncio.TimeoutError):
+            return "timeout"
+        return type(exc).__name__
+    detail = response.json()
+    message = detail.get("error") if isinstance(detail, dict) else None
+    label = f"HTTP {response.status}"
+    return f"{label} {message}"[:MAX_ERROR_LENGTH] if message else label
+
+
+def applicant(index: int, seed: int = 0) -> Dict[str, str]:
+    """Deterministic, valid form data for flow number index"""
+    rng = random.Random(f"{seed}:loadgen:{index}")
+    offsets = random.Random(f"{seed}:loadgen")
+    aadhaar_offset = offsets.randrange(AADHAAR_SPACE)
+    pan_offset = offsets.randrange(PAN_SPACE)
+    surname = rng.choice(SURNAMES)
+    org_type = rng.choice(list(ORG_TYPE_PAN_CHAR))
+    holder = ORG_TYPE_PAN_CHAR[org_type]
+    pan = pan_for(index, pan_offset, holder, surname[0] if holder in "PH" else rng.choice("ABCDEFGHJKLMNPRSTVW"))
+    state = rng.choice([code for code in GST_STATE_CODES if code < "90"])
+    return {
+        "aadhaar_number": aadhaar_for(index, aadhaar_offset),
+        "entrepreneur_name": f"{rng.choice(FIRST_NAMES)} {surname}",
+        "organization_type": org_type,
+        "pan_number": pan,
+        "gstin": gstin_for(pan, state) if rng.random() < 0.6 else "",
+        "filed_itr": "yes" if rng.random() < 0.7 else "no",
+    }
+
+
+def arrivals(rate: float, duration: float, poisson: bool = False, seed: int = 0) -> Iterator[float]:
+    """Intended start offsets (seconds) of each flow: evenly spaced, or Poisson with --poisson"""
+    rng = random.Random(f"{seed}:arrivals")
+    t = 0.0
+    while t < duration:
+        yield t
+        t += rng.expovariate(rate) if poisson else 1.0 / rate
+
+
+class LoadStats:
+    """Per-endpoint latency histograms and error counts"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {name: Histogram() for name in ENDPOINTS + ("flow",)}
+        self.ok: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.flows = Counter()
+
+    def observe(self, endpoint: str, latency_s: float, error: Optional[str] = None):
+        self.histograms[endpoint].record(int(latency_s * 1_000_000))
+        if error:
+            self.errors[(endpoint, error)] += 1
+        else:
+            self.ok[endpoint] += 1
+
+    def to_dict(self, elapsed: float) -> Dict:
+        return {
+            "elapsed": elapsed,
+            "flows": dict(self.flows),
+            "endpoints": {
+                name: {"ok": self.ok[name], "errors": sum(n for (e, _), n in self.errors.items() if e == name),
+                       "latency": hist.to_dict()}
+                for name, hist in self.histograms.items() if hist.count
+            },
+            "errors": [{"endpoint": e, "error": label, "count": n} for (e, label), n in self.errors.most_common()],
+        }
+
+
+class FlowRunner:
+    """Runs one registration flow; latencies count from when each request was due, not when it was sent"""
+
+    def __init__(self, client: HttpClient, stats: LoadStats, otp: str = MOCK_OTP, think: float = 0.0,
+                 seed: int = 0):
+        self.client = client
+        self.stats = stats
+        self.otp = otp
+        self.think = think
+        self.seed = seed
+
+    async def _step(self, endpoint: str, due: float, body: Dict, headers=None, record: bool = True):
+        try:
+            response = await self.client.request("POST", f"/api/{endpoint}", body, headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            if record:
+                self.stats.observe(endpoint, time.perf_counter() - due, describe_error(exc=e))
+            return None
+        error = None if 200 <= response.status < 300 else describe_error(response)
+        if record:
+            self.stats.observe(endpoint, time.perf_counter() - due, error)
+        return None if error else response
+
+    async def run(self, index: int, due: float, record: bool = True):
+        person = applicant(index, self.seed)
+        started = due
+        aadhaar = {k: person[k] for k in ("aadhaar_number", "entrepreneur_name")}
+
+        steps = (
+            ("generate-otp", lambda token: (aadhaar, None)),
+            ("validate-otp", lambda token: ({"aadhaar_number": person["aadhaar_number"], "otp": self.otp}, None)),
+            ("validate-pan", lambda token: ({k: person[k] for k in ("organization_type", "pan_number", "gstin",
+                                                                     "filed_itr")},
+                                            {"Authorization": f"Bearer {token}"})),
+            ("submit-registration", lambda token: ({}, {"Authorization": f"Bearer {token}"})),
+        )
+        token = None
+        for endpoint, build in steps:
+            body, headers = build(token)
+            response = await self._step(endpoint, due, body, headers, record)
+            if response is None:
+                if record:
+                    self.stats.flows[f"failed at {endpoint}"] += 1
+                return
+            if endpoint == "validate-otp":
+                token = (response.json() or {}).get("token")
+            due = time.perf_counter()
+            if self.think:
+                await asyncio.sleep(self.think)
+                due += self.think
+        if record:
+            self.stats.histograms["flow"].record(int((time.perf_counter() - started) * 1_000_000))
+            self.stats.flows["completed"] += 1
+
+
+async def run_load(base_url: str, rate: float, duration: float, warmup: float = 0.0, poisson: bool = False,
+                   max_inflight: int = 10_000, max_connections: int = 256, timeout: float = DEFAULT_TIMEOUT,
+                   think: float = 0.0, otp: str = MOCK_OTP, seed: int = 0) -> Tuple[LoadStats, float]:
+    """
+    Start flows at `rate` per second for warmup + duration seconds.
+
+    The schedule never waits for responses (open loop). A flow that would push
+    in-flight flows past max_inflight is counted as dropped rather than delayed,
+    so a stalled server shows up as errors and latency instead of a lower rate.
+    """
+    client = HttpClient(base_url, max_connections, timeout)
+    stats = LoadStats()
+    runner = FlowRunner(client, stats, otp, think, seed)
+    active = set()
+    loop_start = time.perf_counter()
+
+    for index, offset in enumerate(arrivals(rate, warmup + duration, poisson, seed)):
+        due = loop_start + offset
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        record = offset >= warmup
+        if len(active) >= max_inflight:
+            if record:
+                stats.flows["dropped (max in-flight)"] += 1
+            continue
+        if record:
+            stats.flows["started"] += 1
+        task = asyncio.ensure_future(runner.run(index, due, record))
+        active.add(task)
+        task.add_done_callback(active.discard)
+
+    if active:
+        await asyncio.wait(list(active))
+    elapsed = time.perf_counter() - loop_start - warmup
+    await client.close()
+    return stats, elapsed
+
+
+def format_report(stats: LoadStats, elapsed: float) -> str:
+    columns = "".join(f"{'p' + format(q, 'g'):>9}" for q in REPORT_PERCENTILES)
+    lines = [f"📊 {'endpoint':<20} {'ok':>8} {'errors':>7} {'req/s':>8} {columns} {'max':>9}   (ms)"]
+    for name, hist in stats.histograms.items():
+        if not hist.count:
+            continue
+        errors = sum(n for (e, _), n in stats.errors.items() if e == name)
+        values = "".join(f"{hist.percentile(q) / 1000:>9.1f}" for q in REPORT_PERCENTILES)
+        lines.append(f"   {name:<20} {stats.ok[name] if name != 'flow' else hist.count:>8,} {errors:>7,} "
+                     f"{hist.count / elapsed if elapsed else 0:>8.1f} {values} {(hist.max or 0) / 1000:>9.1f}")
+    if stats.flows:
+        lines.append("🔁 Flows: " + ", ".join(f"{label} {n:,}" for label, n in sorted(stats.flows.items())))
+    if stats.errors:
+        lines.append("⚠️  Errors:")
+        for (endpoint, label), n in stats.errors.most_common():
+            lines.append(f"   {n:>8,}  {endpoint:<20} {label}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.loadgen",
+        description="Open-loop load test of the registration flow (run the API with OTPMOCK=true)",
+    )
+    parser.add_argument("--url", default="http://localhost:3001", help="API base URL")
+    parser.add_argument("--rate", type=float, default=50.0, help="New flows per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unrecorded load first")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times instead of even spacing")
+    parser.add_argument("--think", type=float, default=0.0, help="Pause between the steps of a flow, in seconds")
+    parser.add_argument("--max-inflight", type=int, default=10_000, help="Drop new flows beyond this many in flight")
+    parser.add_argument("--connections", type=int, default=256, help="Maximum open HTTP connections")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout in seconds")
+    parser.add_argument("--otp", default=MOCK_OTP, help="OTP to submit (the API accepts 1234 with OTPMOCK=true)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for applicant data and Poisson arrivals")
+    parser.add_argument("--json", help="Write summary and histogram buckets as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.rate <= 0 or args.duration <= 0:
+        parser.error("--rate and --duration must be positive")
+
+    print(f"🚀 {args.rate:g} flows/s for {args.duration:g}s (+{args.warmup:g}s warm-up) against {args.url}",
+          file=sys.stderr)
+    stats, elapsed = asyncio.run(run_load(
+        args.url, args.rate, args.duration, args.warmup, args.poisson, args.max_inflight, args.connections,
+        args.timeout, args.think, args.otp, args.seed,
+    ))
+    print(format_report(stats, elapsed))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(elapsed), f, indent=2)
+
+    if not stats.ok["generate-otp"] and stats.errors:
+        print("❌ No flow got past generate-otp; is the API running?", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
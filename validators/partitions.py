@@ -0,0 +1,357 @@
+"""
+Audit partition maintenance
+Pre-creates the monthly partitions of form_submissions and validation_logs and detaches and archives those past retention
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sys
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+
+from .loader import connect
+
+# Partitioned audit tables and their partition keys, as in database_schema.sql
+PARTITIONED_TABLES = {
+    "form_submissions": "submitted_at",
+    "validation_logs": "validated_at",
+}
+DEFAULT_AHEAD = 3
+DEFAULT_LOCK_TIMEOUT = "5s"
+ARCHIVE_SCHEMA = "audit_archive"
+# Suffix the original table gets when convert moves its rows into a partitioned one
+UNPARTITIONED_SUFFIX = "_unpartitioned"
+
+MONTHLY_PARTITION = re.compile(r"^(%s)_(\d{4})_(\d{2})$" % "|".join(PARTITIONED_TABLES))
+RANGE_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before) month's"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, month: date) -> str:
+    """Matches create_monthly_partition() in database_schema.sql"""
+    return f"{parent}_{month.year:04d}_{month.month:02d}"
+
+
+class Partition:
+    __slots__ = ("name", "lower", "upper", "rows", "bytes", "index_bytes")
+
+    def __init__(self, name: str, bound: str, rows: int, total_bytes: int, index_bytes: int):
+        self.name = name
+        match = RANGE_BOUND.search(bound)
+        # None for the default partition
+        self.lower = datetime.fromisoformat(match.group(1)).date() if match else None
+        self.upper = datetime.fromisoformat(match.group(2)).date() if match else None
+        self.rows = max(0, rows)
+        self.bytes = total_bytes
+        self.index_bytes = index_bytes
+
+
+def is_partitioned(conn, table: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+                    (table,))
+        return cur.fetchone()[0]
+
+
+def list_partitions(conn, parent: str) -> List[Partition]:
+    """Attached partitions in bound order, the default partition last; rows are planner estimates"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint,
+                   pg_total_relation_size(c.oid), pg_indexes_size(c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            (parent,),
+        )
+        partitions = [Partition(*row) for row in cur.fetchall()]
+    return sorted(partitions, key=lambda p: (p.lower is None, p.lower or date.min))
+
+
+def database_month(conn) -> date:
+    """This month by the database's clock, which also stamps the rows"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT date_trunc('month', CURRENT_DATE)::date")
+        return cur.fetchone()[0]
+
+
+def default_months(conn, parent: str) -> List[date]:
+    """Months with rows in the default partition, i.e. months that had no partition yet"""
+    default = f"{parent}_default"
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (default,))
+        if not cur.fetchone()[0]:
+            return []
+        cur.execute(sql.SQL("SELECT DISTINCT date_trunc('month', {key})::date FROM {table} ORDER BY 1").format(
+            key=sql.Identifier(PARTITIONED_TABLES[parent]), table=sql.Identifier(default)))
+        return [row[0] for row in cur.fetchall()]
+
+
+def create_partitions(conn, parent: str, months: Sequence[date], dry_run: bool = False) -> List[str]:
+    """Create the missing monthly partitions, one transaction each; returns the names created"""
+    existing = {p.name for p in list_partitions(conn, parent)}
+    created = []
+    for month in months:
+        name = partition_name(parent, month)
+        if name in existing:
+            continue
+        if not dry_run:
+            with conn.cursor() as cur:
+                cur.execute("SELECT create_monthly_partition(%s, %s)", (parent, month))
+            conn.commit()
+        existing.add(name)
+        created.append(name)
+    return created
+
+
+def detach_partitions(conn, parent: str, before: date, lock_timeout: str = DEFAULT_LOCK_TIMEOUT,
+                      dry_run: bool = False) -> List[str]:
+    """
+    Detach the monthly partitions that end on or before `before` into ARCHIVE_SCHEMA.
+
+    Each detach is a catalog change: it holds the parent's lock only briefly, and
+    lock_timeout makes it give up rather than queue inserts behind a long query.
+    """
+    detached = []
+    for partition in list_partitions(conn, parent):
+        if partition.upper is None or partition.upper > before:
+            continue
+        if not dry_run:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = %s", (lock_timeout,))
+                cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                    sql.Identifier(parent), sql.Identifier(partition.name)))
+                cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(ARCHIVE_SCHEMA)))
+                cur.execute(sql.SQL("ALTER TABLE {} SET SCHEMA {}").format(
+                    sql.Identifier(partition.name), sql.Identifier(ARCHIVE_SCHEMA)))
+                # Archived rows no longer take part in registration deletes
+                cur.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                    (f"{ARCHIVE_SCHEMA}.{partition.name}",),
+                )
+                for (constraint,) in cur.fetchall():
+                    cur.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                        sql.Identifier(ARCHIVE_SCHEMA, partition.name), sql.Identifier(constraint)))
+            conn.commit()
+        detached.append(partition.name)
+    return detached
+
+
+def archived_tables(conn) -> List[str]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT tablename FROM pg_tables WHERE schemaname = %s ORDER BY tablename", (ARCHIVE_SCHEMA,))
+        return [name for (name,) in cur.fetchall() if MONTHLY_PARTITION.match(name)]
+
+
+def export_archived(conn, directory: str, dry_run: bool = False) -> List[Tuple[str, str]]:
+    """
+    Write each archived partition to <directory>/<name>.csv.gz and drop it.
+
+    The file is complete (written to a temporary name, then renamed) before the
+    table is dropped; a failed export leaves the table for the next run.
+    """
+    exported = []
+    for name in archived_tables(conn):
+        target = os.path.join(directory, f"{name}.csv.gz")
+        if not dry_run:
+            os.makedirs(directory, exist_ok=True)
+            temp = f"{target}.{os.getpid()}.tmp"
+            with conn.cursor() as cur, gzip.open(temp, "wb") as f:
+                cur.copy_expert(sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER)").format(
+                    sql.Identifier(ARCHIVE_SCHEMA, name)).as_string(conn), f)
+            os.replace(temp, target)
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(ARCHIVE_SCHEMA, name)))
+            conn.commit()
+        exported.append((name, target))
+    return exported
+
+
+def convert_table(conn, parent: str, ahead: int = DEFAULT_AHEAD) -> Dict[str, int]:
+    """
+    Move an unpartitioned audit table's rows into a monthly-partitioned table of the same shape.
+
+    The original is renamed to <parent>_unpartitioned and kept until you drop it;
+    rows without a timestamp can't be placed and stay there. Everything happens in
+    one transaction that locks the table, so run it while the API is stopped.
+    """
+    key = PARTITIONED_TABLES[parent]
+    legacy = parent + UNPARTITIONED_SUFFIX
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regprocedure('create_monthly_partition(text, date)') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            raise RuntimeError("create_monthly_partition() is missing; run database_schema.sql first")
+
+        # Secondary indexes and foreign keys are recreated on the new table under their own names
+        cur.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid),
+                   EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = to_regclass(%s)
+            """,
+            (parent,),
+        )
+        indexes = cur.fetchall()
+        secondary = [definition for _, definition, backs_constraint in indexes if not backs_constraint]
+        cur.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                    "WHERE conrelid = to_regclass(%s) AND contype = 'f'", (parent,))
+        foreign_keys = cur.fetchall()
+        cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (parent,))
+        sequence = cur.fetchone()[0]
+
+        cur.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(sql.Identifier(parent), sql.Identifier(legacy)))
+        for name, _, _ in indexes:
+            cur.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                sql.Identifier(name), sql.Identifier((name + UNPARTITIONED_SUFFIX)[:63])))
+
+        cur.execute(sql.SQL(
+            "CREATE TABLE {parent} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) "
+            "PARTITION BY RANGE ({key})"
+        ).format(parent=sql.Identifier(parent), legacy=sql.Identifier(legacy), key=sql.Identifier(key)))
+        cur.execute(sql.SQL("ALTER TABLE {parent} ALTER COLUMN {key} SET NOT NULL, ADD PRIMARY KEY (id, {key})").format(
+            parent=sql.Identifier(parent), key=sql.Identifier(key)))
+        for name, definition in foreign_keys:
+            cur.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(
+                sql.Identifier(parent), sql.Identifier(name), sql.SQL(definition)))
+        if sequence:
+            # Otherwise dropping the old table would take the id sequence with it
+            cur.execute(sql.SQL("ALTER SEQUENCE {} OWNED BY {}").format(
+                sql.SQL(sequence), sql.Identifier(parent, "id")))
+
+        cur.execute(sql.SQL("CREATE TABLE {} PARTITION OF {} DEFAULT").format(
+            sql.Identifier(f"{parent}_default"), sql.Identifier(parent)))
+        cur.execute(sql.SQL("SELECT min({key})::date, count(*) FILTER (WHERE {key} IS NULL) FROM {legacy}").format(
+            key=sql.Identifier(key), legacy=sql.Identifier(legacy)))
+        oldest, undated = cur.fetchone()
+    current = database_month(conn)
+    month = oldest.replace(day=1) if oldest else current
+    months = []
+    while month <= add_months(current, ahead):
+        months.append(month)
+        month = add_months(month, 1)
+    with conn.cursor() as cur:
+        for month in months:
+            cur.execute("SELECT create_monthly_partition(%s, %s)", (parent, month))
+
+        cur.execute(sql.SQL("INSERT INTO {parent} SELECT * FROM {legacy} WHERE {key} IS NOT NULL").format(
+            parent=sql.Identifier(parent), legacy=sql.Identifier(legacy), key=sql.Identifier(key)))
+        moved = cur.rowcount
+        # Built once per partition after the copy, not row by row during it
+        for definition in secondary:
+            cur.execute(definition)
+    conn.commit()
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(parent)))
+    conn.commit()
+    return {"partitions": len(months), "rows": moved, "undated": undated}
+
+
+def _size(value: int) -> str:
+    return f"{value / 1048576:,.1f} MiB"
+
+
+def format_status(parent: str, partitions: List[Partition]) -> str:
+    lines = [f"📅 {parent}: {sum(1 for p in partitions if p.lower)} monthly partitions"]
+    for p in partitions:
+        span = f"{p.lower} .. {p.upper}" if p.lower else "default"
+        lines.append(f"   {p.name:<32} {span:<24} ~{p.rows:>12,} rows  {_size(p.bytes):>12}  "
+                     f"indexes {_size(p.index_bytes):>12}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.partitions",
+        description="Maintain the monthly partitions of form_submissions and validation_logs",
+    )
+    parser.add_argument("command", choices=("status", "maintain", "convert"),
+                        help="status lists partitions; maintain creates and retires them; "
+                             "convert partitions tables created before partitioning")
+    parser.add_argument("--dsn", help="libpq connection string (default: DATABASE_URL or DB_* variables)")
+    parser.add_argument("--tables", default=",".join(PARTITIONED_TABLES),
+                        help="Comma-separated audit tables to work on")
+    parser.add_argument("--ahead", type=int, default=DEFAULT_AHEAD,
+                        help="Months of partitions to keep created beyond the current one")
+    parser.add_argument("--retain-months", type=int,
+                        help="Full months kept before the current one; older partitions are detached "
+                             f"into the {ARCHIVE_SCHEMA} schema (default: keep everything)")
+    parser.add_argument("--archive-dir",
+                        help=f"Export {ARCHIVE_SCHEMA} partitions here as <name>.csv.gz and drop them")
+    parser.add_argument("--lock-timeout", default=DEFAULT_LOCK_TIMEOUT,
+                        help="Longest a detach waits for the parent table's lock")
+    parser.add_argument("--dry-run", action="store_true", help="Report what maintain would do and change nothing")
+    args = parser.parse_args(argv)
+
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in PARTITIONED_TABLES]
+    if unknown:
+        parser.error(f"not a partitioned audit table: {', '.join(unknown)}")
+    if args.retain_months is not None and args.retain_months < 0:
+        parser.error("--retain-months must be 0 or more")
+
+    started = time.perf_counter()
+    conn = connect(args.dsn)
+    try:
+        if args.command == "convert":
+            for table in tables:
+                if is_partitioned(conn, table):
+                    print(f"✅ {table} is already partitioned", file=sys.stderr)
+                    continue
+                result = convert_table(conn, table, args.ahead)
+                print(f"🚀 Partitioned {table}: {result['rows']:,} rows into {result['partitions']} monthly "
+                      f"partitions; the original is {table}{UNPARTITIONED_SUFFIX}", file=sys.stderr)
+                if result["undated"]:
+                    print(f"⚠️  {result['undated']:,} rows without a timestamp stayed in "
+                          f"{table}{UNPARTITIONED_SUFFIX}", file=sys.stderr)
+            return 0
+
+        not_partitioned = [t for t in tables if not is_partitioned(conn, t)]
+        if not_partitioned:
+            print(f"❌ Not partitioned: {', '.join(not_partitioned)}; run convert first", file=sys.stderr)
+            return 1
+
+        if args.command == "status":
+            for table in tables:
+                print(format_status(table, list_partitions(conn, table)))
+            return 0
+
+        verb = "Would" if args.dry_run else "Did"
+        month = database_month(conn)
+        for table in tables:
+            # Months that fell through to the default partition get their own partition too
+            wanted = sorted(set(default_months(conn, table)) | {add_months(month, n) for n in range(args.ahead + 1)})
+            created = create_partitions(conn, table, wanted, args.dry_run)
+            print(f"📅 {table}: {verb.lower()} create {len(created)} partitions"
+                  + (f" ({', '.join(created)})" if created else ""), file=sys.stderr)
+            if args.retain_months is not None:
+                before = add_months(month, -args.retain_months)
+                detached = detach_partitions(conn, table, before, args.lock_timeout, args.dry_run)
+                print(f"📦 {table}: {verb.lower()} detach {len(detached)} partitions ending by {before}"
+                      + (f" into {ARCHIVE_SCHEMA}" if detached else ""), file=sys.stderr)
+        if args.archive_dir:
+            exported = export_archived(conn, args.archive_dir, args.dry_run)
+            for name, path in exported:
+                print(f"🗄️  {verb} export {ARCHIVE_SCHEMA}.{name} to {path} and drop it", file=sys.stderr)
+        print(f"✅ Partition maintenance finished in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Record-level validation API
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import ValidationCache
+from .schema import DEFAULT_SCHEMA_PATH, FieldError, load_schema
+
+
+def validate_record(record: Dict, fields: Optional[Iterable[str]] = None,
+                    steps: Optional[Iterable[str]] = None,
+                    schema_path: str = DEFAULT_SCHEMA_PATH,
+                    checksums: bool = True,
+                    cache: Optional[ValidationCache] = None) -> List[FieldError]:
+    """
+    Validate one registration record against the form schema.
+
+    Returns a list of FieldError tuples; an empty list means the record is valid.
+    Use fields/steps to restrict which rules apply (e.g. steps=["step2"]);
+    checksums=False skips the Aadhaar Verhoeff and GSTIN check-digit tests.
+    Pass a ValidationCache to memoize results for values that repeat.
+    """
+    errors = []
+    get = record.get
+    schema = load_schema(schema_path)
+    if cache is not None:
+        cache.sync(schema.version)
+    for rule in schema.select(fields, steps):
+        value = get(rule.name)
+        error = cache.lookup(rule, value, checksums) if cache is not None else rule.validate(value, checksums)
+        if error is not None:
+            errors.append(error)
+    return errors
+
+
+def validate_many(records: Iterable[Dict], fields: Optional[Iterable[str]] = None,
+                  steps: Optional[Iterable[str]] = None,
+                  schema_path: str = DEFAULT_SCHEMA_PATH,
+                  only_invalid: bool = False,
+                  checksums: bool = True,
+                  cache: Optional[ValidationCache] = None) -> Iterator[Tuple[int, List[FieldError]]]:
+    """
+    Validate a stream of records, yielding (row index, errors) per record.
+
+    The rule list is resolved once up front so the per-row cost is just the
+    compiled checkers. With only_invalid=True, valid rows are skipped; a
+    ValidationCache memoizes repeated values (e.g. the same PAN on many rows).
+    """
+    schema = load_schema(schema_path)
+    if cache is not None:
+        cache.sync(schema.version)
+        rules = [(rule.name, lambda v, c, rule=rule: cache.lookup(rule, v, c))
+                 for rule in schema.select(fields, steps)]
+    else:
+        rules = [(rule.name, rule.validate) for rule in schema.select(fields, steps)]
+    for index, record in enumerate(records):
+        get = record.get
+        errors = []
+        for name, validate in rules:
+            error = validate(get(name), checksums)
+            if error is not None:
+                errors.append(error)
+        if errors or not only_invalid:
+            yield index, errors
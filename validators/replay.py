@@ -0,0 +1,313 @@
+"""
+Traffic replay from the form_submissions audit trail
+Streams recorded submissions through a server-side cursor and re-issues them against a staging API
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .histogram import REPORT_PERCENTILES, Histogram
+from .loadgen import MOCK_OTP, HttpClient, Response, describe_error
+from .loader import connect
+
+# step_number -> endpoint that accepted that step's form data
+STEP_ENDPOINTS = {1: "generate-otp", 2: "validate-pan", 3: "submit-registration"}
+STEP_FIELDS = {
+    1: ("aadhaar_number", "entrepreneur_name"),
+    2: ("organization_type", "pan_number", "gstin", "filed_itr"),
+    3: (),
+}
+# Response fields that legitimately differ between two runs of the same request
+VOLATILE_FIELDS = frozenset(("token", "reference_number", "udyam_number", "timestamp", "created_at",
+                             "completed_at", "expires_in", "mock"))
+DEFAULT_FETCH_ROWS = 2_000
+MAX_EXAMPLES = 5
+
+REPLAY_QUERY = """
+    SELECT f.id, f.registration_id, f.step_number, f.form_data, host(f.ip_address), f.user_agent,
+           f.submitted_at, r.aadhaar_number
+    FROM form_submissions f
+    LEFT JOIN registrations r ON r.id = f.registration_id
+    WHERE f.submitted_at >= %s AND f.submitted_at < %s
+    ORDER BY f.submitted_at, f.id
+"""
+
+
+class Submission:
+    __slots__ = ("id", "registration_id", "step", "form", "ip", "user_agent", "submitted_at", "aadhaar")
+
+    def __init__(self, row: Tuple):
+        (self.id, self.registration_id, self.step, form, self.ip, self.user_agent,
+         self.submitted_at, self.aadhaar) = row
+        self.form = json.loads(form) if isinstance(form, str) else (form or {})
+
+
+async def stream_submissions(dsn: Optional[str], since: datetime, until: datetime,
+                             fetch_rows: int = DEFAULT_FETCH_ROWS, limit: Optional[int] = None
+                             ) -> AsyncIterator[Submission]:
+    """Yield submissions in time order; a named (server-side) cursor keeps memory flat"""
+    loop = asyncio.get_running_loop()
+    conn = await loop.run_in_executor(None, connect, dsn)
+    try:
+        cur = conn.cursor(name="form_submissions_replay")
+        cur.itersize = fetch_rows
+        await loop.run_in_executor(None, cur.execute, REPLAY_QUERY, (since, until))
+        sent = 0
+        while True:
+            rows = await loop.run_in_executor(None, cur.fetchmany, fetch_rows)
+            if not rows:
+                break
+            for row in rows:
+                yield Submission(row)
+                sent += 1
+                if limit and sent >= limit:
+                    return
+    finally:
+        conn.close()
+
+
+def normalise(body) -> object:
+    """Response JSON with volatile fields masked, for comparing two environments"""
+    if isinstance(body, dict):
+        return {k: ("<volatile>" if k in VOLATILE_FIELDS else normalise(v)) for k, v in body.items()}
+    if isinstance(body, list):
+        return [normalise(v) for v in body]
+    return body
+
+
+class ReplayStats:
+    """Latency, status and mismatch counts per endpoint"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+        self.statuses: Counter = Counter()
+        self.mismatches: Counter = Counter()
+        self.examples: Dict[str, List[Dict]] = {}
+        self.lag = Histogram()
+        self.skipped: Counter = Counter()
+
+    def observe(self, endpoint: str, latency_s: float, status: str):
+        self.histograms.setdefault(endpoint, Histogram()).record(int(latency_s * 1_000_000))
+        self.statuses[(endpoint, status)] += 1
+
+    def mismatch(self, endpoint: str, kind: str, example: Dict):
+        self.mismatches[(endpoint, kind)] += 1
+        examples = self.examples.setdefault(f"{endpoint}: {kind}", [])
+        if len(examples) < MAX_EXAMPLES:
+            examples.append(example)
+
+    def to_dict(self, elapsed: float) -> Dict:
+        return {
+            "elapsed": elapsed,
+            "endpoints": {name: hist.to_dict() for name, hist in self.histograms.items()},
+            "statuses": [{"endpoint": e, "status": s, "count": n} for (e, s), n in self.statuses.most_common()],
+            "mismatches": [{"endpoint": e, "kind": k, "count": n} for (e, k), n in self.mismatches.most_common()],
+            "examples": self.examples,
+            "schedule_lag": self.lag.to_dict(),
+            "skipped": dict(self.skipped),
+        }
+
+
+class Replayer:
+    """
+    Re-issues each submission against the target, with a session per registration.
+
+    A registration's first replayed step re-verifies its Aadhaar with the mock
+    OTP to get a token for the later steps. With a baseline client, every
+    request also goes to the baseline and the two responses are compared;
+    otherwise a non-2xx answer to a submission that was accepted originally
+    counts as a mismatch.
+    """
+
+    def __init__(self, target: HttpClient, stats: ReplayStats, baseline: Optional[HttpClient] = None,
+                 otp: str = MOCK_OTP):
+        self.target = target
+        self.baseline = baseline
+        self.stats = stats
+        self.otp = otp
+        self.sessions: Dict[int, Dict[str, Optional[str]]] = {}
+        self.locks: Dict[int, asyncio.Lock] = {}
+
+    async def _send(self, client: HttpClient, endpoint: str, body: Dict, headers: Dict,
+                    ) -> Tuple[Optional[Response], str]:
+        try:
+            response = await client.request("POST", f"/api/{endpoint}", body, headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            return None, describe_error(exc=e)
+        label = str(response.status) if 200 <= response.status < 300 else describe_error(response)
+        return response, label
+
+    async def _token(self, sub: Submission, session: Dict, headers: Dict) -> Dict[str, Optional[str]]:
+        """Session tokens for target and baseline, verifying the Aadhaar first when needed"""
+        if "target" not in session:
+            aadhaar = sub.form.get("aadhaar_number") or sub.aadhaar
+            body = {"aadhaar_number": aadhaar, "otp": self.otp}
+            for side, client in (("target", self.target), ("baseline", self.baseline)):
+                if client is None:
+                    continue
+                response, _ = await self._send(client, "validate-otp", body, headers)
+                data = response.json() if response is not None else None
+                session[side] = data.get("token") if isinstance(data, dict) else None
+        return {side: token for side, token in session.items()}
+
+    async def replay(self, sub: Submission, due: float):
+        endpoint = STEP_ENDPOINTS.get(sub.step)
+        if endpoint is None:
+            self.stats.skipped[f"step {sub.step}"] += 1
+            return
+        self.stats.lag.record(int(max(time.perf_counter() - due, 0) * 1_000_000))
+        headers = {"User-Agent": sub.user_agent or "validators.replay"}
+        if sub.ip:
+            headers["X-Forwarded-For"] = sub.ip
+        body = {k: sub.form.get(k) for k in STEP_FIELDS[sub.step] if k in sub.form}
+
+        lock = self.locks.setdefault(sub.registration_id, asyncio.Lock())
+        async with lock:
+            session = self.sessions.setdefault(sub.registration_id, {})
+            target_headers = dict(headers)
+            baseline_headers = dict(headers)
+            if sub.step != 1:
+                tokens = await self._token(sub, session, headers)
+                if tokens.get("target"):
+                    target_headers["Authorization"] = f"Bearer {tokens['target']}"
+                if tokens.get("baseline"):
+                    baseline_headers["Authorization"] = f"Bearer {tokens['baseline']}"
+
+            sends = [self._send(self.target, endpoint, body, target_headers)]
+            if self.baseline is not None:
+                sends.append(self._send(self.baseline, endpoint, body, baseline_headers))
+            results = await asyncio.gather(*sends)
+
+            if sub.step == 1:
+                # generate-otp is followed by validate-otp in the real flow; do the same so
+                # later steps of this registration have a session
+                session.clear()
+                await self._token(sub, session, headers)
+
+        response, label = results[0]
+        self.stats.observe(endpoint, time.perf_counter() - due, label)
+        example = {"submission_id": sub.id, "registration_id": sub.registration_id, "target": label}
+
+        if self.baseline is None:
+            if response is None or not 200 <= response.status < 300:
+                self.stats.mismatch(endpoint, f"accepted originally, now {label}", example)
+            return
+
+        base_response, base_label = results[1]
+        example["baseline"] = base_label
+        if label != base_label:
+            self.stats.mismatch(endpoint, f"status {base_label} -> {label}", example)
+        elif response is not None and base_response is not None:
+            got, want = normalise(response.json()), normalise(base_response.json())
+            if got != want:
+                example.update(target_body=got, baseline_body=want)
+                self.stats.mismatch(endpoint, "body differs", example)
+
+
+async def run_replay(submissions: AsyncIterator[Submission], target_url: str, baseline_url: Optional[str] = None,
+                     speedup: float = 1.0, max_inflight: int = 5_000, connections: int = 256,
+                     timeout: float = 10.0, otp: str = MOCK_OTP) -> Tuple[ReplayStats, float]:
+    """
+    Replay submissions, spacing them by their original submitted_at gaps divided
+    by speedup (0 sends them as fast as max_inflight allows).
+    """
+    target = HttpClient(target_url, connections, timeout)
+    baseline = HttpClient(baseline_url, connections, timeout) if baseline_url else None
+    stats = ReplayStats()
+    replayer = Replayer(target, stats, baseline, otp)
+    active = set()
+    first_at = None
+    started = time.perf_counter()
+
+    async for sub in submissions:
+        if first_at is None:
+            first_at = sub.submitted_at
+        offset = (sub.submitted_at - first_at).total_seconds() / speedup if speedup else 0.0
+        due = started + offset
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        while len(active) >= max_inflight:
+            await asyncio.wait(list(active), return_when=asyncio.FIRST_COMPLETED)
+        task = asyncio.ensure_future(replayer.replay(sub, max(due, started)))
+        active.add(task)
+        task.add_done_callback(active.discard)
+
+    if active:
+        await asyncio.wait(list(active))
+    elapsed = time.perf_counter() - started
+    await target.close()
+    if baseline is not None:
+        await baseline.close()
+    return stats, elapsed
+
+
+def format_report(stats: ReplayStats, elapsed: float) -> str:
+    columns = "".join(f"{'p' + format(q, 'g'):>9}" for q in REPORT_PERCENTILES[:4])
+    lines = [f"📊 {'endpoint':<20} {'requests':>9} {'req/s':>8} {columns} {'max':>9}   (ms)"]
+    for name, hist in stats.histograms.items():
+        values = "".join(f"{hist.percentile(q) / 1000:>9.1f}" for q in REPORT_PERCENTILES[:4])
+        lines.append(f"   {name:<20} {hist.count:>9,} {hist.count / elapsed if elapsed else 0:>8.1f} "
+                     f"{values} {(hist.max or 0) / 1000:>9.1f}")
+    lines.append(f"⏱️  Schedule lag p99 {stats.lag.percentile(99) / 1000:.1f} ms, "
+                 f"max {(stats.lag.max or 0) / 1000:.1f} ms")
+    lines.append("📄 Statuses:")
+    for (endpoint, status), n in sorted(stats.statuses.items()):
+        lines.append(f"   {n:>9,}  {endpoint:<20} {status}")
+    if stats.skipped:
+        lines.append("⚠️  Skipped: " + ", ".join(f"{k} {n:,}" for k, n in stats.skipped.items()))
+    if stats.mismatches:
+        lines.append("❌ Mismatches:")
+        for (endpoint, kind), n in stats.mismatches.most_common():
+            lines.append(f"   {n:>9,}  {endpoint:<20} {kind}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="python -m validators.replay",
+        description="Replay recorded form submissions against a staging API and compare the responses",
+    )
+    parser.add_argument("--url", default="http://localhost:3001", help="Target API base URL")
+    parser.add_argument("--baseline-url", help="Also send every request here and compare responses")
+    parser.add_argument("--dsn", help="Database holding form_submissions (default: DATABASE_URL or DB_* variables)")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=datetime(1970, 1, 1),
+                        help="First submitted_at to replay (ISO date/time)")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=datetime(9999, 1, 1),
+                        help="Stop before this submitted_at")
+    parser.add_argument("--limit", type=int, help="Replay at most this many submissions")
+    parser.add_argument("--speedup", type=float, default=1.0,
+                        help="Divide original inter-arrival gaps by this (0: no pacing)")
+    parser.add_argument("--max-inflight", type=int, default=5_000, help="Pause the stream beyond this many in flight")
+    parser.add_argument("--connections", type=int, default=256, help="Maximum open HTTP connections per target")
+    parser.add_argument("--fetch-rows", type=int, default=DEFAULT_FETCH_ROWS, help="Rows per cursor fetch")
+    parser.add_argument("--otp", default=MOCK_OTP, help="OTP used to open sessions (targets run with OTPMOCK=true)")
+    parser.add_argument("--json", help="Write the summary, mismatch examples and histograms here")
+    args = parser.parse_args(argv)
+
+    if args.speedup < 0:
+        parser.error("--speedup must be >= 0")
+
+    submissions = stream_submissions(args.dsn, args.since, args.until, args.fetch_rows, args.limit)
+    pacing = f"{args.speedup:g}x" if args.speedup else "unpaced"
+    print(f"🔁 Replaying form_submissions ({pacing}) against {args.url}", file=sys.stderr)
+    stats, elapsed = asyncio.run(run_replay(
+        submissions, args.url, args.baseline_url, args.speedup, args.max_inflight, args.connections,
+        otp=args.otp,
+    ))
+    print(format_report(stats, elapsed))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(elapsed), f, indent=2, default=str)
+    return 1 if stats.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
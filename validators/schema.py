@@ -0,0 +1,113 @@
+"""
+Schema loading for the Udyam form validators
+Reads udyam_form_schema.json once and compiles every field rule
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .checksum import FIELD_CHECKSUMS
+from .compiler import compile_pattern
+
+DEFAULT_SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "udyam_form_schema.json",
+)
+
+
+class FieldError(NamedTuple):
+    """A single validation failure for one field of a record"""
+    field: str
+    code: str
+    message: str
+
+
+class FieldRule:
+    """Compiled validation rule for one form field"""
+
+    __slots__ = (
+        "name", "step", "required", "pattern", "min_length", "max_length",
+        "choices", "message", "check", "checksum",
+    )
+
+    def __init__(self, step: str, spec: Dict):
+        validation = spec.get("validation") or {}
+        self.name = spec["name"]
+        self.step = step
+        self.required = bool(spec.get("required", False))
+        self.pattern = validation.get("pattern")
+        self.min_length = validation.get("minLength")
+        max_length = spec.get("maxLength", validation.get("maxLength"))
+        self.max_length = int(max_length) if max_length is not None else None
+        options = spec.get("options")
+        self.choices = frozenset(o["value"] for o in options) if options else None
+        self.message = validation.get("errorMessage") or f"Invalid {spec.get('label', self.name)}"
+        self.check = compile_pattern(self.pattern) if self.pattern else None
+        self.checksum = FIELD_CHECKSUMS.get(self.name)
+
+    def validate(self, value, checksum: bool = True) -> Optional[FieldError]:
+        """Return a FieldError for value, or None when it is valid"""
+        if value is None or value == "":
+            if self.required:
+                return FieldError(self.name, "required", f"{self.name} is required")
+            return None
+        if not isinstance(value, str):
+            value = str(value)
+        if self.choices is not None and value not in self.choices:
+            return FieldError(self.name, "choice", f"{self.name} must be one of {sorted(self.choices)}")
+        if self.min_length is not None and len(value) < self.min_length:
+            return FieldError(self.name, "min_length", self.message)
+        if self.max_length is not None and len(value) > self.max_length:
+            return FieldError(self.name, "max_length", self.message)
+        if self.check is not None and not self.check(value):
+            return FieldError(self.name, "pattern", self.message)
+        if checksum and self.checksum is not None and not self.checksum(value):
+            return FieldError(self.name, "checksum", f"{self.name} check digit is invalid")
+        return None
+
+    def __repr__(self):
+        return f"FieldRule({self.name!r}, step={self.step!r}, pattern={self.pattern!r})"
+
+
+class CompiledSchema:
+    """All field rules from the form schema, ready for repeated use"""
+
+    def __init__(self, schema: Dict):
+        self.raw = schema
+        canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+        self.version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+        self.rules: Dict[str, FieldRule] = {}
+        for step, step_spec in schema.get("steps", {}).items():
+            for spec in step_spec.get("fields", []):
+                self.rules[spec["name"]] = FieldRule(step, spec)
+        self.validation_rules: Dict = schema.get("validation_rules", {})
+
+    def select(self, fields: Optional[Iterable[str]] = None,
+               steps: Optional[Iterable[str]] = None) -> List[FieldRule]:
+        """Return the rules for the given field names and/or steps"""
+        rules = list(self.rules.values())
+        if steps is not None:
+            wanted_steps = set(steps)
+            rules = [r for r in rules if r.step in wanted_steps]
+        if fields is not None:
+            wanted = set(fields)
+            unknown = wanted - set(self.rules)
+            if unknown:
+                raise KeyError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            rules = [r for r in rules if r.name in wanted]
+        return rules
+
+
+@lru_cache(maxsize=8)
+def _load_schema(path: str, mtime_ns: int, size: int) -> CompiledSchema:
+    with open(path, "r", encoding="utf-8") as f:
+        return CompiledSchema(json.load(f))
+
+
+def load_schema(path: str = DEFAULT_SCHEMA_PATH) -> CompiledSchema:
+    """Load and compile the form schema (cached until the file changes)"""
+    stat = os.stat(path)
+    return _load_schema(path, stat.st_mtime_ns, stat.st_size)